@@ -3,18 +3,105 @@ Redis-based caching with fallback to in-memory LRU cache.
 Handles cache invalidation on model updates.
 """
 
+import asyncio
 import hashlib
 import json
 import logging
 import time
 from collections import OrderedDict
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import redis
+import redis.asyncio as aioredis
 from redis.exceptions import ConnectionError, RedisError
 
+from inference.stats import RollingWindow
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_TTL_MAP = {
+    "classify": 3600,     # 1 hour for classification
+    "toxicity": 1800,     # 30 minutes for toxicity
+    "risk": 1800,         # 30 minutes for risk
+    "embedding": 7200,    # 2 hours for embeddings
+    "similarity": 600,    # 10 minutes for similarity
+    "analyze": 1800,      # 30 minutes for Gemini single-call analysis
+}
+
+MODEL_PREFIX_MAP = {
+    "classifier": "classify",
+    "toxicity": "toxicity",
+    "risk": "risk",
+    "embedding": "embedding",
+}
+
+# Prefixes caching results computed from a model's output, invalidated with
+# it: similarity scores come from the embedder (and its re-ranker).
+DERIVED_PREFIXES = {
+    "embedding": ("similarity",),
+}
+
+
+def model_prefixes(model_name: str) -> List[str]:
+    """Every cache prefix a retrained `model_name` makes stale (empty if unknown)."""
+    prefix = MODEL_PREFIX_MAP.get(model_name)
+    if prefix is None:
+        return []
+    return [prefix, *DERIVED_PREFIXES.get(model_name, ())]
+
+# Per-prefix generation counters live under their own namespace so that a
+# SCAN over "<prefix>:*" only ever sees cache entries.
+GENERATION_KEY_PREFIX = "cachegen"
+# Sorted set of access counts per prefix, used to pre-fill L1 at startup.
+HOT_KEY_PREFIX = "cachehot"
+
+
+def _make_digest(prefix: str, text: str, **kwargs) -> str:
+    raw = f"{prefix}:{text}:{sorted(kwargs.items())}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _make_cache_key(prefix: str, text: str, **kwargs) -> str:
+    """Readable, prefix-scoped key: "<prefix>:<digest>"."""
+    return f"{prefix}:{_make_digest(prefix, text, **kwargs)}"
+
+
+def _serialize_value(value: Any) -> str:
+    """Serialize value to JSON."""
+    try:
+        # Handle Pydantic models (v2)
+        if hasattr(value, "model_dump"):
+            return json.dumps(value.model_dump())
+        # Handle Pydantic models (v1)
+        if hasattr(value, "dict"):
+            return json.dumps(value.dict())
+        return json.dumps(value)
+    except TypeError:
+        logger.warning(f"Could not serialize value: {type(value)}")
+        return json.dumps({"error": "serialization_failed"})
+
+
+def _deserialize_value(data) -> Any:
+    """Deserialize JSON (str or bytes) to Python object."""
+    try:
+        return json.loads(data)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+def _to_plain(value: Any) -> Any:
+    """JSON-shaped copy of a value, so L1 hits look exactly like Redis hits."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if hasattr(value, "dict"):
+        return value.dict()
+    return value
+
+
+def _latency_summary(window: RollingWindow) -> Dict[str, Any]:
+    """Cache-tier operation latencies (ms), with the lifetime operation count."""
+    return {"count": window.count, **window.summary()}
+
 
 class BaseCacheManager:
     """Base cache interface."""
@@ -42,68 +129,111 @@ class BaseCacheManager:
 
 
 class InMemoryLRUCache(BaseCacheManager):
-    """In-memory LRU cache with TTL (fallback)."""
+    """
+    In-memory LRU cache with TTL.
+
+    Used as the Redis outage fallback and, with max_bytes set, as the
+    byte-accounted L1 tier in front of Redis. Entry sizes are the serialized
+    payload length plus the key, which tracks Redis memory closely enough to
+    bound the process footprint.
+    """
 
-    def __init__(self, max_size: int = 512, ttl_seconds: int = 300):
+    def __init__(
+        self,
+        max_size: int = 512,
+        ttl_seconds: int = 300,
+        max_bytes: Optional[int] = None,
+    ):
         self._cache: OrderedDict = OrderedDict()
         self._max_size = max_size
         self._ttl = ttl_seconds
+        self._max_bytes = max_bytes
+        self._bytes = 0
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
 
     def _make_key(self, prefix: str, text: str, **kwargs) -> str:
-        raw = f"{prefix}:{text}:{sorted(kwargs.items())}"
-        return hashlib.md5(raw.encode()).hexdigest()
+        return _make_cache_key(prefix, text, **kwargs)
 
-    def get(self, prefix: str, text: str, **kwargs) -> Optional[Any]:
-        key = self._make_key(prefix, text, **kwargs)
-        if key in self._cache:
-            value, ts = self._cache[key]
+    def get_by_key(self, key: str) -> Optional[Any]:
+        entry = self._cache.get(key)
+        if entry is not None:
+            value, ts, _ = entry
             if time.time() - ts < self._ttl:
                 self._cache.move_to_end(key)
                 self._hits += 1
                 return value
-            del self._cache[key]
+            self.delete_by_key(key)
         self._misses += 1
         return None
 
+    def set_by_key(self, key: str, value: Any, size_bytes: Optional[int] = None) -> None:
+        if size_bytes is None:
+            size_bytes = len(_serialize_value(value)) if self._max_bytes else 0
+        size_bytes += len(key)
+        if self._max_bytes and size_bytes > self._max_bytes:
+            return  # never let a single oversized value flush the whole tier
+        if key in self._cache:
+            self.delete_by_key(key)
+        self._cache[key] = (value, time.time(), size_bytes)
+        self._bytes += size_bytes
+        while self._cache and (
+            len(self._cache) > self._max_size
+            or (self._max_bytes and self._bytes > self._max_bytes)
+        ):
+            _, (_, _, evicted_size) = self._cache.popitem(last=False)
+            self._bytes -= evicted_size
+            self._evictions += 1
+
+    def delete_by_key(self, key: str) -> bool:
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+
+    def get(self, prefix: str, text: str, **kwargs) -> Optional[Any]:
+        return self.get_by_key(self._make_key(prefix, text, **kwargs))
+
     def set(self, prefix: str, text: str, value: Any, **kwargs) -> None:
-        key = self._make_key(prefix, text, **kwargs)
-        self._cache[key] = (value, time.time())
-        self._cache.move_to_end(key)
-        if len(self._cache) > self._max_size:
-            self._cache.popitem(last=False)
+        self.set_by_key(self._make_key(prefix, text, **kwargs), value)
 
     def delete(self, prefix: str, text: str, **kwargs) -> bool:
-        key = self._make_key(prefix, text, **kwargs)
-        if key in self._cache:
-            del self._cache[key]
-            return True
-        return False
+        return self.delete_by_key(self._make_key(prefix, text, **kwargs))
 
     def clear_prefix(self, prefix: str) -> int:
         """🚨 Note: In-memory cache doesn't track prefixes efficiently."""
-        count = 0
-        keys_to_delete = [k for k in self._cache if k.startswith(prefix)]
+        keys_to_delete = [k for k in self._cache if k.startswith(f"{prefix}:")]
         for key in keys_to_delete:
-            del self._cache[key]
-            count += 1
-        return count
+            self.delete_by_key(key)
+        return len(keys_to_delete)
 
     def invalidate_on_model_update(self, model_name: str) -> int:
-        return self.clear_prefix(model_name)
+        prefixes = model_prefixes(model_name) or [model_name]
+        return sum(self.clear_prefix(prefix) for prefix in prefixes)
 
     @property
     def stats(self) -> Dict[str, Any]:
         total = self._hits + self._misses
         rate = (self._hits / total * 100) if total > 0 else 0.0
-        return {
+        stats = {
             "hits": self._hits,
             "misses": self._misses,
             "hit_rate": f"{rate:.1f}%",
             "size": len(self._cache),
             "backend": "in-memory",
         }
+        if self._max_bytes:
+            stats.update(
+                {
+                    "bytes": self._bytes,
+                    "max_bytes": self._max_bytes,
+                    "evictions": self._evictions,
+                    "ttl_seconds": self._ttl,
+                }
+            )
+        return stats
 
 
 class RedisCacheManager(BaseCacheManager):
@@ -128,13 +258,7 @@ class RedisCacheManager(BaseCacheManager):
             fallback_cache: Optional in-memory cache for failover
         """
         self._redis_url = redis_url
-        self._ttl_map = ttl_map or {
-            "classify": 3600,     # 1 hour for classification
-            "toxicity": 1800,     # 30 minutes for toxicity
-            "risk": 1800,         # 30 minutes for risk
-            "embedding": 7200,    # 2 hours for embeddings
-            "similarity": 600,    # 10 minutes for similarity
-        }
+        self._ttl_map = ttl_map or dict(DEFAULT_TTL_MAP)
         self._fallback = fallback_cache or InMemoryLRUCache(max_size=128, ttl_seconds=300)
         self._redis: Optional[redis.Redis] = None
         self._connected = False
@@ -166,29 +290,13 @@ class RedisCacheManager(BaseCacheManager):
             return False
 
     def _make_key(self, prefix: str, text: str, **kwargs) -> str:
-        raw = f"{prefix}:{text}:{sorted(kwargs.items())}"
-        return hashlib.md5(raw.encode()).hexdigest()
+        return _make_cache_key(prefix, text, **kwargs)
 
     def _serialize(self, value: Any) -> str:
-        """Serialize value to JSON."""
-        try:
-            # Handle Pydantic models (v2)
-            if hasattr(value, "model_dump"):
-                return json.dumps(value.model_dump())
-            # Handle Pydantic models (v1)
-            if hasattr(value, "dict"):
-                return json.dumps(value.dict())
-            return json.dumps(value)
-        except TypeError:
-            logger.warning(f"Could not serialize value: {type(value)}")
-            return json.dumps({"error": "serialization_failed"})
+        return _serialize_value(value)
 
     def _deserialize(self, data: str) -> Any:
-        """Deserialize JSON to Python object."""
-        try:
-            return json.loads(data)
-        except json.JSONDecodeError:
-            return None
+        return _deserialize_value(data)
 
     def get(self, prefix: str, text: str, **kwargs) -> Optional[Any]:
         """Get value from cache (Redis first, fallback to in-memory)."""
@@ -249,8 +357,7 @@ class RedisCacheManager(BaseCacheManager):
 
         if self._connected and self._redis:
             try:
-                pattern = f"{prefix}:*"
-                keys = self._redis.keys(pattern)
+                keys = list(self._redis.scan_iter(match=f"{prefix}:*", count=500))
                 if keys:
                     count += self._redis.delete(*keys)
                 logger.info(f"Cleared {count} Redis cache entries for prefix: {prefix}")
@@ -266,17 +373,10 @@ class RedisCacheManager(BaseCacheManager):
         Invalidate cache when a model is updated.
         Maps model names to their cache prefixes.
         """
-        model_prefix_map = {
-            "classifier": "classify",
-            "toxicity": "toxicity",
-            "risk": "risk",
-            "embedding": "embedding",
-        }
-        prefix = model_prefix_map.get(model_name)
-        if prefix:
+        prefixes = model_prefixes(model_name)
+        if prefixes:
             logger.info(f"🔄 Invalidating cache for model: {model_name}")
-            return self.clear_prefix(prefix)
-        return 0
+        return sum(self.clear_prefix(prefix) for prefix in prefixes)
 
     def reconnect(self) -> bool:
         """Attempt to reconnect to Redis."""
@@ -307,3 +407,552 @@ class RedisCacheManager(BaseCacheManager):
             "redis_info": redis_info,
             "fallback_cache": self._fallback.stats,
         }
+
+
+class AsyncRedisCacheManager(BaseCacheManager):
+    """
+    Non-blocking Redis cache for the async endpoints.
+
+    Same TTLs and in-memory fallback as RedisCacheManager, but every Redis
+    round-trip is awaited on a bounded redis.asyncio connection pool, so a
+    slow Redis delays only the requests that touch it instead of stalling the
+    whole event loop. All I/O methods are coroutines and must be awaited.
+
+    Keys are namespaced as "<prefix>:<generation>:<digest>". Each prefix has a
+    generation counter in Redis ("cachegen:<prefix>"); invalidating a prefix
+    is a single INCR, after which old-generation entries are unreachable and
+    age out through their TTL. The counter is cached locally for
+    generation_refresh seconds, which bounds how long other replicas can keep
+    serving a just-invalidated generation.
+
+    With an l1_cache, reads are two-tier: a byte-bounded in-process LRU with a
+    short TTL answers hot keys without a network round-trip or JSON decode,
+    and is populated from Redis hits and writes. L1 keys carry the generation
+    too, so invalidation applies to both tiers.
+    """
+
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379/0",
+        ttl_map: Optional[Dict[str, int]] = None,
+        fallback_cache: Optional[InMemoryLRUCache] = None,
+        max_connections: int = 32,
+        socket_timeout: float = 0.5,
+        pool_timeout: float = 0.5,
+        retry_interval: float = 5.0,
+        generation_refresh: float = 5.0,
+        l1_cache: Optional[InMemoryLRUCache] = None,
+        hot_keys_tracked: int = 0,
+    ):
+        """
+        Args:
+            redis_url: Redis connection string
+            ttl_map: Dict mapping prefix to TTL (e.g., {"classify": 3600, "toxicity": 1800})
+            fallback_cache: Optional in-memory cache for failover
+            max_connections: Size of the shared connection pool
+            socket_timeout: Per-command socket timeout in seconds
+            pool_timeout: Max seconds to wait for a free pooled connection
+            retry_interval: Seconds to stay on the fallback cache before retrying Redis
+            generation_refresh: Seconds a prefix generation is cached locally
+            l1_cache: Optional in-process tier consulted before Redis
+            hot_keys_tracked: Per-prefix size of the Redis access-count set used
+                by prefill_l1 (0 disables tracking)
+        """
+        self._redis_url = redis_url
+        self._ttl_map = ttl_map or dict(DEFAULT_TTL_MAP)
+        self._fallback = fallback_cache or InMemoryLRUCache(max_size=128, ttl_seconds=300)
+        self._max_connections = max_connections
+        self._socket_timeout = socket_timeout
+        self._pool_timeout = pool_timeout
+        self._retry_interval = retry_interval
+        self._generation_refresh = generation_refresh
+        self._pool: Optional[aioredis.BlockingConnectionPool] = None
+        self._redis: Optional[aioredis.Redis] = None
+        self._connected = False
+        self._retry_at = 0.0
+        self._generations: Dict[str, Tuple[int, float]] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+        self._swept = 0
+        self._l1 = l1_cache
+        self._hot_keys_tracked = hot_keys_tracked
+        self._hot_writes: Dict[str, int] = {}
+        self._l1_latency = RollingWindow()
+        self._l2_latency = RollingWindow()
+        self._l2_hits = 0
+        self._l2_misses = 0
+        self._hits = 0
+        self._misses = 0
+        self._redis_info: Dict[str, Any] = {}
+
+    def _build_client(self) -> aioredis.Redis:
+        # Raw bytes on the wire: json.loads accepts bytes, and binary payloads
+        # can share the same pool.
+        self._pool = aioredis.BlockingConnectionPool.from_url(
+            self._redis_url,
+            max_connections=self._max_connections,
+            timeout=self._pool_timeout,
+            socket_connect_timeout=self._socket_timeout,
+            socket_timeout=self._socket_timeout,
+        )
+        return aioredis.Redis(connection_pool=self._pool)
+
+    async def connect(self) -> bool:
+        """Attempt to connect to Redis. Call once from the app lifespan."""
+        try:
+            if self._redis is None:
+                self._redis = self._build_client()
+            await self._redis.ping()
+            self._connected = True
+            # Re-read generations: another replica may have bumped them meanwhile.
+            self._generations = {
+                prefix: (generation, 0.0)
+                for prefix, (generation, _) in self._generations.items()
+            }
+            logger.info(
+                "✅ Redis (asyncio) connected successfully "
+                f"(pool max_connections={self._max_connections})"
+            )
+            return True
+        except (ConnectionError, RedisError, OSError) as e:
+            logger.warning(f"⚠️ Redis connection failed: {e}. Using in-memory fallback.")
+            self._mark_down()
+            return False
+        except Exception as e:
+            logger.error(f"❌ Unexpected Redis error: {e}")
+            self._mark_down()
+            return False
+
+    async def close(self) -> None:
+        """Stop background jobs and release pooled connections on shutdown."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        if self._redis is not None:
+            try:
+                await self._redis.aclose(close_connection_pool=True)
+            except RedisError:
+                pass
+        self._redis = None
+        self._pool = None
+        self._connected = False
+
+    def _mark_down(self) -> None:
+        self._connected = False
+        self._retry_at = time.monotonic() + self._retry_interval
+
+    async def _available(self) -> bool:
+        """True when Redis should be used; retries a lost connection periodically."""
+        if self._connected and self._redis is not None:
+            return True
+        if self._redis is None or time.monotonic() < self._retry_at:
+            return False
+        return await self.connect()
+
+    # ── Generations ───────────────────────────────────────────────────────────
+
+    async def generation(self, prefix: str) -> int:
+        """Current generation for a prefix (locally cached, refreshed from Redis)."""
+        now = time.monotonic()
+        cached = self._generations.get(prefix)
+        if cached is not None and now - cached[1] < self._generation_refresh:
+            return cached[0]
+
+        generation = cached[0] if cached is not None else 0
+        if await self._available():
+            try:
+                raw = await self._redis.get(f"{GENERATION_KEY_PREFIX}:{prefix}")
+                # Never go backwards: a local bump made during an outage must
+                # keep hiding the entries it invalidated.
+                generation = max(generation, int(raw) if raw else 0)
+            except (RedisError, ValueError) as e:
+                logger.warning(f"Redis generation read failed for {prefix}: {e}")
+                if isinstance(e, RedisError):
+                    self._mark_down()
+        self._generations[prefix] = (generation, now)
+        return generation
+
+    async def bump_generation(self, prefix: str) -> int:
+        """Invalidate every entry under a prefix in O(1) by advancing its generation."""
+        generation = (await self.generation(prefix)) + 1
+        if await self._available():
+            try:
+                generation = int(await self._redis.incr(f"{GENERATION_KEY_PREFIX}:{prefix}"))
+            except RedisError as e:
+                logger.warning(f"Redis generation bump failed for {prefix}: {e}")
+                self._mark_down()
+        self._generations[prefix] = (generation, time.monotonic())
+        return generation
+
+    @staticmethod
+    def _versioned_key(prefix: str, generation: int, text: str, **kwargs) -> str:
+        return f"{prefix}:{generation}:{_make_digest(prefix, text, **kwargs)}"
+
+    async def _make_key(self, prefix: str, text: str, **kwargs) -> str:
+        return self._versioned_key(prefix, await self.generation(prefix), text, **kwargs)
+
+    def fingerprint(self, prefix: str, text: str, **kwargs) -> str:
+        """Generation-free request identity, for coalescing concurrent identical work."""
+        return _make_cache_key(prefix, text, **kwargs)
+
+    # ── Entry operations ──────────────────────────────────────────────────────
+
+    async def _fetch(self, prefix: str, key: str) -> Optional[bytes]:
+        """GET a key, counting the access for L1 pre-fill in the same round-trip."""
+        if not self._hot_keys_tracked:
+            return await self._redis.get(key)
+
+        hot_key = f"{HOT_KEY_PREFIX}:{prefix}"
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.zincrby(hot_key, 1, key)
+        writes = self._hot_writes.get(prefix, 0) + 1
+        self._hot_writes[prefix] = writes
+        if writes % 1024 == 0:
+            # Keep only the hottest members so the set stays bounded.
+            pipe.zremrangebyrank(hot_key, 0, -(self._hot_keys_tracked + 1))
+        results = await pipe.execute()
+        return results[0]
+
+    async def get(self, prefix: str, text: str, **kwargs) -> Optional[Any]:
+        """Get value from cache (L1, then Redis, then the outage fallback)."""
+        key = await self._make_key(prefix, text, **kwargs)
+
+        if self._l1 is not None:
+            started_at = time.perf_counter()
+            value = self._l1.get_by_key(key)
+            self._l1_latency.add((time.perf_counter() - started_at) * 1000.0)
+            if value is not None:
+                self._hits += 1
+                return value
+
+        if await self._available():
+            try:
+                started_at = time.perf_counter()
+                data = await self._fetch(prefix, key)
+                self._l2_latency.add((time.perf_counter() - started_at) * 1000.0)
+                if data:
+                    self._l2_hits += 1
+                    self._hits += 1
+                    value = _deserialize_value(data)
+                    if self._l1 is not None and value is not None:
+                        self._l1.set_by_key(key, value, len(data))
+                    return value
+                self._l2_misses += 1
+            except RedisError as e:
+                logger.warning(f"Redis GET failed: {e}. Checking fallback cache.")
+                self._mark_down()
+
+        # Fallback to in-memory
+        value = self._fallback.get(prefix, text, **kwargs)
+        if value:
+            self._hits += 1
+        else:
+            self._misses += 1
+        return value
+
+    async def set(self, prefix: str, text: str, value: Any, **kwargs) -> None:
+        """Set value in cache (Redis + in-memory fallback)."""
+        key = await self._make_key(prefix, text, **kwargs)
+        serialized = _serialize_value(value)
+        ttl = self._ttl_map.get(prefix, 300)
+
+        if await self._available():
+            try:
+                await self._redis.setex(key, ttl, serialized)
+                if self._l1 is not None:
+                    self._l1.set_by_key(key, _to_plain(value), len(serialized))
+                return
+            except RedisError as e:
+                logger.warning(f"Redis SET failed: {e}. Using fallback cache.")
+                self._mark_down()
+        self._fallback.set(prefix, text, value, **kwargs)
+
+    # ── Batch operations ──────────────────────────────────────────────────────
+
+    async def _get_many(
+        self, prefix: str, texts: List[str], raw: bool, **kwargs
+    ) -> List[Optional[Any]]:
+        generation = await self.generation(prefix)
+        keys = [self._versioned_key(prefix, generation, text, **kwargs) for text in texts]
+        values: List[Optional[Any]] = [None] * len(keys)
+
+        pending = []
+        for i, key in enumerate(keys):
+            value = self._l1.get_by_key(key) if self._l1 is not None else None
+            if value is not None:
+                values[i] = value
+            else:
+                pending.append(i)
+
+        if pending and await self._available():
+            try:
+                started_at = time.perf_counter()
+                fetched = await self._redis.mget([keys[i] for i in pending])
+                self._l2_latency.add((time.perf_counter() - started_at) * 1000.0)
+                for i, data in zip(pending, fetched):
+                    value = data if raw or data is None else _deserialize_value(data)
+                    if value is None:
+                        self._l2_misses += 1
+                        continue
+                    self._l2_hits += 1
+                    values[i] = value
+                    if self._l1 is not None:
+                        self._l1.set_by_key(keys[i], value, len(data))
+                pending = [i for i in pending if values[i] is None]
+            except RedisError as e:
+                logger.warning(f"Redis MGET failed: {e}. Checking fallback cache.")
+                self._mark_down()
+
+        for i in pending:
+            values[i] = self._fallback.get(prefix, texts[i], **kwargs)
+
+        found = sum(1 for value in values if value is not None)
+        self._hits += found
+        self._misses += len(values) - found
+        return values
+
+    async def _set_many(
+        self, prefix: str, items: Dict[str, Any], raw: bool, **kwargs
+    ) -> None:
+        if not items:
+            return
+        generation = await self.generation(prefix)
+        ttl = self._ttl_map.get(prefix, 300)
+        entries = [
+            (
+                self._versioned_key(prefix, generation, text, **kwargs),
+                text,
+                value,
+                value if raw else _serialize_value(value),
+            )
+            for text, value in items.items()
+        ]
+
+        if await self._available():
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for key, _, _, data in entries:
+                    pipe.setex(key, ttl, data)
+                await pipe.execute()
+                if self._l1 is not None:
+                    for key, _, value, data in entries:
+                        self._l1.set_by_key(key, value if raw else _to_plain(value), len(data))
+                return
+            except RedisError as e:
+                logger.warning(f"Redis pipelined SET failed: {e}. Using fallback cache.")
+                self._mark_down()
+        for _, text, value, _ in entries:
+            self._fallback.set(prefix, text, value, **kwargs)
+
+    async def get_many(self, prefix: str, texts: List[str], **kwargs) -> List[Optional[Any]]:
+        """Batched get: one MGET for every text not already in L1; None marks a miss."""
+        return await self._get_many(prefix, texts, raw=False, **kwargs)
+
+    async def set_many(self, prefix: str, items: Dict[str, Any], **kwargs) -> None:
+        """Batched set of {text: value} in one pipelined round-trip."""
+        await self._set_many(prefix, items, raw=False, **kwargs)
+
+    async def get_many_raw(self, prefix: str, texts: List[str], **kwargs) -> List[Optional[bytes]]:
+        """
+        Like get_many, for raw binary values that are not JSON
+        (e.g. packed float32 vectors).
+        """
+        return await self._get_many(prefix, texts, raw=True, **kwargs)
+
+    async def set_many_raw(self, prefix: str, items: Dict[str, bytes], **kwargs) -> None:
+        """Like set_many, storing the bytes as-is."""
+        await self._set_many(prefix, items, raw=True, **kwargs)
+
+    async def delete(self, prefix: str, text: str, **kwargs) -> bool:
+        """Delete entry from cache."""
+        key = await self._make_key(prefix, text, **kwargs)
+        deleted = self._l1.delete_by_key(key) if self._l1 is not None else False
+
+        if await self._available():
+            try:
+                deleted = await self._redis.delete(key) > 0
+            except RedisError as e:
+                logger.warning(f"Redis DELETE failed: {e}")
+                self._mark_down()
+
+        deleted = self._fallback.delete(prefix, text, **kwargs) or deleted
+        return deleted
+
+    async def clear_prefix(self, prefix: str) -> int:
+        """
+        Invalidate all entries for a prefix (e.g., when model is retrained).
+
+        Redis entries are orphaned by a generation bump rather than deleted, so
+        the return value only counts the in-memory fallback entries removed.
+        """
+        generation = await self.bump_generation(prefix)
+        count = self._fallback.clear_prefix(prefix)
+        if self._l1 is not None:
+            self._l1.clear_prefix(prefix)
+        logger.info(f"Cache prefix {prefix} advanced to generation {generation}")
+        return count
+
+    async def invalidate_on_model_update(self, model_name: str) -> int:
+        """Invalidate cache when a model is updated, with the prefixes derived from it."""
+        prefixes = model_prefixes(model_name)
+        if prefixes:
+            logger.info(f"🔄 Invalidating cache for model: {model_name}")
+        count = 0
+        for prefix in prefixes:
+            count += await self.clear_prefix(prefix)
+        return count
+
+    async def prefill_l1(self, limit: int) -> int:
+        """
+        Warm L1 at startup with up to `limit` of the most-read current-generation
+        keys per prefix, using one ZREVRANGE and one MGET per prefix.
+        """
+        if self._l1 is None or limit <= 0 or not await self._available():
+            return 0
+
+        loaded = 0
+        for prefix in self._ttl_map:
+            current = f"{prefix}:{await self.generation(prefix)}:"
+            try:
+                members = await self._redis.zrevrange(
+                    f"{HOT_KEY_PREFIX}:{prefix}", 0, limit - 1
+                )
+                keys = [
+                    name
+                    for name in (
+                        m.decode() if isinstance(m, bytes) else m for m in members
+                    )
+                    if name.startswith(current)
+                ]
+                if not keys:
+                    continue
+                values = await self._redis.mget(keys)
+            except RedisError as e:
+                logger.warning(f"L1 prefill failed for {prefix}: {e}")
+                self._mark_down()
+                break
+            for key, data in zip(keys, values):
+                value = _deserialize_value(data) if data else None
+                if value is not None:
+                    self._l1.set_by_key(key, value, len(data))
+                    loaded += 1
+
+        logger.info(f"L1 cache pre-filled with {loaded} hot entries")
+        return loaded
+
+    # ── Stale-generation cleanup (optional) ───────────────────────────────────
+
+    async def sweep_stale_generations(
+        self,
+        prefixes: Optional[List[str]] = None,
+        batch_size: int = 500,
+    ) -> int:
+        """
+        Physically remove entries from superseded generations with SCAN + UNLINK.
+        Never required for correctness; it only frees memory ahead of the TTL.
+        """
+        if not await self._available():
+            return 0
+
+        removed = 0
+        for prefix in prefixes or list(self._ttl_map):
+            cached = self._generations.get(prefix)
+            if cached is not None:
+                self._generations[prefix] = (cached[0], 0.0)  # force a fresh read
+            current = await self.generation(prefix)
+            stale: List[Any] = []
+            try:
+                async for key in self._redis.scan_iter(match=f"{prefix}:*", count=batch_size):
+                    name = key.decode() if isinstance(key, bytes) else key
+                    parts = name.split(":", 2)
+                    # Only older generations: another replica may bump the
+                    # counter mid-scan, and its new live entries must stay.
+                    # Keys without a numeric generation are not ours to judge.
+                    if len(parts) == 3 and parts[1].isdigit() and int(parts[1]) < current:
+                        stale.append(key)
+                    if len(stale) >= batch_size:
+                        removed += await self._redis.unlink(*stale)
+                        stale = []
+                if stale:
+                    removed += await self._redis.unlink(*stale)
+            except RedisError as e:
+                logger.warning(f"Stale generation sweep failed for {prefix}: {e}")
+                self._mark_down()
+                break
+
+        self._swept += removed
+        if removed:
+            logger.info(f"Swept {removed} stale-generation cache entries")
+        return removed
+
+    def start_stale_sweeper(self, interval_seconds: float) -> None:
+        """Run sweep_stale_generations every interval_seconds in the background."""
+        if interval_seconds <= 0 or self._sweeper is not None:
+            return
+
+        async def _loop():
+            while True:
+                await asyncio.sleep(interval_seconds)
+                try:
+                    await self.sweep_stale_generations()
+                except Exception as e:
+                    logger.warning(f"Stale generation sweeper error: {e}")
+
+        self._sweeper = asyncio.create_task(_loop())
+
+    # ── Admin / observability ─────────────────────────────────────────────────
+
+    async def reconnect(self) -> bool:
+        """Attempt to reconnect to Redis."""
+        return await self.connect()
+
+    async def refresh_info(self) -> Dict[str, Any]:
+        """Fetch Redis server info for the stats snapshot (not on the hot path)."""
+        if await self._available():
+            try:
+                info = await self._redis.info()
+                self._redis_info = {
+                    "memory_used_mb": info.get("used_memory_human", "N/A"),
+                    "connected_clients": info.get("connected_clients", 0),
+                }
+            except RedisError:
+                pass
+        return self._redis_info
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        total = self._hits + self._misses
+        rate = (self._hits / total * 100) if total > 0 else 0.0
+        pool_in_use = (
+            len(getattr(self._pool, "_in_use_connections", ()))
+            if self._pool is not None
+            else 0
+        )
+
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": f"{rate:.1f}%",
+            "backend": "redis-asyncio" if self._connected else "in-memory (fallback)",
+            "redis_connected": self._connected,
+            "redis_info": self._redis_info,
+            "pool": {
+                "max_connections": self._max_connections,
+                "in_use": pool_in_use,
+            },
+            "generations": {
+                prefix: generation for prefix, (generation, _) in self._generations.items()
+            },
+            "stale_entries_swept": self._swept,
+            "l1": (
+                {**self._l1.stats, "latency_ms": _latency_summary(self._l1_latency)}
+                if self._l1 is not None
+                else None
+            ),
+            "l2": {
+                "hits": self._l2_hits,
+                "misses": self._l2_misses,
+                "latency_ms": _latency_summary(self._l2_latency),
+            },
+            "fallback_cache": self._fallback.stats,
+        }
@@ -1,6 +1,7 @@
 import json
 import os
 import platform
+import tempfile
 
 from dotenv import load_dotenv
 
@@ -135,12 +136,120 @@ print(f"[ML Service] CPU threads for inference: {NUM_THREADS}")
 INFERENCE_MAX_CONCURRENCY = int(
     os.getenv("INFERENCE_MAX_CONCURRENCY", "2" if DEVICE == "cuda" else "4")
 )
+# Per-model concurrency pools (local provider): every model admits up to
+# INFERENCE_MAX_CONCURRENCY concurrent endpoint calls, each with its own
+# queue; INFERENCE_POOL_LIMITS overrides single models, e.g. "classifier:2,risk:16".
+INFERENCE_POOL_LIMITS = {
+    name: INFERENCE_MAX_CONCURRENCY for name in ("classifier", "embedding", "toxicity", "risk")
+}
+for _item in _load_csv_env("INFERENCE_POOL_LIMITS", []):
+    _model, _, _limit = _item.partition(":")
+    if _limit.strip():
+        INFERENCE_POOL_LIMITS[_model.strip().lower()] = int(_limit)
+
+# CPU core partitioning (local provider on CPU, models in this process): each
+# model runs on its own executor with its share of the cores as torch intra-op
+# threads, instead of every concurrent call using ML_NUM_THREADS. The split
+# is "auto" (shares follow per-model service time measured during warmup) or
+# weights such as "classifier:4,embedding:2,toxicity:2". MODEL_CORE_PIN also
+# pins each model's thread to its cores (Linux).
+MODEL_CORE_SCHEDULER_ENABLED = (
+    os.getenv("MODEL_CORE_SCHEDULER_ENABLED", "true").lower() == "true" and DEVICE == "cpu"
+)
+MODEL_CORE_SPLIT = os.getenv("MODEL_CORE_SPLIT", "auto")
+MODEL_CORE_PIN = os.getenv("MODEL_CORE_PIN", "false").lower() == "true"
+
+# Model loading (local provider): startup loads run concurrently in worker
+# threads; models named in MODEL_LAZY_LOAD (embedding, classifier, toxicity,
+# risk, or "all") load on first use instead.
+MODEL_PARALLEL_LOAD = os.getenv("MODEL_PARALLEL_LOAD", "true").lower() == "true"
+MODEL_LAZY_LOAD = {
+    name.strip()
+    for name in os.getenv("MODEL_LAZY_LOAD", "").lower().split(",")
+    if name.strip()
+}
+# Memory budget: above MODEL_MEMORY_BUDGET_MB of RSS (0 = off), optional
+# sub-models idle for MODEL_EVICT_IDLE_SECONDS are unloaded, least recently
+# used first, and reloaded when wanted again and back within budget.
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", 0))
+MODEL_EVICTABLE = [
+    name.strip()
+    for name in os.getenv("MODEL_EVICTABLE", "cross_encoder,fast_classifier").split(",")
+    if name.strip()
+]
+MODEL_EVICT_IDLE_SECONDS = float(os.getenv("MODEL_EVICT_IDLE_SECONDS", 300))
+MODEL_MEMORY_CHECK_INTERVAL_SECONDS = float(os.getenv("MODEL_MEMORY_CHECK_INTERVAL_SECONDS", 30))
+# Warmup (local provider): after startup, texts of each length (in words)
+# are run through every loaded model at each batch size; /health reports
+# provider_ready only once this has finished.
+MODEL_WARMUP_ENABLED = os.getenv("MODEL_WARMUP_ENABLED", "true").lower() == "true"
+MODEL_WARMUP_LENGTHS = [
+    int(n) for n in os.getenv("MODEL_WARMUP_LENGTHS", "8,64,256").split(",") if n.strip()
+]
+MODEL_WARMUP_BATCH_SIZES = [
+    int(n) for n in os.getenv("MODEL_WARMUP_BATCH_SIZES", "1,8").split(",") if n.strip()
+]
+# A failed warmup is retried with doubling backoff; once every attempt has
+# failed /health answers 503 "unhealthy" so the orchestrator restarts the pod.
+MODEL_WARMUP_ATTEMPTS = max(1, int(os.getenv("MODEL_WARMUP_ATTEMPTS", 3)))
+MODEL_WARMUP_RETRY_BACKOFF_SECONDS = float(os.getenv("MODEL_WARMUP_RETRY_BACKOFF_SECONDS", 5))
+
+# Prefork serving (python prefork.py): the master loads the models once and
+# forks PREFORK_WORKERS uvicorn workers that share the weights copy-on-write.
+# Each worker runs PREFORK_THREADS_PER_WORKER torch threads (0 = an equal
+# share of the cores), pinned to its own cores when PREFORK_PIN_CPUS is set.
+PREFORK_WORKERS = int(os.getenv("PREFORK_WORKERS", 2))
+PREFORK_THREADS_PER_WORKER = int(os.getenv("PREFORK_THREADS_PER_WORKER", 0))
+PREFORK_PIN_CPUS = os.getenv("PREFORK_PIN_CPUS", "true").lower() == "true"
+# Workers publish health/cache snapshots here; /health aggregates them.
+PREFORK_STATS_DIR = os.getenv(
+    "PREFORK_STATS_DIR", os.path.join(tempfile.gettempdir(), f"ml-service-workers-{PORT}")
+)
+PREFORK_STATS_INTERVAL_SECONDS = float(os.getenv("PREFORK_STATS_INTERVAL_SECONDS", 5))
+# A worker exiting within PREFORK_RAPID_EXIT_SECONDS of its start is re-forked
+# after a delay doubling from PREFORK_RESTART_BACKOFF_SECONDS; after
+# PREFORK_MAX_RAPID_RESTARTS such exits in a row the master exits non-zero.
+PREFORK_RAPID_EXIT_SECONDS = float(os.getenv("PREFORK_RAPID_EXIT_SECONDS", 60))
+PREFORK_RESTART_BACKOFF_SECONDS = float(os.getenv("PREFORK_RESTART_BACKOFF_SECONDS", 1))
+PREFORK_RESTART_BACKOFF_MAX_SECONDS = float(
+    os.getenv("PREFORK_RESTART_BACKOFF_MAX_SECONDS", 30)
+)
+PREFORK_MAX_RAPID_RESTARTS = int(os.getenv("PREFORK_MAX_RAPID_RESTARTS", 5))
+
+# Out-of-process inference (local provider): with INFERENCE_PROCESS_WORKERS > 0
+# the embedding, classifier and toxicity models run in that many spawned
+# model processes (INFERENCE_PROCESS_THREADS torch threads each, 0 = an equal
+# share of ML_NUM_THREADS) and the API process only does I/O. Arrays of at
+# least INFERENCE_SHM_MIN_BYTES cross the process boundary in shared memory.
+INFERENCE_PROCESS_WORKERS = int(os.getenv("INFERENCE_PROCESS_WORKERS", 0))
+INFERENCE_PROCESS_THREADS = int(os.getenv("INFERENCE_PROCESS_THREADS", 0))
+INFERENCE_PROCESS_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_PROCESS_TIMEOUT_SECONDS", 120))
+INFERENCE_PROCESS_START_TIMEOUT_SECONDS = float(
+    os.getenv("INFERENCE_PROCESS_START_TIMEOUT_SECONDS", 600)
+)
+INFERENCE_SHM_MIN_BYTES = int(os.getenv("INFERENCE_SHM_MIN_BYTES", 16384))
 
 # Performance optimizations
 USE_BETTERTRANSFORMER = os.getenv("USE_BETTERTRANSFORMER", "true").lower() == "true"
 TORCH_COMPILE_MODE = os.getenv("TORCH_COMPILE_MODE", "reduce-overhead")  # or 'max-autotune'
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", 1))  # For future batch processing
 
+# Dynamic micro-batching (local provider): concurrent classify calls are
+# queued for up to MAX_WAIT_MS and run as one padded batch.
+CLASSIFIER_BATCHING_ENABLED = os.getenv("CLASSIFIER_BATCHING_ENABLED", "true").lower() == "true"
+CLASSIFIER_MAX_BATCH_SIZE = int(os.getenv("CLASSIFIER_MAX_BATCH_SIZE", 16))
+CLASSIFIER_BATCH_MAX_WAIT_MS = float(os.getenv("CLASSIFIER_BATCH_MAX_WAIT_MS", 5))
+TOXICITY_BATCHING_ENABLED = os.getenv("TOXICITY_BATCHING_ENABLED", "true").lower() == "true"
+TOXICITY_MAX_BATCH_SIZE = int(os.getenv("TOXICITY_MAX_BATCH_SIZE", 32))
+TOXICITY_BATCH_MAX_WAIT_MS = float(os.getenv("TOXICITY_BATCH_MAX_WAIT_MS", 5))
+# Texts per Detoxify forward pass after length-sorting a batch.
+TOXICITY_PADDING_CHUNK = int(os.getenv("TOXICITY_PADDING_CHUNK", 8))
+
+# Bulk endpoints (/classify/batch, ...): max items per request, and how many
+# cache misses are in flight at once while streaming results.
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 1000))
+BATCH_MAX_IN_FLIGHT = int(os.getenv("BATCH_MAX_IN_FLIGHT", 64))
+
 # Enable CUDA optimizations
 if DEVICE == "cuda":
     torch.backends.cudnn.benchmark = True  # Auto-tune kernels
@@ -153,6 +262,17 @@ if DEVICE == "cuda":
 SIMILARITY_THRESHOLD = float(os.getenv("SIMILARITY_THRESHOLD", 0.60))
 TOXICITY_THRESHOLD = float(os.getenv("TOXICITY_THRESHOLD", 0.5))
 
+# Dedup vector index (/dedup/index, /dedup/search): recent incident embeddings
+# in an in-process IVF-flat index, so the backend looks neighbours up by id
+# instead of sending candidate texts. Window and radius mirror the backend's
+# LIMITS.DEDUP.TIME_HOURS / RADIUS_METERS; entries older than the window are
+# evicted. NPROBE >= NLIST makes every search exact.
+DEDUP_INDEX_WINDOW_HOURS = float(os.getenv("DEDUP_INDEX_WINDOW_HOURS", 4))
+DEDUP_INDEX_RADIUS_METERS = float(os.getenv("DEDUP_INDEX_RADIUS_METERS", 1000))
+DEDUP_INDEX_NLIST = int(os.getenv("DEDUP_INDEX_NLIST", 64))
+DEDUP_INDEX_NPROBE = int(os.getenv("DEDUP_INDEX_NPROBE", 8))
+DEDUP_INDEX_MAX_ENTRIES = int(os.getenv("DEDUP_INDEX_MAX_ENTRIES", 100000))
+
 # Toxicity backstop rules are configurable for safer tuning without deploys.
 TOXICITY_DEHUMANIZING_TERMS = tuple(
     _load_csv_env(
@@ -209,16 +329,38 @@ USE_8BIT_QUANTIZATION = os.getenv("USE_8BIT_QUANTIZATION", "false").lower() == "
 # Useful alternative on Windows when bitsandbytes quantization is not available.
 IS_WINDOWS = platform.system().lower().startswith("win")
 USE_ONNX_ON_WINDOWS = os.getenv("USE_ONNX_ON_WINDOWS", "true").lower() == "true"
+# CPU-optimised backends, selectable per model:
+#   torch | torch-int8 (dynamic quantization) | onnx | onnx-int8 (ONNX Runtime,
+#   dynamic int8). Only applied to models running on CPU. ONNX exports are
+#   written once into ONNX_CACHE_DIR and reused on later starts.
+ML_CPU_BACKEND = os.getenv("ML_CPU_BACKEND", "torch").lower()
 CLASSIFIER_BACKEND = os.getenv("CLASSIFIER_BACKEND", "auto").lower()
 if CLASSIFIER_BACKEND == "auto":
     CLASSIFIER_BACKEND_RESOLVED = (
         "onnx"
         if IS_WINDOWS and USE_ONNX_ON_WINDOWS and not USE_8BIT_QUANTIZATION
-        else "torch"
+        else ML_CPU_BACKEND
     )
 else:
     CLASSIFIER_BACKEND_RESOLVED = CLASSIFIER_BACKEND
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", ML_CPU_BACKEND).lower()
+CROSS_ENCODER_BACKEND = os.getenv("CROSS_ENCODER_BACKEND", ML_CPU_BACKEND).lower()
+TOXICITY_BACKEND = os.getenv("TOXICITY_BACKEND", ML_CPU_BACKEND).lower()
 ONNX_EXECUTION_PROVIDER = os.getenv("ONNX_EXECUTION_PROVIDER", "CPUExecutionProvider")
+# Pre-converted artifacts written by scripts/build_model_artifacts.py
+# (safetensors in the chosen dtype, memory-mapped at load time so replicas on
+# one host share page cache). Empty = load every model from the HF cache.
+# When set, ONNX exports live alongside the artifacts unless ONNX_CACHE_DIR
+# says otherwise.
+MODEL_ARTIFACT_DIR = os.getenv("MODEL_ARTIFACT_DIR", "")
+ONNX_CACHE_DIR = os.getenv(
+    "ONNX_CACHE_DIR",
+    os.path.join(MODEL_ARTIFACT_DIR, "onnx")
+    if MODEL_ARTIFACT_DIR
+    else os.path.join(os.path.dirname(os.path.abspath(__file__)), ".onnx_cache"),
+)
+# Instruction set targeted by ONNX int8 kernels: avx2 | avx512 | avx512_vnni | arm64
+ONNX_QUANTIZATION_ARCH = os.getenv("ONNX_QUANTIZATION_ARCH", "avx2")
 
 # Cascade classifier: use fast model first, accurate model only when needed
 # Reduces latency by 60-80% for high-confidence predictions
@@ -227,10 +369,56 @@ USE_CASCADE_CLASSIFIER = os.getenv("USE_CASCADE_CLASSIFIER", "true").lower() ==
 CASCADE_CONFIDENCE_THRESHOLD = float(os.getenv("CASCADE_CONFIDENCE_THRESHOLD", 0.72))
 # Require a clear top-1 vs top-2 separation before trusting fast model output.
 CASCADE_MARGIN_THRESHOLD = float(os.getenv("CASCADE_MARGIN_THRESHOLD", 0.08))
+# Online cascade calibration: fast-path decisions are kept in a rolling window;
+# a sample of decisive texts is also checked by the accurate model so agreement
+# can be estimated above the current gates.
+CASCADE_AUDIT_RATE = float(os.getenv("CASCADE_AUDIT_RATE", 0.02))
+CASCADE_CALIBRATION_WINDOW = int(os.getenv("CASCADE_CALIBRATION_WINDOW", 2048))
+CASCADE_CALIBRATION_TARGET_AGREEMENT = float(
+    os.getenv("CASCADE_CALIBRATION_TARGET_AGREEMENT", 0.95)
+)
+CASCADE_CALIBRATION_MIN_SUPPORT = int(os.getenv("CASCADE_CALIBRATION_MIN_SUPPORT", 50))
+# Auto-apply the suggestion every INTERVAL decisions, never outside the bounds.
+CASCADE_AUTO_CALIBRATE = os.getenv("CASCADE_AUTO_CALIBRATE", "false").lower() == "true"
+CASCADE_CALIBRATION_INTERVAL = int(os.getenv("CASCADE_CALIBRATION_INTERVAL", 256))
+CASCADE_CONFIDENCE_MIN = float(os.getenv("CASCADE_CONFIDENCE_MIN", 0.55))
+CASCADE_CONFIDENCE_MAX = float(os.getenv("CASCADE_CONFIDENCE_MAX", 0.95))
+CASCADE_MARGIN_MIN = float(os.getenv("CASCADE_MARGIN_MIN", 0.02))
+CASCADE_MARGIN_MAX = float(os.getenv("CASCADE_MARGIN_MAX", 0.30))
 
 # Zero-shot classification hypothesis template
 # Optimized for incident reports - more specific context improves entailment accuracy
 HYPOTHESIS_TEMPLATE = os.getenv("HYPOTHESIS_TEMPLATE", "This incident involves {}.")
+# Pre-tokenized NLI engine in place of the HF zero-shot pipeline call
+# (identical scores; cached hypothesis tokens, one padded pass per batch).
+USE_NLI_ENGINE = os.getenv("USE_NLI_ENGINE", "true").lower() == "true"
+NLI_MAX_PAIRS_PER_FORWARD = int(os.getenv("NLI_MAX_PAIRS_PER_FORWARD", 256))
+# Hypothesis pruning: escalated texts are scored by the accurate model only on
+# the fast model's top-k labels, domain-hint matches and "other".
+CLASSIFIER_PRUNING_ENABLED = os.getenv("CLASSIFIER_PRUNING_ENABLED", "false").lower() == "true"
+CLASSIFIER_PRUNE_TOP_K = int(os.getenv("CLASSIFIER_PRUNE_TOP_K", 4))
+# Speculative cascade: under light load (small batch, few concurrent
+# predictions) the accurate model starts alongside the fast one and is
+# cancelled/discarded when the fast result is decisive. Trades spare CPU/GPU
+# for tail latency on uncertain reports.
+CLASSIFIER_SPECULATIVE_ENABLED = (
+    os.getenv("CLASSIFIER_SPECULATIVE_ENABLED", "false").lower() == "true"
+)
+CLASSIFIER_SPECULATIVE_MAX_TEXTS = int(os.getenv("CLASSIFIER_SPECULATIVE_MAX_TEXTS", 4))
+CLASSIFIER_SPECULATIVE_MAX_IN_FLIGHT = int(
+    os.getenv("CLASSIFIER_SPECULATIVE_MAX_IN_FLIGHT", 1)
+)
+# Embedding-head tier: categories scored from the report's MiniLM embedding
+# (prototypes + distilled linear head, see scripts/train_embedding_head.py).
+# Only results clearing both thresholds skip the zero-shot cascade.
+EMBEDDING_HEAD_PATH = os.getenv("EMBEDDING_HEAD_PATH", "")
+EMBEDDING_HEAD_CONFIDENCE_THRESHOLD = float(
+    os.getenv("EMBEDDING_HEAD_CONFIDENCE_THRESHOLD", 0.85)
+)
+EMBEDDING_HEAD_MARGIN_THRESHOLD = float(os.getenv("EMBEDDING_HEAD_MARGIN_THRESHOLD", 0.30))
+# Opt-in JSONL log of accurate-model scores (PII-redacted text) used as
+# distillation targets for the embedding head.
+CLASSIFIER_DISTILL_LOG_PATH = os.getenv("CLASSIFIER_DISTILL_LOG_PATH", "")
 
 # Risk rules and weights are configurable to avoid code changes when tuning.
 RISK_HIGH_RISK_KEYWORDS = _load_json_env(
@@ -371,6 +559,8 @@ MODEL_VERSION_MAP = {
     "embedding": {
         "name": EMBEDDING_MODEL,
         "version": EMBEDDING_MODEL_VERSION,
+        "backend": EMBEDDING_BACKEND,
+        "cross_encoder_backend": CROSS_ENCODER_BACKEND,
     },
     "classifier": {
         "name": CLASSIFIER_MODEL,
@@ -384,6 +574,7 @@ MODEL_VERSION_MAP = {
     "toxicity": {
         "name": TOXICITY_MODEL,
         "version": TOXICITY_MODEL_VERSION,
+        "backend": TOXICITY_BACKEND,
         "ruleset_version": TOXICITY_RULESET_VERSION,
     },
     "risk": {
@@ -398,6 +589,9 @@ MODEL_VERSION_MAP = {
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 GEMINI_CHAT_MODEL = os.getenv("GEMINI_CHAT_MODEL", "gemini-2.5-flash")
 GEMINI_EMBEDDING_MODEL = os.getenv("GEMINI_EMBEDDING_MODEL", "models/gemini-embedding-001")
+# Most texts per embed_content request (the API rejects larger batches);
+# longer lists are split and the requests sent concurrently.
+GEMINI_EMBEDDING_MAX_BATCH = max(1, int(os.getenv("GEMINI_EMBEDDING_MAX_BATCH", "100")))
 GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30.0"))
 GEMINI_MEDIA_TIMEOUT_SECONDS = float(os.getenv("GEMINI_MEDIA_TIMEOUT_SECONDS", "120.0"))
 GEMINI_INLINE_MEDIA_LIMIT_BYTES = int(
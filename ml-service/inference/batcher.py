@@ -0,0 +1,150 @@
+"""
+Dynamic micro-batching for local model inference.
+Concurrent requests are queued for up to max_wait_ms (or until max_batch_size
+items are pending) and then served by a single batched forward pass run in a
+worker thread; each caller gets back its own slice of the results.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from inference.stats import RollingWindow
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collect concurrent submissions and run them as one batch.
+
+    Args:
+        run_batch: Blocking callable taking a list of items and returning one
+            result per item, in order. Runs in a worker thread.
+        max_batch_size: Flush as soon as this many items are pending.
+        max_wait_ms: Longest time the first queued item waits for company.
+        name: Label used in logs.
+        runner: Coroutine function that runs the blocking batch call off the
+            event loop (default asyncio.to_thread), e.g. a model's own executor.
+
+    Batches execute one at a time: while a batch runs, new arrivals queue up
+    and form the next one, so batch size grows with load on its own.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        name: str = "batcher",
+        runner: Optional[Callable[..., Awaitable[Any]]] = None,
+    ):
+        self._run_batch = run_batch
+        self._runner = runner or asyncio.to_thread
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._name = name
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batches = 0
+        self._items = 0
+        self._largest = 0
+        self._batch_sizes = RollingWindow()
+        self._queue_wait_ms = RollingWindow()
+        self._run_ms = RollingWindow()
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result from the next batch."""
+        if self._worker is None or self._worker.done():
+            # Whatever a stopped worker left in its queue was failed by that
+            # worker on the way out, so a fresh queue orphans nothing.
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._loop(self._queue))
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self, queue: asyncio.Queue, pending: List[tuple]) -> None:
+        pending.append(await queue.get())
+        deadline = time.perf_counter() + self._max_wait
+        while len(pending) < self._max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Anything that arrived while we waited rides along, up to the cap.
+        while len(pending) < self._max_batch_size and not queue.empty():
+            pending.append(queue.get_nowait())
+
+    async def _loop(self, queue: asyncio.Queue) -> None:
+        pending: List[tuple] = []
+        try:
+            while True:
+                pending = []
+                await self._collect(queue, pending)
+                # Callers that were cancelled while queued don't need a result.
+                pending = [entry for entry in pending if not entry[1].done()]
+                if not pending:
+                    continue
+                await self._serve(pending)
+        finally:
+            # Cancelled by close() (or crashed): nothing else will ever resolve
+            # the batch in hand or the items still queued behind it.
+            error = RuntimeError(f"{self._name} stopped")
+            while not queue.empty():
+                pending.append(queue.get_nowait())
+            for _, future, _ in pending:
+                if not future.done():
+                    future.set_exception(error)
+
+    async def _serve(self, pending: List[tuple]) -> None:
+        started_at = time.perf_counter()
+        for _, _, queued_at in pending:
+            self._queue_wait_ms.add((started_at - queued_at) * 1000.0)
+        try:
+            results = await self._runner(self._run_batch, [item for item, _, _ in pending])
+            if len(results) != len(pending):
+                raise RuntimeError(
+                    f"{self._name} returned {len(results)} results "
+                    f"for {len(pending)} items"
+                )
+        except Exception as e:
+            logger.warning(f"{self._name} batch of {len(pending)} failed: {e}")
+            for _, future, _ in pending:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future, _), result in zip(pending, results):
+                if not future.done():
+                    future.set_result(result)
+
+        self._run_ms.add((time.perf_counter() - started_at) * 1000.0)
+        self._batches += 1
+        self._items += len(pending)
+        self._largest = max(self._largest, len(pending))
+        self._batch_sizes.add(len(pending))
+
+    async def close(self) -> None:
+        """Stop the worker; callers still waiting get a RuntimeError."""
+        worker, self._worker = self._worker, None
+        if worker is not None:
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self._max_batch_size,
+            "max_wait_ms": self._max_wait * 1000.0,
+            "batches": self._batches,
+            "items": self._items,
+            "largest_batch": self._largest,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batch_size": self._batch_sizes.summary(),
+            "queue_wait_ms": self._queue_wait_ms.summary(),
+            "run_ms": self._run_ms.summary(),
+        }
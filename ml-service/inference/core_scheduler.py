@@ -0,0 +1,268 @@
+"""
+CPU core partitioning for the in-process local models.
+
+Without it every model call runs on the shared to_thread pool, so a
+classify, an embed and a toxicity call in flight together each ask for the
+whole machine. With it each model gets its own single-thread executor and a
+share of the cores:
+
+    classifier  6 cores    embedding  1 core    toxicity  1 core
+
+The shares add up to the cores this process may use, so concurrent calls to
+different models never oversubscribe; concurrent calls to the same model
+queue on its executor, where the micro-batchers already merge them. Shares
+come from MODEL_CORE_SPLIT weights, or with "auto" from measured service
+time: they start equal and are re-derived once warmup has timed each model.
+
+How a share is enforced depends on the backend:
+  - ONNX Runtime sessions are created with the share as intra_op_num_threads
+    (models.cpu_backends.set_ort_threads, recorded before the models load).
+    A session's pool is fixed at creation, so a later "auto" rebalance moves
+    the executors but not these counts.
+  - torch's intra-op thread count is process-wide: torch.set_num_threads
+    sets the default every thread picks up, including the to_thread pool and
+    the API threads, so the executors do not touch it and torch models keep
+    ML_NUM_THREADS. With MODEL_CORE_PIN each executor thread is pinned to its
+    cores (Linux), and the OpenMP workers it starts inherit that mask.
+
+Work a model call starts in parallel with itself (the classifier's
+speculative accurate pass) goes to the model's side executor via
+submit_side: a second thread pinned to the same cores, so it shares the
+model's partition instead of taking cores the layout gave to another model.
+The models find the scheduler through active_scheduler().
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Models that get a partition; the risk scorer is pure Python and stays on
+# the shared thread pool.
+PARTITIONED_MODELS = ("classifier", "embedding", "toxicity")
+
+_active: Optional["CoreScheduler"] = None
+
+
+def set_active_scheduler(scheduler: Optional["CoreScheduler"]) -> None:
+    """Make `scheduler` the one models submit side work to (None: none)."""
+    global _active
+    _active = scheduler
+
+
+def active_scheduler() -> Optional["CoreScheduler"]:
+    return _active
+
+
+def available_cores() -> List[int]:
+    """CPU ids this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def parse_split(spec: str) -> Optional[Dict[str, float]]:
+    """"classifier:4,embedding:2" -> weights; "auto" or empty -> None."""
+    spec = (spec or "").strip().lower()
+    if spec in ("", "auto"):
+        return None
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition(":")
+        if name.strip():
+            weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def apportion(total: int, weights: Dict[str, float]) -> Dict[str, int]:
+    """
+    Split `total` cores in proportion to `weights`, at least one per model
+    (largest remainder). With fewer cores than models every model gets one
+    and the layout is oversubscribed; nothing better exists.
+    """
+    names = list(weights)
+    if not names:
+        return {}
+    if total <= len(names):
+        return {name: 1 for name in names}
+    positive = {name: max(0.0, weights[name]) for name in names}
+    if not any(positive.values()):
+        positive = {name: 1.0 for name in names}
+    weight_sum = sum(positive.values())
+    spare = total - len(names)
+    exact = {name: spare * positive[name] / weight_sum for name in names}
+    counts = {name: 1 + int(exact[name]) for name in names}
+    by_remainder = sorted(names, key=lambda n: exact[n] - int(exact[n]), reverse=True)
+    for name in by_remainder[: total - sum(counts.values())]:
+        counts[name] += 1
+    return counts
+
+
+def _init_worker(cores: List[int]) -> None:
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)  # pid 0 = this thread on Linux
+
+
+def initial_weights(
+    models: Sequence[str], split: Optional[Dict[str, float]]
+) -> Dict[str, float]:
+    """Configured weights, or equal shares for "auto" until service time is measured."""
+    return {m: (split or {}).get(m, 0.0 if split else 1.0) for m in models}
+
+
+class CoreScheduler:
+    """
+    Args:
+        models: Model names that get a partition.
+        cores: CPU ids to divide between them.
+        split: Fixed weights per model, or None for "auto".
+        pin: Also restrict each executor thread to its cores (Linux).
+    """
+
+    def __init__(
+        self,
+        models: Sequence[str],
+        cores: List[int],
+        split: Optional[Dict[str, float]] = None,
+        pin: bool = False,
+    ):
+        self._models = list(models)
+        self._cores = list(cores) or [0]
+        self._split = split
+        self._pin = pin
+        self._lock = threading.Lock()
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._side_executors: Dict[str, ThreadPoolExecutor] = {}
+        self._layout: Dict[str, List[int]] = {}
+        self._measured_core_ms: Dict[str, float] = {}
+        self._calls: Dict[str, int] = {}
+        self._busy_ms: Dict[str, float] = {}
+        self._side_calls: Dict[str, int] = {}
+        self._rebalances = 0
+        self.apply(initial_weights(self._models, split))
+
+    def apply(self, weights: Dict[str, float]) -> Dict[str, int]:
+        """Lay out contiguous core slices for `weights`; returns threads per model."""
+        counts = apportion(len(self._cores), {m: weights.get(m, 0.0) for m in self._models})
+        layout, start = {}, 0
+        for model in self._models:
+            layout[model] = [
+                self._cores[(start + i) % len(self._cores)] for i in range(counts[model])
+            ]
+            start += counts[model]
+        with self._lock:
+            if layout == self._layout:
+                return counts
+            retired = list(self._executors.values()) + list(self._side_executors.values())
+            self._layout = layout
+            self._executors = {
+                model: self._executor(f"cores-{model}", cores) for model, cores in layout.items()
+            }
+            self._side_executors = {
+                model: self._executor(f"cores-{model}-side", cores)
+                for model, cores in layout.items()
+            }
+        for executor in retired:
+            executor.shutdown(wait=False)
+        logger.info(f"Core layout: { {m: len(c) for m, c in layout.items()} }")
+        return counts
+
+    def _executor(self, name: str, cores: List[int]) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix=name,
+            initializer=_init_worker,
+            initargs=(cores if self._pin else [],),
+        )
+
+    def rebalance(self, service_ms: Dict[str, float]) -> Optional[Dict[str, int]]:
+        """
+        "auto" only: re-derive shares from measured service time of the same
+        workload per model. Time on k threads is scaled to core-ms, so a model
+        that was starved of cores is not mistaken for a cheap one.
+        """
+        with self._lock:
+            for model, ms in service_ms.items():
+                if model in self._layout and ms > 0:
+                    self._measured_core_ms[model] = ms * len(self._layout[model])
+        if self._split is not None or not self._measured_core_ms:
+            return None
+        weights = {
+            m: self._measured_core_ms.get(m, min(self._measured_core_ms.values()))
+            for m in self._models
+        }
+        self._rebalances += 1
+        return self.apply(weights)
+
+    async def run(self, model: str, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call on `model`'s executor (unknown models: to_thread)."""
+        executor = self._executors.get(model)
+        if executor is None:
+            return await asyncio.to_thread(func, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, functools.partial(func, *args, **kwargs)
+            )
+        finally:
+            self._calls[model] = self._calls.get(model, 0) + 1
+            self._busy_ms[model] = self._busy_ms.get(model, 0.0) + (
+                time.perf_counter() - started
+            ) * 1000.0
+
+    def submit_side(self, model: str, func: Callable, *args, **kwargs) -> Optional[Future]:
+        """
+        Start a blocking call on `model`'s side executor, pinned to the same
+        cores as its main one; None for a model without a partition. For
+        work a call on the main executor runs alongside itself; submitting
+        it to the main executor would wait behind the caller.
+        """
+        with self._lock:
+            executor = self._side_executors.get(model)
+            if executor is None:
+                return None
+            self._side_calls[model] = self._side_calls.get(model, 0) + 1
+            return executor.submit(func, *args, **kwargs)
+
+    @property
+    def threads(self) -> Dict[str, int]:
+        """Cores per model in the current layout."""
+        return {model: len(cores) for model, cores in self._layout.items()}
+
+    def shutdown(self) -> None:
+        for executor in list(self._executors.values()) + list(self._side_executors.values()):
+            executor.shutdown(wait=False)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cores": len(self._cores),
+            "split": self._split or "auto",
+            "pinned": self._pin,
+            "rebalances": self._rebalances,
+            "layout": {
+                model: {
+                    "threads": len(cores),
+                    "cores": cores if self._pin else None,
+                    "calls": self._calls.get(model, 0),
+                    "side_calls": self._side_calls.get(model, 0),
+                    "mean_call_ms": (
+                        round(self._busy_ms[model] / self._calls[model], 1)
+                        if self._calls.get(model)
+                        else None
+                    ),
+                    "measured_core_ms": (
+                        round(self._measured_core_ms[model], 1)
+                        if model in self._measured_core_ms
+                        else None
+                    ),
+                }
+                for model, cores in self._layout.items()
+            },
+        }
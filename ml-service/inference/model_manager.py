@@ -0,0 +1,292 @@
+"""
+Model lifecycle for the local provider.
+
+- Startup loads run concurrently in worker threads instead of one after
+  another; models listed in MODEL_LAZY_LOAD load on first use instead.
+- A memory budget (MODEL_MEMORY_BUDGET_MB) is enforced by unloading optional
+  sub-models (a model's `component_usage()`: the cross-encoder, the cascade's
+  fast classifier) least recently used first while RSS is over budget, and
+  reloading them once they are wanted again and there is headroom. While a
+  sub-model is out its owner degrades gracefully (no re-ranking, accurate
+  model only) instead of the process being OOM-killed.
+"""
+
+import asyncio
+import gc
+import inspect
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def local_model_specs() -> Dict[str, tuple]:
+    """(loader, model class) for each local model, keyed by model name."""
+    from models.classifier import CategoryClassifier
+    from models.embeddings import EmbeddingModel
+    from models.risk import RiskScorer
+    from models.toxicity import ToxicityDetector
+
+    return {
+        "embedding": (lambda: EmbeddingModel(config.EMBEDDING_MODEL), EmbeddingModel),
+        "classifier": (lambda: CategoryClassifier(config.CLASSIFIER_MODEL), CategoryClassifier),
+        "toxicity": (ToxicityDetector, ToxicityDetector),
+        "risk": (RiskScorer, RiskScorer),
+    }
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process (Linux /proc), None where unavailable."""
+    try:
+        with open("/proc/self/statm") as handle:
+            pages = int(handle.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _release_memory() -> None:
+    """Collect, then hand freed heap pages back to the OS where glibc allows."""
+    gc.collect()
+    try:
+        import ctypes
+
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+
+class _Slot:
+    def __init__(self, name: str, loader: Callable[[], Any], lazy: bool):
+        self.name = name
+        self.loader = loader
+        self.lazy = lazy
+        self.instance: Any = None
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self.load_ms: Optional[float] = None
+        self.loaded_at: Optional[float] = None
+        self.lock = threading.Lock()
+
+
+class LazyModel:
+    """
+    Stand-in handed to the provider for a registered model. Attribute access
+    resolves against the loaded instance; methods of a model that has not
+    loaded yet are returned as deferred callables, so the load happens on the
+    first call (in the caller's worker thread) rather than on lookup.
+    """
+
+    def __init__(self, manager: "ModelManager", name: str, model_class: Optional[type]):
+        self._manager = manager
+        self._name = name
+        self._model_class = model_class
+
+    def is_loaded(self) -> bool:
+        return self._manager.instance(self._name) is not None
+
+    def load(self) -> Any:
+        return self._manager.get(self._name)
+
+    def __getattr__(self, attr: str) -> Any:
+        instance = self._manager.instance(self._name)
+        if instance is None and self._model_class is not None:
+            static = inspect.getattr_static(self._model_class, attr, None)
+            if inspect.isfunction(static):
+
+                def deferred(*args, **kwargs):
+                    return getattr(self._manager.get(self._name), attr)(*args, **kwargs)
+
+                return deferred
+        if instance is None:
+            instance = self._manager.get(self._name)
+        return getattr(instance, attr)
+
+    def __repr__(self) -> str:
+        return f"LazyModel({self._name!r}, loaded={self.is_loaded()})"
+
+
+class ModelManager:
+    """
+    Args:
+        memory_budget_mb: RSS ceiling; 0 disables eviction.
+        evictable: Sub-model names that may be unloaded under pressure.
+        idle_seconds: A sub-model used more recently than this is kept.
+        rss_reader: Returns current RSS in MB (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        memory_budget_mb: float = 0.0,
+        evictable: Iterable[str] = (),
+        idle_seconds: float = 300.0,
+        rss_reader: Callable[[], Optional[float]] = current_rss_mb,
+    ):
+        self._slots: Dict[str, _Slot] = {}
+        self._budget = max(0.0, memory_budget_mb)
+        self._evictable = set(evictable)
+        self._idle_seconds = max(0.0, idle_seconds)
+        self._rss = rss_reader
+        self._component_mb: Dict[str, float] = {}
+        self._evictions: Dict[str, int] = {}
+        self._reloads: Dict[str, int] = {}
+        self._budget_lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        model_class: Optional[type] = None,
+        lazy: bool = False,
+    ) -> LazyModel:
+        self._slots[name] = _Slot(name, loader, lazy)
+        return LazyModel(self, name, model_class)
+
+    def instance(self, name: str) -> Any:
+        """The loaded instance, or None; never triggers a load."""
+        return self._slots[name].instance
+
+    def get(self, name: str) -> Any:
+        """The instance, loading it first if needed (blocking, thread-safe)."""
+        slot = self._slots[name]
+        if slot.instance is not None:
+            return slot.instance
+        with slot.lock:
+            if slot.instance is None:
+                slot.state = "loading"
+                started = time.perf_counter()
+                try:
+                    instance = slot.loader()
+                except Exception as e:
+                    slot.state, slot.error = "failed", str(e)
+                    logger.error(f"Loading {name} failed: {e}")
+                    raise
+                slot.load_ms = round((time.perf_counter() - started) * 1000.0, 1)
+                slot.loaded_at = time.time()
+                slot.state, slot.error = "loaded", None
+                slot.instance = instance
+                logger.info(f"{name} loaded in {slot.load_ms} ms")
+        return slot.instance
+
+    async def load_eager(self, parallel: bool = True) -> None:
+        """Load every non-lazy model; concurrently in worker threads when `parallel`."""
+        names = [slot.name for slot in self._slots.values() if not slot.lazy]
+        if parallel:
+            await asyncio.gather(*(asyncio.to_thread(self.get, name) for name in names))
+        else:
+            for name in names:
+                await asyncio.to_thread(self.get, name)
+
+    # ── Memory budget ─────────────────────────────────────────────────────────
+
+    def _components(self) -> List[tuple]:
+        """(owner instance, component name, usage) for loaded owners' evictable sub-models."""
+        found = []
+        for slot in self._slots.values():
+            usage_fn = getattr(slot.instance, "component_usage", None)
+            if usage_fn is None:
+                continue
+            for component, usage in usage_fn().items():
+                if component in self._evictable:
+                    found.append((slot.instance, component, usage))
+        return found
+
+    def enforce_budget(self) -> List[str]:
+        """
+        Evict idle sub-models while over budget, or reload wanted ones that
+        fit back under it. Returns the actions taken, e.g. ["evicted:cross_encoder"].
+        """
+        rss = self._rss()
+        if not self._budget or rss is None:
+            return []
+        actions = []
+        with self._budget_lock:
+            components = self._components()
+            if rss > self._budget:
+                now = time.time()
+                idle = sorted(
+                    (
+                        (usage["last_used"], owner, component)
+                        for owner, component, usage in components
+                        if usage["loaded"] and now - usage["last_used"] >= self._idle_seconds
+                    ),
+                    key=lambda item: item[0],
+                )
+                for _, owner, component in idle:
+                    owner.unload_component(component)
+                    _release_memory()
+                    after = self._rss() or rss
+                    self._component_mb[component] = max(0.0, rss - after)
+                    self._evictions[component] = self._evictions.get(component, 0) + 1
+                    actions.append(f"evicted:{component}")
+                    logger.warning(
+                        f"RSS {rss:.0f} MB over budget {self._budget:.0f} MB; unloaded {component} "
+                        f"(freed ~{self._component_mb[component]:.0f} MB)"
+                    )
+                    rss = after
+                    if rss <= self._budget:
+                        break
+            else:
+                for owner, component, usage in components:
+                    if usage["loaded"] or not usage["wanted"]:
+                        continue
+                    if rss + self._component_mb.get(component, 0.0) > self._budget:
+                        continue
+                    owner.reload_component(component)
+                    self._reloads[component] = self._reloads.get(component, 0) + 1
+                    actions.append(f"reloaded:{component}")
+                    logger.info(f"Reloaded {component} (RSS {rss:.0f} MB within budget)")
+                    rss = self._rss() or rss
+        return actions
+
+    async def watch(self, interval_seconds: float) -> None:
+        """Background loop applying the memory budget every `interval_seconds`."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(self.enforce_budget)
+            except Exception as e:
+                logger.warning(f"Memory budget check failed: {e}")
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        components = {
+            component: {
+                "loaded": usage["loaded"],
+                "wanted": usage["wanted"],
+                "last_used": usage["last_used"] or None,
+                "evictions": self._evictions.get(component, 0),
+                "reloads": self._reloads.get(component, 0),
+            }
+            for _, component, usage in self._components()
+        }
+        rss = self._rss()
+        return {
+            "models": {
+                slot.name: {
+                    "state": slot.state,
+                    "lazy": slot.lazy,
+                    "load_ms": slot.load_ms,
+                    "loaded_at": slot.loaded_at,
+                    "error": slot.error,
+                }
+                for slot in self._slots.values()
+            },
+            "components": components,
+            "memory": {
+                "rss_mb": round(rss, 1) if rss is not None else None,
+                "budget_mb": self._budget or None,
+            },
+        }
@@ -0,0 +1,96 @@
+"""
+Per-model concurrency pools for local inference.
+
+Each model has its own admission limit and FIFO wait queue, so a burst of
+slow classifications only queues behind the classifier's limit while
+/risk and /toxicity calls keep flowing through theirs. Endpoints reserve the
+pools of the models they actually call; a multi-model reservation acquires
+pools in name order, so two endpoints can never deadlock on each other.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from inference.stats import RollingWindow
+
+
+class ModelPool:
+    """Concurrency limit for one model, with queue depth and wait-time stats."""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self._semaphore = asyncio.Semaphore(self.limit)
+        self._active = 0
+        self._queued = 0
+        self._peak_queued = 0
+        self._admitted = 0
+        self._wait_ms = RollingWindow()
+
+    async def acquire(self) -> None:
+        started = time.perf_counter()
+        self._queued += 1
+        self._peak_queued = max(self._peak_queued, self._queued)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._queued -= 1
+        self._active += 1
+        self._admitted += 1
+        self._wait_ms.add((time.perf_counter() - started) * 1000.0)
+
+    def release(self) -> None:
+        self._active -= 1
+        self._semaphore.release()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self._active,
+            "queue_depth": self._queued,
+            "peak_queue_depth": self._peak_queued,
+            "admitted": self._admitted,
+            "wait_ms": self._wait_ms.summary(),
+        }
+
+
+class ModelPools:
+    """
+    Args:
+        limits: Concurrency limit per model name; these pools exist (and show
+            in stats) from the start.
+        default_limit: Limit for models not named in `limits`.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, default_limit: int = 4):
+        self._limits = dict(limits or {})
+        self._default_limit = max(1, default_limit)
+        self._pools: Dict[str, ModelPool] = {}
+        for name in self._limits:
+            self.pool(name)
+
+    def pool(self, name: str) -> ModelPool:
+        if name not in self._pools:
+            self._pools[name] = ModelPool(name, self._limits.get(name, self._default_limit))
+        return self._pools[name]
+
+    @asynccontextmanager
+    async def reserve(self, *names: str) -> AsyncIterator[None]:
+        """Hold one slot in each named pool (none named: no wait at all)."""
+        held = []
+        try:
+            for name in sorted(set(names)):
+                pool = self.pool(name)
+                await pool.acquire()
+                held.append(pool)
+            yield
+        finally:
+            for pool in reversed(held):
+                pool.release()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {name: pool.stats for name, pool in sorted(self._pools.items())}
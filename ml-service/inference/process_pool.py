@@ -0,0 +1,488 @@
+"""
+Out-of-process inference for the local provider.
+
+With INFERENCE_PROCESS_WORKERS > 0 the API process loads no models. Spawned
+model processes each load them (from MODEL_ARTIFACT_DIR when built, so the
+weights are shared page cache) and serve the calls sent down their own
+pipe. Large numpy arrays in either direction (embeddings going out,
+precomputed embeddings coming in) travel through shared-memory blocks; only
+their name, shape and dtype are pickled. The API process keeps only I/O and
+cheap glue; a thread waiting on a model call holds no GIL while it waits.
+
+ProcessModelProxy stands in for a model object, so LocalProvider code is the
+same in both modes.
+"""
+
+import inspect
+import itertools
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import pickle
+import threading
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Models served from the worker processes. The risk scorer is keyword rules
+# only, cheaper to run in place than to ship across a queue.
+REMOTE_MODELS = ("embedding", "classifier", "toxicity")
+
+
+class _SharedArray:
+    """Pickled placeholder for an ndarray parked in shared memory."""
+
+    __slots__ = ("name", "shape", "dtype")
+
+    def __init__(self, name: str, shape: tuple, dtype: str):
+        self.name, self.shape, self.dtype = name, shape, dtype
+
+    def __getstate__(self):
+        return (self.name, self.shape, self.dtype)
+
+    def __setstate__(self, state):
+        self.name, self.shape, self.dtype = state
+
+
+def pack(value: Any, min_bytes: int, counters: Optional[Dict[str, int]] = None) -> Any:
+    """Move arrays of at least `min_bytes` into shared memory, recursively."""
+    if isinstance(value, np.ndarray) and value.nbytes >= min_bytes and value.dtype != object:
+        array = np.ascontiguousarray(value)
+        block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+        handle = _SharedArray(block.name, array.shape, array.dtype.str)
+        block.close()
+        if counters is not None:
+            counters["shm_transfers"] = counters.get("shm_transfers", 0) + 1
+            counters["shm_bytes"] = counters.get("shm_bytes", 0) + array.nbytes
+        return handle
+    if isinstance(value, dict):
+        return {k: pack(v, min_bytes, counters) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(pack(v, min_bytes, counters) for v in value)
+    return value
+
+
+def unpack(value: Any) -> Any:
+    """Copy shared-memory arrays back out and release their blocks."""
+    if isinstance(value, _SharedArray):
+        block = shared_memory.SharedMemory(name=value.name)
+        try:
+            return np.ndarray(value.shape, np.dtype(value.dtype), buffer=block.buf).copy()
+        finally:
+            block.close()
+            block.unlink()
+    if isinstance(value, dict):
+        return {k: unpack(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(unpack(v) for v in value)
+    return value
+
+
+def _load_worker_models() -> Dict[str, Any]:
+    import asyncio
+
+    from inference.model_manager import ModelManager, local_model_specs
+
+    manager = ModelManager()
+    specs = local_model_specs()
+    for name in REMOTE_MODELS:
+        loader, model_class = specs[name]
+        manager.register(name, loader, model_class)
+    asyncio.run(manager.load_eager(parallel=config.MODEL_PARALLEL_LOAD))
+    return {name: manager.instance(name) for name in REMOTE_MODELS}
+
+
+def _warm_worker_models(models: Dict[str, Any]) -> None:
+    from providers.local import warmup_text
+
+    for words in config.MODEL_WARMUP_LENGTHS:
+        for size in config.MODEL_WARMUP_BATCH_SIZES:
+            texts = [warmup_text(words, i) for i in range(max(1, size))]
+            models["embedding"].warmup(texts)
+            models["classifier"].warmup(texts, config.INCIDENT_CATEGORIES)
+            models["toxicity"].warmup(texts)
+
+
+def _worker_main(index: int, tasks, results, threads: int, min_bytes: int, loader=None) -> None:
+    """Model process: load, warm up, then serve (request_id, component, kind, name, args, kwargs)."""
+    try:
+        import torch
+
+        torch.set_num_threads(max(1, threads))
+    except ImportError:
+        pass
+    try:
+        models = (loader or _load_worker_models)()
+        if loader is None and config.MODEL_WARMUP_ENABLED:
+            _warm_worker_models(models)
+    except Exception as e:
+        results.send(("failed", index, os.getpid(), f"{type(e).__name__}: {e}"))
+        return
+    results.send(("ready", index, os.getpid(), None))
+
+    while True:
+        try:
+            task = tasks.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        request_id, component, kind, name, args, kwargs = task
+        try:
+            target = getattr(models[component], name)
+            if kind == "call":
+                target = target(*unpack(args), **unpack(kwargs))
+            reply = (request_id, True, pack(target, min_bytes))
+        except Exception as e:
+            try:
+                pickle.dumps(e)
+                error = e
+            except Exception:
+                error = RuntimeError(f"{type(e).__name__}: {e}")
+            reply = (request_id, False, error)
+        results.send(reply)
+
+
+def release(value: Any) -> None:
+    """Unlink the shared-memory blocks of a packed value that will never be unpacked."""
+    if isinstance(value, _SharedArray):
+        try:
+            block = shared_memory.SharedMemory(name=value.name)
+        except FileNotFoundError:
+            return  # the worker unpacked it before dying
+        block.close()
+        block.unlink()
+    elif isinstance(value, dict):
+        for item in value.values():
+            release(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            release(item)
+
+
+class WorkerDiedError(RuntimeError):
+    """The model process serving a call exited before answering it."""
+
+
+class _Worker:
+    """One model process and the API process's ends of its two pipes."""
+
+    def __init__(self, index: int, process, tasks, results):
+        self.index = index
+        self.process = process
+        self.tasks = tasks
+        self.results = results
+        self.send_lock = threading.Lock()
+        self.ready = False
+        self.load_failed = False
+        self.in_flight = 0
+
+
+class InferenceProcessPool:
+    """
+    Every worker has its own task and result pipe, so the pool knows which
+    worker holds each call and one worker dying cannot corrupt a queue the
+    others share. Calls go to the ready worker with the fewest in flight.
+    The reader thread waits on the result pipes and the process sentinels
+    together: when a worker exits, its calls fail at once with
+    WorkerDiedError, the shared-memory blocks of their arguments are
+    unlinked, and (after startup) the worker is respawned.
+
+    Args:
+        workers: Model processes to spawn.
+        threads_per_worker: torch intra-op threads in each (0 = NUM_THREADS / workers).
+        timeout_seconds: Longest wait for one call before it fails.
+        shm_min_bytes: Arrays at least this large go through shared memory.
+        loader: Test hook replacing model loading in the workers (picklable).
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        threads_per_worker: int = 0,
+        timeout_seconds: float = 120.0,
+        shm_min_bytes: int = 16384,
+        loader=None,
+    ):
+        self._workers = max(1, workers)
+        self._threads = threads_per_worker or max(
+            1, getattr(config, "NUM_THREADS", os.cpu_count() or 1) // self._workers
+        )
+        self._timeout = timeout_seconds
+        self._min_bytes = shm_min_bytes
+        self._loader = loader
+        self._context = multiprocessing.get_context("spawn")
+        self._slots: List[_Worker] = []
+        # request_id -> (future, worker, packed args); all guarded by _lock.
+        self._pending: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._ids = itertools.count()
+        self._started = False
+        self._closing = False
+        self._startup_error: Optional[str] = None
+        self._wake_recv, self._wake_send = self._context.Pipe(duplex=False)
+        self._reader: Optional[threading.Thread] = None
+        self._counters: Dict[str, int] = {
+            "calls": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "worker_deaths": 0,
+            "respawns": 0,
+        }
+
+    def _spawn(self, index: int) -> _Worker:
+        task_recv, task_send = self._context.Pipe(duplex=False)
+        result_recv, result_send = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, task_recv, result_send, self._threads, self._min_bytes, self._loader),
+            name=f"inference-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        # Drop the child's ends here so a dead worker reads as EOF.
+        task_recv.close()
+        result_send.close()
+        return _Worker(index, process, task_send, result_recv)
+
+    def start(self, timeout: Optional[float] = None) -> None:
+        """Spawn the workers and block until every one has loaded its models."""
+        self._slots = [self._spawn(i) for i in range(self._workers)]
+        self._reader = threading.Thread(target=self._drain, name="inference-results", daemon=True)
+        self._reader.start()
+        with self._changed:
+            ready = self._changed.wait_for(
+                lambda: self._startup_error or all(w.ready for w in self._slots), timeout
+            )
+            error = self._startup_error
+            self._started = bool(ready) and not error
+        if error:
+            self.close()
+            raise RuntimeError(f"Inference worker failed to load models: {error}")
+        if not ready:
+            self.close()
+            raise TimeoutError("Inference workers did not become ready in time")
+        logger.info(f"{self._workers} inference worker processes ready")
+
+    # ── Reader thread ─────────────────────────────────────────────────────────
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                slots = list(self._slots)
+            waiting: Dict[Any, Optional[_Worker]] = {self._wake_recv: None}
+            for worker in slots:
+                waiting[worker.results] = worker
+                waiting[worker.process.sentinel] = worker
+            for ready in multiprocessing.connection.wait(list(waiting)):
+                worker = waiting[ready]
+                if worker is None:
+                    self._wake_recv.recv()
+                    return
+                if ready is worker.results:
+                    try:
+                        self._handle(worker, worker.results.recv())
+                        continue
+                    except (EOFError, OSError):
+                        worker.process.join(timeout=5)
+                self._worker_exited(worker)
+                break  # the slot list changed
+
+    def _handle(self, worker: _Worker, message: tuple) -> None:
+        if message[0] in ("ready", "failed"):
+            _, index, pid, error = message
+            with self._changed:
+                if error:
+                    worker.load_failed = True
+                    if not self._started:
+                        self._startup_error = error
+                    logger.error(f"Inference worker {index} (pid={pid}) failed to load: {error}")
+                else:
+                    worker.ready = True
+                self._changed.notify_all()
+            return
+        request_id, ok, payload = message
+        with self._lock:
+            entry = self._pending.pop(request_id, None)
+            if entry is not None:
+                entry[1].in_flight -= 1
+                if not ok:
+                    self._counters["failed"] += 1
+        if entry is None:
+            unpack(payload)  # timed out already; free the blocks anyway
+        elif ok:
+            entry[0].set_result(unpack(payload))
+        else:
+            entry[0].set_exception(payload)
+
+    def _worker_exited(self, worker: _Worker) -> None:
+        # Replies it sent before exiting are still in the pipe.
+        try:
+            while worker.results.poll():
+                self._handle(worker, worker.results.recv())
+        except (EOFError, OSError):
+            pass
+        code = worker.process.exitcode
+        with self._changed:
+            if worker not in self._slots:
+                return
+            lost = [rid for rid, entry in self._pending.items() if entry[1] is worker]
+            entries = [self._pending.pop(rid) for rid in lost]
+            respawn = self._started and not self._closing and not worker.load_failed
+            if not self._closing:
+                self._counters["worker_deaths"] += 1
+                if not self._started and not self._startup_error:
+                    self._startup_error = f"worker {worker.index} exited with code {code}"
+            self._slots.remove(worker)
+            self._changed.notify_all()
+        for connection in (worker.tasks, worker.results):
+            connection.close()
+        if not self._closing:
+            logger.error(
+                f"Inference worker {worker.index} (pid={worker.process.pid}) exited with "
+                f"code {code}; failing {len(entries)} call(s)"
+                + ("" if respawn else ", not respawning")
+            )
+        for future, _, packed in entries:
+            release(packed)
+            future.set_exception(
+                WorkerDiedError(f"Inference worker {worker.index} exited with code {code}")
+            )
+        if respawn:
+            replacement = self._spawn(worker.index)
+            with self._lock:
+                self._slots.append(replacement)
+                self._counters["respawns"] += 1
+
+    # ── Calls ─────────────────────────────────────────────────────────────────
+
+    def request(self, component: str, kind: str, name: str, *args, **kwargs) -> Any:
+        """Blocking call into a worker; safe from any thread."""
+        request_id = next(self._ids)
+        future: Future = Future()
+        transfers: Dict[str, int] = {}
+        packed = (pack(args, self._min_bytes, transfers), pack(kwargs, self._min_bytes, transfers))
+        with self._changed:
+            # Only while a respawned worker loads can there be none ready.
+            available = self._changed.wait_for(
+                lambda: self._closing or any(w.ready for w in self._slots), self._timeout
+            )
+            if self._closing or not available:
+                release(packed)
+                raise RuntimeError("No inference worker is available")
+            worker = min((w for w in self._slots if w.ready), key=lambda w: w.in_flight)
+            worker.in_flight += 1
+            self._pending[request_id] = (future, worker, packed)
+            self._counters["calls"] += 1
+            for key, value in transfers.items():
+                self._counters[key] = self._counters.get(key, 0) + value
+        try:
+            with worker.send_lock:
+                worker.tasks.send((request_id, component, kind, name) + packed)
+        except OSError:
+            pass  # the worker is gone; the reader fails this call
+        try:
+            return future.result(timeout=self._timeout)
+        except TimeoutError:
+            with self._lock:
+                entry = self._pending.pop(request_id, None)
+                if entry is not None:
+                    worker.in_flight -= 1
+                self._counters["timeouts"] += 1
+            raise
+
+    def close(self) -> None:
+        with self._changed:
+            self._closing = True
+            slots = list(self._slots)
+            self._changed.notify_all()
+        for worker in slots:
+            try:
+                with worker.send_lock:
+                    worker.tasks.send(None)
+            except OSError:
+                pass
+        for worker in slots:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        self._wake_send.send(None)
+        if self._reader is not None:
+            self._reader.join(timeout=5)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": [
+                    {
+                        "pid": w.process.pid,
+                        "alive": w.process.is_alive(),
+                        "ready": w.ready,
+                        "in_flight": w.in_flight,
+                    }
+                    for w in sorted(self._slots, key=lambda w: w.index)
+                ],
+                "threads_per_worker": self._threads,
+                "in_flight": len(self._pending),
+                **self._counters,
+            }
+
+
+class ProcessModelProxy:
+    """
+    Model stand-in whose methods run in the worker pool. Plain attribute reads
+    (properties such as optimization_status) are fetched from a worker too;
+    those named in `cached_attrs` are fixed once a model has loaded, so they
+    are fetched once and then answered locally (they are read on the event
+    loop). `warmup` is local and a no-op: workers warm themselves before
+    reporting ready, and a proxied call would reach only one of them.
+    """
+
+    def __init__(
+        self,
+        pool: InferenceProcessPool,
+        component: str,
+        model_class: type,
+        cached_attrs: tuple = (),
+    ):
+        self._pool = pool
+        self._component = component
+        self._model_class = model_class
+        self._cached_attrs = set(cached_attrs)
+        self._cached: Dict[str, Any] = {}
+
+    def is_loaded(self) -> bool:
+        return True
+
+    def warmup(self, *_args, **_kwargs) -> None:
+        return None
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        static = inspect.getattr_static(self._model_class, attr, None)
+        if inspect.isfunction(static) or isinstance(static, (staticmethod, classmethod)):
+
+            def remote(*args, **kwargs):
+                return self._pool.request(self._component, "call", attr, *args, **kwargs)
+
+            return remote
+        if attr in self._cached:
+            return self._cached[attr]
+        value = self._pool.request(self._component, "attr", attr)
+        if attr in self._cached_attrs:
+            self._cached[attr] = value
+        return value
+
+    def __repr__(self) -> str:
+        return f"ProcessModelProxy({self._component!r})"
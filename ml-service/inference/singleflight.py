@@ -0,0 +1,67 @@
+"""
+Single-flight request coalescing.
+Concurrent calls that share a fingerprint await one in-flight execution
+instead of each running the model (or a Gemini call) separately.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical async computations onto one shared task.
+
+    The first caller for a key starts the computation; later callers with the
+    same key await the same task until it finishes. Every caller awaits it
+    through asyncio.shield, so a cancelled waiter (client disconnect, timeout)
+    never cancels the shared work the other waiters depend on.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._executions: Dict[str, int] = defaultdict(int)
+        self._collapsed: Dict[str, int] = defaultdict(int)
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        group: str = "default",
+    ) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._release(key, done))
+            self._executions[group] += 1
+        else:
+            self._collapsed[group] += 1
+        return await asyncio.shield(task)
+
+    def _release(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved: if every waiter was cancelled nobody
+        # else will, and asyncio would log "exception was never retrieved".
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Coalesced computation for {key} failed: {task.exception()}")
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        groups = sorted(set(self._executions) | set(self._collapsed))
+        return {
+            "in_flight": len(self._inflight),
+            "collapsed_total": sum(self._collapsed.values()),
+            "groups": {
+                group: {
+                    "executions": self._executions[group],
+                    "collapsed": self._collapsed[group],
+                }
+                for group in groups
+            },
+        }
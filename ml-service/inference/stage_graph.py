@@ -0,0 +1,114 @@
+"""
+Small dependency-graph executor for multi-model requests.
+
+A stage names the stages whose results it needs and starts as soon as all of
+them have finished, so independent stages overlap and a request takes as
+long as its longest dependency chain instead of the sum of its stages:
+
+    classification ─┐
+    toxicity ───────┴─> risk        similarity
+
+A failed stage does not cancel the graph: its dependents still run and see
+None for it (risk then falls back to the request's category or a zero
+toxicity score), and the error is reported next to the results.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Sequence, Tuple
+
+
+class Stage:
+    """
+    Args:
+        name: Key of this stage's result.
+        run: Coroutine function taking {dependency name: result or None}.
+        requires: Names of the stages that must finish first.
+    """
+
+    __slots__ = ("name", "run", "requires")
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[Dict[str, Any]], Awaitable[Any]],
+        requires: Iterable[str] = (),
+    ):
+        self.name = name
+        self.run = run
+        self.requires = tuple(requires)
+
+
+class StageResults:
+    """Per-stage values (None when failed), errors, and (start, end) ms offsets."""
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.timings: Dict[str, Tuple[float, float]] = {}
+
+    @property
+    def elapsed_ms(self) -> float:
+        return max((end for _, end in self.timings.values()), default=0.0)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            name: {"start_ms": round(start, 1), "ms": round(end - start, 1)}
+            for name, (start, end) in self.timings.items()
+        }
+
+
+def _ordered(stages: Sequence[Stage]) -> List[Stage]:
+    """Stages in dependency order; ValueError on duplicates, unknown names or cycles."""
+    by_name: Dict[str, Stage] = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage {stage.name!r}")
+        by_name[stage.name] = stage
+    for stage in stages:
+        unknown = [name for name in stage.requires if name not in by_name]
+        if unknown:
+            raise ValueError(f"Stage {stage.name!r} requires unknown stages {unknown}")
+
+    ordered: List[Stage] = []
+    state: Dict[str, str] = {}
+
+    def visit(stage: Stage) -> None:
+        if state.get(stage.name) == "done":
+            return
+        if state.get(stage.name) == "visiting":
+            raise ValueError(f"Stage dependency cycle through {stage.name!r}")
+        state[stage.name] = "visiting"
+        for name in stage.requires:
+            visit(by_name[name])
+        state[stage.name] = "done"
+        ordered.append(stage)
+
+    for stage in stages:
+        visit(stage)
+    return ordered
+
+
+async def run_stages(stages: Sequence[Stage]) -> StageResults:
+    """Run every stage as soon as its dependencies have finished."""
+    results = StageResults()
+    tasks: Dict[str, asyncio.Future] = {}
+    origin = time.perf_counter()
+
+    async def execute(stage: Stage) -> None:
+        if stage.requires:
+            await asyncio.wait([tasks[name] for name in stage.requires])
+        inputs = {name: results.values.get(name) for name in stage.requires}
+        started = (time.perf_counter() - origin) * 1000.0
+        try:
+            results.values[stage.name] = await stage.run(inputs)
+        except Exception as e:
+            results.values[stage.name] = None
+            results.errors[stage.name] = e
+        finally:
+            results.timings[stage.name] = (started, (time.perf_counter() - origin) * 1000.0)
+
+    for stage in _ordered(stages):
+        tasks[stage.name] = asyncio.ensure_future(execute(stage))
+    await asyncio.gather(*tasks.values())
+    return results
@@ -0,0 +1,35 @@
+"""
+Rolling latency/size windows shared by the batchers, model pools and cache
+tiers, so every /health section reports percentiles the same way.
+"""
+
+from collections import deque
+from typing import Any, Dict
+
+
+class RollingWindow:
+    """
+    Recent samples for p50/p99/mean reporting, plus a lifetime count.
+
+    Args:
+        size: Number of most recent samples kept.
+    """
+
+    def __init__(self, size: int = 1024):
+        self._samples: deque = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+        self.count += 1
+
+    def summary(self) -> Dict[str, Any]:
+        if not self._samples:
+            return {"p50": None, "p99": None, "mean": None}
+        ordered = sorted(self._samples)
+        last = len(ordered) - 1
+        return {
+            "p50": round(ordered[int(last * 0.50)], 3),
+            "p99": round(ordered[int(last * 0.99)], 3),
+            "mean": round(sum(ordered) / len(ordered), 3),
+        }
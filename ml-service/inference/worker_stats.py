@@ -0,0 +1,112 @@
+"""
+Cross-worker stats for prefork serving.
+
+Each uvicorn worker periodically writes a JSON snapshot of its own health and
+cache counters to a shared directory; any worker answering /health or
+/cache/stats reads all snapshots, so the response describes the whole
+replica rather than whichever process the kernel handed the request to.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+_PREFIX = "worker-"
+
+
+def publish_worker_stats(directory: str, snapshot: Dict[str, Any]) -> None:
+    """Atomically replace this process's snapshot."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{_PREFIX}{os.getpid()}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(snapshot, handle, default=str)
+    os.replace(tmp_path, path)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect_worker_stats(directory: str) -> List[Dict[str, Any]]:
+    """Snapshots of live workers, ordered by worker index; stale files are removed."""
+    if not os.path.isdir(directory):
+        return []
+    snapshots = []
+    for name in os.listdir(directory):
+        if not (name.startswith(_PREFIX) and name.endswith(".json")):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            pid = int(name[len(_PREFIX):-len(".json")])
+        except ValueError:
+            continue
+        if not _alive(pid):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path, encoding="utf-8") as handle:
+                snapshots.append(json.load(handle))
+        except (OSError, ValueError) as e:
+            logger.debug(f"Skipping unreadable worker snapshot {name}: {e}")
+    return sorted(snapshots, key=lambda s: s.get("worker", 0))
+
+
+def _hit_counts(stats: Dict[str, Any]) -> Dict[str, Any]:
+    hits, misses = int(stats.get("hits", 0)), int(stats.get("misses", 0))
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": f"{(hits / total * 100) if total else 0.0:.1f}%",
+    }
+
+
+def _sum_hits(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return _hit_counts(
+        {
+            "hits": sum(int(p.get("hits", 0)) for p in parts),
+            "misses": sum(int(p.get("misses", 0)) for p in parts),
+        }
+    )
+
+
+def aggregate_worker_stats(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Replica-wide view: ready/total workers, summed cache hit/miss counters
+    (overall, L1 and L2 tiers), and a short per-worker summary.
+    """
+    caches = [s.get("cache") or {} for s in snapshots]
+    cache: Dict[str, Any] = _sum_hits(caches)
+    for tier in ("l1", "l2"):
+        parts = [c[tier] for c in caches if isinstance(c.get(tier), dict)]
+        if parts:
+            cache[tier] = _sum_hits(parts)
+    return {
+        "count": len(snapshots),
+        "ready": sum(1 for s in snapshots if s.get("provider_ready")),
+        "cache": cache,
+        "per_worker": [
+            {
+                "worker": s.get("worker"),
+                "pid": s.get("pid"),
+                "provider_ready": s.get("provider_ready"),
+                "warmup": (s.get("warmup") or {}).get("state"),
+                "cache": _hit_counts(s.get("cache") or {}),
+                "updated_at": s.get("updated_at"),
+            }
+            for s in snapshots
+        ],
+    }
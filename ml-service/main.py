@@ -10,16 +10,46 @@ import os
 import tempfile
 import time
 from contextlib import asynccontextmanager
-from typing import Dict, List, Optional
+from datetime import datetime, timezone
+from typing import Dict, List, Literal, Optional, Set, get_args
 
 from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field, ValidationError
 
 import config
-from cache_manager import RedisCacheManager, InMemoryLRUCache
-from providers import get_provider, BaseProvider
+from cache_manager import MODEL_PREFIX_MAP, AsyncRedisCacheManager, InMemoryLRUCache
+from inference.core_scheduler import (
+    PARTITIONED_MODELS,
+    CoreScheduler,
+    available_cores,
+    parse_split,
+    set_active_scheduler,
+)
+from inference.model_manager import ModelManager, local_model_specs
+from inference.model_pools import ModelPools
+from inference.process_pool import REMOTE_MODELS, InferenceProcessPool, ProcessModelProxy
+from inference.singleflight import SingleFlight
+from inference.stage_graph import Stage, run_stages
+from inference.worker_stats import (
+    aggregate_worker_stats,
+    collect_worker_stats,
+    publish_worker_stats,
+)
+from models.artifact_store import get_artifact_store
+from models.cpu_backends import set_ort_threads
+from providers import get_provider, BaseProvider, CachedProvider
+from providers.base import (
+    ANALYZE_COMPONENTS,
+    component_stages,
+    components_to_run,
+    requested_results,
+)
 from providers.gemini import GeminiProvider
+from services.embedding_store import EmbeddingStore
+from services.vector_index import VectorIndex
 from services.constellation_synthesis import synthesize_constellation as run_constellation_synthesis
 
 # Configure logging
@@ -40,16 +70,72 @@ ttl_config = {
     "risk": int(os.getenv("CACHE_TTL_RISK", 1800)),  # 30 min
     "embedding": int(os.getenv("CACHE_TTL_EMBEDDING", 7200)),  # 2 hours
     "similarity": int(os.getenv("CACHE_TTL_SIMILARITY", 600)),  # 10 min
+    "analyze": int(os.getenv("CACHE_TTL_ANALYZE", 1800)),  # 30 min (Gemini single call)
 }
 
 # Fallback in-memory cache for Redis outages
 fallback_cache = InMemoryLRUCache(max_size=128, ttl_seconds=300)
 
-# Initialize Redis cache manager
-cache = RedisCacheManager(
+# L1: byte-bounded in-process tier in front of Redis for hot keys
+# (CACHE_L1_MAX_BYTES=0 disables it). The short TTL bounds staleness
+# across replicas.
+CACHE_L1_MAX_BYTES = int(os.getenv("CACHE_L1_MAX_BYTES", 32 * 1024 * 1024))
+CACHE_L1_PREFILL_KEYS = int(os.getenv("CACHE_L1_PREFILL_KEYS", 0))
+l1_cache = (
+    InMemoryLRUCache(
+        max_size=int(os.getenv("CACHE_L1_MAX_ENTRIES", 8192)),
+        ttl_seconds=int(os.getenv("CACHE_L1_TTL_SECONDS", 30)),
+        max_bytes=CACHE_L1_MAX_BYTES,
+    )
+    if CACHE_L1_MAX_BYTES > 0
+    else None
+)
+
+# Initialize Redis cache manager (redis.asyncio; connected in lifespan).
+# Cache round-trips are awaited so a slow Redis never blocks the event loop.
+cache = AsyncRedisCacheManager(
     redis_url=redis_url,
     ttl_map=ttl_config,
     fallback_cache=fallback_cache,
+    max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", 32)),
+    socket_timeout=float(os.getenv("REDIS_SOCKET_TIMEOUT", 0.5)),
+    pool_timeout=float(os.getenv("REDIS_POOL_TIMEOUT", 0.5)),
+    generation_refresh=float(os.getenv("CACHE_GENERATION_REFRESH_SECONDS", 5)),
+    l1_cache=l1_cache,
+    hot_keys_tracked=CACHE_L1_PREFILL_KEYS,
+)
+# Optional background SCAN that frees superseded cache generations before
+# their TTL expires (0 disables; invalidation itself never needs it).
+CACHE_STALE_SWEEP_INTERVAL_SECONDS = float(os.getenv("CACHE_STALE_SWEEP_INTERVAL_SECONDS", 0))
+
+# Per-text embedding cache; the namespace keeps vectors from different
+# embedding models (local vs Gemini, or a new version) apart.
+embedding_store = EmbeddingStore(
+    cache,
+    namespace=(
+        config.GEMINI_EMBEDDING_MODEL
+        if config.ML_PROVIDER == "gemini"
+        else f"{config.EMBEDDING_MODEL}@{config.EMBEDDING_MODEL_VERSION}"
+        # Quantized/ONNX encoders produce slightly different vectors.
+        + ("" if config.EMBEDDING_BACKEND == "torch" else f"/{config.EMBEDDING_BACKEND}")
+    ),
+)
+
+# Recent incident embeddings for /dedup/search (per process, starts empty)
+dedup_index = VectorIndex(
+    nlist=config.DEDUP_INDEX_NLIST,
+    nprobe=config.DEDUP_INDEX_NPROBE,
+    window_hours=config.DEDUP_INDEX_WINDOW_HOURS,
+    radius_meters=config.DEDUP_INDEX_RADIUS_METERS,
+    max_entries=config.DEDUP_INDEX_MAX_ENTRIES,
+    background_training=True,
+)
+
+# Loads, lazily loads and (under memory pressure) sheds local models
+model_manager = ModelManager(
+    memory_budget_mb=config.MODEL_MEMORY_BUDGET_MB,
+    evictable=config.MODEL_EVICTABLE,
+    idle_seconds=config.MODEL_EVICT_IDLE_SECONDS,
 )
 
 # Global model instances — only populated when ML_PROVIDER=local
@@ -58,26 +144,61 @@ classifier_model: Optional[object] = None
 toxicity_model: Optional[object] = None
 risk_scorer: Optional[object] = None
 
+# Model processes serving local inference when INFERENCE_PROCESS_WORKERS > 0
+inference_pool: Optional[InferenceProcessPool] = None
+
+# Per-model CPU partitions for in-process local inference
+core_scheduler: Optional[CoreScheduler] = None
+
+# Worker index when forked by prefork.py (None for a plain uvicorn process)
+PREFORK_WORKER = os.getenv("ML_PREFORK_WORKER")
+
 # Active provider — set during lifespan startup
 active_provider: Optional[BaseProvider] = None
 
-# Local (GPU/CPU-bound) inference semaphore
-inference_semaphore = asyncio.Semaphore(max(1, config.INFERENCE_MAX_CONCURRENCY))
+# Local (GPU/CPU-bound) inference: one concurrency pool per model
+inference_pools = ModelPools(
+    config.INFERENCE_POOL_LIMITS, default_limit=config.INFERENCE_MAX_CONCURRENCY
+)
 # Gemini (I/O-bound) semaphore — higher cap is safe for network calls
 api_semaphore = asyncio.Semaphore(config.GEMINI_MAX_CONCURRENCY)
 
 
-def _get_semaphore() -> asyncio.Semaphore:
-    """Return the appropriate concurrency guard for the active provider."""
-    return api_semaphore if config.ML_PROVIDER == "gemini" else inference_semaphore
+# Identical concurrent requests share one computation
+inflight = SingleFlight()
+
+
+# Local models served through a micro-batcher, and the batcher's name
+_BATCHED_MODELS = {"classifier": "classify", "toxicity": "toxicity"}
+
+
+def _gemini_active() -> bool:
+    """Whether the provider (behind its component cache) is Gemini, for LLM-only endpoints."""
+    return isinstance(getattr(active_provider, "inner", active_provider), GeminiProvider)
+
+
+def _reserve(*models: str):
+    """
+    Concurrency guard for a provider call that runs `models`. Gemini calls
+    share the API semaphore. Locally each model has its own pool, so a flood
+    on one model never queues calls that need only others. Batched models
+    queue in the provider's micro-batcher instead: holding a pool slot while
+    waiting for a batch would cap every batch at the pool size.
+    """
+    if config.ML_PROVIDER == "gemini":
+        return api_semaphore
+    batched = active_provider.batching_stats() if active_provider is not None else {}
+    return inference_pools.reserve(
+        *(model for model in models if _BATCHED_MODELS.get(model) not in batched)
+    )
 
 
-async def run_inference(func, *args, **kwargs):
+async def run_inference(model: str, func, *args, **kwargs):
     """
     Execute blocking model inference without blocking the event loop.
-    Concurrency is bounded to protect process stability under load.
+    Concurrency is bounded by the model's pool to protect process stability.
     """
-    async with inference_semaphore:
+    async with inference_pools.reserve(model):
         return await asyncio.to_thread(func, *args, **kwargs)
 
 
@@ -91,11 +212,24 @@ def build_model_metadata(component: str) -> Dict[str, object]:
         "model": config.MODEL_VERSION_MAP.get(component),
     }
 
-    if component == "classifier" and classifier_model is not None:
-        metadata["runtime"] = classifier_model.optimization_status
+    runtime = _classifier_runtime() if component == "classifier" else None
+    if runtime is not None:
+        metadata["runtime"] = runtime
     return metadata
 
 
+def _classifier_runtime() -> Optional[Dict[str, object]]:
+    """
+    Classifier optimization status, without forcing a lazy classifier to load
+    (or, for a classifier in the process pool, a blocking round trip).
+    """
+    if classifier_model is None or isinstance(classifier_model, ProcessModelProxy):
+        return None
+    if not classifier_model.is_loaded():
+        return None
+    return classifier_model.optimization_status
+
+
 def log_inference_event(endpoint: str, component: str, started_at: float):
     duration_ms = (time.perf_counter() - started_at) * 1000.0
     logger.info(
@@ -109,52 +243,198 @@ def log_inference_event(endpoint: str, component: str, started_at: float):
     )
 
 
+def register_local_models() -> None:
+    """
+    Register the local models with model_manager (no loading yet). Idempotent:
+    prefork.py calls it in the master, and the forked workers' lifespan then
+    finds the already-loaded instances.
+    """
+    global embedding_model, classifier_model, toxicity_model, risk_scorer
+    if embedding_model is not None:
+        return
+
+    lazy = config.MODEL_LAZY_LOAD
+    registered = {
+        name: model_manager.register(name, loader, model_class, lazy=bool(lazy & {name, "all"}))
+        for name, (loader, model_class) in local_model_specs().items()
+    }
+    embedding_model = registered["embedding"]
+    classifier_model = registered["classifier"]
+    toxicity_model = registered["toxicity"]
+    risk_scorer = registered["risk"]
+
+
+def start_inference_pool() -> None:
+    """
+    Spawn the model processes (blocking until they have loaded and warmed up)
+    and point the model globals at proxies; the risk scorer stays in-process.
+    """
+    global inference_pool, embedding_model, classifier_model, toxicity_model, risk_scorer
+    pool = InferenceProcessPool(
+        workers=config.INFERENCE_PROCESS_WORKERS,
+        threads_per_worker=config.INFERENCE_PROCESS_THREADS,
+        timeout_seconds=config.INFERENCE_PROCESS_TIMEOUT_SECONDS,
+        shm_min_bytes=config.INFERENCE_SHM_MIN_BYTES,
+    )
+    pool.start(timeout=config.INFERENCE_PROCESS_START_TIMEOUT_SECONDS)
+    inference_pool = pool
+
+    specs = local_model_specs()
+    proxies = {
+        name: ProcessModelProxy(
+            pool,
+            name,
+            specs[name][1],
+            cached_attrs=("uses_embeddings",) if name == "classifier" else (),
+        )
+        for name in REMOTE_MODELS
+    }
+    embedding_model = proxies["embedding"]
+    classifier_model = proxies["classifier"]
+    toxicity_model = proxies["toxicity"]
+    loader, model_class = specs["risk"]
+    risk_scorer = model_manager.register("risk", loader, model_class)
+
+
+def start_core_scheduler() -> CoreScheduler:
+    """
+    Partition the cores this process runs inference on: the torch thread
+    count it was started with (ML_NUM_THREADS, or a prefork worker's share).
+    """
+    global core_scheduler
+    try:
+        import torch
+
+        total = torch.get_num_threads()
+    except ImportError:
+        total = config.NUM_THREADS
+    core_scheduler = CoreScheduler(
+        PARTITIONED_MODELS,
+        available_cores()[: max(1, total)],
+        split=parse_split(config.MODEL_CORE_SPLIT),
+        pin=config.MODEL_CORE_PIN,
+    )
+    set_ort_threads(core_scheduler.threads)
+    set_active_scheduler(core_scheduler)
+    return core_scheduler
+
+
+async def _worker_snapshot() -> Dict[str, object]:
+    return {
+        "worker": int(PREFORK_WORKER),
+        "pid": os.getpid(),
+        "provider_ready": (
+            await active_provider.is_ready() if active_provider is not None else False
+        ),
+        "warmup": active_provider.warmup_stats() if active_provider is not None else {},
+        "cache": cache.stats,
+        "coalescing": inflight.stats,
+        "updated_at": time.time(),
+    }
+
+
+async def _publish_worker_stats() -> None:
+    """Prefork workers: share this process's stats with its siblings."""
+    while True:
+        try:
+            publish_worker_stats(config.PREFORK_STATS_DIR, await _worker_snapshot())
+        except Exception as e:
+            logger.warning(f"Publishing worker stats failed: {e}")
+        await asyncio.sleep(config.PREFORK_STATS_INTERVAL_SECONDS)
+
+
+def _workers_view() -> Optional[Dict[str, object]]:
+    """Replica-wide worker stats when running under prefork.py, else None."""
+    if PREFORK_WORKER is None:
+        return None
+    return aggregate_worker_stats(collect_worker_stats(config.PREFORK_STATS_DIR))
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialise the active provider on startup."""
-    global \
-        embedding_model, \
-        classifier_model, \
-        toxicity_model, \
-        risk_scorer, \
-        active_provider
+    global active_provider
 
     logger.info(f"Starting ML service — provider: {config.ML_PROVIDER}")
+    await cache.connect()
+    cache.start_stale_sweeper(CACHE_STALE_SWEEP_INTERVAL_SECONDS)
+    await cache.prefill_l1(CACHE_L1_PREFILL_KEYS)
     logger.info(f"Cache backend: {cache.stats.get('backend', 'unknown')}")
 
+    memory_watch = None
+    if (
+        config.ML_PROVIDER == "local"
+        and config.MODEL_CORE_SCHEDULER_ENABLED
+        and config.INFERENCE_PROCESS_WORKERS <= 0
+    ):
+        # Before loading, so ONNX Runtime sessions are sized to their partition.
+        start_core_scheduler()
+
     if config.ML_PROVIDER == "local":
         # Load HuggingFace models only when running the local provider.
         try:
-            from models.embeddings import EmbeddingModel
-            from models.classifier import CategoryClassifier
-            from models.toxicity import ToxicityDetector
-            from models.risk import RiskScorer
-
-            embedding_model = EmbeddingModel(config.EMBEDDING_MODEL)
-            classifier_model = CategoryClassifier(config.CLASSIFIER_MODEL)
-            toxicity_model = ToxicityDetector()
-            risk_scorer = RiskScorer()
-            logger.info("✅ All local models loaded successfully")
+            if config.INFERENCE_PROCESS_WORKERS > 0:
+                await asyncio.to_thread(start_inference_pool)
+            else:
+                register_local_models()
+            await model_manager.load_eager(parallel=config.MODEL_PARALLEL_LOAD)
+            logger.info(f"✅ Local models ready: {model_manager.stats['models']}")
         except Exception as e:
             logger.error(f"❌ Failed to load local models: {e}")
             raise
+        if config.MODEL_MEMORY_BUDGET_MB > 0:
+            memory_watch = asyncio.create_task(
+                model_manager.watch(config.MODEL_MEMORY_CHECK_INTERVAL_SECONDS)
+            )
 
     try:
-        active_provider = get_provider(
-            classifier=classifier_model,
-            embedding_model=embedding_model,
-            toxicity_model=toxicity_model,
-            risk_scorer=risk_scorer,
+        # Component results are cached (and pools reserved) at the provider,
+        # so every endpoint shares them.
+        active_provider = CachedProvider(
+            get_provider(
+                classifier=classifier_model,
+                embedding_model=embedding_model,
+                toxicity_model=toxicity_model,
+                risk_scorer=risk_scorer,
+                embedding_store=embedding_store,
+                core_scheduler=core_scheduler,
+            ),
+            cache,
+            reserve=_reserve,
         )
         logger.info(f"✅ Provider initialised: {config.ML_PROVIDER}")
     except Exception as e:
         logger.error(f"❌ Failed to initialise provider: {e}")
         raise
 
+    if PREFORK_WORKER is not None and config.PREFORK_WORKERS > 1:
+        logger.warning(
+            "Dedup vector index is per worker: /dedup/index and /dedup/search return 409 "
+            "under prefork with more than one worker"
+        )
+
+    # Warm up in the background: /health stays reachable (liveness) while
+    # provider_ready remains false until warmup finishes (readiness).
+    warmup_task = (
+        asyncio.create_task(active_provider.warmup()) if config.MODEL_WARMUP_ENABLED else None
+    )
+    stats_task = (
+        asyncio.create_task(_publish_worker_stats()) if PREFORK_WORKER is not None else None
+    )
+
     yield
 
+    for task in (warmup_task, memory_watch, stats_task):
+        if task is not None:
+            task.cancel()
     logger.info("Shutting down ML service")
     logger.info(f"Cache stats: {cache.stats}")
+    await cache.close()
+    if inference_pool is not None:
+        await asyncio.to_thread(inference_pool.close)
+    if core_scheduler is not None:
+        set_active_scheduler(None)
+        core_scheduler.shutdown()
 
 
 app = FastAPI(
@@ -199,12 +479,48 @@ class RiskRequest(BaseModel):
     toxicity_score: float = Field(default=0.0, ge=0.0, le=1.0)
 
 
+# What /analyze can be asked for: the model outputs, similarity (needs
+# candidate_texts) and the LLM-only fields.
+AnalysisComponent = Literal[
+    "classification",
+    "toxicity",
+    "risk",
+    "similarity",
+    "summary",
+    "entities",
+    "spam_flag",
+    "dispatch_suggestion",
+]
+
+
 class FullAnalysisRequest(BaseModel):
     text: str = Field(..., min_length=1)
     category: Optional[str] = None
     severity: Optional[str] = None
     candidate_texts: Optional[List[str]] = None
     duplicate_count: int = Field(default=0, ge=0)
+    # Only these are computed (None = all); the other response fields are null.
+    components: Optional[List[AnalysisComponent]] = Field(default=None, min_length=1)
+
+
+class ClassifyBatchRequest(BaseModel):
+    items: List[ClassifyRequest] = Field(
+        ..., min_length=1, max_length=config.BATCH_MAX_ITEMS
+    )
+
+
+class ToxicityBatchRequest(BaseModel):
+    items: List[TextInput] = Field(..., min_length=1, max_length=config.BATCH_MAX_ITEMS)
+
+
+class RiskBatchRequest(BaseModel):
+    items: List[RiskRequest] = Field(..., min_length=1, max_length=config.BATCH_MAX_ITEMS)
+
+
+class FullAnalysisBatchRequest(BaseModel):
+    items: List[FullAnalysisRequest] = Field(
+        ..., min_length=1, max_length=config.BATCH_MAX_ITEMS
+    )
 
 
 class DedupCompareRequest(BaseModel):
@@ -223,6 +539,51 @@ class DedupCompareResponse(BaseModel):
     provider_supported: bool = True
 
 
+class DedupIndexItem(BaseModel):
+    incident_id: str = Field(..., min_length=1)
+    # One of the two: a precomputed embedding, or the text to embed here.
+    embedding: Optional[List[float]] = Field(default=None, min_length=1)
+    text: Optional[str] = Field(default=None, min_length=1)
+    timestamp: datetime
+    lat: float = Field(..., ge=-90, le=90)
+    lon: float = Field(..., ge=-180, le=180)
+
+
+class DedupIndexRequest(BaseModel):
+    items: List[DedupIndexItem] = Field(..., min_length=1, max_length=config.BATCH_MAX_ITEMS)
+
+
+class DedupIndexResponse(BaseModel):
+    upserted: int
+    entries: int
+
+
+class DedupSearchRequest(BaseModel):
+    # The query vector: an embedding, an indexed incident's, or text to embed.
+    embedding: Optional[List[float]] = Field(default=None, min_length=1)
+    incident_id: Optional[str] = None
+    text: Optional[str] = Field(default=None, min_length=1)
+    timestamp: datetime
+    lat: Optional[float] = Field(default=None, ge=-90, le=90)
+    lon: Optional[float] = Field(default=None, ge=-180, le=180)
+    k: int = Field(default=20, ge=1, le=200)
+    radius_meters: Optional[float] = Field(default=None, gt=0)
+
+
+class DedupNeighbour(BaseModel):
+    incident_id: str
+    score: float
+    is_duplicate: bool
+    distance_meters: Optional[float] = None
+    hours_apart: float
+
+
+class DedupSearchResponse(BaseModel):
+    neighbours: List[DedupNeighbour]
+    threshold: float
+    index_size: int
+
+
 class InsightsRequest(BaseModel):
     period: str = Field(..., pattern=r"^(7d|30d|90d|1y)$")
     total_incidents: int = Field(..., ge=0)
@@ -440,11 +801,13 @@ async def health_check():
         await active_provider.is_ready() if active_provider is not None else False
     )
     # Keep classifier_runtime for backwards-compat with anything that reads it.
-    classifier_runtime = (
-        classifier_model.optimization_status if classifier_model is not None else None
-    )
-    return {
-        "status": "healthy" if provider_ready else "degraded",
+    classifier_runtime = _classifier_runtime()
+    warmup = active_provider.warmup_stats() if active_provider is not None else {}
+    # Warmup that failed every attempt will not recover on its own: report
+    # 503 so the orchestrator's probe restarts the pod.
+    warmup_failed = warmup.get("state") == "failed"
+    health = {
+        "status": "unhealthy" if warmup_failed else "healthy" if provider_ready else "degraded",
         "provider": config.ML_PROVIDER,
         "provider_ready": provider_ready,
         "device": config.DEVICE,
@@ -458,7 +821,10 @@ async def health_check():
         },
         "optimizations": {
             "classifier": classifier_runtime,
+            "artifacts": get_artifact_store().stats,
         },
+        "model_loading": model_manager.stats,
+        "process_pool": inference_pool.stats if inference_pool is not None else None,
         "model_versions": config.MODEL_VERSION_MAP,
         "release": {
             "model_release": config.MODEL_RELEASE,
@@ -467,17 +833,25 @@ async def health_check():
         },
         "inference_limits": {
             "max_concurrency": config.INFERENCE_MAX_CONCURRENCY,
+            "pools": inference_pools.stats,
         },
+        "core_partitions": core_scheduler.stats if core_scheduler is not None else None,
+        "warmup": warmup,
+        "batching": active_provider.batching_stats() if active_provider is not None else {},
         "cache": cache.stats,
+        "coalescing": inflight.stats,
+        "dedup_index": dedup_index.stats,
+        "workers": _workers_view(),
     }
+    if warmup_failed:
+        return JSONResponse(status_code=503, content=jsonable_encoder(health))
+    return health
 
 
 @app.get("/models/versions")
 async def model_versions():
     """Expose model/ruleset versions for observability and audits."""
-    classifier_runtime = (
-        classifier_model.optimization_status if classifier_model is not None else None
-    )
+    classifier_runtime = _classifier_runtime()
     return {
         "service_version": config.SERVICE_VERSION,
         "release": config.MODEL_RELEASE,
@@ -488,9 +862,41 @@ async def model_versions():
     }
 
 
+@app.post("/models/classifier/calibrate")
+async def calibrate_classifier(apply: bool = False):
+    """
+    Suggest fast-path cascade thresholds from the rolling calibration window;
+    with ?apply=true the suggestion (bounded by CASCADE_*_MIN/MAX) takes effect.
+    """
+    if classifier_model is None:
+        raise HTTPException(
+            status_code=404, detail="Cascade calibration needs the local classifier"
+        )
+    if isinstance(classifier_model, ProcessModelProxy):
+        # Each model process keeps its own window and thresholds; a call
+        # reaches only one of them.
+        raise HTTPException(
+            status_code=409,
+            detail="Cascade calibration is per process; unavailable with INFERENCE_PROCESS_WORKERS",
+        )
+
+    def calibrate() -> Dict[str, object]:
+        # Blocking: may load a lazy classifier first.
+        suggestion = classifier_model.recalibrate(apply=apply)
+        return {
+            "suggestion": suggestion,
+            "applied": bool(apply and suggestion),
+            "thresholds": classifier_model.cascade_thresholds,
+            "calibration": classifier_model.calibration_status(),
+        }
+
+    return await asyncio.to_thread(calibrate)
+
+
 @app.get("/cache/stats")
 async def cache_stats():
     """Get cache statistics and backend info."""
+    await cache.refresh_info()
     return {
         "stats": cache.stats,
         "ttl_config": {
@@ -500,6 +906,9 @@ async def cache_stats():
             "embedding": ttl_config["embedding"],
             "similarity": ttl_config["similarity"],
         },
+        "coalescing": inflight.stats,
+        "embeddings": embedding_store.stats,
+        "workers": _workers_view(),
     }
 
 
@@ -508,7 +917,8 @@ async def invalidate_cache(model_name: str):
     """
     Invalidate cache for a specific model when it's been retrained.
 
-    Models: classifier, toxicity, risk, embedding
+    Models: classifier, toxicity, risk, embedding (which also invalidates
+    the similarity scores computed from it)
     """
     valid_models = {"classifier", "toxicity", "risk", "embedding"}
     if model_name not in valid_models:
@@ -517,9 +927,11 @@ async def invalidate_cache(model_name: str):
             detail=f"Invalid model: {model_name}. Valid options: {valid_models}",
         )
 
-    count = cache.invalidate_on_model_update(model_name)
+    # O(1): bumps the prefix generation; old entries age out through their TTL.
+    count = await cache.invalidate_on_model_update(model_name)
     return {
         "model": model_name,
+        "generation": await cache.generation(MODEL_PREFIX_MAP[model_name]),
         "invalidated_count": count,
         "message": f"Cache invalidated for {model_name}",
     }
@@ -528,22 +940,23 @@ async def invalidate_cache(model_name: str):
 @app.post("/cache/clear")
 async def clear_all_cache():
     """Clear entire cache (use with caution)."""
-    prefixes = ["classify", "toxicity", "risk", "embedding", "similarity"]
+    prefixes = ["classify", "toxicity", "risk", "embedding", "similarity", "analyze"]
     total_cleared = 0
     for prefix in prefixes:
-        total_cleared += cache.clear_prefix(prefix)
+        total_cleared += await cache.clear_prefix(prefix)
 
     logger.warning(f"⚠️ Cache completely cleared: {total_cleared} entries removed")
     return {
         "message": "Entire cache cleared",
         "entries_removed": total_cleared,
+        "generations": {prefix: await cache.generation(prefix) for prefix in prefixes},
     }
 
 
 @app.post("/cache/reconnect")
 async def reconnect_redis():
     """Attempt to reconnect to Redis (for debugging)."""
-    success = cache.reconnect()
+    success = await cache.reconnect()
     return {
         "success": success,
         "backend": "redis" if success else "in-memory (fallback)",
@@ -557,14 +970,23 @@ async def get_embedding(request: TextInput):
     if active_provider is None:
         raise HTTPException(status_code=503, detail="ML provider not initialised")
 
-    started_at = time.perf_counter()
-    async with _get_semaphore():
-        embedding = await active_provider.embed(request.text)
-    log_inference_event("/embed", "embedding", started_at)
-    return EmbeddingResponse(
-        embedding=embedding,
-        dimensions=len(embedding),
+    async def compute() -> EmbeddingResponse:
+        started_at = time.perf_counter()
+        async with _reserve("embedding"):
+            embedding = await active_provider.embed(request.text)
+        log_inference_event("/embed", "embedding", started_at)
+        return EmbeddingResponse(
+            embedding=embedding,
+            dimensions=len(embedding),
+        )
+
+    key = cache.fingerprint(
+        "embedding",
+        request.text,
+        provider=config.ML_PROVIDER,
+        mv=config.EMBEDDING_MODEL_VERSION,
     )
+    return await inflight.do(key, compute, group="embed")
 
 
 @app.post("/similarity", response_model=SimilarityResponse)
@@ -574,11 +996,10 @@ async def compute_similarity(request: SimilarityRequest):
         raise HTTPException(status_code=503, detail="ML provider not initialised")
 
     started_at = time.perf_counter()
-    async with _get_semaphore():
-        similarities = await active_provider.batch_similarity(
-            request.query_text,
-            request.candidate_texts,
-        )
+    similarities = await active_provider.batch_similarity(
+        request.query_text,
+        request.candidate_texts,
+    )
 
     results = [
         {
@@ -616,7 +1037,7 @@ async def dedup_compare(request: DedupCompareRequest):
         raise HTTPException(status_code=503, detail="ML provider not initialised")
 
     started_at = time.perf_counter()
-    async with _get_semaphore():
+    async with _reserve():
         result = await active_provider.pairwise_compare(
             request.base_text,
             request.candidate_text,
@@ -640,6 +1061,134 @@ async def dedup_compare(request: DedupCompareRequest):
     return DedupCompareResponse(**result)
 
 
+def _epoch_seconds(moment: datetime) -> float:
+    """Naive timestamps are taken as UTC."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def _require_single_dedup_index() -> None:
+    """
+    The index lives in this process. Under prefork.py with several workers an
+    incident upserted through one worker is invisible to searches served by
+    another, so refuse rather than silently miss duplicates.
+    """
+    if PREFORK_WORKER is not None and config.PREFORK_WORKERS > 1:
+        raise HTTPException(
+            status_code=409,
+            detail=(
+                "The dedup index is per worker; serve /dedup/index and /dedup/search "
+                "from a single-worker replica (PREFORK_WORKERS=1 or uvicorn main:app)"
+            ),
+        )
+
+
+async def _embed_for_index(texts: List[str]) -> List[List[float]]:
+    """One batched pass through the embedding store for every text."""
+    if not texts:
+        return []
+    async with _reserve("embedding"):
+        return await active_provider.embed_many(texts)
+
+
+@app.post("/dedup/index", response_model=DedupIndexResponse)
+async def dedup_index_upsert(request: DedupIndexRequest):
+    """
+    Add or replace incidents in the dedup vector index. Items carry an
+    embedding or the text to embed (through the embedding cache); entries
+    older than the dedup window are evicted as newer ones arrive.
+    """
+    _require_single_dedup_index()
+    if any(item.embedding is None and item.text is None for item in request.items):
+        raise HTTPException(status_code=400, detail="Each item needs an embedding or text")
+    if active_provider is None and any(item.embedding is None for item in request.items):
+        raise HTTPException(status_code=503, detail="ML provider not initialised")
+
+    started_at = time.perf_counter()
+    embedded = iter(
+        await _embed_for_index(
+            [item.text for item in request.items if item.embedding is None]
+        )
+    )
+    vectors = [
+        next(embedded) if item.embedding is None else item.embedding
+        for item in request.items
+    ]
+    try:
+        # Off the loop: an insert can compact the index; k-means retraining
+        # runs in the index's own thread.
+        await asyncio.to_thread(
+            dedup_index.upsert_many,
+            [
+                (item.incident_id, vector, _epoch_seconds(item.timestamp), item.lat, item.lon)
+                for item, vector in zip(request.items, vectors)
+            ],
+        )
+    except ValueError as e:
+        # Dimension mismatch, e.g. vectors from another embedding model; the
+        # batch is rejected whole.
+        raise HTTPException(status_code=400, detail=str(e))
+
+    log_inference_event("/dedup/index", "embedding", started_at)
+    return DedupIndexResponse(upserted=len(request.items), entries=len(dedup_index))
+
+
+@app.delete("/dedup/index/{incident_id}")
+async def dedup_index_remove(incident_id: str):
+    """Drop an incident from the dedup vector index (e.g. deleted or merged)."""
+    _require_single_dedup_index()
+    return {"incident_id": incident_id, "removed": dedup_index.remove(incident_id)}
+
+
+@app.post("/dedup/search", response_model=DedupSearchResponse)
+async def dedup_search(request: DedupSearchRequest):
+    """
+    Top-k indexed incidents most similar to the query within the dedup time
+    window and radius, by id — the candidate lookup that otherwise needs the
+    candidates' texts sent to /similarity or /analyze.
+    """
+    _require_single_dedup_index()
+    started_at = time.perf_counter()
+    query = request.embedding
+    if query is None and request.incident_id is not None:
+        query = dedup_index.vector(request.incident_id)
+    if query is None and request.text is not None:
+        if active_provider is None:
+            raise HTTPException(status_code=503, detail="ML provider not initialised")
+        query = (await _embed_for_index([request.text]))[0]
+    if query is None:
+        raise HTTPException(
+            status_code=400, detail="Send an embedding, text, or an indexed incident_id"
+        )
+
+    try:
+        neighbours = await asyncio.to_thread(
+            dedup_index.search,
+            query,
+            _epoch_seconds(request.timestamp),
+            lat=request.lat,
+            lon=request.lon,
+            k=request.k,
+            radius_meters=request.radius_meters,
+            exclude=request.incident_id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    log_inference_event("/dedup/search", "embedding", started_at)
+    return DedupSearchResponse(
+        neighbours=[
+            DedupNeighbour(
+                **neighbour, is_duplicate=neighbour["score"] >= config.SIMILARITY_THRESHOLD
+            )
+            for neighbour in neighbours
+        ],
+        threshold=config.SIMILARITY_THRESHOLD,
+        index_size=len(dedup_index),
+    )
+
+
 @app.post("/insights", response_model=InsightsResponse)
 async def generate_insights(request: InsightsRequest):
     """
@@ -649,13 +1198,13 @@ async def generate_insights(request: InsightsRequest):
     if active_provider is None:
         raise HTTPException(status_code=503, detail="ML provider not initialised")
 
-    if not isinstance(active_provider, GeminiProvider):
+    if not _gemini_active():
         return InsightsResponse(sections=None, supported=False)
 
     started_at = time.perf_counter()
     stats = request.model_dump()
 
-    async with _get_semaphore():
+    async with _reserve():
         result = await active_provider.generate_insights(stats)
 
     log_inference_event("/insights", "insights", started_at)
@@ -681,13 +1230,13 @@ async def generate_area_insights(request: AreaInsightsRequest):
     if active_provider is None:
         raise HTTPException(status_code=503, detail="ML provider not initialised")
 
-    if not isinstance(active_provider, GeminiProvider):
+    if not _gemini_active():
         return AreaInsightsResponse(insight=None, supported=False)
 
     started_at = time.perf_counter()
     payload = request.model_dump()
 
-    async with _get_semaphore():
+    async with _reserve():
         result = await active_provider.generate_area_insights(payload)
 
     log_inference_event("/insights/area", "area_insights", started_at)
@@ -711,7 +1260,7 @@ async def synthesize_constellation(request: ConstellationSynthesisRequest):
 
     started_at = time.perf_counter()
     try:
-        async with _get_semaphore():
+        async with _reserve():
             result = await run_constellation_synthesis(
                 active_provider,
                 request.model_dump(),
@@ -744,7 +1293,7 @@ async def analyze_report_media(
             judgment=build_insufficient_media_judgment(),
         )
 
-    if not isinstance(active_provider, GeminiProvider):
+    if not _gemini_active():
         return MediaAnalysisResponse(
             supported=False,
             status="unsupported",
@@ -757,7 +1306,7 @@ async def analyze_report_media(
         for upload in files:
             media_files.append(await save_upload_to_temp(upload))
 
-        async with _get_semaphore():
+        async with _reserve():
             judgment = await active_provider.analyze_report_media(
                 metadata_payload,
                 media_files,
@@ -780,21 +1329,37 @@ async def analyze_report_media(
         remove_temp_files(media_files)
 
 
-@app.post("/classify", response_model=ClassificationResponse)
-async def classify_text(request: ClassifyRequest):
-    """Classify text into incident category."""
-    if active_provider is None:
-        raise HTTPException(status_code=503, detail="ML provider not initialised")
+def _classification_response(result: Dict) -> ClassificationResponse:
+    return ClassificationResponse(
+        predicted_category=result["predicted_category"],
+        confidence=result["confidence"],
+        all_scores=result["all_scores"],
+        inference_metadata=build_model_metadata("classifier"),
+    )
 
-    categories = request.categories or config.INCIDENT_CATEGORIES
-    cats_key = ",".join(sorted(categories))
-    pv = config.PROMPT_VERSION_CLASSIFY
 
-    # Cache check — prompt version baked into key so stale results survive a prompt change
-    cached = cache.get("classify", request.text, cats=cats_key, pv=pv)
-    if cached:
-        return cached
+def _toxicity_response(result: Dict) -> ToxicityResponse:
+    return ToxicityResponse(
+        is_toxic=result["is_toxic"],
+        toxicity_score=result["toxicity_score"],
+        is_severe=result["is_severe"],
+        details=result["details"],
+        inference_metadata=build_model_metadata("toxicity"),
+    )
+
+
+def _risk_response(result: Dict) -> RiskResponse:
+    return RiskResponse(
+        risk_score=result["risk_score"],
+        is_high_risk=result["is_high_risk"],
+        is_critical=result["is_critical"],
+        breakdown=result["breakdown"],
+        inference_metadata=build_model_metadata("risk"),
+    )
+
 
+async def _classify(text: str, categories: List[str]) -> ClassificationResponse:
+    """Classification through the provider's component cache."""
     started_at = time.perf_counter()
 
     # Shadow mode: run both providers, log comparison, always return local result.
@@ -808,8 +1373,8 @@ async def classify_text(request: ClassifyRequest):
         try:
             shadow_prov = GeminiProvider()
             local_result, shadow_result = await asyncio.gather(
-                active_provider.classify(request.text, categories),
-                shadow_prov.classify(request.text, categories),
+                active_provider.classify(text, categories),
+                shadow_prov.classify(text, categories),
                 return_exceptions=True,
             )
             if isinstance(shadow_result, Exception):
@@ -830,23 +1395,44 @@ async def classify_text(request: ClassifyRequest):
             result = local_result if not isinstance(local_result, Exception) else None
         except Exception as e:
             logger.warning(f"Shadow mode error: {e}")
-            result = await active_provider.classify(request.text, categories)
+            result = await active_provider.classify(text, categories)
     else:
-        async with _get_semaphore():
-            result = await active_provider.classify(request.text, categories)
+        result = await active_provider.classify(text, categories)
 
     if not result:
         raise HTTPException(status_code=400, detail="Could not classify text")
 
-    response = ClassificationResponse(
-        predicted_category=result["predicted_category"],
-        confidence=result["confidence"],
-        all_scores=result["all_scores"],
-        inference_metadata=build_model_metadata("classifier"),
-    )
-    cache.set("classify", request.text, response, cats=cats_key, pv=pv)
     log_inference_event("/classify", "classifier", started_at)
-    return response
+    return _classification_response(result)
+
+
+async def _classify_coalesced(text: str, categories: List[str]) -> ClassificationResponse:
+    key = cache.fingerprint("classify", text, cats=",".join(sorted(categories)))
+    return await inflight.do(key, lambda: _classify(text, categories), group="classify")
+
+
+@app.post("/classify", response_model=ClassificationResponse)
+async def classify_text(request: ClassifyRequest):
+    """Classify text into incident category."""
+    if active_provider is None:
+        raise HTTPException(status_code=503, detail="ML provider not initialised")
+
+    return await _classify_coalesced(
+        request.text, request.categories or config.INCIDENT_CATEGORIES
+    )
+
+
+async def _toxicity(text: str) -> ToxicityResponse:
+    """Toxicity through the provider's component cache."""
+    started_at = time.perf_counter()
+    result = await active_provider.detect_toxicity(text)
+    log_inference_event("/toxicity", "toxicity", started_at)
+    return _toxicity_response(result)
+
+
+async def _toxicity_coalesced(text: str) -> ToxicityResponse:
+    key = cache.fingerprint("toxicity", text)
+    return await inflight.do(key, lambda: _toxicity(text), group="toxicity")
 
 
 @app.post("/toxicity", response_model=ToxicityResponse)
@@ -855,25 +1441,21 @@ async def detect_toxicity(request: TextInput):
     if active_provider is None:
         raise HTTPException(status_code=503, detail="ML provider not initialised")
 
-    pv = config.PROMPT_VERSION_TOXICITY
-    cached = cache.get("toxicity", request.text, pv=pv)
-    if cached:
-        return cached
+    return await _toxicity_coalesced(request.text)
 
-    started_at = time.perf_counter()
-    async with _get_semaphore():
-        result = await active_provider.detect_toxicity(request.text)
 
-    response = ToxicityResponse(
-        is_toxic=result["is_toxic"],
-        toxicity_score=result["toxicity_score"],
-        is_severe=result["is_severe"],
-        details=result["details"],
-        inference_metadata=build_model_metadata("toxicity"),
+async def _compute_risk(request: RiskRequest) -> RiskResponse:
+    """Risk score through the provider's component cache."""
+    started_at = time.perf_counter()
+    result = await active_provider.compute_risk(
+        text=request.text,
+        category=request.category,
+        severity=request.severity,
+        duplicate_count=request.duplicate_count,
+        toxicity_score=request.toxicity_score,
     )
-    cache.set("toxicity", request.text, response, pv=pv)
-    log_inference_event("/toxicity", "toxicity", started_at)
-    return response
+    log_inference_event("/risk", "risk", started_at)
+    return _risk_response(result)
 
 
 @app.post("/risk", response_model=RiskResponse)
@@ -882,24 +1464,7 @@ async def compute_risk(request: RiskRequest):
     if active_provider is None:
         raise HTTPException(status_code=503, detail="ML provider not initialised")
 
-    started_at = time.perf_counter()
-    async with _get_semaphore():
-        result = await active_provider.compute_risk(
-            text=request.text,
-            category=request.category,
-            severity=request.severity,
-            duplicate_count=request.duplicate_count,
-            toxicity_score=request.toxicity_score,
-        )
-
-    log_inference_event("/risk", "risk", started_at)
-    return RiskResponse(
-        risk_score=result["risk_score"],
-        is_high_risk=result["is_high_risk"],
-        is_critical=result["is_critical"],
-        breakdown=result["breakdown"],
-        inference_metadata=build_model_metadata("risk"),
-    )
+    return await _compute_risk(request)
 
 
 @app.post("/analyze", response_model=FullAnalysisResponse)
@@ -907,129 +1472,395 @@ async def full_analysis(request: FullAnalysisRequest):
     """
     Perform full ML analysis on incident text.
     - Gemini provider: single API call returning all fields including LLM-only ones.
-    - Local provider: serial model inference; LLM-only fields return null.
+    - Local provider: classification, toxicity and similarity concurrently,
+      then risk; LLM-only fields return null.
+    - `components` restricts the analysis (and, for Gemini, the prompt and
+      response schema) to the listed fields; risk still runs the models it
+      depends on, but only requested fields are returned.
     """
     if active_provider is None:
         raise HTTPException(status_code=503, detail="ML provider not initialised")
 
-    started_at = time.perf_counter()
-    response = FullAnalysisResponse()
-    # ── Gemini single-call path ───────────────────────────────────────────────
-    if config.ML_PROVIDER == "gemini":
-        try:
-            async with _get_semaphore():
-                result = await active_provider.full_analyze(
-                    text=request.text,
-                    category=request.category,
-                    severity=request.severity,
-                    duplicate_count=request.duplicate_count,
-                    categories=config.INCIDENT_CATEGORIES,
-                )
+    return await _analyze_coalesced(request)
 
-            if result.get("classification"):
-                response.classification = ClassificationResponse(
-                    **result["classification"],
-                    inference_metadata=build_model_metadata("classifier"),
-                )
-            if result.get("toxicity"):
-                response.toxicity = ToxicityResponse(
-                    **result["toxicity"],
-                    inference_metadata=build_model_metadata("toxicity"),
-                )
-            if result.get("risk"):
-                response.risk = RiskResponse(
-                    **result["risk"],
-                    inference_metadata=build_model_metadata("risk"),
-                )
-            response.summary = result.get("summary")
-            response.entities = result.get("entities")
-            response.spam_flag = result.get("spam_flag")
-            response.dispatch_suggestion = result.get("dispatch_suggestion")
 
-        except Exception as e:
-            logger.error(f"/analyze Gemini call failed: {e}")
-            # Return what we have rather than a 500; classification/toxicity/risk stay None.
-
-        # Similarity still requires a separate embedding call (always true for any provider)
-        if request.candidate_texts:
-            try:
-                async with _get_semaphore():
-                    similarities = await active_provider.batch_similarity(
-                        request.text, request.candidate_texts
-                    )
-                sim_results = [
-                    {
-                        "index": idx,
-                        "score": round(score, 4),
-                        "is_duplicate": score >= config.SIMILARITY_THRESHOLD,
-                    }
-                    for idx, score in enumerate(similarities)
-                ]
-                response.similarity = SimilarityResponse(
-                    similarities=sorted(
-                        sim_results, key=lambda x: x["score"], reverse=True
-                    ),
-                    threshold=config.SIMILARITY_THRESHOLD,
-                )
-            except Exception as e:
-                logger.warning(f"/analyze similarity failed: {e}")
+async def _analyze_coalesced(request: FullAnalysisRequest) -> FullAnalysisResponse:
+    key = cache.fingerprint(
+        "analyze",
+        request.text,
+        category=request.category,
+        severity=request.severity,
+        duplicate_count=request.duplicate_count,
+        candidates=json.dumps(request.candidate_texts or []),
+        components=",".join(sorted(_requested_components(request))),
+        provider=config.ML_PROVIDER,
+    )
+    return await inflight.do(key, lambda: _run_full_analysis(request), group="analyze")
 
-        log_inference_event("/analyze", "gemini", started_at)
-        return response
 
-    # ── Local serial inference path ───────────────────────────────────────────
-    async with _get_semaphore():
-        result = await active_provider.full_analyze(
-            text=request.text,
-            category=request.category,
-            severity=request.severity,
-            duplicate_count=request.duplicate_count,
-            categories=config.INCIDENT_CATEGORIES,
+def _requested_components(request: FullAnalysisRequest) -> Set[str]:
+    return set(request.components or get_args(AnalysisComponent))
+
+
+async def _similarity(text: str, candidate_texts: List[str]) -> SimilarityResponse:
+    """Similarity of `text` to each candidate at the service threshold."""
+    similarities = await active_provider.batch_similarity(text, candidate_texts)
+    sim_results = [
+        {
+            "index": idx,
+            "score": round(score, 4),
+            "is_duplicate": score >= config.SIMILARITY_THRESHOLD,
+        }
+        for idx, score in enumerate(similarities)
+    ]
+    return SimilarityResponse(
+        similarities=sorted(sim_results, key=lambda x: x["score"], reverse=True),
+        threshold=config.SIMILARITY_THRESHOLD,
+    )
+
+
+async def _gemini_analysis(request: FullAnalysisRequest) -> Dict:
+    return await active_provider.full_analyze(
+        text=request.text,
+        category=request.category,
+        severity=request.severity,
+        duplicate_count=request.duplicate_count,
+        categories=config.INCIDENT_CATEGORIES,
+        components=sorted(_requested_components(request) & set(ANALYZE_COMPONENTS)),
+    )
+
+
+def _analysis_stages(request: FullAnalysisRequest) -> List[Stage]:
+    """
+    /analyze as a stage graph. Gemini: one LLM call plus similarity, side by
+    side. Local: classification, toxicity and similarity side by side, then
+    risk from the predicted category and toxicity score; every stage reads
+    and fills the provider's component cache, shared with /classify,
+    /toxicity, /risk and /similarity. Only stages the requested components
+    need are added. The model stages come from providers.base.component_stages,
+    as for the providers' own full_analyze.
+    """
+    wanted = _requested_components(request)
+    stages = []
+    if request.candidate_texts and "similarity" in wanted:
+        stages.append(
+            Stage("similarity", lambda _: _similarity(request.text, request.candidate_texts))
         )
+    if config.ML_PROVIDER == "gemini":
+        if wanted & set(ANALYZE_COMPONENTS):
+            stages.append(Stage("gemini", lambda _: _gemini_analysis(request)))
+        return stages
+
+    return stages + component_stages(
+        lambda: _classify_coalesced(request.text, config.INCIDENT_CATEGORIES),
+        lambda: _toxicity_coalesced(request.text),
+        lambda category, toxicity_score: _compute_risk(
+            RiskRequest(
+                text=request.text,
+                category=category,
+                severity=request.severity,
+                duplicate_count=request.duplicate_count,
+                toxicity_score=toxicity_score,
+            )
+        ),
+        wanted & set(ANALYZE_COMPONENTS),
+        request.category,
+    )
 
+
+def _fill_gemini_response(response: FullAnalysisResponse, result: Dict) -> None:
+    """Copy a Gemini full_analyze result into `response`."""
     if result.get("classification"):
-        response.classification = ClassificationResponse(
-            **result["classification"],
-            inference_metadata=build_model_metadata("classifier"),
-        )
+        response.classification = _classification_response(result["classification"])
     if result.get("toxicity"):
-        response.toxicity = ToxicityResponse(
-            **result["toxicity"],
-            inference_metadata=build_model_metadata("toxicity"),
-        )
+        response.toxicity = _toxicity_response(result["toxicity"])
     if result.get("risk"):
-        response.risk = RiskResponse(
-            **result["risk"],
-            inference_metadata=build_model_metadata("risk"),
-        )
-    # LLM-only fields are None for local provider
+        response.risk = _risk_response(result["risk"])
+    response.summary = result.get("summary")
+    response.entities = result.get("entities")
+    response.spam_flag = result.get("spam_flag")
+    response.dispatch_suggestion = result.get("dispatch_suggestion")
 
-    # Similarity
-    if request.candidate_texts:
-        try:
-            async with _get_semaphore():
-                similarities = await active_provider.batch_similarity(
-                    request.text, request.candidate_texts
+
+async def _run_full_analysis(request: FullAnalysisRequest) -> FullAnalysisResponse:
+    started_at = time.perf_counter()
+    stages = await run_stages(_analysis_stages(request))
+    for name, error in stages.errors.items():
+        logger.warning(f"/analyze {name} stage failed: {error}")
+    logger.debug(f"/analyze stages: {stages.summary()}")
+
+    response = FullAnalysisResponse(similarity=stages.values.get("similarity"))
+    # ── Gemini single-call result ─────────────────────────────────────────────
+    if config.ML_PROVIDER == "gemini":
+        # A failed call leaves classification/toxicity/risk None rather than a 500.
+        _fill_gemini_response(response, stages.values.get("gemini") or {})
+        log_inference_event("/analyze", "gemini", started_at)
+        return response
+
+    # ── Local stage results ───────────────────────────────────────────────────
+    # LLM-only fields are None for local provider; so are unrequested ones
+    # (e.g. a classification that ran only as an input to risk).
+    for name, value in requested_results(
+        stages.values, _requested_components(request)
+    ).items():
+        setattr(response, name, value)
+    log_inference_event("/analyze", "local", started_at)
+    return response
+
+
+# ============== Batch Endpoints ==============
+# Each takes {"items": [...]} and streams one NDJSON line per item, in
+# completion order: {"index": i, "result": {...}} or {"index": i, "error": "..."}.
+# Cache hits are resolved with batched MGETs (one per distinct set of
+# non-text key inputs; /analyze/batch only for items fully answered by the
+# component cache) and written first; misses run through the same coalesced
+# single-item paths, at most BATCH_MAX_IN_FLIGHT at a time, so local models
+# see them as micro-batches.
+
+
+def _ndjson_line(index: int, result=None, error: Optional[str] = None) -> str:
+    line: Dict[str, object] = {"index": index}
+    if error is not None:
+        line["error"] = error
+    else:
+        line["result"] = result.model_dump() if hasattr(result, "model_dump") else result
+    return json.dumps(line) + "\n"
+
+
+async def _stream_completed(jobs, max_in_flight: int):
+    """Run (index, coroutine factory) jobs with bounded concurrency, yielding NDJSON as each finishes."""
+    jobs = iter(jobs)
+    running: Dict[asyncio.Task, int] = {}
+
+    def launch():
+        for index, make in jobs:
+            running[asyncio.ensure_future(make())] = index
+            if len(running) >= max_in_flight:
+                return
+
+    launch()
+    try:
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = running.pop(task)
+                error = task.exception()
+                if error is None:
+                    yield _ndjson_line(index, task.result())
+                elif isinstance(error, HTTPException):
+                    yield _ndjson_line(index, error=str(error.detail))
+                else:
+                    logger.warning(f"Batch item {index} failed: {error}")
+                    yield _ndjson_line(index, error=str(error) or type(error).__name__)
+            launch()
+    finally:
+        # Client went away mid-stream: stop the work nobody will read.
+        for task in running:
+            task.cancel()
+
+
+def _ndjson_response(hits: List[str], jobs) -> StreamingResponse:
+    async def body():
+        for line in hits:
+            yield line
+        async for line in _stream_completed(jobs, max(1, config.BATCH_MAX_IN_FLIGHT)):
+            yield line
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+@app.post("/classify/batch")
+async def classify_batch(request: ClassifyBatchRequest):
+    """Classify many texts; streams NDJSON results as they complete."""
+    if active_provider is None:
+        raise HTTPException(status_code=503, detail="ML provider not initialised")
+
+    groups: Dict[str, List[int]] = {}
+    categories_by_key: Dict[str, List[str]] = {}
+    for index, item in enumerate(request.items):
+        categories = item.categories or config.INCIDENT_CATEGORIES
+        cats_key = ",".join(sorted(categories))
+        categories_by_key.setdefault(cats_key, categories)
+        groups.setdefault(cats_key, []).append(index)
+
+    hits: List[str] = []
+    jobs = []
+    for cats_key, indices in groups.items():
+        texts = [request.items[i].text for i in indices]
+        categories = categories_by_key[cats_key]
+        cached = await active_provider.cached_classifications(texts, categories)
+        for index, text, value in zip(indices, texts, cached):
+            if value:
+                hits.append(_ndjson_line(index, _classification_response(value)))
+            else:
+                jobs.append(
+                    (
+                        index,
+                        lambda text=text, categories=categories: _classify_coalesced(
+                            text, categories
+                        ),
+                    )
                 )
-            sim_results = [
+    return _ndjson_response(hits, jobs)
+
+
+@app.post("/toxicity/batch")
+async def toxicity_batch(request: ToxicityBatchRequest):
+    """Score many texts for toxicity; streams NDJSON results as they complete."""
+    if active_provider is None:
+        raise HTTPException(status_code=503, detail="ML provider not initialised")
+
+    texts = [item.text for item in request.items]
+    cached = await active_provider.cached_toxicity(texts)
+
+    hits: List[str] = []
+    jobs = []
+    for index, (text, value) in enumerate(zip(texts, cached)):
+        if value:
+            hits.append(_ndjson_line(index, _toxicity_response(value)))
+        else:
+            jobs.append((index, lambda text=text: _toxicity_coalesced(text)))
+    return _ndjson_response(hits, jobs)
+
+
+def _risk_call(item: RiskRequest) -> Dict:
+    return {
+        "text": item.text,
+        "category": item.category,
+        "severity": item.severity,
+        "duplicate_count": item.duplicate_count,
+        "toxicity_score": item.toxicity_score,
+    }
+
+
+@app.post("/risk/batch")
+async def risk_batch(request: RiskBatchRequest):
+    """Compute risk for many incidents; streams NDJSON results as they complete."""
+    if active_provider is None:
+        raise HTTPException(status_code=503, detail="ML provider not initialised")
+
+    cached = await active_provider.cached_risks([_risk_call(item) for item in request.items])
+
+    hits: List[str] = []
+    jobs = []
+    for index, (item, value) in enumerate(zip(request.items, cached)):
+        if value:
+            hits.append(_ndjson_line(index, _risk_response(value)))
+        else:
+            jobs.append((index, lambda item=item: _compute_risk(item)))
+    return _ndjson_response(hits, jobs)
+
+
+async def _cached_analyses(
+    items: List[FullAnalysisRequest],
+) -> List[Optional[FullAnalysisResponse]]:
+    """
+    /analyze responses answerable entirely from the component cache, looked
+    up with batched reads: Gemini's whole result, or locally classification
+    and toxicity, then risk from their cached values. None where any part
+    misses, and for items asking for similarity.
+    """
+    responses: List[Optional[FullAnalysisResponse]] = [None] * len(items)
+    wanted = [_requested_components(item) for item in items]
+    eligible = [
+        i for i, item in enumerate(items)
+        if not (item.candidate_texts and "similarity" in wanted[i])
+    ]
+    if config.ML_PROVIDER == "gemini":
+        results = await active_provider.cached_analyses(
+            [
                 {
-                    "index": idx,
-                    "score": round(score, 4),
-                    "is_duplicate": score >= config.SIMILARITY_THRESHOLD,
+                    "text": items[i].text,
+                    "category": items[i].category,
+                    "severity": items[i].severity,
+                    "duplicate_count": items[i].duplicate_count,
+                    "categories": config.INCIDENT_CATEGORIES,
+                    "components": sorted(wanted[i] & set(ANALYZE_COMPONENTS)),
                 }
-                for idx, score in enumerate(similarities)
+                for i in eligible
             ]
-            response.similarity = SimilarityResponse(
-                similarities=sorted(
-                    sim_results, key=lambda x: x["score"], reverse=True
-                ),
-                threshold=config.SIMILARITY_THRESHOLD,
+        )
+        for i, result in zip(eligible, results):
+            if result:
+                responses[i] = FullAnalysisResponse()
+                _fill_gemini_response(responses[i], result)
+        return responses
+
+    runs = {
+        i: components_to_run(wanted[i] & set(ANALYZE_COMPONENTS), items[i].category)
+        for i in eligible
+    }
+    values: Dict[int, Dict] = {i: {} for i in eligible}
+    for name, lookup in (
+        (
+            "classification",
+            lambda texts: active_provider.cached_classifications(
+                texts, config.INCIDENT_CATEGORIES
+            ),
+        ),
+        ("toxicity", active_provider.cached_toxicity),
+    ):
+        needed = [i for i in eligible if name in runs[i]]
+        if needed:
+            for i, value in zip(needed, await lookup([items[i].text for i in needed])):
+                values[i][name] = value
+
+    # Risk only where every input it depends on was a hit.
+    needed = [
+        i for i in eligible
+        if "risk" in runs[i] and all(values[i].get(name) for name in values[i])
+    ]
+    if needed:
+        risks = await active_provider.cached_risks(
+            [
+                {
+                    "text": items[i].text,
+                    "category": (values[i].get("classification") or {}).get(
+                        "predicted_category"
+                    )
+                    or items[i].category,
+                    "severity": items[i].severity,
+                    "duplicate_count": items[i].duplicate_count,
+                    "toxicity_score": values[i]["toxicity"].get("toxicity_score") or 0.0,
+                }
+                for i in needed
+            ]
+        )
+        for i, value in zip(needed, risks):
+            values[i]["risk"] = value
+
+    build = {
+        "classification": _classification_response,
+        "toxicity": _toxicity_response,
+        "risk": _risk_response,
+    }
+    for i in eligible:
+        if all(values[i].get(name) for name in runs[i]):
+            responses[i] = FullAnalysisResponse(
+                **{
+                    name: build[name](value)
+                    for name, value in requested_results(values[i], wanted[i]).items()
+                }
             )
-        except Exception as e:
-            logger.warning(f"/analyze similarity failed: {e}")
+    return responses
 
-    log_inference_event("/analyze", "local", started_at)
-    return response
+
+@app.post("/analyze/batch")
+async def full_analysis_batch(request: FullAnalysisBatchRequest):
+    """Full analysis for many incidents; streams NDJSON results as they complete."""
+    if active_provider is None:
+        raise HTTPException(status_code=503, detail="ML provider not initialised")
+
+    cached = await _cached_analyses(request.items)
+
+    hits: List[str] = []
+    jobs = []
+    for index, (item, response) in enumerate(zip(request.items, cached)):
+        if response is not None:
+            hits.append(_ndjson_line(index, response))
+        else:
+            jobs.append((index, lambda item=item: _analyze_coalesced(item)))
+    return _ndjson_response(hits, jobs)
 
 
 if __name__ == "__main__":
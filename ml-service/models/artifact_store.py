@@ -0,0 +1,187 @@
+"""
+Pre-converted model artifacts with memory-mapped weights.
+
+scripts/build_model_artifacts.py writes each local model once, ready to
+serve, into MODEL_ARTIFACT_DIR/<component>/:
+  manifest.json      source model, dtype, model class, extra fields
+  model.safetensors  weights in the chosen dtype (+ non-persistent buffers)
+  config / tokenizer files
+At startup the weights file is opened with safetensors.safe_open, which
+memory-maps it, and the tensors are assigned straight into a
+meta-initialised module instead of being copied into freshly allocated
+parameters.
+
+SentenceTransformer/CrossEncoder artifacts are plain local save directories
+(safetensors), loaded by sentence-transformers itself.
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+WEIGHTS = "model.safetensors"
+BUFFER_PREFIX = "__buffer__."
+
+
+def load_safetensors(path: str) -> Tuple[Dict[str, object], Dict[str, str]]:
+    """
+    Open a .safetensors file with safetensors' own reader, which maps it
+    rather than reading it. Returns ({name: tensor}, metadata).
+    """
+    from safetensors import safe_open
+
+    with safe_open(path, framework="pt", device="cpu") as handle:
+        metadata = handle.metadata() or {}
+        tensors = {name: handle.get_tensor(name) for name in handle.keys()}
+    return tensors, metadata
+
+
+class ArtifactStore:
+    """
+    Args:
+        root: MODEL_ARTIFACT_DIR; an empty value disables the store.
+    """
+
+    def __init__(self, root: Optional[str]):
+        self.root = root or ""
+        self.loaded: Dict[str, Dict[str, object]] = {}
+
+    def path(self, component: str) -> str:
+        return os.path.join(self.root, component)
+
+    def manifest(self, component: str, source: str) -> Optional[Dict]:
+        """The component's manifest, or None when absent or built from another model."""
+        if not self.root:
+            return None
+        manifest_path = os.path.join(self.path(component), MANIFEST)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, encoding="utf-8") as handle:
+            manifest = json.load(handle)
+        if manifest.get("source") != source:
+            logger.warning(
+                f"Artifact for {component} was built from {manifest.get('source')}, "
+                f"not {source}; loading from the hub instead"
+            )
+            return None
+        return manifest
+
+    def local_dir(self, component: str, source: str) -> Optional[str]:
+        """Directory to pass to from_pretrained-style loaders, if an artifact exists."""
+        return self.path(component) if self.manifest(component, source) else None
+
+    def load_hf_model(self, component: str, source: str):
+        """
+        Build the manifest's transformers model class on the meta device and
+        assign the memory-mapped weights. Returns None without an artifact.
+        """
+        manifest = self.manifest(component, source)
+        if manifest is None:
+            return None
+        import torch
+        import transformers
+
+        started = time.perf_counter()
+        directory = self.path(component)
+        model_class = getattr(transformers, manifest["model_class"])
+        model_config = transformers.AutoConfig.from_pretrained(directory)
+        with torch.device("meta"):
+            model = model_class._from_config(
+                model_config, torch_dtype=getattr(torch, manifest["dtype"])
+            )
+
+        tensors, metadata = load_safetensors(os.path.join(directory, WEIGHTS))
+        for alias, target in json.loads(metadata.get("aliases", "{}")).items():
+            tensors[alias] = tensors[target]
+        buffers = {
+            name[len(BUFFER_PREFIX):]: tensors.pop(name)
+            for name in list(tensors)
+            if name.startswith(BUFFER_PREFIX)
+        }
+        model.load_state_dict(tensors, strict=False, assign=True)
+        for name, tensor in buffers.items():
+            owner, _, attr = name.rpartition(".")
+            model.get_submodule(owner)._buffers[attr] = tensor
+
+        missing = [
+            name
+            for name, tensor in list(model.named_parameters()) + list(model.named_buffers())
+            if tensor.is_meta
+        ]
+        if missing:
+            raise RuntimeError(f"Artifact for {component} lacks tensors: {missing[:5]}")
+        model.eval()
+
+        self.loaded[component] = {
+            "path": directory,
+            "dtype": manifest["dtype"],
+            "load_ms": round((time.perf_counter() - started) * 1000.0, 1),
+            "mmap": True,
+        }
+        logger.info(f"{component} loaded from memory-mapped artifact in {self.loaded[component]['load_ms']} ms")
+        return model
+
+    @property
+    def stats(self) -> Dict[str, object]:
+        return {"root": self.root or None, "loaded": self.loaded}
+
+
+_store: Optional[ArtifactStore] = None
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Process-wide store rooted at config.MODEL_ARTIFACT_DIR."""
+    global _store
+    if _store is None:
+        _store = ArtifactStore(getattr(config, "MODEL_ARTIFACT_DIR", ""))
+    return _store
+
+
+def save_hf_model(model, directory: str, source: str, dtype: str, extra: Optional[Dict] = None) -> None:
+    """
+    Write a transformers model as an artifact: weights in `dtype`, tied
+    weights stored once (recorded as aliases), non-persistent buffers kept.
+    """
+    import torch
+    from safetensors.torch import save_file
+
+    os.makedirs(directory, exist_ok=True)
+    model = model.to(getattr(torch, dtype)).eval()
+    state = model.state_dict()
+    tensors, aliases, seen = {}, {}, {}
+    for name, tensor in state.items():
+        key = (tensor.data_ptr(), tuple(tensor.shape), tensor.dtype)
+        if tensor.numel() and key in seen:
+            aliases[name] = seen[key]
+            continue
+        seen[key] = name
+        tensors[name] = tensor.detach().contiguous().cpu()
+    for name, buffer in model.named_buffers():
+        if name not in state:
+            tensors[BUFFER_PREFIX + name] = buffer.detach().contiguous().cpu()
+
+    save_file(
+        tensors,
+        os.path.join(directory, WEIGHTS),
+        metadata={"format": "pt", "aliases": json.dumps(aliases)},
+    )
+    model.config.save_pretrained(directory)
+    write_manifest(directory, source, dtype, {"model_class": type(model).__name__, **(extra or {})})
+
+
+def write_manifest(directory: str, source: str, dtype: str, extra: Optional[Dict] = None) -> None:
+    manifest = {
+        "source": source,
+        "dtype": dtype,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        **(extra or {}),
+    }
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2)
@@ -0,0 +1,139 @@
+"""
+Online calibration of the fast/accurate cascade thresholds.
+
+Every fast-model decision is recorded in a rolling window with its top
+score, top-1/top-2 margin, whether the fast path was taken and, when the
+accurate model also ran, whether both agreed on the top category. Decisive
+texts are only checked on a small audited sample, so their observations
+carry an inverse-sampling weight. From that window the calibrator suggests
+the (confidence, margin) pair with the highest fast-path rate whose
+estimated agreement still meets the target.
+"""
+
+import threading
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+class CascadeCalibrator:
+    """
+    Args:
+        window: Number of most recent fast-model decisions kept
+        confidence_bounds: Range searched for CASCADE_CONFIDENCE_THRESHOLD
+        margin_bounds: Range searched for CASCADE_MARGIN_THRESHOLD
+        min_support: Agreement observations a candidate needs to be trusted
+    """
+
+    def __init__(
+        self,
+        window: int = 2048,
+        confidence_bounds: Tuple[float, float] = (0.55, 0.95),
+        margin_bounds: Tuple[float, float] = (0.02, 0.30),
+        min_support: int = 50,
+    ):
+        self._samples: deque = deque(maxlen=max(1, window))
+        self._lock = threading.Lock()
+        self.confidence_bounds = confidence_bounds
+        self.margin_bounds = margin_bounds
+        self.min_support = min_support
+        self._fast_runs = 0
+        self._fast_taken = 0
+        self._since_calibration = 0
+
+    def record(
+        self,
+        top: float,
+        margin: float,
+        taken: bool,
+        agreed: Optional[bool] = None,
+        weight: float = 1.0,
+    ) -> None:
+        with self._lock:
+            self._samples.append((top, margin, taken, agreed, weight))
+            self._fast_runs += 1
+            self._fast_taken += int(taken)
+            self._since_calibration += 1
+
+    def due(self, interval: int) -> bool:
+        """True once `interval` decisions were recorded since the last call that returned True."""
+        with self._lock:
+            if self._since_calibration < interval:
+                return False
+            self._since_calibration = 0
+            return True
+
+    def _arrays(self):
+        with self._lock:
+            samples = list(self._samples)
+        if not samples:
+            return None
+        top, margin, taken, agreed, weight = zip(*samples)
+        known = np.array([a is not None for a in agreed])
+        return (
+            np.array(top),
+            np.array(margin),
+            np.array(taken, dtype=bool),
+            known,
+            np.array([bool(a) for a in agreed]),
+            np.array(weight),
+        )
+
+    @staticmethod
+    def _agreement(mask, known, agreed, weight) -> Tuple[Optional[float], int]:
+        checked = mask & known
+        support = int(checked.sum())
+        if not support:
+            return None, 0
+        return float(np.average(agreed[checked], weights=weight[checked])), support
+
+    def suggest(self, target_agreement: float) -> Optional[Dict[str, float]]:
+        """
+        Thresholds maximising the fast-path rate with estimated agreement >=
+        target_agreement, or None while the window lacks support. Ties go to
+        the stricter pair.
+        """
+        arrays = self._arrays()
+        if arrays is None:
+            return None
+        top, margin, _, known, agreed, weight = arrays
+        best = None
+        for conf in np.linspace(*self.confidence_bounds, 21):
+            for marg in np.linspace(*self.margin_bounds, 15):
+                mask = (top >= conf) & (margin >= marg)
+                agreement, support = self._agreement(mask, known, agreed, weight)
+                if support < self.min_support or agreement < target_agreement:
+                    continue
+                rate = float(mask.mean())
+                if best is None or rate > best["fast_path_rate"]:
+                    best = {
+                        "confidence_threshold": round(float(conf), 4),
+                        "margin_threshold": round(float(marg), 4),
+                        "fast_path_rate": round(rate, 4),
+                        "agreement": round(agreement, 4),
+                        "support": support,
+                    }
+        return best
+
+    @property
+    def stats(self) -> Dict[str, object]:
+        arrays = self._arrays()
+        window: Dict[str, object] = {"samples": 0}
+        if arrays is not None:
+            top, _, taken, known, agreed, weight = arrays
+            taken_agreement, taken_support = self._agreement(taken, known, agreed, weight)
+            window = {
+                "samples": int(len(top)),
+                "fast_path_rate": round(float(taken.mean()), 4),
+                "agreement": None if taken_agreement is None else round(taken_agreement, 4),
+                "agreement_support": taken_support,
+            }
+        return {
+            "fast_runs": self._fast_runs,
+            "fast_path_taken": self._fast_taken,
+            "fast_path_rate": (
+                round(self._fast_taken / self._fast_runs, 4) if self._fast_runs else None
+            ),
+            "window": window,
+        }
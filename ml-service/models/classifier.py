@@ -1,12 +1,25 @@
 import hashlib
+import json
 import logging
+import random
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 
+import numpy as np
 import torch
 from transformers import AutoTokenizer, BitsAndBytesConfig, pipeline
 
 import config
+from inference.core_scheduler import active_scheduler
+from models.artifact_store import get_artifact_store
+from models.cascade_calibration import CascadeCalibrator
+from models.cpu_backends import is_int8, load_ort_model, quantize_dynamic_int8, resolve_backend
+from models.embedding_head import EmbeddingHead
+from models.nli_engine import ZeroShotNLIEngine
+from utils.pii_redactor import redact
 
 logger = logging.getLogger(__name__)
 
@@ -151,14 +164,40 @@ class CategoryClassifier:
     _quantization_applied = False
     _cascade_requested = False
     _cascade_applied = False
+    # Memory-manager eviction of the fast model (see unload_component)
+    _fast_evicted = False
+    _fast_wanted = False
+    _fast_last_used = 0.0
+    _pruned_pairs = 0
+    _embedding_head = None
+    _head_consulted = 0
+    _head_decided = 0
+    _distill_lock = threading.Lock()
+    _in_flight = 0
+    _in_flight_lock = threading.Lock()
+    _speculative_executor = None
+    _speculative_runs = 0
+    _speculative_paid_off = 0
+    _speculative_discarded = 0
+    _calibrator = None
+    # Thresholds applied by online calibration; None means the config values.
+    _cascade_confidence = None
+    _cascade_margin = None
+    # Last recalibrate() result, served by calibration_status without
+    # re-running the grid search (it is reached from /health).
+    _suggestion = None
+    _suggested_at = None
 
     def __new__(cls, model_name: str = "typeform/distilbert-base-uncased-mnli"):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def _load_onnx_pipeline(self, model_name: str):
-        """Load zero-shot pipeline with ONNX Runtime backend when available."""
+    def _load_onnx_pipeline(self, model_name: str, quantize: bool = False):
+        """
+        Load zero-shot pipeline with ONNX Runtime backend when available.
+        The export (and its int8 variant) is cached on disk after first use.
+        """
         if not ONNX_RUNTIME_AVAILABLE:
             logger.warning(
                 "ONNX backend requested, but optimum.onnxruntime is not installed. "
@@ -170,11 +209,13 @@ class CategoryClassifier:
             provider = getattr(config, "ONNX_EXECUTION_PROVIDER", "CPUExecutionProvider")
             logger.info(
                 f"Loading ONNX classifier model: {model_name} "
-                f"(provider={provider})"
+                f"(provider={provider}, int8={quantize})"
             )
-            ort_model = ORTModelForSequenceClassification.from_pretrained(
+            ort_model = load_ort_model(
+                ORTModelForSequenceClassification,
                 model_name,
-                export=True,
+                quantize,
+                partition="classifier",
                 provider=provider,
             )
             tokenizer = AutoTokenizer.from_pretrained(model_name)
@@ -188,6 +229,78 @@ class CategoryClassifier:
             logger.warning(f"ONNX backend load failed for {model_name}: {e}")
             return None
 
+    @staticmethod
+    def _load_torch_pipeline(component: str, model_name: str, device: int, **kwargs):
+        """
+        Zero-shot pipeline over the memory-mapped artifact when one was built
+        for `model_name`, otherwise from the HF cache. bitsandbytes loads
+        (model_kwargs) always go through from_pretrained.
+        """
+        if not kwargs.get("model_kwargs"):
+            store = get_artifact_store()
+            try:
+                model = store.load_hf_model(component, model_name)
+            except Exception as e:
+                logger.warning(f"Artifact load failed for {component} ({e}); using the HF cache")
+                model = None
+            if model is not None:
+                if "torch_dtype" in kwargs:
+                    model = model.to(kwargs["torch_dtype"])
+                return pipeline(
+                    "zero-shot-classification",
+                    model=model,
+                    tokenizer=AutoTokenizer.from_pretrained(store.path(component)),
+                    device=device,
+                )
+        return pipeline(
+            "zero-shot-classification", model=model_name, device=device, **kwargs
+        )
+
+    def _load_fast_classifier(self, dev: str) -> None:
+        """
+        Load the cascade's fast model. Also reloads it after the memory
+        manager evicted it, so the model is published only once complete.
+        """
+        logger.info(f"Loading fast classifier for cascade: {self._fast_model_name}")
+        if self._backend in ("onnx", "onnx-int8"):
+            fast = self._load_onnx_pipeline(
+                self._fast_model_name, quantize=is_int8(self._backend)
+            )
+            if fast is None:
+                logger.warning("Fast ONNX classifier unavailable; disabling cascade.")
+                self._use_cascade = False
+                return
+        else:
+            fast_kwargs = {}
+            if dev == "cuda":
+                fast_kwargs["torch_dtype"] = torch.float16
+            fast = self._load_torch_pipeline(
+                "classifier_fast", self._fast_model_name, 0 if dev == "cuda" else -1, **fast_kwargs
+            )
+            if self._backend == "torch-int8":
+                fast.model = quantize_dynamic_int8(fast.model)
+
+            # Apply optimizations to fast classifier too
+            if BETTERTRANSFORMER_AVAILABLE and dev == "cuda":
+                try:
+                    fast.model = BetterTransformer.transform(fast.model)
+                    logger.info("BetterTransformer applied to fast classifier")
+                except Exception as e:
+                    logger.warning(f"BetterTransformer failed on fast classifier: {e}")
+
+            if TORCH_COMPILE_AVAILABLE and dev == "cuda":
+                try:
+                    fast.model = torch.compile(fast.model, mode="reduce-overhead")
+                    logger.info("torch.compile applied to fast classifier")
+                except Exception as e:
+                    logger.warning(f"torch.compile failed on fast classifier: {e}")
+
+        if getattr(config, "USE_NLI_ENGINE", True):
+            fast = self._as_engine(fast)
+        self._fast_classifier = fast
+        self._fast_evicted = self._fast_wanted = False
+        logger.info("Fast classifier loaded successfully")
+
     def __init__(self, model_name: str = "typeform/distilbert-base-uncased-mnli"):
         if self._classifier is None:
             dev = config.CLASSIFIER_DEVICE
@@ -212,17 +325,23 @@ class CategoryClassifier:
                 self._use_cascade = False
 
             # Load main classifier with selected backend.
-            self._backend = getattr(config, "CLASSIFIER_BACKEND_RESOLVED", "torch")
+            self._backend = resolve_backend(
+                getattr(config, "CLASSIFIER_BACKEND_RESOLVED", "torch"), dev, "classifier"
+            )
             logger.info(
                 f"Loading classifier model: {self._main_model_name} on {dev} "
                 f"(backend={self._backend})"
             )
             device = 0 if dev == "cuda" else -1
 
-            if self._backend == "onnx":
-                self._quantization_requested = False
-                self._quantization_applied = False
-                self._classifier = self._load_onnx_pipeline(self._main_model_name)
+            if self._backend in ("onnx", "onnx-int8"):
+                self._quantization_requested = is_int8(self._backend)
+                self._classifier = self._load_onnx_pipeline(
+                    self._main_model_name, quantize=self._quantization_requested
+                )
+                self._quantization_applied = (
+                    self._classifier is not None and self._quantization_requested
+                )
                 if self._classifier is None:
                     self._backend = "torch"
 
@@ -251,11 +370,8 @@ class CategoryClassifier:
                     kwargs["torch_dtype"] = torch.float16
 
                 try:
-                    self._classifier = pipeline(
-                        "zero-shot-classification",
-                        model=self._main_model_name,
-                        device=device,
-                        **kwargs,
+                    self._classifier = self._load_torch_pipeline(
+                        "classifier", self._main_model_name, device, **kwargs
                     )
                 except Exception as e:
                     # Fallback path when quantized loading fails (common on unsupported setups)
@@ -266,11 +382,8 @@ class CategoryClassifier:
                         fallback_kwargs = (
                             {"torch_dtype": torch.float16} if dev == "cuda" else {}
                         )
-                        self._classifier = pipeline(
-                            "zero-shot-classification",
-                            model=self._main_model_name,
-                            device=device,
-                            **fallback_kwargs,
+                        self._classifier = self._load_torch_pipeline(
+                            "classifier", self._main_model_name, device, **fallback_kwargs
                         )
                     else:
                         raise
@@ -283,6 +396,10 @@ class CategoryClassifier:
                         logger.warning(
                             "8-bit quantization status: REQUESTED but NOT APPLIED"
                         )
+                elif self._backend == "torch-int8":
+                    self._classifier.model = quantize_dynamic_int8(self._classifier.model)
+                    self._quantization_requested = self._quantization_applied = True
+                    logger.info("8-bit quantization status: APPLIED (torch dynamic int8, CPU)")
                 else:
                     reason = "GPU not active" if dev != "cuda" else "disabled by config"
                     logger.info(f"8-bit quantization status: DISABLED ({reason})")
@@ -326,53 +443,12 @@ class CategoryClassifier:
 
             # Load fast classifier for hybrid cascade
             if self._use_cascade:
-                logger.info(
-                    f"Loading fast classifier for cascade: {self._fast_model_name}"
-                )
-                if self._backend == "onnx":
-                    self._fast_classifier = self._load_onnx_pipeline(
-                        self._fast_model_name
-                    )
-                    if self._fast_classifier is None:
-                        logger.warning(
-                            "Fast ONNX classifier unavailable; disabling cascade."
-                        )
-                        self._use_cascade = False
-                else:
-                    fast_kwargs = {}
-                    if dev == "cuda":
-                        fast_kwargs["torch_dtype"] = torch.float16
-                    self._fast_classifier = pipeline(
-                        "zero-shot-classification",
-                        model=self._fast_model_name,
-                        device=device,
-                        **fast_kwargs,
-                    )
+                self._load_fast_classifier(dev)
 
-                    # Apply optimizations to fast classifier too
-                    if BETTERTRANSFORMER_AVAILABLE and dev == "cuda":
-                        try:
-                            self._fast_classifier.model = BetterTransformer.transform(
-                                self._fast_classifier.model
-                            )
-                            logger.info("BetterTransformer applied to fast classifier")
-                        except Exception as e:
-                            logger.warning(
-                                f"BetterTransformer failed on fast classifier: {e}"
-                            )
-
-                    if TORCH_COMPILE_AVAILABLE and dev == "cuda":
-                        try:
-                            self._fast_classifier.model = torch.compile(
-                                self._fast_classifier.model,
-                                mode="reduce-overhead",
-                            )
-                            logger.info("torch.compile applied to fast classifier")
-                        except Exception as e:
-                            logger.warning(f"torch.compile failed on fast classifier: {e}")
-
-                if self._fast_classifier is not None:
-                    logger.info("Fast classifier loaded successfully")
+            # Swap the pipeline call for the pre-tokenized engine (same scores,
+            # one padded forward pass per batch, cached hypothesis tokens).
+            if getattr(config, "USE_NLI_ENGINE", True):
+                self._classifier = self._as_engine(self._classifier)
 
             self._cascade_applied = self._fast_classifier is not None
             if self._cascade_requested:
@@ -383,6 +459,35 @@ class CategoryClassifier:
             else:
                 logger.info("Hybrid cascade status: DISABLED by config")
 
+            self._calibrator = CascadeCalibrator(
+                window=getattr(config, "CASCADE_CALIBRATION_WINDOW", 2048),
+                confidence_bounds=(
+                    getattr(config, "CASCADE_CONFIDENCE_MIN", 0.55),
+                    getattr(config, "CASCADE_CONFIDENCE_MAX", 0.95),
+                ),
+                margin_bounds=(
+                    getattr(config, "CASCADE_MARGIN_MIN", 0.02),
+                    getattr(config, "CASCADE_MARGIN_MAX", 0.30),
+                ),
+                min_support=getattr(config, "CASCADE_CALIBRATION_MIN_SUPPORT", 50),
+            )
+
+            self._embedding_head = EmbeddingHead.load_if_configured(
+                getattr(config, "EMBEDDING_HEAD_PATH", ""),
+                getattr(config, "EMBEDDING_MODEL", ""),
+            )
+
+    @staticmethod
+    def _as_engine(classifier_pipeline):
+        try:
+            return ZeroShotNLIEngine.from_pipeline(
+                classifier_pipeline,
+                max_pairs_per_forward=getattr(config, "NLI_MAX_PAIRS_PER_FORWARD", 256),
+            )
+        except Exception as e:
+            logger.warning(f"NLI engine unavailable ({e}); keeping the HF pipeline")
+            return classifier_pipeline
+
     def _is_8bit_loaded(self, classifier_pipeline) -> bool:
         """Best-effort detection of successful 8-bit model loading."""
         if classifier_pipeline is None or getattr(classifier_pipeline, "model", None) is None:
@@ -394,6 +499,11 @@ class CategoryClassifier:
             return True
         return False
 
+    @property
+    def uses_embeddings(self) -> bool:
+        """True when predictions can start from a precomputed report embedding."""
+        return self._embedding_head is not None
+
     @property
     def optimization_status(self) -> Dict[str, object]:
         """Return runtime optimization state for health/observability."""
@@ -406,6 +516,16 @@ class CategoryClassifier:
             "quantization_applied": self._quantization_applied,
             "cascade_requested": self._cascade_requested,
             "cascade_applied": self._cascade_applied,
+            "fast_classifier_loaded": self._fast_classifier is not None,
+            "nli_engine": isinstance(self._classifier, ZeroShotNLIEngine),
+            "pruning_enabled": getattr(config, "CLASSIFIER_PRUNING_ENABLED", False),
+            "pruned_pairs": self._pruned_pairs,
+            "embedding_head": self._embedding_head is not None,
+            "embedding_head_consulted": self._head_consulted,
+            "embedding_head_decided": self._head_decided,
+            "speculative": self._speculation_stats(),
+            "cascade_thresholds": self.cascade_thresholds,
+            "calibration": self.calibration_status(),
             "version": getattr(config, "CLASSIFIER_MODEL_VERSION", self._main_model_name),
             "release": getattr(config, "MODEL_RELEASE", "unversioned"),
             "experiment": getattr(config, "MODEL_EXPERIMENT", "baseline"),
@@ -444,6 +564,37 @@ class CategoryClassifier:
             mapped_scores[original_cat] = float(score)
         return mapped_scores
 
+    def _hint_match_counts(self, lowered: str) -> Dict[str, int]:
+        """Domain-hint keyword matches per category (categories without matches omitted)."""
+        counts = {}
+        for category, keywords in DOMAIN_HINT_KEYWORDS.items():
+            matches = sum(1 for kw in keywords if self._contains_keyword(lowered, kw))
+            if matches:
+                counts[category] = matches
+        return counts
+
+    def _prune_candidates(
+        self,
+        text: str,
+        categories: List[str],
+        fast_scores: Optional[Dict[str, float]],
+    ) -> List[str]:
+        """
+        Plausible subset of categories for the accurate model: the fast
+        model's top-k, every category with a domain-hint keyword match, and
+        'other'. Without fast-model scores there is no reliable signal, so
+        nothing is pruned.
+        """
+        if not fast_scores:
+            return list(categories)
+        top_k = max(1, getattr(config, "CLASSIFIER_PRUNE_TOP_K", 4))
+        keep = set(sorted(fast_scores, key=fast_scores.get, reverse=True)[:top_k])
+        keep.update(self._hint_match_counts((text or "").lower()))
+        if "other" in categories:
+            keep.add("other")
+        subset = [category for category in categories if category in keep]
+        return subset if len(subset) >= 2 else list(categories)
+
     def _apply_domain_hints(self, text: str, scores: Dict[str, float]) -> Dict[str, float]:
         """
         Apply lightweight domain priors based on explicit incident phrasing.
@@ -455,15 +606,9 @@ class CategoryClassifier:
         lowered = (text or "").lower()
         adjusted = dict(scores)
 
-        for category, keywords in DOMAIN_HINT_KEYWORDS.items():
+        for category, matches in self._hint_match_counts(lowered).items():
             if category not in adjusted:
                 continue
-            matches = sum(
-                1 for kw in keywords
-                if self._contains_keyword(lowered, kw)
-            )
-            if matches == 0:
-                continue
             per_match = DOMAIN_HINT_WEIGHT.get(category, 0.04)
             adjusted[category] += min(DOMAIN_HINT_CAP, matches * per_match)
 
@@ -502,12 +647,145 @@ class CategoryClassifier:
 
         return self._normalize_scores(adjusted)
     
+    @staticmethod
+    def _as_result_list(output) -> List[Dict]:
+        """HF pipelines return a bare dict for a single input, a list otherwise."""
+        return [output] if isinstance(output, dict) else list(output)
+
+    @property
+    def cascade_thresholds(self) -> Dict[str, object]:
+        """Fast-path gates in effect (calibrated values override config)."""
+        return {
+            "confidence": (
+                config.CASCADE_CONFIDENCE_THRESHOLD
+                if self._cascade_confidence is None
+                else self._cascade_confidence
+            ),
+            "margin": (
+                getattr(config, "CASCADE_MARGIN_THRESHOLD", 0.08)
+                if self._cascade_margin is None
+                else self._cascade_margin
+            ),
+            "source": "calibrated" if self._cascade_confidence is not None else "config",
+        }
+
+    def calibration_status(self) -> Optional[Dict[str, object]]:
+        """
+        Fast-path hit rate, audited agreement and the last suggestion, as of
+        the last recalibrate() (every CASCADE_CALIBRATION_INTERVAL decisions).
+        """
+        if self._calibrator is None:
+            return None
+        return {
+            **self._calibrator.stats,
+            "target_agreement": getattr(config, "CASCADE_CALIBRATION_TARGET_AGREEMENT", 0.95),
+            "auto_apply": getattr(config, "CASCADE_AUTO_CALIBRATE", False),
+            "suggestion": self._suggestion,
+            "suggested_at": self._suggested_at,
+        }
+
+    def recalibrate(self, apply: bool = False) -> Optional[Dict[str, float]]:
+        """
+        Suggest cascade thresholds from the rolling window; with apply=True
+        the suggestion (always inside the configured bounds) takes effect.
+        """
+        if self._calibrator is None:
+            return None
+        suggestion = self._calibrator.suggest(
+            getattr(config, "CASCADE_CALIBRATION_TARGET_AGREEMENT", 0.95)
+        )
+        self._suggestion, self._suggested_at = suggestion, time.time()
+        if apply and suggestion is not None:
+            self._cascade_confidence = suggestion["confidence_threshold"]
+            self._cascade_margin = suggestion["margin_threshold"]
+            logger.info(
+                "Cascade thresholds calibrated: "
+                f"confidence={self._cascade_confidence}, margin={self._cascade_margin} "
+                f"(fast path {suggestion['fast_path_rate']:.0%}, "
+                f"agreement {suggestion['agreement']:.1%})"
+            )
+        return suggestion
+
+    def _record_cascade(
+        self,
+        fast_results: List[Dict],
+        slow_results: Dict[int, Dict],
+        audited: set,
+    ) -> None:
+        """Feed fast-model decisions (and agreement, where known) to the calibrator."""
+        if self._calibrator is None:
+            return
+        audit_rate = getattr(config, "CASCADE_AUDIT_RATE", 0.02)
+        for i, fast_result in enumerate(fast_results):
+            top, margin = self._top_margin(fast_result)
+            slow = slow_results.get(i)
+            self._calibrator.record(
+                top,
+                margin,
+                taken=self._passes_cascade_gate(top, margin),
+                agreed=None if slow is None else slow["labels"][0] == fast_result["labels"][0],
+                weight=1.0 / audit_rate if i in audited and audit_rate > 0 else 1.0,
+            )
+        # Refresh the suggestion here, on the classifier's thread; it is only
+        # applied with CASCADE_AUTO_CALIBRATE.
+        if self._calibrator.due(getattr(config, "CASCADE_CALIBRATION_INTERVAL", 256)):
+            self.recalibrate(apply=getattr(config, "CASCADE_AUTO_CALIBRATE", False))
+
+    @staticmethod
+    def _top_margin(result: Dict) -> tuple:
+        top_score = result["scores"][0]
+        second_score = result["scores"][1] if len(result["scores"]) > 1 else 0.0
+        return top_score, top_score - second_score
+
+    def _passes_cascade_gate(self, top_score: float, margin: float) -> bool:
+        thresholds = self.cascade_thresholds
+        return top_score >= thresholds["confidence"] and margin >= thresholds["margin"]
+
+    def _is_decisive(self, result: Dict) -> bool:
+        top_score, margin = self._top_margin(result)
+        decisive = self._passes_cascade_gate(top_score, margin)
+        if decisive:
+            logger.debug(
+                f"Fast classifier decisive (top={top_score:.2f}, margin={margin:.2f}), "
+                "skipping slow model"
+            )
+        else:
+            logger.debug(
+                f"Fast classifier uncertain (top={top_score:.2f}, margin={margin:.2f}), "
+                "using accurate model"
+            )
+        return decisive
+
+    def _head_is_decisive(self, scores: Dict[str, float]) -> bool:
+        ranked = sorted(scores.values(), reverse=True)
+        margin = ranked[0] - (ranked[1] if len(ranked) > 1 else 0.0)
+        return (
+            ranked[0] >= getattr(config, "EMBEDDING_HEAD_CONFIDENCE_THRESHOLD", 0.85)
+            and margin >= getattr(config, "EMBEDDING_HEAD_MARGIN_THRESHOLD", 0.30)
+        )
+
+    def _log_distillation(self, texts: List[str], scores: List[Dict[str, float]]) -> None:
+        """Append accurate-model scores as embedding-head training targets."""
+        path = getattr(config, "CLASSIFIER_DISTILL_LOG_PATH", "")
+        if not path or not texts:
+            return
+        lines = "".join(
+            json.dumps({"text": redact(text), "scores": row}) + "\n"
+            for text, row in zip(texts, scores)
+        )
+        try:
+            with self._distill_lock, open(path, "a", encoding="utf-8") as handle:
+                handle.write(lines)
+        except OSError as e:
+            logger.warning(f"Distillation log write failed: {e}")
+
     def predict(
         self,
         text: str,
         categories: List[str],
         multi_label: bool = False,
         use_cache: bool = True,
+        embedding: Optional[np.ndarray] = None,
     ) -> Dict[str, float]:
         """
         Predict category probabilities for text.
@@ -516,58 +794,339 @@ class CategoryClassifier:
         """
         if not text or not categories:
             return {}
+        embeddings = None if embedding is None else np.asarray(embedding)[None, :]
+        return self.predict_batch(
+            [text], categories, multi_label=multi_label, embeddings=embeddings
+        )[0]
+
+    def predict_batch(
+        self,
+        texts: List[str],
+        categories: List[str],
+        multi_label: bool = False,
+        embeddings: Optional[np.ndarray] = None,
+    ) -> List[Dict[str, float]]:
+        """
+        Predict category probabilities for several texts at once.
+
+        When an embedding head is loaded and `embeddings` (one row per text)
+        are given, texts the head is confident about are decided right away.
+        Everything else goes through the fast model in one padded batch; only
+        the undecided ones are escalated to the accurate model, again as a
+        single batch. Returns one score dict per text, in order.
+        """
+        if not categories:
+            return [{} for _ in texts]
+        present = [i for i, text in enumerate(texts) if text]
+        if len(present) < len(texts):
+            scored = self.predict_batch(
+                [texts[i] for i in present],
+                categories,
+                multi_label,
+                None if embeddings is None else np.asarray(embeddings)[present],
+            )
+            out: List[Dict[str, float]] = [{} for _ in texts]
+            for i, scores in zip(present, scored):
+                out[i] = scores
+            return out
+        if not texts:
+            return []
 
+        predictions: List[Optional[Dict[str, float]]] = [None] * len(texts)
+        remaining = list(range(len(texts)))
+
+        # EMBEDDING-HEAD TIER: a dot product against the report embedding the
+        # similarity path already computed; clear-cut texts never reach NLI.
+        head = self._embedding_head
+        if (
+            head is not None
+            and embeddings is not None
+            and not multi_label
+            and head.covers(categories)
+        ):
+            self._head_consulted += len(texts)
+            remaining = []
+            for i, scores in enumerate(head.predict(embeddings, categories)):
+                if self._head_is_decisive(scores):
+                    predictions[i] = self._apply_domain_hints(texts[i], scores)
+                    self._head_decided += 1
+                else:
+                    remaining.append(i)
+
+        if remaining:
+            cascade = self._predict_cascade(
+                [texts[i] for i in remaining], categories, multi_label
+            )
+            for i, scores in zip(remaining, cascade):
+                predictions[i] = scores
+        return predictions
+
+    def _speculation_stats(self) -> Dict[str, object]:
+        runs = self._speculative_runs
+        return {
+            "enabled": getattr(config, "CLASSIFIER_SPECULATIVE_ENABLED", False),
+            "runs": runs,
+            "paid_off": self._speculative_paid_off,
+            "discarded": self._speculative_discarded,
+            "payoff_rate": round(self._speculative_paid_off / runs, 4) if runs else None,
+        }
+
+    def _fast_model(self):
+        """
+        Snapshot of the fast cascade model (None when disabled or evicted);
+        marks it used, or wanted back when it was evicted.
+        """
+        fast = self._fast_classifier if self._use_cascade else None
+        if fast is not None:
+            self._fast_last_used = time.time()
+        elif self._fast_evicted:
+            self._fast_wanted = True
+        return fast
+
+    def component_usage(self) -> Dict[str, Dict[str, object]]:
+        """Sub-models the memory manager may unload and reload."""
+        if not self._cascade_applied:
+            return {}
+        return {
+            "fast_classifier": {
+                "loaded": self._fast_classifier is not None,
+                "last_used": self._fast_last_used,
+                "wanted": self._fast_wanted,
+            }
+        }
+
+    def unload_component(self, name: str) -> None:
+        """Drop the fast model; the cascade sends every text to the accurate model meanwhile."""
+        if name == "fast_classifier" and self._fast_classifier is not None:
+            self._fast_classifier = None
+            self._fast_evicted = True
+            self._fast_wanted = False
+
+    def reload_component(self, name: str) -> None:
+        if name == "fast_classifier" and self._fast_classifier is None:
+            self._load_fast_classifier(config.CLASSIFIER_DEVICE)
+
+    def _should_speculate(self, batch_texts: int) -> bool:
+        """
+        Speculate only while load is light: few concurrent predictions and a
+        small batch (micro-batches grow with queue depth). Otherwise the extra
+        accurate-model work would compete with queued requests.
+        """
+        return (
+            getattr(config, "CLASSIFIER_SPECULATIVE_ENABLED", False)
+            and self._use_cascade
+            and self._fast_classifier is not None
+            and batch_texts <= getattr(config, "CLASSIFIER_SPECULATIVE_MAX_TEXTS", 4)
+            and self._in_flight <= getattr(config, "CLASSIFIER_SPECULATIVE_MAX_IN_FLIGHT", 1)
+        )
+
+    def _run_accurate(
+        self,
+        texts: List[str],
+        subset: List[str],
+        pipeline_kwargs: Dict,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> List[Dict]:
+        subset_labels = [CATEGORY_LABEL_MAP.get(cat, cat) for cat in subset]
+        kwargs = {
+            **pipeline_kwargs,
+            "candidate_labels": subset_labels,
+            "batch_size": len(texts) * len(subset_labels),
+        }
+        # Only the NLI engine can stop between forward passes.
+        if cancel_event is not None and isinstance(self._classifier, ZeroShotNLIEngine):
+            kwargs["cancel_event"] = cancel_event
+        return self._as_result_list(self._classifier(list(texts), **kwargs))
+
+    def warmup(self, texts: List[str], categories: List[str]) -> None:
+        """
+        One pass of the fast and accurate models over `texts`, shaped like a
+        production batch, so kernels and allocator pools (and compiled graphs
+        on GPU) exist before traffic. Skips the cascade: nothing reaches the
+        calibrator, the distillation log or the counters.
+        """
+        labels = [CATEGORY_LABEL_MAP.get(cat, cat) for cat in categories]
+        kwargs = {
+            "candidate_labels": labels,
+            "multi_label": False,
+            "hypothesis_template": config.HYPOTHESIS_TEMPLATE,
+            "batch_size": len(texts) * len(labels),
+        }
+        for model in (self._fast_classifier, self._classifier):
+            if model is not None:
+                model(list(texts), **kwargs)
+
+    def _log_accurate(self, texts: List[str], results: List[Dict]) -> None:
+        self._log_distillation(
+            texts,
+            [
+                self._map_pipeline_scores(r["labels"], r["scores"], CATEGORY_LABEL_MAP)
+                for r in results
+            ],
+        )
+
+    def _predict_cascade(
+        self,
+        texts: List[str],
+        categories: List[str],
+        multi_label: bool = False,
+    ) -> List[Dict[str, float]]:
+        """Zero-shot fast/accurate cascade over non-empty texts."""
         label_map = CATEGORY_LABEL_MAP
         labels = [label_map.get(cat, cat) for cat in categories]
+        # Zero-shot expands each text into one premise/hypothesis pair per
+        # label; size the pipeline batch so each model runs one forward pass.
+        pipeline_kwargs = {
+            "candidate_labels": labels,
+            "multi_label": multi_label,
+            "hypothesis_template": config.HYPOTHESIS_TEMPLATE,
+            "batch_size": len(texts) * len(labels),
+        }
+
+        with self._in_flight_lock:
+            self._in_flight += 1
+        try:
+            if self._should_speculate(len(texts)):
+                results = self._speculative_cascade(texts, categories, pipeline_kwargs)
+            else:
+                results = self._sequential_cascade(texts, categories, pipeline_kwargs)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight -= 1
+
+        predictions = []
+        for text, result in zip(texts, results):
+            # Pruned categories were judged implausible: they score zero.
+            scores = dict.fromkeys(categories, 0.0)
+            scores.update(
+                self._map_pipeline_scores(result["labels"], result["scores"], label_map)
+            )
+            predictions.append(self._apply_domain_hints(text, scores))
+        return predictions
+
+    def _sequential_cascade(
+        self,
+        texts: List[str],
+        categories: List[str],
+        pipeline_kwargs: Dict,
+    ) -> List[Dict]:
+        label_map = CATEGORY_LABEL_MAP
+        multi_label = pipeline_kwargs["multi_label"]
+        results: List[Optional[Dict]] = [None] * len(texts)
+        escalate = list(range(len(texts)))
+        fast_results: List[Dict] = []
+        # Decisive texts sampled for an accurate-model check; their output is
+        # still the fast result, the check only feeds calibration.
+        audited = set()
+        audit_rate = getattr(config, "CASCADE_AUDIT_RATE", 0.02)
 
         # HYBRID CASCADE OPTIMIZATION:
         # 1. Use fast DistilBERT for initial classification
         # 2. Only use slow BART if confidence below threshold
         # This gives 60-80% latency reduction for high-confidence cases
-        
-        if self._use_cascade and self._fast_classifier is not None:
-            # Fast first-pass with DistilBERT (~150ms)
-            fast_result = self._fast_classifier(
-                text,
-                candidate_labels=labels,
-                multi_label=multi_label,
-                hypothesis_template=config.HYPOTHESIS_TEMPLATE,
-            )
-            
-            # If high confidence and clear separation from runner-up, return fast result
-            top_score = fast_result["scores"][0]
-            second_score = fast_result["scores"][1] if len(fast_result["scores"]) > 1 else 0.0
-            margin = top_score - second_score
-            if (
-                top_score >= config.CASCADE_CONFIDENCE_THRESHOLD
-                and margin >= getattr(config, "CASCADE_MARGIN_THRESHOLD", 0.08)
-            ):
-                logger.debug(
-                    f"Fast classifier decisive (top={top_score:.2f}, margin={margin:.2f}), "
-                    "skipping slow model"
+        fast = self._fast_model()
+        if fast is not None:
+            fast_results = self._as_result_list(fast(list(texts), **pipeline_kwargs))
+            escalate = []
+            for i, fast_result in enumerate(fast_results):
+                if self._is_decisive(fast_result):
+                    results[i] = fast_result
+                    if audit_rate > 0 and random.random() < audit_rate:
+                        audited.add(i)
+                else:
+                    escalate.append(i)
+
+        # Hypothesis pruning: the accurate model only scores the plausible
+        # labels; texts that end up with the same subset share a forward pass.
+        groups: Dict[tuple, List[int]] = {}
+        for i in escalate:
+            subset = categories
+            if getattr(config, "CLASSIFIER_PRUNING_ENABLED", False) and fast_results:
+                fast_scores = self._map_pipeline_scores(
+                    fast_results[i]["labels"], fast_results[i]["scores"], label_map
                 )
-                scores = self._map_pipeline_scores(
-                    fast_result["labels"],
-                    fast_result["scores"],
-                    label_map,
+                subset = self._prune_candidates(texts[i], categories, fast_scores)
+            groups.setdefault(tuple(subset), []).append(i)
+        for i in sorted(audited):
+            groups.setdefault(tuple(categories), []).append(i)
+
+        slow_by_index: Dict[int, Dict] = {}
+        for subset, indices in groups.items():
+            subset_texts = [texts[i] for i in indices]
+            slow_results = self._run_accurate(subset_texts, list(subset), pipeline_kwargs)
+            for i, slow_result in zip(indices, slow_results):
+                slow_by_index[i] = slow_result
+                if i not in audited:
+                    results[i] = slow_result
+            self._pruned_pairs += len(indices) * (len(categories) - len(subset))
+            # Unpruned, single-label accurate-model scores are the head's
+            # distillation targets.
+            if len(subset) == len(categories) and not multi_label:
+                self._log_accurate(subset_texts, slow_results)
+        if fast_results:
+            self._record_cascade(fast_results, slow_by_index, audited)
+        return results
+
+    def _speculative_cascade(
+        self,
+        texts: List[str],
+        categories: List[str],
+        pipeline_kwargs: Dict,
+    ) -> List[Dict]:
+        """
+        Start the accurate model alongside the fast one. If every text is
+        decided by the fast model the accurate run is cancelled (or, when
+        already mid-pass, its output discarded); otherwise its results are
+        already in flight instead of starting from scratch. Pruning needs the
+        fast scores up front, so speculative runs score all categories.
+
+        The accurate run goes to the classifier partition's side executor
+        when cores are partitioned, so it stays on the classifier's cores. It
+        is part of the prediction that holds the caller's classifier pool
+        slot, and _should_speculate keeps it to light load. Without a
+        partition (process pool workers, scheduler disabled) it runs on a
+        private single-thread executor.
+        """
+        fast = self._fast_model()
+        if fast is None:
+            return self._sequential_cascade(texts, categories, pipeline_kwargs)
+        cancel = threading.Event()
+        run = (self._run_accurate, list(texts), categories, pipeline_kwargs, cancel)
+        scheduler = active_scheduler()
+        accurate = scheduler.submit_side("classifier", *run) if scheduler is not None else None
+        if accurate is None:
+            executor = type(self)._speculative_executor
+            if executor is None:
+                executor = type(self)._speculative_executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="speculative-nli"
                 )
-                return self._apply_domain_hints(text, scores)
-            
-            logger.debug(
-                f"Fast classifier uncertain (top={top_score:.2f}, margin={margin:.2f}), "
-                "using accurate model"
-            )
-        
-        # Use accurate BART classifier (with 8-bit quantization: ~400ms)
-        result = self._classifier(
-            text,
-            candidate_labels=labels,
-            multi_label=multi_label,
-            hypothesis_template=config.HYPOTHESIS_TEMPLATE,
-        )
+            accurate = executor.submit(*run)
+        self._speculative_runs += 1
 
-        scores = self._map_pipeline_scores(result["labels"], result["scores"], label_map)
-        return self._apply_domain_hints(text, scores)
+        try:
+            fast_results = self._as_result_list(fast(list(texts), **pipeline_kwargs))
+        except Exception:
+            cancel.set()
+            accurate.cancel()
+            raise
+
+        results: List[Optional[Dict]] = list(fast_results)
+        escalate = [i for i, r in enumerate(fast_results) if not self._is_decisive(r)]
+        if not escalate:
+            cancel.set()
+            accurate.cancel()
+            self._speculative_discarded += 1
+            self._record_cascade(fast_results, {}, set())
+            return results
+
+        slow_results = accurate.result()
+        self._speculative_paid_off += 1
+        self._record_cascade(fast_results, dict(enumerate(slow_results)), set())
+        for i in escalate:
+            results[i] = slow_results[i]
+        if not pipeline_kwargs["multi_label"]:
+            self._log_accurate([texts[i] for i in escalate], [slow_results[i] for i in escalate])
+        return results
 
     def predict_top(
         self,
@@ -575,6 +1134,7 @@ class CategoryClassifier:
         categories: List[str],
         confidence_threshold: Optional[float] = None,
         margin_threshold: Optional[float] = None,
+        embedding: Optional[np.ndarray] = None,
     ) -> Optional[Dict]:
         """
         Get top predicted category with confidence.
@@ -583,7 +1143,27 @@ class CategoryClassifier:
         If the top prediction is below confidence_threshold, returns 'other'
         as a fallback to handle highly ambiguous cases.
         """
-        scores = self.predict(text, categories)
+        scores = self.predict(text, categories, embedding=embedding)
+        return self._select_top(scores, confidence_threshold, margin_threshold)
+
+    def predict_top_batch(
+        self,
+        texts: List[str],
+        categories: List[str],
+        embeddings: Optional[np.ndarray] = None,
+    ) -> List[Optional[Dict]]:
+        """Batched predict_top: one result (or None) per text, in order."""
+        return [
+            self._select_top(scores)
+            for scores in self.predict_batch(texts, categories, embeddings=embeddings)
+        ]
+
+    def _select_top(
+        self,
+        scores: Dict[str, float],
+        confidence_threshold: Optional[float] = None,
+        margin_threshold: Optional[float] = None,
+    ) -> Optional[Dict]:
         if not scores:
             return None
 
@@ -0,0 +1,211 @@
+"""
+CPU-optimised inference backends shared by all local models.
+
+Every model can be served as:
+  torch       plain PyTorch (fp32 on CPU)
+  torch-int8  PyTorch with dynamic int8 quantization of the Linear layers
+  onnx        ONNX Runtime, fp32
+  onnx-int8   ONNX Runtime with dynamic int8 weights
+ONNX exports (and their quantized variants) are written once under
+ONNX_CACHE_DIR and loaded from disk on every later start.
+
+ONNX Runtime sessions size their own intra-op thread pool when created.
+When the core scheduler partitions the cores (inference/core_scheduler.py)
+it records each model's share with set_ort_threads() before the models
+load, and sessions loaded for that model get it as intra_op_num_threads.
+"""
+
+import glob
+import logging
+import os
+import re
+from typing import Dict, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+# Intra-op threads per ONNX Runtime session, by core partition (model name).
+_ort_threads: Dict[str, int] = {}
+
+try:
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    ORT_QUANTIZATION_AVAILABLE = True
+except ImportError:
+    ORT_QUANTIZATION_AVAILABLE = False
+
+
+def resolve_backend(requested: str, device: str, component: str) -> str:
+    """Validate a configured backend; int8 variants only apply on CPU."""
+    backend = (requested or "torch").lower()
+    if backend not in BACKENDS:
+        logger.warning(f"Unknown {component} backend '{requested}'; using torch")
+        return "torch"
+    if is_int8(backend) and device != "cpu":
+        fallback = backend[: -len("-int8")]
+        logger.info(f"{component} runs on {device}; using '{fallback}' instead of '{backend}'")
+        return fallback
+    return backend
+
+
+def is_int8(backend: str) -> bool:
+    return backend.endswith("-int8")
+
+
+def quantize_dynamic_int8(module):
+    """Dynamic int8 quantization of every nn.Linear (weights int8, activations fp32)."""
+    import torch
+
+    return torch.ao.quantization.quantize_dynamic(
+        module, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def set_ort_threads(threads: Dict[str, int]) -> None:
+    """Record each partition's core count for sessions created from now on."""
+    _ort_threads.clear()
+    _ort_threads.update(threads)
+
+
+def ort_session_kwargs(partition: Optional[str]) -> Dict[str, object]:
+    """from_pretrained kwargs that size a session to `partition`'s cores, if known."""
+    threads = _ort_threads.get(partition) if partition else None
+    if not threads:
+        return {}
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+    return {"session_options": options}
+
+
+def artifact_dir(model_name: str, variant: str) -> str:
+    safe_name = re.sub(r"[^\w.-]+", "--", model_name).strip("-")
+    return os.path.join(config.ONNX_CACHE_DIR, safe_name, variant)
+
+
+def _find_onnx(directory: str, pattern: str = "*.onnx") -> Optional[str]:
+    matches = sorted(glob.glob(os.path.join(directory, "**", pattern), recursive=True))
+    return os.path.relpath(matches[0], directory) if matches else None
+
+
+def _quantization_config():
+    arch = getattr(config, "ONNX_QUANTIZATION_ARCH", "avx2")
+    factory = getattr(AutoQuantizationConfig, arch, None)
+    if factory is None:
+        logger.warning(f"Unknown ONNX_QUANTIZATION_ARCH '{arch}'; using avx2")
+        factory = AutoQuantizationConfig.avx2
+    return factory(is_static=False, per_channel=False)
+
+
+def load_ort_model(
+    ort_class,
+    model_name: str,
+    quantize: bool,
+    source: Optional[str] = None,
+    partition: Optional[str] = None,
+    **load_kwargs,
+):
+    """
+    Load an optimum ORTModel for `model_name`, exporting (and quantizing) on
+    first use and reusing the cached artifacts afterwards.
+
+    Args:
+        ort_class: e.g. ORTModelForSequenceClassification
+        model_name: Hub id or local path; also names the cache directory
+        quantize: Serve the dynamic int8 variant
+        source: Export from this path instead of model_name
+        partition: Core partition whose thread count the session gets
+        load_kwargs: Passed to from_pretrained when loading (e.g. provider)
+    """
+    load_kwargs = {**ort_session_kwargs(partition), **load_kwargs}
+    fp32_dir = artifact_dir(model_name, "onnx")
+    if _find_onnx(fp32_dir) is None:
+        logger.info(f"Exporting {model_name} to ONNX ({fp32_dir})")
+        ort_class.from_pretrained(source or model_name, export=True).save_pretrained(fp32_dir)
+    if not quantize:
+        return ort_class.from_pretrained(fp32_dir, **load_kwargs)
+
+    if not ORT_QUANTIZATION_AVAILABLE:
+        raise RuntimeError("optimum.onnxruntime quantization is not installed")
+    int8_dir = artifact_dir(model_name, "onnx-int8")
+    if _find_onnx(int8_dir, "*quantized.onnx") is None:
+        logger.info(f"Quantizing {model_name} ONNX export to int8 ({int8_dir})")
+        ORTQuantizer.from_pretrained(fp32_dir).quantize(
+            save_dir=int8_dir, quantization_config=_quantization_config()
+        )
+    return ort_class.from_pretrained(
+        int8_dir, file_name=_find_onnx(int8_dir, "*quantized.onnx"), **load_kwargs
+    )
+
+
+def load_sentence_transformers_onnx(
+    model_class,
+    model_name: str,
+    quantize: bool,
+    device: str = "cpu",
+    source: Optional[str] = None,
+    partition: Optional[str] = None,
+    **kwargs,
+):
+    """
+    SentenceTransformer / CrossEncoder with the ONNX backend
+    (sentence-transformers >= 3.2 / 4.1), exported (from `source` when given)
+    and optionally quantized once into the artifact cache. The session gets
+    `partition`'s thread count.
+    """
+    target = artifact_dir(model_name, "st-onnx")
+    if _find_onnx(target) is None:
+        logger.info(f"Exporting {model_name} to ONNX ({target})")
+        model_class(
+            source or model_name, device="cpu", backend="onnx", **kwargs
+        ).save_pretrained(target)
+
+    pattern = "*qint8*.onnx" if quantize else "model.onnx"
+    if quantize and _find_onnx(target, pattern) is None:
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+
+        logger.info(f"Quantizing {model_name} ONNX export to int8 ({target})")
+        export_dynamic_quantized_onnx_model(
+            model_class(target, device="cpu", backend="onnx", **kwargs),
+            getattr(config, "ONNX_QUANTIZATION_ARCH", "avx2"),
+            target,
+        )
+    return model_class(
+        target,
+        device=device,
+        backend="onnx",
+        model_kwargs={"file_name": _find_onnx(target, pattern), **ort_session_kwargs(partition)},
+        **kwargs,
+    )
+
+
+class ORTLogitsAdapter:
+    """
+    Presents an ORTModelForSequenceClassification where code expects a torch
+    classifier returning a tuple (logits first), e.g. Detoxify.predict.
+    """
+
+    def __init__(self, ort_model):
+        self._model = ort_model
+        self.config = getattr(ort_model, "config", None)
+
+    @property
+    def device(self):
+        import torch
+
+        return torch.device("cpu")
+
+    def eval(self):
+        return self
+
+    def to(self, *_args, **_kwargs):
+        return self
+
+    def __call__(self, **inputs):
+        return (self._model(**inputs).logits,)
@@ -0,0 +1,128 @@
+"""
+Embedding-head classifier tier.
+Scores incident categories straight from the report's sentence embedding
+(the one already computed for duplicate detection) with category prototypes
+plus a small linear head distilled from logged accurate-model outputs.
+Clear-cut reports are decided here in microseconds; the rest fall through to
+the zero-shot cascade. Train with scripts/train_embedding_head.py.
+"""
+
+import logging
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = np.exp(logits - logits.max(-1, keepdims=True))
+    return shifted / shifted.sum(-1, keepdims=True)
+
+
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class EmbeddingHead:
+    """
+    Args:
+        categories: Category names, one per column of the head
+        prototypes: (C, D) mean embedding per category
+        weight: Optional (D, C) distilled linear head
+        bias: Optional (C,) head bias
+        temperature: Scale applied to prototype cosine similarities
+        embedding_model: Embedding model the head was trained against
+    """
+
+    def __init__(
+        self,
+        categories: Sequence[str],
+        prototypes: np.ndarray,
+        weight: Optional[np.ndarray] = None,
+        bias: Optional[np.ndarray] = None,
+        temperature: float = 20.0,
+        embedding_model: str = "",
+    ):
+        self.categories = list(categories)
+        self.prototypes = _l2_normalize(np.asarray(prototypes, dtype=np.float32))
+        self.weight = None if weight is None else np.asarray(weight, dtype=np.float32)
+        self.bias = (
+            np.zeros(len(self.categories), dtype=np.float32)
+            if bias is None
+            else np.asarray(bias, dtype=np.float32)
+        )
+        self.temperature = float(temperature)
+        self.embedding_model = embedding_model
+        self._index = {category: i for i, category in enumerate(self.categories)}
+
+    # ── Persistence ───────────────────────────────────────────────────────────
+
+    def save(self, path: str) -> None:
+        arrays = {
+            "categories": np.array(self.categories),
+            "prototypes": self.prototypes,
+            "bias": self.bias,
+            "temperature": np.array(self.temperature),
+            "embedding_model": np.array(self.embedding_model),
+        }
+        if self.weight is not None:
+            arrays["weight"] = self.weight
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "EmbeddingHead":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                categories=[str(c) for c in data["categories"]],
+                prototypes=data["prototypes"],
+                weight=data["weight"] if "weight" in data.files else None,
+                bias=data["bias"],
+                temperature=float(data["temperature"]),
+                embedding_model=str(data["embedding_model"]),
+            )
+
+    @classmethod
+    def load_if_configured(cls, path: Optional[str], embedding_model: str) -> Optional["EmbeddingHead"]:
+        """Load the configured head, or None when unset, missing or trained for another encoder."""
+        if not path:
+            return None
+        if not os.path.exists(path):
+            logger.warning(f"Embedding head not found at {path}; tier disabled")
+            return None
+        try:
+            head = cls.load(path)
+        except Exception as e:
+            logger.warning(f"Embedding head at {path} could not be loaded: {e}")
+            return None
+        if head.embedding_model and head.embedding_model != embedding_model:
+            logger.warning(
+                f"Embedding head was trained for {head.embedding_model}, "
+                f"not {embedding_model}; tier disabled"
+            )
+            return None
+        logger.info(f"Embedding head loaded ({len(head.categories)} categories)")
+        return head
+
+    # ── Scoring ───────────────────────────────────────────────────────────────
+
+    def covers(self, categories: Sequence[str]) -> bool:
+        return all(category in self._index for category in categories)
+
+    def logits(self, embeddings: np.ndarray) -> np.ndarray:
+        """(N, C) logits: prototype cosine similarity, plus the linear head when trained."""
+        embeddings = _l2_normalize(np.atleast_2d(np.asarray(embeddings, dtype=np.float32)))
+        logits = self.temperature * embeddings @ self.prototypes.T
+        if self.weight is not None:
+            logits = logits + embeddings @ self.weight + self.bias
+        return logits
+
+    def predict(
+        self, embeddings: np.ndarray, categories: Sequence[str]
+    ) -> List[Dict[str, float]]:
+        """Probabilities over the requested categories (renormalised), one dict per row."""
+        columns = [self._index[category] for category in categories]
+        probs = _softmax(self.logits(embeddings)[:, columns])
+        return [dict(zip(categories, row.tolist())) for row in probs]
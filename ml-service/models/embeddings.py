@@ -9,9 +9,17 @@ from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 from typing import List, Tuple, Optional
 import logging
+import time
 import torch
 
 import config
+from models.artifact_store import get_artifact_store
+from models.cpu_backends import (
+    is_int8,
+    load_sentence_transformers_onnx,
+    quantize_dynamic_int8,
+    resolve_backend,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +30,11 @@ class EmbeddingModel:
     _cpu_model = None
     _cross_encoder = None
     _model_name = None
+    _backend = "torch"
+    _cross_encoder_backend = "torch"
+    _cross_encoder_evicted = False
+    _cross_encoder_wanted = False
+    _cross_encoder_last_used = 0.0
 
     def __new__(cls, model_name: str = "sentence-transformers/all-MiniLM-L12-v2"):
         if cls._instance is None:
@@ -32,24 +45,101 @@ class EmbeddingModel:
         if self._model is None:
             self._model_name = model_name
             dev = config.EMBEDDING_DEVICE
-            logger.info(f"Loading embedding model: {model_name} on {dev}")
-            self._model = SentenceTransformer(model_name, device=dev)
+            self._backend = resolve_backend(
+                getattr(config, "EMBEDDING_BACKEND", "torch"), dev, "embedding"
+            )
+            logger.info(
+                f"Loading embedding model: {model_name} on {dev} (backend={self._backend})"
+            )
+            self._model, self._backend = self._load(
+                SentenceTransformer, model_name, dev, self._backend, "embedding"
+            )
             logger.info(f"Embedding model loaded successfully on {dev}")
 
             # Load cross-encoder for re-ranking borderline duplicates
-            cross_model = getattr(config, "CROSS_ENCODER_MODEL", None)
-            cross_dev = getattr(config, "CROSS_ENCODER_DEVICE", "cpu")
-            if cross_model:
-                try:
-                    logger.info(f"Loading cross-encoder: {cross_model} on {cross_dev}")
-                    self._cross_encoder = CrossEncoder(
-                        cross_model,
-                        device=cross_dev,
-                    )
-                    logger.info("Cross-encoder loaded successfully")
-                except Exception as e:
-                    logger.warning(f"Cross-encoder failed to load: {e}")
-                    self._cross_encoder = None
+            self._load_cross_encoder()
+
+    def _load_cross_encoder(self) -> None:
+        """Load the re-ranking cross-encoder (also after a memory-manager eviction)."""
+        cross_model = getattr(config, "CROSS_ENCODER_MODEL", None)
+        cross_dev = getattr(config, "CROSS_ENCODER_DEVICE", "cpu")
+        if not cross_model:
+            return
+        try:
+            backend = resolve_backend(
+                getattr(config, "CROSS_ENCODER_BACKEND", "torch"), cross_dev, "cross-encoder"
+            )
+            logger.info(f"Loading cross-encoder: {cross_model} on {cross_dev} (backend={backend})")
+            cross_encoder, self._cross_encoder_backend = self._load(
+                CrossEncoder, cross_model, cross_dev, backend, "cross_encoder"
+            )
+            self._cross_encoder = cross_encoder
+            self._cross_encoder_evicted = self._cross_encoder_wanted = False
+            logger.info("Cross-encoder loaded successfully")
+        except Exception as e:
+            logger.warning(f"Cross-encoder failed to load: {e}")
+            self._cross_encoder = None
+
+    def component_usage(self) -> dict:
+        """Sub-models the memory manager may unload and reload."""
+        if not getattr(config, "CROSS_ENCODER_MODEL", None):
+            return {}
+        return {
+            "cross_encoder": {
+                "loaded": self._cross_encoder is not None,
+                "last_used": self._cross_encoder_last_used,
+                "wanted": self._cross_encoder_wanted,
+            }
+        }
+
+    def unload_component(self, name: str) -> None:
+        """Drop the cross-encoder; borderline pairs keep their bi-encoder score meanwhile."""
+        if name == "cross_encoder" and self._cross_encoder is not None:
+            self._cross_encoder = None
+            self._cross_encoder_evicted = True
+            self._cross_encoder_wanted = False
+
+    def reload_component(self, name: str) -> None:
+        if name == "cross_encoder" and self._cross_encoder is None:
+            self._load_cross_encoder()
+
+    @staticmethod
+    def _load(model_class, model_name: str, device: str, backend: str, component: str):
+        """
+        Load a SentenceTransformer/CrossEncoder on the requested backend,
+        from the pre-built artifact directory when there is one; returns
+        (model, backend).
+        """
+        source = get_artifact_store().local_dir(component, model_name)
+        if backend in ("onnx", "onnx-int8"):
+            try:
+                # The cross-encoder re-ranks inside embedding calls, on the
+                # embedding partition.
+                model = load_sentence_transformers_onnx(
+                    model_class,
+                    model_name,
+                    is_int8(backend),
+                    device=device,
+                    source=source,
+                    partition="embedding",
+                )
+                return model, backend
+            except Exception as e:
+                logger.warning(f"ONNX backend failed for {model_name} ({e}); using torch")
+                backend = "torch-int8" if is_int8(backend) else "torch"
+
+        model = model_class(source or model_name, device=device)
+        if backend == "torch-int8":
+            if model_class is CrossEncoder:
+                model.model = quantize_dynamic_int8(model.model)
+            else:
+                model = quantize_dynamic_int8(model)
+            logger.info(f"Dynamic int8 quantization applied to {model_name}")
+        return model, backend
+
+    @property
+    def backends(self) -> dict:
+        return {"embedding": self._backend, "cross_encoder": self._cross_encoder_backend}
 
     @staticmethod
     def _is_cuda_oom(error: Exception) -> bool:
@@ -67,12 +157,23 @@ class EmbeddingModel:
             logger.warning(
                 "Embedding GPU memory pressure detected; loading CPU fallback model."
             )
-            self._cpu_model = SentenceTransformer(self._model_name, device="cpu")
+            self._cpu_model = SentenceTransformer(
+                get_artifact_store().local_dir("embedding", self._model_name)
+                or self._model_name,
+                device="cpu",
+            )
             return self._cpu_model
         except Exception as e:
             logger.error(f"Failed to initialize CPU embedding fallback: {e}")
             return None
 
+    def warmup(self, texts: List[str]) -> None:
+        """Encode `texts` and, when loaded, re-rank them against themselves."""
+        self.encode(texts)
+        cross_encoder = self._cross_encoder
+        if cross_encoder is not None:
+            cross_encoder.predict([(text, text) for text in texts])
+
     def encode(self, texts: List[str]) -> np.ndarray:
         """Encode texts into embeddings."""
         try:
@@ -137,18 +238,39 @@ class EmbeddingModel:
         self,
         query_text: str,
         candidate_texts: List[str],
+        query_embedding: Optional[np.ndarray] = None,
+        candidate_embeddings: Optional[np.ndarray] = None,
     ) -> List[float]:
         """
         Compute similarity between query and all candidates.
         Uses bi-encoder for fast initial scoring, then cross-encoder
         re-ranking for borderline cases (scores in the uncertain zone).
+        Precomputed (e.g. cached) embeddings skip the bi-encoder pass.
         Returns list of similarity scores in same order as candidates.
         """
+        return self.scored_similarity(
+            query_text, candidate_texts, query_embedding, candidate_embeddings
+        )[0]
+
+    def scored_similarity(
+        self,
+        query_text: str,
+        candidate_texts: List[str],
+        query_embedding: Optional[np.ndarray] = None,
+        candidate_embeddings: Optional[np.ndarray] = None,
+    ) -> Tuple[List[float], bool]:
+        """
+        batch_similarity plus whether the scores are final: False when
+        borderline candidates kept their bi-encoder score because the
+        cross-encoder was evicted by the memory budget or failed.
+        """
         if not candidate_texts:
-            return []
+            return [], True
 
-        query_embedding = self.encode_single(query_text)
-        candidate_embeddings = self.encode(candidate_texts)
+        if query_embedding is None:
+            query_embedding = self.encode_single(query_text)
+        if candidate_embeddings is None:
+            candidate_embeddings = self.encode(candidate_texts)
 
         bi_scores = cosine_similarity([query_embedding], candidate_embeddings)[0]
         final_scores = [float(s) for s in bi_scores]
@@ -157,16 +279,23 @@ class EmbeddingModel:
         rerank_low = getattr(config, "RERANK_LOW", 0.45)
         rerank_high = getattr(config, "RERANK_HIGH", 0.75)
 
-        if self._cross_encoder is not None:
+        final = True
+        cross_encoder = self._cross_encoder
+        if cross_encoder is None and self._cross_encoder_evicted:
+            if any(rerank_low <= s <= rerank_high for s in final_scores):
+                self._cross_encoder_wanted = True
+                final = False
+        if cross_encoder is not None:
             borderline_indices = [
                 i for i, s in enumerate(final_scores)
                 if rerank_low <= s <= rerank_high
             ]
 
             if borderline_indices:
+                self._cross_encoder_last_used = time.time()
                 pairs = [(query_text, candidate_texts[i]) for i in borderline_indices]
                 try:
-                    cross_scores = self._cross_encoder.predict(pairs)
+                    cross_scores = cross_encoder.predict(pairs)
                     # Cross-encoder outputs logits; normalize to [0, 1]
                     cross_scores = self._sigmoid(cross_scores)
 
@@ -184,8 +313,9 @@ class EmbeddingModel:
                         final_scores[bi_idx] = blended
                 except Exception as e:
                     logger.warning(f"Cross-encoder re-ranking failed: {e}")
+                    final = False
 
-        return final_scores
+        return final_scores, final
 
     @staticmethod
     def _sigmoid(x):
@@ -0,0 +1,207 @@
+"""
+Pre-tokenized zero-shot NLI engine.
+Drop-in replacement for calling a transformers "zero-shot-classification"
+pipeline: same arguments, same {"sequence", "labels", "scores"} output, same
+scoring math. Hypothesis token IDs are cached per (labels, template), each
+premise is tokenized once, and every premise-hypothesis pair of a call is run
+in one dynamically padded forward pass under torch.inference_mode.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceCancelled(RuntimeError):
+    """Raised when a caller withdraws a run through its cancel_event."""
+
+
+class ZeroShotNLIEngine:
+    """
+    Args:
+        model: Sequence-classification NLI model (torch or ORT-wrapped)
+        tokenizer: Matching tokenizer
+        device: Device the model lives on (inputs are moved there)
+        max_pairs_per_forward: Upper bound on pairs per forward pass, to cap
+            activation memory for very large batches
+        hypothesis_cache_size: Number of (labels, template) sets kept tokenized
+    """
+
+    def __init__(
+        self,
+        model,
+        tokenizer,
+        device: Optional[Union[str, torch.device]] = None,
+        max_pairs_per_forward: int = 256,
+        hypothesis_cache_size: int = 64,
+    ):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = torch.device(device) if device is not None else None
+        self._max_pairs = max(1, max_pairs_per_forward)
+        max_length = getattr(tokenizer, "model_max_length", None)
+        # Tokenizers without a configured limit report a huge sentinel value.
+        self._max_length = max_length if max_length and max_length < 100_000 else 512
+        self._pair_special = tokenizer.num_special_tokens_to_add(pair=True)
+        self._use_token_types = "token_type_ids" in getattr(
+            tokenizer, "model_input_names", ()
+        )
+        self._pad_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else 0
+        self._pad_left = getattr(tokenizer, "padding_side", "right") == "left"
+        self._hypotheses: "OrderedDict[Tuple, List[List[int]]]" = OrderedDict()
+        # Shared by every thread the engine runs on (core partition, side
+        # executor, to_thread pool); OrderedDict reordering is not atomic.
+        self._hypotheses_lock = threading.Lock()
+        self._hypothesis_cache_size = hypothesis_cache_size
+        self.entailment_id = self._label_id("entail", default=-1)
+        self.contradiction_id = -1 if self.entailment_id == 0 else 0
+
+    @classmethod
+    def from_pipeline(cls, zero_shot_pipeline, **kwargs) -> "ZeroShotNLIEngine":
+        """Reuse the model/tokenizer an existing pipeline already loaded."""
+        device = getattr(zero_shot_pipeline, "device", None)
+        return cls(zero_shot_pipeline.model, zero_shot_pipeline.tokenizer, device, **kwargs)
+
+    def _label_id(self, prefix: str, default: int) -> int:
+        # Same lookup as ZeroShotClassificationPipeline.entailment_id.
+        label2id = getattr(getattr(self.model, "config", None), "label2id", None) or {}
+        for label, index in label2id.items():
+            if label.lower().startswith(prefix):
+                return int(index)
+        return default
+
+    # ── Tokenization ──────────────────────────────────────────────────────────
+
+    def hypothesis_ids(self, labels: Sequence[str], template: str) -> List[List[int]]:
+        """Token IDs (no special tokens) for each label's hypothesis, cached."""
+        key = (tuple(labels), template)
+        with self._hypotheses_lock:
+            cached = self._hypotheses.get(key)
+            if cached is not None:
+                self._hypotheses.move_to_end(key)
+                return cached
+        # Tokenize outside the lock; two threads missing together both encode
+        # and store the same IDs.
+        encoded = self.tokenizer(
+            [template.format(label) for label in labels],
+            add_special_tokens=False,
+        )["input_ids"]
+        with self._hypotheses_lock:
+            self._hypotheses[key] = encoded
+            self._hypotheses.move_to_end(key)
+            while len(self._hypotheses) > self._hypothesis_cache_size:
+                self._hypotheses.popitem(last=False)
+        return encoded
+
+    def _build_pair(self, premise: List[int], hypothesis: List[int]) -> Tuple[List[int], Optional[List[int]]]:
+        # truncation="only_first": only the premise gives way to max_length.
+        budget = self._max_length - self._pair_special - len(hypothesis)
+        premise = premise[: max(0, budget)]
+        input_ids = self.tokenizer.build_inputs_with_special_tokens(premise, hypothesis)
+        token_types = (
+            self.tokenizer.create_token_type_ids_from_sequences(premise, hypothesis)
+            if self._use_token_types
+            else None
+        )
+        return input_ids, token_types
+
+    def _collate(self, pairs: List[Tuple[List[int], Optional[List[int]]]]) -> Dict[str, torch.Tensor]:
+        width = max(len(ids) for ids, _ in pairs)
+        input_ids, attention, token_types = [], [], []
+        for ids, types in pairs:
+            pad = width - len(ids)
+            if self._pad_left:
+                input_ids.append([self._pad_id] * pad + ids)
+                attention.append([0] * pad + [1] * len(ids))
+                if types is not None:
+                    token_types.append([0] * pad + types)
+            else:
+                input_ids.append(ids + [self._pad_id] * pad)
+                attention.append([1] * len(ids) + [0] * pad)
+                if types is not None:
+                    token_types.append(types + [0] * pad)
+        batch = {
+            "input_ids": torch.tensor(input_ids, dtype=torch.long),
+            "attention_mask": torch.tensor(attention, dtype=torch.long),
+        }
+        if token_types:
+            batch["token_type_ids"] = torch.tensor(token_types, dtype=torch.long)
+        if self.device is not None:
+            batch = {name: tensor.to(self.device) for name, tensor in batch.items()}
+        return batch
+
+    # ── Inference ─────────────────────────────────────────────────────────────
+
+    def pair_logits(
+        self,
+        texts: Sequence[str],
+        hypotheses: List[List[int]],
+        cancel_event: Optional[threading.Event] = None,
+    ) -> np.ndarray:
+        """
+        NLI logits for every (text, hypothesis) pair: shape (texts, hypotheses, classes).
+        A set cancel_event stops the run before its next forward pass.
+        """
+        premises = self.tokenizer(list(texts), add_special_tokens=False)["input_ids"]
+        pairs = [
+            self._build_pair(premise, hypothesis)
+            for premise in premises
+            for hypothesis in hypotheses
+        ]
+        chunks = []
+        with torch.inference_mode():
+            for start in range(0, len(pairs), self._max_pairs):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise InferenceCancelled("NLI run cancelled")
+                outputs = self.model(**self._collate(pairs[start : start + self._max_pairs]))
+                chunks.append(outputs.logits.float().cpu().numpy())
+        logits = np.concatenate(chunks, axis=0)
+        return logits.reshape(len(texts), len(hypotheses), -1)
+
+    def scores_from_logits(self, logits: np.ndarray, multi_label: bool) -> np.ndarray:
+        """Per-label probabilities, exactly as the pipeline's postprocess computes them."""
+        if multi_label or logits.shape[1] == 1:
+            pair = logits[..., [self.contradiction_id, self.entailment_id]]
+            pair = np.exp(pair - pair.max(-1, keepdims=True))
+            return (pair / pair.sum(-1, keepdims=True))[..., 1]
+        entail = logits[..., self.entailment_id]
+        entail = np.exp(entail - entail.max(-1, keepdims=True))
+        return entail / entail.sum(-1, keepdims=True)
+
+    def __call__(
+        self,
+        sequences: Union[str, List[str]],
+        candidate_labels: Sequence[str],
+        hypothesis_template: str = "This example is {}.",
+        multi_label: bool = False,
+        cancel_event: Optional[threading.Event] = None,
+        **_: object,
+    ) -> Union[Dict, List[Dict]]:
+        single = isinstance(sequences, str)
+        texts = [sequences] if single else list(sequences)
+        labels = list(candidate_labels)
+        if not texts:
+            return []
+
+        logits = self.pair_logits(
+            texts, self.hypothesis_ids(labels, hypothesis_template), cancel_event
+        )
+        scores = self.scores_from_logits(logits, multi_label)
+
+        results = []
+        for text, row in zip(texts, scores):
+            order = list(reversed(row.argsort()))
+            results.append(
+                {
+                    "sequence": text,
+                    "labels": [labels[i] for i in order],
+                    "scores": row[order].tolist(),
+                }
+            )
+        return results[0] if single else results
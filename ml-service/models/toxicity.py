@@ -4,12 +4,23 @@ Detects multiple types of toxic content.
 """
 
 import logging
+import os
 import re
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 from detoxify import Detoxify
 
 import config
+from models.artifact_store import get_artifact_store
+from models.cpu_backends import (
+    ORTLogitsAdapter,
+    artifact_dir,
+    is_int8,
+    load_ort_model,
+    quantize_dynamic_int8,
+    resolve_backend,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +28,7 @@ logger = logging.getLogger(__name__)
 class ToxicityDetector:
     _instance = None
     _model = None
+    _backend = "torch"
 
     def __new__(cls, model_type: str = "original"):
         if cls._instance is None:
@@ -30,35 +42,145 @@ class ToxicityDetector:
         """
         if self._model is None:
             dev = config.TOXICITY_DEVICE
-            logger.info(f"Loading toxicity model: {model_type} on {dev}")
-            self._model = Detoxify(model_type, device=dev)
-            logger.info(f"Toxicity model loaded successfully on {dev}")
+            self._backend = resolve_backend(
+                getattr(config, "TOXICITY_BACKEND", "torch"), dev, "toxicity"
+            )
+            logger.info(
+                f"Loading toxicity model: {model_type} on {dev} (backend={self._backend})"
+            )
+            self._model = self._load_artifact(model_type, dev) or Detoxify(
+                model_type, device=dev
+            )
+            if self._backend in ("onnx", "onnx-int8"):
+                self._backend = self._use_onnx(model_type)
+            if self._backend == "torch-int8":
+                self._model.model = quantize_dynamic_int8(self._model.model)
+            logger.info(
+                f"Toxicity model loaded successfully on {dev} (backend={self._backend})"
+            )
+
+    @staticmethod
+    def _load_artifact(model_type: str, device: str) -> Optional[Detoxify]:
+        """
+        Detoxify around the memory-mapped artifact built by
+        scripts/build_model_artifacts.py, skipping the checkpoint download and
+        torch.load. predict() only needs model, tokenizer, class_names, device.
+        """
+        store = get_artifact_store()
+        name = f"detoxify-{model_type}"
+        manifest = store.manifest("toxicity", name)
+        if manifest is None:
+            return None
+        try:
+            from transformers import AutoTokenizer
+
+            detector = Detoxify.__new__(Detoxify)
+            detector.model = store.load_hf_model("toxicity", name).to(device)
+            detector.tokenizer = AutoTokenizer.from_pretrained(store.path("toxicity"))
+            detector.class_names = manifest["class_names"]
+            detector.device = device
+            return detector
+        except Exception as e:
+            logger.warning(f"Toxicity artifact load failed ({e}); using Detoxify checkpoint")
+            return None
+
+    def _use_onnx(self, model_type: str) -> str:
+        """
+        Swap Detoxify's torch module for an ONNX Runtime export of the same
+        checkpoint; Detoxify keeps doing tokenization and the sigmoid.
+        Returns the backend actually in use.
+        """
+        requested = self._backend
+        name = f"detoxify-{model_type}"
+        try:
+            source = artifact_dir(name, "hf")
+            if not os.path.isdir(source):
+                self._model.model.save_pretrained(source)
+                self._model.tokenizer.save_pretrained(source)
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+
+            self._model.model = ORTLogitsAdapter(
+                load_ort_model(
+                    ORTModelForSequenceClassification,
+                    name,
+                    is_int8(requested),
+                    source=source,
+                    partition="toxicity",
+                    provider=getattr(config, "ONNX_EXECUTION_PROVIDER", "CPUExecutionProvider"),
+                )
+            )
+            return requested
+        except Exception as e:
+            fallback = "torch-int8" if is_int8(requested) else "torch"
+            logger.warning(f"ONNX toxicity backend unavailable ({e}); using {fallback}")
+            return fallback
+
+    @property
+    def backend(self) -> str:
+        return self._backend
+
+    @staticmethod
+    def _empty_scores() -> Dict[str, float]:
+        return {
+            "toxicity": 0.0,
+            "severe_toxicity": 0.0,
+            "obscene": 0.0,
+            "threat": 0.0,
+            "insult": 0.0,
+            "identity_attack": 0.0,
+        }
 
     def analyze(self, text: str) -> Dict[str, float]:
         """
         Analyze text for various types of toxicity.
         Returns dict with scores for each toxicity type.
         """
-        if not text:
-            return {
-                "toxicity": 0.0,
-                "severe_toxicity": 0.0,
-                "obscene": 0.0,
-                "threat": 0.0,
-                "insult": 0.0,
-                "identity_attack": 0.0,
-            }
-
-        results = self._model.predict(text)
-        return {k: float(v) for k, v in results.items()}
+        return self.batch_analyze([text])[0]
+
+    def batch_analyze(self, texts: List[str]) -> List[Dict[str, float]]:
+        """
+        Analyze multiple texts with batched Detoxify.predict calls.
+
+        Texts are sorted by length and split into chunks of
+        TOXICITY_PADDING_CHUNK so each forward pass pads to a similar length
+        instead of to the longest text in the whole batch.
+        """
+        results: List[Dict[str, float]] = [self._empty_scores() for _ in texts]
+        order = sorted((i for i, text in enumerate(texts) if text), key=lambda i: len(texts[i]))
+        chunk = max(1, config.TOXICITY_PADDING_CHUNK)
+
+        for start in range(0, len(order), chunk):
+            indices = order[start : start + chunk]
+            predicted = self._model.predict([texts[i] for i in indices])
+            for row, i in enumerate(indices):
+                results[i] = {k: float(v[row]) for k, v in predicted.items()}
+        return results
+
+    def warmup(self, texts: List[str]) -> None:
+        self.batch_analyze(texts)
 
     def is_toxic(self, text: str, threshold: float = 0.5) -> Dict:
         """
         Check if text exceeds toxicity threshold.
         Returns dict with 'is_toxic', 'toxicity_score', and 'details'.
         """
-        scores = self.analyze(text)
-
+        return self.is_toxic_batch([text], threshold)[0]
+
+    def is_toxic_batch(self, texts: List[str], threshold: float = 0.5) -> List[Dict]:
+        """Batched is_toxic: one forward pass per padding chunk, one verdict per text."""
+        dehumanizing = _term_pattern(config.TOXICITY_DEHUMANIZING_TERMS)
+        return [
+            self._judge(text, scores, threshold, dehumanizing)
+            for text, scores in zip(texts, self.batch_analyze(texts))
+        ]
+
+    @staticmethod
+    def _judge(
+        text: str,
+        scores: Dict[str, float],
+        threshold: float,
+        dehumanizing: Optional[re.Pattern],
+    ) -> Dict:
         # Primary toxicity score
         toxicity_score = scores.get("toxicity", 0.0)
 
@@ -75,10 +197,8 @@ class ToxicityDetector:
         # Backstop for dehumanizing group-targeting language that may get
         # moderate toxicity scores but is still harmful in moderation workflows.
         lowered = (text or "").lower()
-        dehumanizing_hits = sum(
-            1
-            for term in config.TOXICITY_DEHUMANIZING_TERMS
-            if re.search(rf"\b{re.escape(term)}\b", lowered)
+        has_dehumanizing = (
+            dehumanizing is not None and dehumanizing.search(lowered) is not None
         )
         has_group_reference = any(
             term in lowered for term in config.TOXICITY_GROUP_REFERENCE_TERMS
@@ -90,7 +210,7 @@ class ToxicityDetector:
                 config.TOXICITY_CONTEXTUAL_MIN_SCORE,
                 threshold * config.TOXICITY_CONTEXTUAL_THRESHOLD_RATIO,
             )
-            and dehumanizing_hits >= 1
+            and has_dehumanizing
             and has_group_reference
         )
 
@@ -109,6 +229,10 @@ class ToxicityDetector:
             "details": scores,
         }
 
-    def batch_analyze(self, texts: list) -> list:
-        """Analyze multiple texts at once."""
-        return [self.analyze(text) for text in texts]
+
+@lru_cache(maxsize=8)
+def _term_pattern(terms: Tuple[str, ...]) -> Optional[re.Pattern]:
+    """One compiled word-boundary alternation for the whole term list."""
+    if not terms:
+        return None
+    return re.compile(r"\b(" + "|".join(re.escape(term) for term in terms) + r")\b")
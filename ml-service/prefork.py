@@ -0,0 +1,297 @@
+"""
+Prefork launcher: load the models once, then fork uvicorn workers.
+
+The master process imports the app, loads every non-lazy local model and
+binds the listening socket; it then forks PREFORK_WORKERS children that each
+run uvicorn on the inherited socket. Model weights are never written after
+load, so the children share the master's pages copy-on-write instead of each
+holding its own copy. Every worker:
+  - gets its own torch thread count (and, on Linux, its own CPU cores),
+  - runs the normal lifespan (cache connection, provider, warmup), and
+  - publishes health/cache snapshots that /health aggregates across workers.
+The master only supervises: crashed workers are re-forked (cheap, the models
+are already in memory) and SIGTERM/SIGINT are forwarded for a graceful stop.
+A worker that keeps dying right after it starts is re-forked with a growing
+delay, and after PREFORK_MAX_RAPID_RESTARTS such failures in a row the master
+stops everything and exits non-zero, so the orchestrator sees the failure
+instead of a fork loop.
+
+Usage:
+    ML_PROVIDER=local PREFORK_WORKERS=4 python prefork.py
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+import config
+
+logger = logging.getLogger("prefork")
+
+
+def cpu_slices(workers: int, threads: int, cpus: List[int]) -> List[List[int]]:
+    """
+    Split `cpus` into one contiguous slice of `threads` cores per worker
+    (0 = an equal share). Slices wrap around when workers * threads
+    oversubscribes the machine.
+    """
+    if not cpus:
+        return [[] for _ in range(workers)]
+    threads = threads or max(1, len(cpus) // max(1, workers))
+    return [
+        [cpus[(worker * threads + i) % len(cpus)] for i in range(threads)]
+        for worker in range(workers)
+    ]
+
+
+class RestartPolicy:
+    """
+    Delay before re-forking a worker that exited. An exit within
+    `rapid_seconds` of its start is a rapid failure; consecutive ones double
+    the delay from `backoff` up to `max_backoff`, and one more than
+    `max_rapid` means the failure is deterministic (delay() returns None).
+    A worker that ran longer is re-forked at once and its count starts over.
+    """
+
+    def __init__(
+        self, backoff: float, max_backoff: float, max_rapid: int, rapid_seconds: float
+    ):
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_rapid = max_rapid
+        self.rapid_seconds = rapid_seconds
+        self.rapid: Dict[int, int] = {}
+
+    def delay(self, index: int, uptime: float) -> Optional[float]:
+        if uptime >= self.rapid_seconds:
+            self.rapid[index] = 0
+            return 0.0
+        failures = self.rapid.get(index, 0) + 1
+        self.rapid[index] = failures
+        if failures > self.max_rapid:
+            return None
+        return min(self.max_backoff, self.backoff * 2 ** (failures - 1))
+
+
+def _bind() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((config.HOST, config.PORT))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def config_error() -> Optional[str]:
+    """Why this configuration cannot be preforked, or None."""
+    devices = {
+        config.DEVICE,
+        config.CLASSIFIER_DEVICE,
+        config.EMBEDDING_DEVICE,
+        config.TOXICITY_DEVICE,
+        config.CROSS_ENCODER_DEVICE,
+    }
+    if devices != {"cpu"}:
+        # The master would initialise CUDA before forking, and a CUDA context
+        # does not survive fork(): every child would fail on its first call.
+        return (
+            "prefork.py only supports CPU inference (DEVICE and every *_DEVICE must "
+            "be 'cpu'); run one uvicorn process per GPU instead"
+        )
+    if config.INFERENCE_PROCESS_WORKERS > 0:
+        # Each worker's lifespan would spawn its own model processes, so the
+        # weights loaded here would not be the ones serving requests.
+        return (
+            "prefork.py and INFERENCE_PROCESS_WORKERS > 0 cannot be combined; "
+            "set INFERENCE_PROCESS_WORKERS=0 or run uvicorn main:app"
+        )
+    return None
+
+
+def _load_models(worker_threads: int) -> None:
+    """Load the models in the master, without starting torch's thread pools."""
+    import main
+    from inference.core_scheduler import (
+        PARTITIONED_MODELS,
+        apportion,
+        initial_weights,
+        parse_split,
+    )
+    from models.cpu_backends import set_ort_threads
+
+    if config.ML_PROVIDER != "local":
+        logger.info("ML_PROVIDER is not local; nothing to share, workers start empty")
+        return
+    try:
+        import torch
+
+        # Forking after OpenMP worker threads exist can deadlock the children;
+        # a single-threaded master never starts them.
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+    if config.MODEL_CORE_SCHEDULER_ENABLED:
+        # Size ONNX Runtime sessions to one worker's partitions: they are
+        # created here and fixed for the children's lifetime.
+        weights = initial_weights(PARTITIONED_MODELS, parse_split(config.MODEL_CORE_SPLIT))
+        set_ort_threads(apportion(worker_threads, weights))
+    main.register_local_models()
+    asyncio.run(main.model_manager.load_eager(parallel=config.MODEL_PARALLEL_LOAD))
+    logger.info(f"Master loaded models: {main.model_manager.stats['models']}")
+
+
+def _worker_threads(cores: List[int]) -> int:
+    return len(cores) or config.PREFORK_THREADS_PER_WORKER or 1
+
+
+def _run_worker(index: int, sock: socket.socket, cores: List[int]) -> None:
+    """Child process body; never returns."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    os.environ["ML_PREFORK_WORKER"] = str(index)
+    threads = _worker_threads(cores)
+    if cores and config.PREFORK_PIN_CPUS and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    import uvicorn
+
+    import main
+
+    main.PREFORK_WORKER = str(index)
+    server = uvicorn.Server(
+        uvicorn.Config(main.app, host=config.HOST, port=config.PORT, log_level="info")
+    )
+    code = 0
+    try:
+        server.run(sockets=[sock])
+    except Exception:
+        logger.exception(f"Worker {index} crashed")
+        code = 1
+    os._exit(code)
+
+
+def _fork_worker(index: int, sock: socket.socket, cores: List[int]) -> int:
+    pid = os.fork()
+    if pid == 0:
+        _run_worker(index, sock, cores)
+    logger.info(f"Worker {index} started (pid={pid}, cores={cores or 'any'})")
+    return pid
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    if not hasattr(os, "fork"):
+        sys.exit("prefork.py needs os.fork(); run uvicorn main:app on this platform")
+    error = config_error()
+    if error:
+        sys.exit(error)
+
+    workers = max(1, config.PREFORK_WORKERS)
+    available = (
+        sorted(os.sched_getaffinity(0))
+        if hasattr(os, "sched_getaffinity")
+        else list(range(os.cpu_count() or 1))
+    )
+    slices = cpu_slices(workers, config.PREFORK_THREADS_PER_WORKER, available)
+
+    _load_models(_worker_threads(slices[0]))
+    sock = _bind()
+    # Keep the loaded objects out of future collections: a GC pass in a child
+    # would touch (and so copy) every page holding a tracked object.
+    gc.collect()
+    gc.freeze()
+
+    children: Dict[int, int] = {}
+    started: Dict[int, float] = {}
+    # index -> monotonic time its re-fork is due
+    pending: Dict[int, float] = {}
+    policy = RestartPolicy(
+        config.PREFORK_RESTART_BACKOFF_SECONDS,
+        config.PREFORK_RESTART_BACKOFF_MAX_SECONDS,
+        config.PREFORK_MAX_RAPID_RESTARTS,
+        config.PREFORK_RAPID_EXIT_SECONDS,
+    )
+
+    def _spawn(index: int) -> None:
+        children[_fork_worker(index, sock, slices[index])] = index
+        started[index] = time.monotonic()
+
+    for index in range(workers):
+        _spawn(index)
+
+    stopping = False
+    failure: Optional[str] = None
+
+    def _stop(signum, _frame):
+        nonlocal stopping
+        stopping = True
+        pending.clear()
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    while children or pending:
+        now = time.monotonic()
+        for index, due in list(pending.items()):
+            if due <= now:
+                del pending[index]
+                _spawn(index)
+        try:
+            if pending:
+                # Poll so a delayed re-fork is not stuck behind os.wait().
+                pid, status = os.waitpid(-1, os.WNOHANG)
+                if pid == 0:
+                    time.sleep(min(0.5, max(0.0, min(pending.values()) - time.monotonic())))
+                    continue
+            else:
+                pid, status = os.wait()
+        except ChildProcessError:
+            if pending:
+                time.sleep(max(0.0, min(pending.values()) - time.monotonic()))
+                continue
+            break
+        except InterruptedError:
+            continue
+        index: Optional[int] = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        delay = policy.delay(index, time.monotonic() - started[index])
+        if delay is None:
+            failure = (
+                f"Worker {index} exited within {config.PREFORK_RAPID_EXIT_SECONDS:g}s of "
+                f"starting {policy.rapid[index]} times in a row (last status {status}); "
+                "stopping the service"
+            )
+            logger.error(failure)
+            _stop(None, None)
+            continue
+        logger.warning(
+            f"Worker {index} (pid={pid}) exited with status {status}; re-forking in {delay:g}s"
+        )
+        pending[index] = time.monotonic() + delay
+
+    sock.close()
+    if failure is not None:
+        sys.exit(failure)
+    logger.info("All workers stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 Provider factory. Import get_provider() in main.py lifespan.
 """
 from providers.base import BaseProvider
+from providers.cached import CachedProvider
 from providers.gemini import GeminiProvider
 
 import config
@@ -12,18 +13,22 @@ def get_provider(
     embedding_model=None,
     toxicity_model=None,
     risk_scorer=None,
+    embedding_store=None,
+    core_scheduler=None,
 ) -> BaseProvider:
     """
     Return the active provider based on ML_PROVIDER config.
     For ML_PROVIDER=local, pass the loaded model instances.
     For ML_PROVIDER=gemini, model instances are not used.
+    embedding_store, when given, caches embeddings for either provider.
+    core_scheduler, when given, runs each local model on its own CPU cores.
     """
     if config.ML_PROVIDER == "gemini":
         if not config.GEMINI_API_KEY:
             raise RuntimeError(
                 "ML_PROVIDER=gemini but GEMINI_API_KEY is not set in .env"
             )
-        return GeminiProvider()
+        return GeminiProvider(embedding_store=embedding_store)
 
     from providers.local import LocalProvider
 
@@ -32,7 +37,9 @@ def get_provider(
         embedding_model=embedding_model,
         toxicity_model=toxicity_model,
         risk_scorer=risk_scorer,
+        embedding_store=embedding_store,
+        core_scheduler=core_scheduler,
     )
 
 
-__all__ = ["BaseProvider", "GeminiProvider", "get_provider"]
+__all__ = ["BaseProvider", "CachedProvider", "GeminiProvider", "get_provider"]
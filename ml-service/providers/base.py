@@ -4,11 +4,108 @@ All methods mirror the existing endpoint contract exactly.
 Adding a new provider = subclass this and implement all methods.
 """
 
+import logging
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from inference.stage_graph import Stage, run_stages
+
+logger = logging.getLogger(__name__)
+
+# Fields full_analyze can be asked for; the last four only an LLM produces.
+ANALYZE_COMPONENTS = (
+    "classification",
+    "toxicity",
+    "risk",
+    "summary",
+    "entities",
+    "spam_flag",
+    "dispatch_suggestion",
+)
+
+
+def components_to_run(
+    components: Optional[Iterable[str]], category: Optional[str] = None
+) -> Set[str]:
+    """
+    Model components a partial analysis has to run: the requested ones plus
+    risk's inputs (toxicity always, classification unless the caller already
+    knows the category). None requests everything.
+    """
+    wanted = set(ANALYZE_COMPONENTS if components is None else components)
+    run = wanted & {"classification", "toxicity", "risk"}
+    if "risk" in run:
+        run.add("toxicity")
+        if not category:
+            run.add("classification")
+    return run
+
+
+MODEL_COMPONENTS = ("classification", "toxicity", "risk")
+
+
+def _field(result: Any, name: str) -> Any:
+    """`name` of a stage result, whether a provider dict or a response model."""
+    if result is None:
+        return None
+    return result.get(name) if isinstance(result, dict) else getattr(result, name, None)
+
+
+def component_stages(
+    classify: Callable[[], Awaitable],
+    detect_toxicity: Callable[[], Awaitable],
+    compute_risk: Callable[[Optional[str], float], Awaitable],
+    components: Optional[Iterable[str]],
+    category: Optional[str] = None,
+) -> List[Stage]:
+    """
+    Stage graph of a composed analysis: classification and toxicity side by
+    side, then risk from the predicted category (else `category`) and the
+    toxicity score. Only the stages the requested components need are built.
+
+    Args:
+        classify: Runs the classification stage.
+        detect_toxicity: Runs the toxicity stage.
+        compute_risk: Runs the risk stage given (category, toxicity_score).
+        components: Requested components; None requests everything.
+        category: Category the caller already knows, if any.
+    """
+    run = components_to_run(components, category)
+    stages = []
+    if "classification" in run:
+        stages.append(Stage("classification", lambda _: classify()))
+    if "toxicity" in run:
+        stages.append(Stage("toxicity", lambda _: detect_toxicity()))
+    if "risk" in run:
+
+        async def risk(done: Dict) -> Any:
+            return await compute_risk(
+                _field(done.get("classification"), "predicted_category") or category,
+                _field(done.get("toxicity"), "toxicity_score") or 0.0,
+            )
+
+        stages.append(Stage("risk", risk, requires=[stage.name for stage in stages]))
+    return stages
+
+
+def requested_results(values: Dict[str, Any], components: Optional[Iterable[str]]) -> Dict:
+    """
+    Model-component results the caller asked for, dropping stages that ran
+    only as inputs to risk. None requests everything.
+    """
+    wanted = set(ANALYZE_COMPONENTS if components is None else components)
+    return {
+        name: values.get(name)
+        for name in MODEL_COMPONENTS
+        if name in wanted and name in values
+    }
 
 
 class BaseProvider(ABC):
+    # True when full_analyze is one model call (Gemini) rather than a
+    # composition of classify / detect_toxicity / compute_risk.
+    single_call_analysis = False
+
     @abstractmethod
     async def classify(self, text: str, categories: List[str]) -> Dict:
         """
@@ -49,6 +146,10 @@ class BaseProvider(ABC):
     async def embed(self, text: str) -> List[float]:
         """Returns a float list (embedding vector)."""
 
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embeddings aligned with texts; providers override this with one batched call."""
+        return [await self.embed(text) for text in texts]
+
     @abstractmethod
     async def batch_similarity(
         self, query_text: str, candidate_texts: List[str]
@@ -58,6 +159,16 @@ class BaseProvider(ABC):
         Each score is a float in [0, 1].
         """
 
+    async def scored_similarity(
+        self, query_text: str, candidate_texts: List[str]
+    ) -> Tuple[List[float], bool]:
+        """
+        batch_similarity plus whether the scores are final. False means a
+        degraded path produced them (e.g. a re-ranker unloaded by the memory
+        budget), so they must not be cached.
+        """
+        return await self.batch_similarity(query_text, candidate_texts), True
+
     @abstractmethod
     async def pairwise_compare(
         self,
@@ -90,10 +201,13 @@ class BaseProvider(ABC):
         severity: Optional[str],
         duplicate_count: int,
         categories: List[str],
+        components: Optional[List[str]] = None,
     ) -> Dict:
         """
         Combined analysis returning all fields at once.
-        Local provider runs serial inference; Gemini provider uses a single API call.
+        Local provider composes the component models; Gemini provider uses a single API call.
+        `components` (a subset of ANALYZE_COMPONENTS, None = all) limits the
+        work to what is requested; fields not requested are None.
 
         Returns a dict that maps to FullAnalysisResponse fields:
             classification, toxicity, risk  — same shapes as individual endpoints
@@ -142,9 +256,73 @@ class BaseProvider(ABC):
             Structured media judgment dict, or None when unsupported.
         """
 
+    def batching_stats(self) -> Dict:
+        """
+        Micro-batcher metrics keyed by component ("classify", ...).
+        Components listed here queue in their batcher instead of taking the
+        endpoint concurrency semaphore. Empty when nothing is batched.
+        """
+        return {}
+
+    async def warmup(self) -> None:
+        """
+        Run representative inputs through the loaded models before traffic.
+        Called once in the background after startup; providers with nothing
+        to warm keep this no-op.
+        """
+
+    def warmup_stats(self) -> Dict:
+        """Warmup state and per-model timings for /health. Empty when not applicable."""
+        return {}
+
     @abstractmethod
     async def is_ready(self) -> bool:
         """
         Lightweight readiness probe called by /health.
         Must not load models; must not make inference calls.
         """
+
+
+async def analyze_components(
+    provider: BaseProvider,
+    text: str,
+    category: Optional[str],
+    severity: Optional[str],
+    duplicate_count: int,
+    categories: List[str],
+    components: Optional[List[str]] = None,
+) -> Dict:
+    """
+    full_analyze from the provider's own component methods: classification
+    and toxicity run concurrently; risk follows, using the predicted category
+    and the toxicity score. Only the models the requested components need
+    run. LLM-only fields are None.
+    """
+    result: Dict = {
+        "classification": None,
+        "toxicity": None,
+        "risk": None,
+        "summary": None,
+        "entities": None,
+        "spam_flag": None,
+        "dispatch_suggestion": None,
+    }
+
+    stages = component_stages(
+        lambda: provider.classify(text, categories),
+        lambda: provider.detect_toxicity(text),
+        lambda risk_category, toxicity_score: provider.compute_risk(
+            text=text,
+            category=risk_category,
+            severity=severity,
+            duplicate_count=duplicate_count,
+            toxicity_score=toxicity_score,
+        ),
+        components,
+        category,
+    )
+    results = await run_stages(stages)
+    for name, error in results.errors.items():
+        logger.warning(f"{type(provider).__name__}.full_analyze {name} failed: {error}")
+    result.update(requested_results(results.values, components))
+    return result
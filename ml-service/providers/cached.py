@@ -0,0 +1,354 @@
+"""
+CachedProvider — per-component result cache in front of the active provider.
+
+Every endpoint reaches the models through the provider, so caching here lets
+/classify, /toxicity, /risk, /similarity, their batch forms and /analyze
+share results: a report classified through /classify is not classified again
+by /analyze, and a repeated /analyze is answered component by component.
+
+Entries live under the existing prefixes ("classify", "toxicity", "risk",
+"similarity"), so TTLs and model-update invalidation apply unchanged. Keys
+carry the inputs, the provider, the prompt version (config.PROMPT_VERSION_*)
+and the model version that produced the result, so a prompt or model change
+never serves an old answer. Embeddings are already cached per text by the
+provider's EmbeddingStore and pass straight through.
+
+Gemini answers full_analyze with one LLM call whose parts were not produced
+by the single-purpose prompts, so that result is cached whole under
+"analyze"; the local provider's full_analyze is composed from the cached
+components.
+
+Only misses reach the wrapped provider, inside `reserve(*models)` (the
+per-model pools, or the Gemini API semaphore), so a hit never queues behind
+a busy model.
+"""
+
+import json
+from contextlib import nullcontext
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import config
+from providers.base import ANALYZE_COMPONENTS, BaseProvider, analyze_components
+
+# component -> (cache prefix, prompt version setting)
+_COMPONENTS = {
+    "classifier": ("classify", "PROMPT_VERSION_CLASSIFY"),
+    "toxicity": ("toxicity", "PROMPT_VERSION_TOXICITY"),
+    "risk": ("risk", "PROMPT_VERSION_RISK"),
+    "embedding": ("similarity", None),
+    "analyze": ("analyze", "PROMPT_VERSION_ANALYZE"),
+}
+
+
+def component_version(provider: str, component: str) -> str:
+    """Version of the model behind `component`, as baked into its cache keys."""
+    if provider == "gemini":
+        if component == "embedding":
+            return config.GEMINI_EMBEDDING_MODEL
+        return config.GEMINI_CHAT_MODEL
+    info = dict(config.MODEL_VERSION_MAP.get(component, {}))
+    if component == "classifier":
+        # The cascade's fast model answers part of the traffic.
+        info["fast"] = config.MODEL_VERSION_MAP.get("classifier_fast")
+    return json.dumps(info, sort_keys=True, default=str)
+
+
+def categories_key(categories: List[str]) -> str:
+    return ",".join(sorted(categories))
+
+
+def components_key(components: Optional[List[str]]) -> Optional[str]:
+    """Canonical form of a full_analyze components subset (None = everything)."""
+    requested = set(ANALYZE_COMPONENTS if components is None else components)
+    if requested >= set(ANALYZE_COMPONENTS):
+        return None
+    return ",".join(sorted(requested & set(ANALYZE_COMPONENTS)))
+
+
+def _risk_inputs(
+    category: Optional[str], severity: Optional[str], duplicate_count: int, toxicity_score: float
+) -> Dict[str, Any]:
+    return {
+        "category": category,
+        "severity": severity,
+        "duplicate_count": duplicate_count,
+        "toxicity_score": round(toxicity_score, 4),
+    }
+
+
+def _analyze_inputs(
+    category: Optional[str],
+    severity: Optional[str],
+    duplicate_count: int,
+    categories: List[str],
+    components: Optional[List[str]],
+) -> Dict[str, Any]:
+    return {
+        "category": category,
+        "severity": severity,
+        "duplicate_count": duplicate_count,
+        "cats": categories_key(categories),
+        "components": components_key(components),
+    }
+
+
+def _no_reservation(*models: str) -> AsyncContextManager:
+    return nullcontext()
+
+
+class CachedProvider(BaseProvider):
+    """
+    Args:
+        inner: The provider that runs the models.
+        cache: Async cache (get/set/get_many) shared with the rest of the service.
+        reserve: reserve(*models) -> async context manager held around every
+            call into `inner` on a miss. Defaults to no limit.
+        provider: Provider name baked into keys; defaults to config.ML_PROVIDER.
+    """
+
+    def __init__(
+        self,
+        inner: BaseProvider,
+        cache,
+        reserve: Optional[Callable[..., AsyncContextManager]] = None,
+        provider: Optional[str] = None,
+    ):
+        self.inner = inner
+        self._cache = cache
+        self._reserve = reserve or _no_reservation
+        self._provider = provider or config.ML_PROVIDER
+
+    @property
+    def single_call_analysis(self) -> bool:
+        return self.inner.single_call_analysis
+
+    def __getattr__(self, name: str) -> Any:
+        # Provider-specific extras (e.g. Gemini's generate_area_insights).
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    # ── Keys ──────────────────────────────────────────────────────────────────
+
+    def key_args(self, component: str, **inputs) -> Dict[str, Any]:
+        """Cache key arguments for `component` given its non-text inputs."""
+        prompt_setting = _COMPONENTS[component][1]
+        return {
+            **inputs,
+            "provider": self._provider,
+            "pv": getattr(config, prompt_setting) if prompt_setting else None,
+            "mv": component_version(self._provider, component),
+        }
+
+    async def _cached(
+        self,
+        component: str,
+        text: str,
+        compute: Callable[[], Awaitable[Any]],
+        models: tuple,
+        **inputs,
+    ) -> Any:
+        prefix = _COMPONENTS[component][0]
+        key_args = self.key_args(component, **inputs)
+        cached = await self._cache.get(prefix, text, **key_args)
+        if cached is not None:
+            return cached
+
+        async with self._reserve(*models):
+            result = await compute()
+        if result is not None:
+            await self._cache.set(prefix, text, result, **key_args)
+        return result
+
+    async def _cached_many(
+        self, component: str, texts: List[str], inputs: List[Dict[str, Any]]
+    ) -> List[Optional[Any]]:
+        """Cached results for (text, inputs) pairs: one get_many per distinct inputs."""
+        groups: Dict[tuple, List[int]] = {}
+        for index, args in enumerate(inputs):
+            groups.setdefault(tuple(sorted(args.items())), []).append(index)
+        results: List[Optional[Any]] = [None] * len(texts)
+        for args, indices in groups.items():
+            values = await self._cache.get_many(
+                _COMPONENTS[component][0],
+                [texts[i] for i in indices],
+                **self.key_args(component, **dict(args)),
+            )
+            for index, value in zip(indices, values):
+                results[index] = value
+        return results
+
+    # ── Cached components ─────────────────────────────────────────────────────
+
+    async def classify(self, text: str, categories: List[str]) -> Dict:
+        return await self._cached(
+            "classifier",
+            text,
+            lambda: self.inner.classify(text, categories),
+            ("classifier",),
+            cats=categories_key(categories),
+        )
+
+    async def cached_classifications(
+        self, texts: List[str], categories: List[str]
+    ) -> List[Optional[Dict]]:
+        """Cached classify results for many texts in one round trip (None = miss)."""
+        key_args = self.key_args("classifier", cats=categories_key(categories))
+        return await self._cache.get_many("classify", texts, **key_args)
+
+    async def detect_toxicity(self, text: str) -> Dict:
+        return await self._cached(
+            "toxicity", text, lambda: self.inner.detect_toxicity(text), ("toxicity",)
+        )
+
+    async def cached_toxicity(self, texts: List[str]) -> List[Optional[Dict]]:
+        """Cached detect_toxicity results for many texts in one round trip (None = miss)."""
+        return await self._cache.get_many("toxicity", texts, **self.key_args("toxicity"))
+
+    async def compute_risk(
+        self,
+        text: str,
+        category: Optional[str],
+        severity: Optional[str],
+        duplicate_count: int,
+        toxicity_score: float,
+    ) -> Dict:
+        return await self._cached(
+            "risk",
+            text,
+            lambda: self.inner.compute_risk(
+                text=text,
+                category=category,
+                severity=severity,
+                duplicate_count=duplicate_count,
+                toxicity_score=toxicity_score,
+            ),
+            ("risk",),
+            **_risk_inputs(category, severity, duplicate_count, toxicity_score),
+        )
+
+    async def cached_risks(self, calls: List[Dict[str, Any]]) -> List[Optional[Dict]]:
+        """
+        Cached compute_risk results for many calls (dicts of its keyword
+        arguments); None = miss. One round trip per distinct non-text inputs.
+        """
+        return await self._cached_many(
+            "risk",
+            [call["text"] for call in calls],
+            [
+                _risk_inputs(
+                    call["category"],
+                    call["severity"],
+                    call["duplicate_count"],
+                    call["toxicity_score"],
+                )
+                for call in calls
+            ],
+        )
+
+    async def batch_similarity(
+        self, query_text: str, candidate_texts: List[str]
+    ) -> List[float]:
+        return (await self.scored_similarity(query_text, candidate_texts))[0]
+
+    async def scored_similarity(
+        self, query_text: str, candidate_texts: List[str]
+    ) -> Tuple[List[float], bool]:
+        # Scores computed while the re-ranker was unavailable are served but
+        # not cached, so they do not outlive its reload.
+        key_args = self.key_args("embedding", candidates=json.dumps(candidate_texts))
+        cached = await self._cache.get("similarity", query_text, **key_args)
+        if cached is not None:
+            return cached, True
+        async with self._reserve("embedding"):
+            scores, final = await self.inner.scored_similarity(query_text, candidate_texts)
+        if final:
+            await self._cache.set("similarity", query_text, scores, **key_args)
+        return scores, final
+
+    async def full_analyze(
+        self,
+        text: str,
+        category: Optional[str],
+        severity: Optional[str],
+        duplicate_count: int,
+        categories: List[str],
+        components: Optional[List[str]] = None,
+    ) -> Dict:
+        if not self.single_call_analysis:
+            return await analyze_components(
+                self, text, category, severity, duplicate_count, categories, components
+            )
+        return await self._cached(
+            "analyze",
+            text,
+            lambda: self.inner.full_analyze(
+                text=text,
+                category=category,
+                severity=severity,
+                duplicate_count=duplicate_count,
+                categories=categories,
+                components=components,
+            ),
+            (),
+            **_analyze_inputs(category, severity, duplicate_count, categories, components),
+        )
+
+    async def cached_analyses(self, calls: List[Dict[str, Any]]) -> List[Optional[Dict]]:
+        """
+        Cached single-call full_analyze results for many calls (dicts of its
+        keyword arguments); None = miss, and always None for a composed
+        full_analyze, whose parts are cached per component instead.
+        """
+        if not self.single_call_analysis:
+            return [None] * len(calls)
+        return await self._cached_many(
+            "analyze",
+            [call["text"] for call in calls],
+            [
+                _analyze_inputs(
+                    call["category"],
+                    call["severity"],
+                    call["duplicate_count"],
+                    call["categories"],
+                    call["components"],
+                )
+                for call in calls
+            ],
+        )
+
+    # ── Pass-through ──────────────────────────────────────────────────────────
+
+    async def embed(self, text: str) -> List[float]:
+        return await self.inner.embed(text)
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        return await self.inner.embed_many(texts)
+
+    async def pairwise_compare(
+        self, base_text: str, candidate_text: str, **kwargs
+    ) -> Optional[Dict]:
+        return await self.inner.pairwise_compare(base_text, candidate_text, **kwargs)
+
+    async def generate_insights(self, stats: Dict) -> Optional[Dict]:
+        return await self.inner.generate_insights(stats)
+
+    async def synthesize_constellation(self, prompt: str) -> Optional[Dict]:
+        return await self.inner.synthesize_constellation(prompt)
+
+    async def analyze_report_media(
+        self, metadata: Dict, media_files: List[Dict]
+    ) -> Optional[Dict]:
+        return await self.inner.analyze_report_media(metadata, media_files)
+
+    def batching_stats(self) -> Dict:
+        return self.inner.batching_stats()
+
+    async def warmup(self) -> None:
+        await self.inner.warmup()
+
+    def warmup_stats(self) -> Dict:
+        return self.inner.warmup_stats()
+
+    async def is_ready(self) -> bool:
+        return await self.inner.is_ready()
@@ -17,7 +17,7 @@ from google import genai
 from google.genai import types
 
 import config
-from providers.base import BaseProvider
+from providers.base import ANALYZE_COMPONENTS, BaseProvider
 from utils.pii_redactor import redact
 
 logger = logging.getLogger(__name__)
@@ -231,17 +231,24 @@ is_high_risk is true when risk_score >= 0.50.
 is_critical is true when risk_score >= 0.80.
 """
 
-_ANALYZE_SYSTEM = """\
+_ANALYZE_INTRO = """\
 You are a combined incident analysis system for a public safety platform.
 Perform full analysis of the incident report and return a single structured JSON result.
 
 Respond with ONLY a JSON object in this exact format — no extra text:
 {
+"""
+
+# Response schema per full_analyze component; a partial analysis asks only
+# for the requested ones, which shortens both the prompt and the output.
+_ANALYZE_FIELDS = {
+    "classification": """\
   "classification": {
     "predicted_category": "<category>",
     "confidence": <float 0-1>,
     "all_scores": {"<category>": <float>}
-  },
+  }""",
+    "toxicity": """\
   "toxicity": {
     "is_toxic": <bool>,
     "toxicity_score": <float 0-1>,
@@ -253,7 +260,8 @@ Respond with ONLY a JSON object in this exact format — no extra text:
       "threat": <float>,
       "identity_attack": <float>
     }
-  },
+  }""",
+    "risk": """\
   "risk": {
     "risk_score": <float 0-1>,
     "is_high_risk": <bool>,
@@ -264,17 +272,21 @@ Respond with ONLY a JSON object in this exact format — no extra text:
       "keyword_score": <float>,
       "urgency_score": <float>
     }
-  },
-  "summary": "<one concise sentence describing the incident>",
-  "spam_flag": <bool>,
-  "dispatch_suggestion": "<brief dispatch recommendation, or null if not applicable>",
+  }""",
+    "summary": '  "summary": "<one concise sentence describing the incident>"',
+    "spam_flag": '  "spam_flag": <bool>',
+    "dispatch_suggestion": (
+        '  "dispatch_suggestion": "<brief dispatch recommendation, or null if not applicable>"'
+    ),
+    "entities": """\
   "entities": {
     "weapon_type": "<string or null>",
     "vehicle_description": "<string or null>",
     "suspect_description": "<string or null>"
-  }
+  }""",
 }
 
+_ANALYZE_RISK_NOTES = """\
 Risk score calibration — use these anchors:
   0.05–0.18  Routine (noise, minor vandalism, non-violent petty theft)
   0.20–0.38  Low-moderate (suspicious activity, property damage, fender-bender)
@@ -287,9 +299,21 @@ Default to the LOWER end of the matching band. Only escalate when the text expli
 confirms ongoing danger, active violence, or life-threatening harm. Vague reports \
 without concrete danger indicators should score 0.05–0.35.
 is_high_risk is true when risk_score >= 0.50. is_critical is true when risk_score >= 0.80.
+"""
+
+_ANALYZE_SPAM_NOTES = """\
 spam_flag is true if the report appears fake, a test submission, or coordinated noise.
 """
 
+
+def _analyze_system(components) -> str:
+    """The /analyze system prompt restricted to `components` (in schema order)."""
+    fields = ",\n".join(body for name, body in _ANALYZE_FIELDS.items() if name in components)
+    notes = (_ANALYZE_RISK_NOTES if "risk" in components else "") + (
+        _ANALYZE_SPAM_NOTES if "spam_flag" in components else ""
+    )
+    return _ANALYZE_INTRO + fields + "\n}\n" + ("\n" + notes if notes else "")
+
 _DEDUP_COMPARE_SYSTEM = """\
 You are a duplicate-incident detection system for a public safety platform.
 You will receive two citizen-submitted incident reports and must decide whether
@@ -551,12 +575,15 @@ def _redact_report_metadata(metadata: Dict) -> Dict:
 
 
 class GeminiProvider(BaseProvider):
-    def __init__(self):
+    single_call_analysis = True
+
+    def __init__(self, embedding_store=None):
         if not config.GEMINI_API_KEY:
             raise RuntimeError(
                 "GEMINI_API_KEY is not set. Cannot use ML_PROVIDER=gemini."
             )
         self._client = genai.Client(api_key=config.GEMINI_API_KEY)
+        self._embedding_store = embedding_store
         self._gen_config = types.GenerateContentConfig(
             response_mime_type="application/json",
             temperature=0.0,  # deterministic output
@@ -675,7 +702,30 @@ class GeminiProvider(BaseProvider):
             },
         }
 
+    async def _embed_chunk(self, texts: List[str]) -> List[List[float]]:
+        """Embed up to GEMINI_EMBEDDING_MAX_BATCH texts in one API call (redacted)."""
+        result = await asyncio.wait_for(
+            asyncio.to_thread(
+                self._client.models.embed_content,
+                model=config.GEMINI_EMBEDDING_MODEL,
+                contents=[redact(t) for t in texts],
+            ),
+            timeout=config.GEMINI_TIMEOUT_SECONDS,
+        )
+        return [list(e.values) for e in result.embeddings]
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts: one API call per GEMINI_EMBEDDING_MAX_BATCH, concurrently."""
+        size = config.GEMINI_EMBEDDING_MAX_BATCH
+        chunks = await asyncio.gather(
+            *(self._embed_chunk(texts[i : i + size]) for i in range(0, len(texts), size))
+        )
+        return [vector for chunk in chunks for vector in chunk]
+
     async def embed(self, text: str) -> List[float]:
+        if self._embedding_store is not None:
+            vectors = await self._embedding_store.resolve([text], self._embed_batch)
+            return vectors[0].tolist()
         safe = redact(text)
         result = await asyncio.wait_for(
             asyncio.to_thread(
@@ -687,11 +737,23 @@ class GeminiProvider(BaseProvider):
         )
         return list(result.embeddings[0].values)
 
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        if self._embedding_store is not None:
+            return (await self._embedding_store.resolve(texts, self._embed_batch)).tolist()
+        return await self._embed_batch(texts)
+
     async def batch_similarity(
         self, query_text: str, candidate_texts: List[str]
     ) -> List[float]:
         if not candidate_texts:
             return []
+        if self._embedding_store is not None:
+            vectors = await self._embedding_store.resolve(
+                [query_text] + candidate_texts, self._embed_batch
+            )
+            return _cosine_similarity_batch(vectors[0], vectors[1:])
         safe_query = redact(query_text)
         safe_candidates = [redact(t) for t in candidate_texts]
 
@@ -728,23 +790,30 @@ class GeminiProvider(BaseProvider):
         severity: Optional[str],
         duplicate_count: int,
         categories: List[str],
+        components: Optional[List[str]] = None,
     ) -> Dict:
         """
         Single Gemini API call that returns all analysis fields at once.
         This is the primary advantage of the Gemini provider over local.
+        A components subset gets a prompt and response schema with only those
+        fields, and no call at all when none is requested.
         """
-        safe = redact(text)
-        context = (
-            f"Available categories: {', '.join(categories)}\n"
-            f"Severity hint (if known): {severity or 'unknown'}\n"
-            f"Duplicate report count: {duplicate_count}\n\n"
-            f"Incident report: {safe}"
-        )
-        result = await self._call(self._build_prompt(_ANALYZE_SYSTEM, context))
+        wanted = set(ANALYZE_COMPONENTS if components is None else components)
+        result: Dict = {}
+        if wanted & set(ANALYZE_COMPONENTS):
+            safe = redact(text)
+            context = (
+                f"Severity hint (if known): {severity or 'unknown'}\n"
+                f"Duplicate report count: {duplicate_count}\n\n"
+                f"Incident report: {safe}"
+            )
+            if "classification" in wanted:
+                context = f"Available categories: {', '.join(categories)}\n" + context
+            result = await self._call(self._build_prompt(_analyze_system(wanted), context))
 
         # Validate and normalise each sub-section defensively.
         classification = None
-        if "classification" in result and result["classification"]:
+        if "classification" in wanted and result.get("classification"):
             c = result["classification"]
             _require_keys(
                 c,
@@ -766,7 +835,7 @@ class GeminiProvider(BaseProvider):
             }
 
         toxicity = None
-        if "toxicity" in result and result["toxicity"]:
+        if "toxicity" in wanted and result.get("toxicity"):
             t = result["toxicity"]
             _require_keys(
                 t,
@@ -781,7 +850,7 @@ class GeminiProvider(BaseProvider):
             }
 
         risk = None
-        if "risk" in result and result["risk"]:
+        if "risk" in wanted and result.get("risk"):
             r = result["risk"]
             _require_keys(
                 r,
@@ -795,15 +864,11 @@ class GeminiProvider(BaseProvider):
                 "breakdown": {k: round(float(v), 4) for k, v in r["breakdown"].items()},
             }
 
-        return {
-            "classification": classification,
-            "toxicity": toxicity,
-            "risk": risk,
-            "summary": result.get("summary"),
-            "spam_flag": result.get("spam_flag"),
-            "dispatch_suggestion": result.get("dispatch_suggestion"),
-            "entities": result.get("entities"),
+        extras = {
+            name: result.get(name) if name in wanted else None
+            for name in ("summary", "spam_flag", "dispatch_suggestion", "entities")
         }
+        return {"classification": classification, "toxicity": toxicity, "risk": risk, **extras}
 
     async def generate_insights(self, stats: Dict) -> Optional[Dict]:
         """
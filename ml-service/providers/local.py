@@ -5,30 +5,146 @@ All blocking inference is offloaded to threads to keep the event loop free.
 """
 
 import asyncio
+import functools
 import logging
-from typing import Dict, List, Optional
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 import config
-from providers.base import BaseProvider
+from inference.batcher import MicroBatcher
+from inference.model_manager import LazyModel
+from providers.base import BaseProvider, analyze_components
 
 logger = logging.getLogger(__name__)
 
+_WARMUP_WORDS = (
+    "caller reports a suspicious vehicle parked near the school entrance with the "
+    "engine running and two people arguing loudly while smoke rises from a nearby "
+    "building and a pedestrian appears injured on the sidewalk"
+).split()
+
+
+def warmup_text(words: int, variant: int = 0) -> str:
+    """Incident-like text of `words` words; `variant` rotates the wording."""
+    return " ".join(
+        _WARMUP_WORDS[(variant + i) % len(_WARMUP_WORDS)] for i in range(max(1, words))
+    )
+
 
 class LocalProvider(BaseProvider):
-    def __init__(self, classifier, embedding_model, toxicity_model, risk_scorer):
+    def __init__(
+        self,
+        classifier,
+        embedding_model,
+        toxicity_model,
+        risk_scorer,
+        embedding_store=None,
+        core_scheduler=None,
+    ):
         self._classifier = classifier
         self._embedding = embedding_model
         self._toxicity = toxicity_model
         self._risk = risk_scorer
+        self._embedding_store = embedding_store
+        self._cores = core_scheduler
+        self._warmup_state = "pending" if config.MODEL_WARMUP_ENABLED else "disabled"
+        self._warmup_ms: Dict[str, float] = {}
+        self._warmup_attempts = 0
+        self._warmup_error: Optional[str] = None
+        self._classify_batcher = (
+            MicroBatcher(
+                self._classify_batch,
+                max_batch_size=config.CLASSIFIER_MAX_BATCH_SIZE,
+                max_wait_ms=config.CLASSIFIER_BATCH_MAX_WAIT_MS,
+                name="classify-batcher",
+                runner=functools.partial(self._run_on, "classifier"),
+            )
+            if config.CLASSIFIER_BATCHING_ENABLED
+            and hasattr(classifier, "predict_top_batch")
+            else None
+        )
+        self._toxicity_batcher = (
+            MicroBatcher(
+                self._toxicity_batch,
+                max_batch_size=config.TOXICITY_MAX_BATCH_SIZE,
+                max_wait_ms=config.TOXICITY_BATCH_MAX_WAIT_MS,
+                name="toxicity-batcher",
+                runner=functools.partial(self._run_on, "toxicity"),
+            )
+            if config.TOXICITY_BATCHING_ENABLED
+            and hasattr(toxicity_model, "is_toxic_batch")
+            else None
+        )
 
     async def _run(self, func, *args, **kwargs):
         """Offload a blocking call to a thread pool."""
         return await asyncio.to_thread(func, *args, **kwargs)
 
+    async def _run_on(self, model: str, func, *args, **kwargs):
+        """Offload a blocking call to `model`'s core partition, if cores are partitioned."""
+        if self._cores is None:
+            return await self._run(func, *args, **kwargs)
+        return await self._cores.run(model, func, *args, **kwargs)
+
     # ── Core endpoints ────────────────────────────────────────────────────────
 
+    def _classify_batch(self, items: List[tuple]) -> List[Optional[Dict]]:
+        """Run queued (text, categories, embedding) items, one batch per category set."""
+        groups: Dict[tuple, List[int]] = {}
+        for i, (_, categories, _) in enumerate(items):
+            groups.setdefault(categories, []).append(i)
+        results: List[Optional[Dict]] = [None] * len(items)
+        for categories, indices in groups.items():
+            texts = [items[i][0] for i in indices]
+            vectors = [items[i][2] for i in indices]
+            if all(vector is not None for vector in vectors):
+                batch = self._classifier.predict_top_batch(
+                    texts, list(categories), embeddings=np.stack(vectors)
+                )
+            else:
+                batch = self._classifier.predict_top_batch(texts, list(categories))
+            for i, result in zip(indices, batch):
+                results[i] = result
+        return results
+
+    async def _classification_embedding(self, text: str) -> Optional[np.ndarray]:
+        """
+        Report embedding for the classifier's embedding-head tier. Goes through
+        the embedding store, so /analyze and dedup reuse the same vector.
+        """
+        if not text:
+            return None
+        if isinstance(self._classifier, LazyModel) and not self._classifier.is_loaded():
+            # First use of a lazily loaded classifier: load off the event loop.
+            await self._run_on("classifier", self._classifier.load)
+        if not getattr(self._classifier, "uses_embeddings", False):
+            return None
+        try:
+            if self._embedding_store is not None:
+                vectors = await self._embedding_store.resolve([text], self._encode_batch)
+            else:
+                vectors = await self._encode_batch([text])
+            return np.asarray(vectors[0], dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Embedding for classification unavailable: {e}")
+            return None
+
     async def classify(self, text: str, categories: List[str]) -> Dict:
-        result = await self._run(self._classifier.predict_top, text, categories)
+        embedding = await self._classification_embedding(text)
+        if self._classify_batcher is not None:
+            result = await self._classify_batcher.submit(
+                (text, tuple(categories), embedding)
+            )
+        elif embedding is not None:
+            result = await self._run_on(
+                "classifier", self._classifier.predict_top, text, categories, embedding=embedding
+            )
+        else:
+            result = await self._run_on(
+                "classifier", self._classifier.predict_top, text, categories
+            )
         if not result:
             raise ValueError("Classifier returned no result")
         return {
@@ -37,10 +153,16 @@ class LocalProvider(BaseProvider):
             "all_scores": {k: round(v, 4) for k, v in result["all_scores"].items()},
         }
 
+    def _toxicity_batch(self, texts: List[str]) -> List[Dict]:
+        return self._toxicity.is_toxic_batch(texts, config.TOXICITY_THRESHOLD)
+
     async def detect_toxicity(self, text: str) -> Dict:
-        result = await self._run(
-            self._toxicity.is_toxic, text, config.TOXICITY_THRESHOLD
-        )
+        if self._toxicity_batcher is not None:
+            result = await self._toxicity_batcher.submit(text)
+        else:
+            result = await self._run_on(
+                "toxicity", self._toxicity.is_toxic, text, config.TOXICITY_THRESHOLD
+            )
         return {
             "is_toxic": result["is_toxic"],
             "toxicity_score": round(result["toxicity_score"], 4),
@@ -71,17 +193,49 @@ class LocalProvider(BaseProvider):
             "breakdown": result["breakdown"],
         }
 
+    async def _encode_batch(self, texts: List[str]):
+        return await self._run_on("embedding", self._embedding.encode, texts)
+
     async def embed(self, text: str) -> List[float]:
-        result = await self._run(self._embedding.encode_single, text)
+        if self._embedding_store is not None:
+            vectors = await self._embedding_store.resolve([text], self._encode_batch)
+            return vectors[0].tolist()
+        result = await self._run_on("embedding", self._embedding.encode_single, text)
         return result.tolist()
 
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        if self._embedding_store is not None:
+            vectors = await self._embedding_store.resolve(texts, self._encode_batch)
+        else:
+            vectors = await self._encode_batch(texts)
+        return np.asarray(vectors, dtype=np.float32).tolist()
+
     async def batch_similarity(
         self, query_text: str, candidate_texts: List[str]
     ) -> List[float]:
+        return (await self.scored_similarity(query_text, candidate_texts))[0]
+
+    async def scored_similarity(
+        self, query_text: str, candidate_texts: List[str]
+    ) -> Tuple[List[float], bool]:
         if not candidate_texts:
-            return []
-        return await self._run(
-            self._embedding.batch_similarity, query_text, candidate_texts
+            return [], True
+        if self._embedding_store is None:
+            return await self._run_on(
+                "embedding", self._embedding.scored_similarity, query_text, candidate_texts
+            )
+        vectors = await self._embedding_store.resolve(
+            [query_text] + candidate_texts, self._encode_batch
+        )
+        return await self._run_on(
+            "embedding",
+            self._embedding.scored_similarity,
+            query_text,
+            candidate_texts,
+            query_embedding=vectors[0],
+            candidate_embeddings=vectors[1:],
         )
 
     async def pairwise_compare(
@@ -106,55 +260,16 @@ class LocalProvider(BaseProvider):
         severity: Optional[str],
         duplicate_count: int,
         categories: List[str],
+        components: Optional[List[str]] = None,
     ) -> Dict:
         """
-        Serial inference across all local models.
-        LLM-only fields (summary, entities, spam_flag, dispatch_suggestion)
-        are always None for the local provider.
+        Composed from classify, detect_toxicity and compute_risk (see
+        analyze_components). LLM-only fields (summary, entities, spam_flag,
+        dispatch_suggestion) are always None for the local provider.
         """
-        result: Dict = {
-            "classification": None,
-            "toxicity": None,
-            "risk": None,
-            "summary": None,
-            "entities": None,
-            "spam_flag": None,
-            "dispatch_suggestion": None,
-        }
-
-        # Classification
-        try:
-            result["classification"] = await self.classify(text, categories)
-        except Exception as e:
-            logger.warning(f"LocalProvider.full_analyze classification failed: {e}")
-
-        # Toxicity
-        toxicity_score = 0.0
-        try:
-            tox = await self.detect_toxicity(text)
-            result["toxicity"] = tox
-            toxicity_score = tox["toxicity_score"]
-        except Exception as e:
-            logger.warning(f"LocalProvider.full_analyze toxicity failed: {e}")
-
-        # Risk — use the predicted category if available
-        try:
-            predicted_cat = (
-                result["classification"]["predicted_category"]
-                if result["classification"]
-                else category
-            )
-            result["risk"] = await self.compute_risk(
-                text=text,
-                category=predicted_cat or category,
-                severity=severity,
-                duplicate_count=duplicate_count,
-                toxicity_score=toxicity_score,
-            )
-        except Exception as e:
-            logger.warning(f"LocalProvider.full_analyze risk failed: {e}")
-
-        return result
+        return await analyze_components(
+            self, text, category, severity, duplicate_count, categories, components
+        )
 
     async def generate_insights(self, stats: Dict) -> Optional[Dict]:
         """Local provider has no LLM — insights are not available."""
@@ -170,6 +285,95 @@ class LocalProvider(BaseProvider):
         """Local provider has no multimodal LLM — media judgment is unavailable."""
         return None
 
+    def batching_stats(self) -> Dict:
+        stats = {}
+        if self._classify_batcher is not None:
+            stats["classify"] = self._classify_batcher.stats
+        if self._toxicity_batcher is not None:
+            stats["toxicity"] = self._toxicity_batcher.stats
+        return stats
+
+    def _warmup_runs(self) -> List[tuple]:
+        """(name, model, run) for every loaded model."""
+        runs = (
+            ("embedding", self._embedding, lambda m, texts: m.warmup(texts)),
+            (
+                "classifier",
+                self._classifier,
+                lambda m, texts: m.warmup(texts, config.INCIDENT_CATEGORIES),
+            ),
+            ("toxicity", self._toxicity, lambda m, texts: m.warmup(texts)),
+        )
+        return [
+            (name, model, run)
+            for name, model, run in runs
+            if model is not None and not (isinstance(model, LazyModel) and not model.is_loaded())
+        ]
+
+    @staticmethod
+    def _warmup_model(name: str, model, run) -> float:
+        """Blocking warmup of one model; returns milliseconds."""
+        started = time.perf_counter()
+        for words in config.MODEL_WARMUP_LENGTHS:
+            for size in config.MODEL_WARMUP_BATCH_SIZES:
+                run(model, [warmup_text(words, i) for i in range(max(1, size))])
+        elapsed = round((time.perf_counter() - started) * 1000.0, 1)
+        logger.info(f"Warmup: {name} took {elapsed} ms")
+        return elapsed
+
+    def _warmup_models(self) -> Dict[str, float]:
+        """Blocking warmup of every loaded model; returns milliseconds per model."""
+        return {
+            name: self._warmup_model(name, model, run)
+            for name, model, run in self._warmup_runs()
+        }
+
+    async def _warmup_once(self) -> Dict[str, float]:
+        if self._cores is None:
+            return await self._run(self._warmup_models)
+        # Each model warms up on its own partition; the timings then size
+        # the partitions when the split is "auto".
+        warmup_ms = {
+            name: await self._run_on(name, self._warmup_model, name, model, run)
+            for name, model, run in self._warmup_runs()
+        }
+        self._cores.rebalance(warmup_ms)
+        return warmup_ms
+
+    async def warmup(self) -> None:
+        """
+        Warm every loaded model, retrying with doubling backoff. Warmup inputs
+        are ordinary requests: once every attempt has failed, so would
+        traffic, and the state stays "failed" for /health to report.
+        """
+        self._warmup_state = "running"
+        backoff = config.MODEL_WARMUP_RETRY_BACKOFF_SECONDS
+        for attempt in range(1, config.MODEL_WARMUP_ATTEMPTS + 1):
+            self._warmup_attempts = attempt
+            try:
+                self._warmup_ms = await self._warmup_once()
+            except Exception as e:
+                self._warmup_error = str(e)
+                if attempt == config.MODEL_WARMUP_ATTEMPTS:
+                    self._warmup_state = "failed"
+                    logger.error(f"Warmup failed {attempt} times; provider stays not ready: {e}")
+                    return
+                logger.warning(f"Warmup attempt {attempt} failed ({e}); retrying in {backoff}s")
+                await asyncio.sleep(backoff)
+                backoff *= 2
+                continue
+            self._warmup_state = "done"
+            self._warmup_error = None
+            return
+
+    def warmup_stats(self) -> Dict:
+        return {
+            "state": self._warmup_state,
+            "ms": self._warmup_ms,
+            "attempts": self._warmup_attempts,
+            "error": self._warmup_error,
+        }
+
     async def is_ready(self) -> bool:
         return all(
             [
@@ -177,5 +381,6 @@ class LocalProvider(BaseProvider):
                 self._embedding is not None,
                 self._toxicity is not None,
                 self._risk is not None,
+                self._warmup_state in ("done", "disabled"),
             ]
         )
@@ -27,10 +27,16 @@ print("=" * 50)
 print("ML Service Latency Benchmark")
 print("=" * 50)
 
-# Warmup call to eliminate CUDA JIT overhead
-print("\n0. Warmup...")
-requests.post(f"{BASE}/classify", json={"text": "warmup", "categories": ["test"]})
-requests.post(f"{BASE}/toxicity", json={"text": "warmup"})
+# The service warms its models itself; wait until it reports ready.
+print("\n0. Waiting for provider_ready (warmup)...")
+deadline = time.time() + 600
+while time.time() < deadline:
+    try:
+        if requests.get(f"{BASE}/health").json().get("provider_ready"):
+            break
+    except requests.RequestException:
+        pass
+    time.sleep(1)
 print("   Done")
 
 # 1. Health
@@ -0,0 +1,138 @@
+"""
+Sweep CPU core partitions between the classifier, embedder and toxicity model.
+
+The models are loaded once; then, for the shared-pool baseline (every call
+on asyncio.to_thread with ML_NUM_THREADS torch threads) and for every split
+of the cores into classifier/embedding/toxicity shares, LocalProvider runs
+the same full_analyze load at a fixed client concurrency. Rows are printed
+best throughput first, followed by the split "auto" derives from warmup.
+
+Usage:
+    ML_PROVIDER=local python scripts/benchmark_core_partitions.py \
+        [--cores 8] [--step 1] [--requests 100] [--concurrency 8] [--top 10]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round((p / 100.0) * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def partitions(cores, step):
+    """(classifier, embedding, toxicity) core counts summing to `cores`."""
+    for classifier in range(1, cores - 1, step):
+        for embedding in range(1, cores - classifier, step):
+            toxicity = cores - classifier - embedding
+            if toxicity >= 1:
+                yield classifier, embedding, toxicity
+
+
+async def drive(provider, texts, requests, concurrency):
+    import config
+
+    latencies = []
+    next_index = iter(range(requests))
+
+    async def client():
+        for i in next_index:
+            started = time.perf_counter()
+            await provider.full_analyze(
+                f"{texts[i % len(texts)]} (#{i})", None, None, 0, config.INCIDENT_CATEGORIES
+            )
+            latencies.append((time.perf_counter() - started) * 1000.0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - started, sorted(latencies)
+
+
+async def measure(provider, texts, requests, concurrency):
+    # Untimed pass so each layout's executor threads are warm; one event loop
+    # for both, since the provider's micro-batchers bind to it.
+    await drive(provider, texts, min(len(texts), requests), concurrency)
+    return await drive(provider, texts, requests, concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--cores", type=int, default=0, help="Cores to partition (0 = ML_NUM_THREADS)"
+    )
+    parser.add_argument("--step", type=int, default=1, help="Core granularity of the sweep")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--top", type=int, default=10, help="Rows to print (0 = all)")
+    args = parser.parse_args()
+
+    import config
+    from inference.core_scheduler import PARTITIONED_MODELS, CoreScheduler, available_cores
+    from inference.model_manager import ModelManager, local_model_specs
+    from providers.local import LocalProvider
+    from test_accuracy import CLASSIFY_TESTS, TOXICITY_TESTS
+
+    texts = [case["text"] for case in CLASSIFY_TESTS + TOXICITY_TESTS]
+    cores = available_cores()[: args.cores or config.NUM_THREADS]
+
+    manager = ModelManager()
+    models = {
+        name: manager.register(name, loader, model_class)
+        for name, (loader, model_class) in local_model_specs().items()
+    }
+    asyncio.run(manager.load_eager())
+
+    def provider_for(scheduler):
+        return LocalProvider(
+            models["classifier"], models["embedding"], models["toxicity"], models["risk"],
+            core_scheduler=scheduler,
+        )
+
+    layouts = [("shared pool", None)] + [
+        (f"{c}/{e}/{t}", dict(zip(PARTITIONED_MODELS, (c, e, t))))
+        for c, e, t in partitions(len(cores), max(1, args.step))
+    ]
+    print(
+        f"{args.requests} full_analyze requests, concurrency {args.concurrency}, "
+        f"{len(cores)} cores; layout = classifier/embedding/toxicity threads"
+    )
+    rows = []
+    for label, split in layouts:
+        scheduler = CoreScheduler(PARTITIONED_MODELS, cores, split=split) if split else None
+        try:
+            wall, latencies = asyncio.run(
+                measure(provider_for(scheduler), texts, args.requests, args.concurrency)
+            )
+        finally:
+            if scheduler is not None:
+                scheduler.shutdown()
+        rows.append(
+            (args.requests / wall, label, percentile(latencies, 50), percentile(latencies, 95))
+        )
+        print(f"  {label:<12} {rows[-1][0]:.1f} req/s", file=sys.stderr)
+
+    print(f"{'layout':<14}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}")
+    for throughput, label, p50, p95 in sorted(rows, reverse=True)[: args.top or None]:
+        print(f"{label:<14}{throughput:>8.1f}{p50:>9.0f}{p95:>9.0f}")
+
+    auto = CoreScheduler(PARTITIONED_MODELS, cores)
+    try:
+        provider = provider_for(auto)
+        asyncio.run(provider.warmup())
+        threads = {m: layout["threads"] for m, layout in auto.stats["layout"].items()}
+        print("auto (from warmup): " + "/".join(str(threads[m]) for m in PARTITIONED_MODELS))
+    finally:
+        auto.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Throughput per core: threaded in-process inference vs the model process pool.
+
+Both modes drive the same LocalProvider.full_analyze over the accuracy-test
+report texts at a fixed client concurrency, on the same number of cores:
+  - threads: the models live in this process and run via asyncio.to_thread
+    with ML_NUM_THREADS torch threads (the default serving mode)
+  - processes: INFERENCE_PROCESS_WORKERS model processes splitting the same
+    cores; this process only queues calls and copies results out of shared
+    memory
+Reported per mode: requests/s, requests/s per core, p50/p95 latency, and the
+CPU seconds this (API) process spent per request.
+
+Usage:
+    ML_PROVIDER=local python scripts/benchmark_process_pool.py \
+        [--requests 200] [--concurrency 16] [--workers 2 4]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round((p / 100.0) * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def report_texts():
+    from test_accuracy import CLASSIFY_TESTS, TOXICITY_TESTS
+
+    return [case["text"] for case in CLASSIFY_TESTS + TOXICITY_TESTS]
+
+
+async def drive(provider, texts, requests, concurrency):
+    import config
+
+    latencies = []
+    next_index = iter(range(requests))
+
+    async def client():
+        for i in next_index:
+            started = time.perf_counter()
+            await provider.full_analyze(
+                f"{texts[i % len(texts)]} (#{i})", None, None, 0, config.INCIDENT_CATEGORIES
+            )
+            latencies.append((time.perf_counter() - started) * 1000.0)
+
+    cpu_started, wall_started = time.process_time(), time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_started
+    return wall, time.process_time() - cpu_started, sorted(latencies)
+
+
+async def measure(provider, texts, requests, concurrency):
+    # Untimed pass first so every mode is measured warm; one event loop for
+    # both, since the provider's micro-batchers bind to the loop they start on.
+    await drive(provider, texts, min(len(texts), requests), concurrency)
+    return await drive(provider, texts, requests, concurrency)
+
+
+def build_provider(models):
+    from providers.local import LocalProvider
+
+    return LocalProvider(
+        classifier=models["classifier"],
+        embedding_model=models["embedding"],
+        toxicity_model=models["toxicity"],
+        risk_scorer=models["risk"],
+    )
+
+
+def threaded_models():
+    from inference.model_manager import ModelManager, local_model_specs
+
+    manager = ModelManager()
+    proxies = {
+        name: manager.register(name, loader, model_class)
+        for name, (loader, model_class) in local_model_specs().items()
+    }
+    asyncio.run(manager.load_eager())
+    return proxies, None
+
+
+def pooled_models(workers):
+    import config
+    from inference.model_manager import local_model_specs
+    from inference.process_pool import REMOTE_MODELS, InferenceProcessPool, ProcessModelProxy
+
+    pool = InferenceProcessPool(
+        workers=workers,
+        timeout_seconds=config.INFERENCE_PROCESS_TIMEOUT_SECONDS,
+        shm_min_bytes=config.INFERENCE_SHM_MIN_BYTES,
+    )
+    pool.start()
+    specs = local_model_specs()
+    models = {
+        name: ProcessModelProxy(pool, name, specs[name][1], cached_attrs=("uses_embeddings",))
+        for name in REMOTE_MODELS
+    }
+    models["risk"] = specs["risk"][0]()
+    return models, pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2])
+    args = parser.parse_args()
+
+    import config
+
+    cores = config.NUM_THREADS
+    texts = report_texts()
+    modes = [("threads", threaded_models)] + [
+        (f"processes x{n}", lambda n=n: pooled_models(n)) for n in args.workers
+    ]
+
+    print(f"{args.requests} full_analyze requests, concurrency {args.concurrency}, {cores} cores")
+    print(f"{'mode':<16}{'req/s':>8}{'req/s/core':>12}{'p50 ms':>9}{'p95 ms':>9}{'api cpu ms/req':>16}")
+    for name, build in modes:
+        models, pool = build()
+        try:
+            wall, cpu, latencies = asyncio.run(
+                measure(build_provider(models), texts, args.requests, args.concurrency)
+            )
+        finally:
+            if pool is not None:
+                pool.close()
+        throughput = args.requests / wall
+        print(
+            f"{name:<16}{throughput:>8.1f}{throughput / cores:>12.2f}"
+            f"{percentile(latencies, 50):>9.0f}{percentile(latencies, 95):>9.0f}"
+            f"{cpu / args.requests * 1000.0:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark the dedup vector index: IVF-flat vs exact search latency and recall.
+
+Fills one VectorIndex per nprobe setting with --entries synthetic clustered
+embeddings (all inside the dedup window and radius, the worst case for the
+filters), then runs --queries searches for near-duplicates of indexed
+entries. Recall@k is measured against the exact index (nprobe = nlist).
+No models are loaded.
+
+Usage:
+    python scripts/benchmark_vector_index.py [--entries 50000] [--dim 384] [--nlist 64]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.vector_index import VectorIndex  # noqa: E402
+
+NOW = time.time()
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round((p / 100.0) * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def build(vectors, nlist, nprobe):
+    index = VectorIndex(nlist=nlist, nprobe=nprobe, max_entries=len(vectors))
+    started = time.perf_counter()
+    for i, vector in enumerate(vectors):
+        index.upsert(str(i), vector, NOW, 0.0, 0.0)
+    return index, time.perf_counter() - started
+
+
+def run_queries(index, queries, k):
+    latencies, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        neighbours = index.search(query, NOW, 0.0, 0.0, k=k)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        results.append({n["incident_id"] for n in neighbours})
+    return sorted(latencies), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=200, help="Synthetic topic clusters")
+    parser.add_argument("--nlist", type=int, default=64)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centres = rng.normal(size=(args.clusters, args.dim))
+    vectors = centres[rng.integers(args.clusters, size=args.entries)]
+    vectors = (vectors + 0.5 * rng.normal(size=vectors.shape)).astype(np.float32)
+    picks = rng.integers(args.entries, size=args.queries)
+    queries = vectors[picks] + 0.1 * rng.normal(size=(args.queries, args.dim))
+
+    print(f"{args.entries} entries, dim {args.dim}, nlist {args.nlist}, k {args.k}")
+    exact, build_s = build(vectors, args.nlist, args.nlist)
+    exact_ms, truth = run_queries(exact, queries, args.k)
+    print(f"{'nprobe':<10}{'recall':>8}{'p50 ms':>9}{'p95 ms':>9}{'scanned':>10}{'build s':>9}")
+    print(
+        f"{'exact':<10}{1.0:>8.3f}{percentile(exact_ms, 50):>9.2f}"
+        f"{percentile(exact_ms, 95):>9.2f}{exact.stats['avg_scanned']:>10.0f}{build_s:>9.1f}"
+    )
+    for nprobe in args.nprobe:
+        index, build_s = build(vectors, args.nlist, nprobe)
+        latencies, found = run_queries(index, queries, args.k)
+        recall = np.mean([len(f & t) / max(1, len(t)) for f, t in zip(found, truth)])
+        print(
+            f"{nprobe:<10}{recall:>8.3f}{percentile(latencies, 50):>9.2f}"
+            f"{percentile(latencies, 95):>9.2f}{index.stats['avg_scanned']:>10.0f}{build_s:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Build ready-to-serve model artifacts for MODEL_ARTIFACT_DIR.
+
+Each local model is loaded once from the HF cache and written to
+<out>/<component>/ in the chosen dtype:
+  - classifier, classifier_fast, toxicity: safetensors + config + tokenizer
+    + manifest.json, memory-mapped by models/artifact_store.py at startup
+  - embedding, cross_encoder: sentence-transformers save directories
+    (safetensors) + manifest.json
+With --onnx the ONNX Runtime exports (fp32 and/or int8) are written to
+<out>/onnx, where the onnx/onnx-int8 backends look for them when
+MODEL_ARTIFACT_DIR is set and ONNX_CACHE_DIR is not.
+
+Artifacts record the source model; a serving process whose configured model
+differs ignores them and loads from the hub as before.
+
+Usage:
+    ML_PROVIDER=local python scripts/build_model_artifacts.py --out /models \
+        [--components classifier toxicity] [--dtype bfloat16] [--onnx int8]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+COMPONENTS = ("classifier", "classifier_fast", "embedding", "cross_encoder", "toxicity")
+DTYPES = ("float32", "float16", "bfloat16")
+ONNX_VARIANTS = {"none": (), "fp32": (False,), "int8": (True,), "both": (False, True)}
+
+
+def source_name(component):
+    import config
+
+    return {
+        "classifier": config.CLASSIFIER_MODEL,
+        "classifier_fast": config.FAST_CLASSIFIER_MODEL,
+        "embedding": config.EMBEDDING_MODEL,
+        "cross_encoder": config.CROSS_ENCODER_MODEL,
+        "toxicity": f"detoxify-{config.TOXICITY_MODEL}",
+    }[component]
+
+
+def build_sequence_classifier(component, directory, dtype, quantize_variants):
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    from models.artifact_store import save_hf_model
+
+    name = source_name(component)
+    model = AutoModelForSequenceClassification.from_pretrained(name)
+    save_hf_model(model, directory, name, dtype)
+    AutoTokenizer.from_pretrained(name).save_pretrained(directory)
+
+    if quantize_variants:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+
+        from models.cpu_backends import load_ort_model
+
+        for quantize in quantize_variants:
+            load_ort_model(ORTModelForSequenceClassification, name, quantize)
+
+
+def build_sentence_transformer(component, directory, dtype, quantize_variants):
+    import torch
+    from sentence_transformers import CrossEncoder, SentenceTransformer
+
+    from models.artifact_store import write_manifest
+    from models.cpu_backends import load_sentence_transformers_onnx
+
+    name = source_name(component)
+    model_class = SentenceTransformer if component == "embedding" else CrossEncoder
+    model = model_class(name, device="cpu")
+    getattr(model, "model", model).to(getattr(torch, dtype))  # CrossEncoder wraps .model
+    model.save_pretrained(directory, safe_serialization=True)
+    write_manifest(directory, name, dtype, {"model_class": model_class.__name__})
+
+    for quantize in quantize_variants:
+        load_sentence_transformers_onnx(model_class, name, quantize)
+
+
+def build_toxicity(component, directory, dtype, quantize_variants):
+    from detoxify import Detoxify
+
+    import config
+    from models.artifact_store import save_hf_model
+    from models.cpu_backends import artifact_dir, load_ort_model
+
+    name = source_name(component)
+    detector = Detoxify(config.TOXICITY_MODEL, device="cpu")
+    if quantize_variants:
+        # The ONNX export needs a standard HF checkpoint in full precision.
+        hf_dir = artifact_dir(name, "hf")
+        detector.model.save_pretrained(hf_dir)
+        detector.tokenizer.save_pretrained(hf_dir)
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+
+        for quantize in quantize_variants:
+            load_ort_model(ORTModelForSequenceClassification, name, quantize, source=hf_dir)
+
+    save_hf_model(
+        detector.model, directory, name, dtype, {"class_names": list(detector.class_names)}
+    )
+    detector.tokenizer.save_pretrained(directory)
+
+
+BUILDERS = {
+    "classifier": build_sequence_classifier,
+    "classifier_fast": build_sequence_classifier,
+    "embedding": build_sentence_transformer,
+    "cross_encoder": build_sentence_transformer,
+    "toxicity": build_toxicity,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--out", required=True, help="Directory to serve as MODEL_ARTIFACT_DIR")
+    parser.add_argument("--components", nargs="+", choices=COMPONENTS, default=list(COMPONENTS))
+    parser.add_argument("--dtype", choices=DTYPES, default="float32")
+    parser.add_argument("--onnx", choices=sorted(ONNX_VARIANTS), default="none")
+    args = parser.parse_args()
+
+    import config
+
+    out = os.path.abspath(args.out)
+    config.MODEL_ARTIFACT_DIR = out
+    config.ONNX_CACHE_DIR = os.path.join(out, "onnx")
+
+    for component in args.components:
+        if not source_name(component):
+            print(f"{component}: not configured, skipped")
+            continue
+        started = time.perf_counter()
+        directory = os.path.join(out, component)
+        BUILDERS[component](component, directory, args.dtype, ONNX_VARIANTS[args.onnx])
+        print(
+            f"{component}: {source_name(component)} -> {directory} "
+            f"({args.dtype}, {time.perf_counter() - started:.1f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
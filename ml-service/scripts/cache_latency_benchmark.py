@@ -0,0 +1,188 @@
+"""
+Cache latency benchmark: sync RedisCacheManager vs AsyncRedisCacheManager.
+
+A TCP proxy in front of the local Redis delays a fraction of Redis replies.
+N concurrent simulated requests (cache get -> short async "inference" ->
+cache set) then run on one event loop against each backend, and the
+p50/p95/p99 request latencies are printed side by side.
+
+With the sync client every delayed reply blocks the event loop, so the delay
+is paid by all in-flight requests; with redis.asyncio only the request that
+hit the slow reply waits.
+
+Usage:
+    docker compose -f docker-compose.redis.yml up -d redis
+    python scripts/cache_latency_benchmark.py --delay-ms 50 --slow-ratio 0.1
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_manager import AsyncRedisCacheManager, InMemoryLRUCache, RedisCacheManager
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round((p / 100.0) * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+async def _pipe(reader, writer, delay_s=0.0, slow_ratio=0.0):
+    try:
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            if delay_s and random.random() < slow_ratio:
+                await asyncio.sleep(delay_s)
+            writer.write(chunk)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+def start_slow_proxy(listen_port, redis_host, redis_port, delay_s, slow_ratio):
+    """Run a delaying TCP proxy on its own thread/loop so a blocked client loop can't stall it."""
+    ready = threading.Event()
+
+    async def handle(client_reader, client_writer):
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection(
+                redis_host, redis_port
+            )
+        except OSError:
+            client_writer.close()
+            return
+        await asyncio.gather(
+            _pipe(client_reader, upstream_writer),
+            _pipe(upstream_reader, client_writer, delay_s, slow_ratio),
+        )
+
+    async def serve():
+        server = await asyncio.start_server(handle, "127.0.0.1", listen_port)
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    thread = threading.Thread(target=lambda: asyncio.run(serve()), daemon=True)
+    thread.start()
+    ready.wait(timeout=5)
+
+
+async def run_load(label, get, set_, total, concurrency, work_s, unique_texts):
+    latencies = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one_request(i):
+        text = f"benchmark incident report #{i % unique_texts}"
+        async with gate:
+            started = time.perf_counter()
+            cached = await get("classify", text, pv="bench")
+            if not cached:
+                await asyncio.sleep(work_s)  # stands in for offloaded inference
+                await set_("classify", text, {"predicted_category": "other", "i": i}, pv="bench")
+            latencies.append((time.perf_counter() - started) * 1000.0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request(i) for i in range(total)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    print(
+        f"  {label:<14} p50={percentile(latencies, 50):7.1f}ms "
+        f"p95={percentile(latencies, 95):7.1f}ms "
+        f"p99={percentile(latencies, 99):7.1f}ms "
+        f"max={latencies[-1]:7.1f}ms  throughput={total / wall:7.1f} req/s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--redis-host", default="127.0.0.1")
+    parser.add_argument("--redis-port", type=int, default=6379)
+    parser.add_argument("--proxy-port", type=int, default=6390)
+    parser.add_argument("--delay-ms", type=float, default=50.0)
+    parser.add_argument("--slow-ratio", type=float, default=0.1)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--work-ms", type=float, default=5.0)
+    parser.add_argument("--unique-texts", type=int, default=500)
+    args = parser.parse_args()
+
+    start_slow_proxy(
+        args.proxy_port,
+        args.redis_host,
+        args.redis_port,
+        args.delay_ms / 1000.0,
+        args.slow_ratio,
+    )
+    proxy_url = f"redis://127.0.0.1:{args.proxy_port}/15"
+
+    print("=" * 72)
+    print(
+        f"Cache latency under load — delay={args.delay_ms:.0f}ms on "
+        f"{args.slow_ratio:.0%} of replies, concurrency={args.concurrency}"
+    )
+    print("=" * 72)
+
+    sync_cache = RedisCacheManager(
+        redis_url=proxy_url,
+        fallback_cache=InMemoryLRUCache(max_size=1),
+    )
+    if not sync_cache.stats["redis_connected"]:
+        print("Redis is not reachable through the proxy; start Redis first.")
+        return
+    # DB 15 is reserved for this benchmark; start each run cold.
+    sync_cache._redis.flushdb()
+
+    async def sync_get(*a, **kw):
+        return sync_cache.get(*a, **kw)
+
+    async def sync_set(*a, **kw):
+        return sync_cache.set(*a, **kw)
+
+    await run_load(
+        "sync redis",
+        sync_get,
+        sync_set,
+        args.requests,
+        args.concurrency,
+        args.work_ms / 1000.0,
+        args.unique_texts,
+    )
+
+    async_cache = AsyncRedisCacheManager(
+        redis_url=proxy_url,
+        fallback_cache=InMemoryLRUCache(max_size=1),
+        max_connections=args.concurrency,
+        socket_timeout=max(1.0, args.delay_ms / 500.0),
+        pool_timeout=max(1.0, args.delay_ms / 500.0),
+    )
+    await async_cache.connect()
+    await async_cache._redis.flushdb()
+
+    await run_load(
+        "redis.asyncio",
+        async_cache.get,
+        async_cache.set,
+        args.requests,
+        args.concurrency,
+        args.work_ms / 1000.0,
+        args.unique_texts,
+    )
+    await async_cache.close()
+
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,165 @@
+"""
+Latency vs accuracy of the CPU backends on the accuracy test sets.
+
+For each model (classifier, embedding, cross-encoder, toxicity) and each
+backend (torch, torch-int8, onnx, onnx-int8) a fresh worker process loads
+the model with only that backend changed and runs the matching cases from
+tests/test_accuracy.py and tests/test_accuracy_extended.py:
+  - classifier:    top-1 category accuracy (CLASSIFY_TESTS*)
+  - embedding:     duplicate accuracy at SIMILARITY_THRESHOLD (SIMILARITY_TESTS*)
+  - cross-encoder: same pairs, reranking enabled on the borderline zone
+  - toxicity:      is_toxic accuracy (TOXICITY_TESTS*)
+The first run of an ONNX backend includes the export; later runs reuse the
+cached artifacts, so the reported load time is the warm-start cost.
+
+Usage:
+    ML_PROVIDER=local python scripts/compare_backends.py \
+        [--models classifier embedding] [--backends torch onnx-int8] [--repeat 3]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODELS = ("classifier", "embedding", "cross-encoder", "toxicity")
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+BACKEND_ENV = {
+    "classifier": "CLASSIFIER_BACKEND",
+    "embedding": "EMBEDDING_BACKEND",
+    "cross-encoder": "CROSS_ENCODER_BACKEND",
+    "toxicity": "TOXICITY_BACKEND",
+}
+
+
+def load_cases(name):
+    cases = []
+    for filename, suffix in (("test_accuracy.py", ""), ("test_accuracy_extended.py", "_EXT")):
+        spec = importlib.util.spec_from_file_location(
+            filename[:-3], os.path.join(ROOT, "tests", filename)
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        cases.extend(getattr(module, name + suffix, []))
+    return cases
+
+
+def _timed(fn, cases, repeat):
+    latencies, outputs = [], []
+    for _ in range(repeat):
+        outputs = []
+        for case in cases:
+            started = time.perf_counter()
+            outputs.append(fn(case))
+            latencies.append((time.perf_counter() - started) * 1000.0)
+    return outputs, latencies
+
+
+def run_worker(model, repeat):
+    """Runs inside the child process; backend env vars are already set."""
+    import config
+
+    started = time.perf_counter()
+    if model == "classifier":
+        from models.classifier import CategoryClassifier
+
+        instance = CategoryClassifier(config.CLASSIFIER_MODEL)
+        backend = instance.optimization_status["backend"]
+        cases = load_cases("CLASSIFY_TESTS")
+        load_ms = (time.perf_counter() - started) * 1000.0
+        outputs, latencies = _timed(
+            lambda c: instance.predict_top(c["text"], config.INCIDENT_CATEGORIES)["category"],
+            cases,
+            repeat,
+        )
+        correct = [out == case["expected"] for out, case in zip(outputs, cases)]
+    elif model in ("embedding", "cross-encoder"):
+        if model == "embedding":
+            config.CROSS_ENCODER_MODEL = None
+        from models.embeddings import EmbeddingModel
+
+        instance = EmbeddingModel(config.EMBEDDING_MODEL)
+        backend = instance.backends["embedding" if model == "embedding" else "cross_encoder"]
+        cases = load_cases("SIMILARITY_TESTS")
+        load_ms = (time.perf_counter() - started) * 1000.0
+        outputs, latencies = _timed(
+            lambda c: instance.batch_similarity(c["query"], [c["candidate"]])[0],
+            cases,
+            repeat,
+        )
+        correct = [
+            (score >= config.SIMILARITY_THRESHOLD) == case["expected_duplicate"]
+            for score, case in zip(outputs, cases)
+        ]
+    else:
+        from models.toxicity import ToxicityDetector
+
+        instance = ToxicityDetector(config.TOXICITY_MODEL)
+        backend = instance.backend
+        cases = load_cases("TOXICITY_TESTS")
+        load_ms = (time.perf_counter() - started) * 1000.0
+        outputs, latencies = _timed(
+            lambda c: instance.is_toxic(c["text"], config.TOXICITY_THRESHOLD)["is_toxic"],
+            cases,
+            repeat,
+        )
+        correct = [out == case["expected_toxic"] for out, case in zip(outputs, cases)]
+
+    ordered = sorted(latencies)
+    return {
+        "backend_in_use": backend,
+        "cases": len(cases),
+        "accuracy": sum(correct) / max(1, len(correct)),
+        "load_ms": load_ms,
+        "p50_ms": statistics.median(ordered),
+        "p95_ms": ordered[int((len(ordered) - 1) * 0.95)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--models", nargs="+", choices=MODELS, default=list(MODELS))
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--worker", choices=MODELS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.repeat)))
+        return
+
+    rows = []
+    for model in args.models:
+        for backend in args.backends:
+            env = {**os.environ, BACKEND_ENV[model]: backend, "ML_USE_GPU": "false"}
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", model,
+                 "--repeat", str(args.repeat)],
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            lines = proc.stdout.strip().splitlines()
+            if proc.returncode != 0 or not lines:
+                print(f"{model}/{backend} failed:\n{proc.stderr[-2000:]}")
+                continue
+            rows.append((model, backend, json.loads(lines[-1])))
+
+    print("=" * 88)
+    print(f"{'model':<14}{'backend':<12}{'in use':<12}{'accuracy':>9}{'p50 ms':>10}"
+          f"{'p95 ms':>10}{'load ms':>10}{'cases':>8}")
+    print("-" * 88)
+    for model, backend, r in rows:
+        print(f"{model:<14}{backend:<12}{r['backend_in_use']:<12}{r['accuracy']:>9.1%}"
+              f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['load_ms']:>10.0f}{r['cases']:>8}")
+    print("=" * 88)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Load test: /risk and /toxicity latency with and without a classification flood.
+
+Against a running service, a probe sends one /risk and one /toxicity request
+every --interval seconds (unique texts, so the cache never answers), first on
+an idle service and then while --flood concurrent clients hammer /classify.
+With per-model pools the probes only queue behind their own models, so their
+p50/p95 should stay close to the idle baseline; the classifier pool's queue
+depth and wait time (from /health) show where the flood is waiting instead.
+
+Usage:
+    ML_PROVIDER=local uvicorn main:app --port 5001 &
+    python scripts/load_test_model_pools.py [--flood 32] [--seconds 20]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+
+import httpx
+
+REPORT = "Someone broke into a parked car near the library and ran off with a laptop"
+counter = itertools.count()
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round((p / 100.0) * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def unique_text():
+    return f"{REPORT} (load test {time.time_ns()}-{next(counter)})"
+
+
+async def probe(client, seconds, interval):
+    latencies = {"/risk": [], "/toxicity": []}
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for path in latencies:
+            started = time.perf_counter()
+            response = await client.post(path, json={"text": unique_text()})
+            response.raise_for_status()
+            latencies[path].append((time.perf_counter() - started) * 1000.0)
+        await asyncio.sleep(interval)
+    return {path: sorted(values) for path, values in latencies.items()}
+
+
+async def flood(client, stop):
+    sent = 0
+    while not stop.is_set():
+        try:
+            await client.post("/classify", json={"text": unique_text()})
+            sent += 1
+        except httpx.HTTPError:
+            pass
+    return sent
+
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.flood + 8)
+    async with httpx.AsyncClient(base_url=args.base, timeout=300, limits=limits) as client:
+        health = (await client.get("/health")).json()
+        if not health.get("provider_ready"):
+            raise SystemExit("Service is not ready yet (provider_ready is false)")
+
+        print(f"Idle baseline for {args.seconds}s...")
+        idle = await probe(client, args.seconds, args.interval)
+
+        print(f"Classification flood ({args.flood} clients) for {args.seconds}s...")
+        stop = asyncio.Event()
+        flooders = [asyncio.create_task(flood(client, stop)) for _ in range(args.flood)]
+        await asyncio.sleep(2)  # let the classifier queue build up
+        loaded = await probe(client, args.seconds, args.interval)
+        pools = (await client.get("/health")).json()["inference_limits"].get("pools")
+        stop.set()
+        classified = sum(await asyncio.gather(*flooders))
+
+    print(f"\n{classified} classifications completed during the flood")
+    print(f"{'endpoint':<12}{'idle p50':>10}{'idle p95':>10}{'flood p50':>11}{'flood p95':>11}")
+    for path in idle:
+        print(
+            f"{path:<12}{percentile(idle[path], 50):>10.0f}{percentile(idle[path], 95):>10.0f}"
+            f"{percentile(loaded[path], 50):>11.0f}{percentile(loaded[path], 95):>11.0f}"
+        )
+    print("\nPools during the flood:")
+    print(json.dumps(pools, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base", default="http://127.0.0.1:5001")
+    parser.add_argument("--flood", type=int, default=32, help="Concurrent /classify clients")
+    parser.add_argument("--seconds", type=float, default=20, help="Length of each phase")
+    parser.add_argument("--interval", type=float, default=0.2, help="Pause between probes")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
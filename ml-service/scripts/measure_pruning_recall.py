@@ -0,0 +1,105 @@
+"""
+Hypothesis-pruning recall on the accuracy datasets.
+
+For every labelled text in tests/test_accuracy.py and
+tests/test_accuracy_extended.py this runs the fast model, builds the pruned
+candidate set the classifier would send to the accurate model, and reports:
+  - label recall:  expected category kept in the pruned set
+  - model recall:  unpruned accurate-model top-1 kept in the pruned set
+  - accuracy with and without pruning, and the share of NLI pairs saved
+
+Usage:
+    ML_PROVIDER=local python scripts/measure_pruning_recall.py [--top-k 4]
+"""
+import argparse
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import config
+from models.classifier import CATEGORY_LABEL_MAP, CategoryClassifier
+
+
+def load_cases():
+    cases = []
+    for filename, name in (
+        ("test_accuracy.py", "CLASSIFY_TESTS"),
+        ("test_accuracy_extended.py", "CLASSIFY_TESTS_EXT"),
+    ):
+        spec = importlib.util.spec_from_file_location(
+            filename[:-3], os.path.join(ROOT, "tests", filename)
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        cases.extend(getattr(module, name))
+    return cases
+
+
+def top1(scores):
+    return max(scores, key=scores.get)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top-k", type=int, default=config.CLASSIFIER_PRUNE_TOP_K)
+    args = parser.parse_args()
+    config.CLASSIFIER_PRUNE_TOP_K = args.top_k
+
+    classifier = CategoryClassifier(config.CLASSIFIER_MODEL)
+    if classifier._fast_classifier is None:
+        print("Pruning needs the fast cascade model (USE_CASCADE_CLASSIFIER=true).")
+        return
+
+    categories = list(config.INCIDENT_CATEGORIES)
+    labels = [CATEGORY_LABEL_MAP.get(c, c) for c in categories]
+    kwargs = {"hypothesis_template": config.HYPOTHESIS_TEMPLATE}
+    cases = load_cases()
+
+    label_hits = model_hits = correct_full = correct_pruned = 0
+    pairs_full = pairs_pruned = 0
+    misses = []
+    for case in cases:
+        text, expected = case["text"], case["expected"]
+        fast = classifier._fast_classifier(text, candidate_labels=labels, **kwargs)
+        fast_scores = classifier._map_pipeline_scores(fast["labels"], fast["scores"], CATEGORY_LABEL_MAP)
+        subset = classifier._prune_candidates(text, categories, fast_scores)
+
+        full = classifier._classifier(text, candidate_labels=labels, **kwargs)
+        full_scores = classifier._apply_domain_hints(
+            text, classifier._map_pipeline_scores(full["labels"], full["scores"], CATEGORY_LABEL_MAP)
+        )
+        subset_labels = [CATEGORY_LABEL_MAP.get(c, c) for c in subset]
+        pruned = classifier._classifier(text, candidate_labels=subset_labels, **kwargs)
+        pruned_scores = dict.fromkeys(categories, 0.0)
+        pruned_scores.update(
+            classifier._map_pipeline_scores(pruned["labels"], pruned["scores"], CATEGORY_LABEL_MAP)
+        )
+        pruned_scores = classifier._apply_domain_hints(text, pruned_scores)
+
+        label_hits += expected in subset
+        model_hits += top1(full_scores) in subset
+        correct_full += top1(full_scores) == expected
+        correct_pruned += top1(pruned_scores) == expected
+        pairs_full += len(categories)
+        pairs_pruned += len(subset)
+        if expected not in subset:
+            misses.append((expected, subset, text))
+
+    n = len(cases)
+    print("=" * 72)
+    print(f"Hypothesis pruning — top-k={args.top_k}, {n} labelled texts")
+    print("=" * 72)
+    print(f"  label recall        {label_hits / n:6.1%}")
+    print(f"  model top-1 recall  {model_hits / n:6.1%}")
+    print(f"  accuracy unpruned   {correct_full / n:6.1%}")
+    print(f"  accuracy pruned     {correct_pruned / n:6.1%}")
+    print(f"  NLI pairs           {pairs_pruned}/{pairs_full} ({pairs_full / max(1, pairs_pruned):.1f}x fewer)")
+    for expected, subset, text in misses:
+        print(f"  MISS expected={expected} kept={subset}: {text[:60]}")
+
+
+if __name__ == "__main__":
+    main()
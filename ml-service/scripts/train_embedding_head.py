@@ -0,0 +1,139 @@
+"""
+Train the classifier's embedding-head tier from logged accurate-model outputs.
+
+Input is the JSONL written when CLASSIFIER_DISTILL_LOG_PATH is set
+({"text": <redacted text>, "scores": {category: probability}} per line).
+Texts are embedded with the configured EmbeddingModel, then:
+  - prototypes: score-weighted mean embedding per category, seeded with the
+    embedding of the category's zero-shot description
+  - linear head: softmax regression on the soft targets (numpy, L2)
+Held-out agreement with the accurate model is reported overall and on the
+texts the head would decide on its own (both thresholds cleared).
+
+Usage:
+    ML_PROVIDER=local python scripts/train_embedding_head.py distill.jsonl \
+        --out models/embedding_head.npz
+Then set EMBEDDING_HEAD_PATH to the output file.
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import config
+from models.classifier import CATEGORY_LABEL_MAP
+from models.embedding_head import EmbeddingHead, _l2_normalize, _softmax
+from models.embeddings import EmbeddingModel
+
+
+def load_targets(path, categories):
+    texts, targets = [], []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            scores = row.get("scores") or {}
+            target = np.array([float(scores.get(c, 0.0)) for c in categories])
+            if row.get("text") and target.sum() > 0:
+                texts.append(row["text"])
+                targets.append(target / target.sum())
+    return texts, np.array(targets, dtype=np.float32)
+
+
+def fit_prototypes(embeddings, targets, seeds, seed_weight):
+    weighted = targets.T @ embeddings + seed_weight * seeds
+    return _l2_normalize(weighted / (targets.sum(0)[:, None] + seed_weight))
+
+
+def fit_linear_head(embeddings, targets, base_logits, epochs, lr, l2):
+    weight = np.zeros((embeddings.shape[1], targets.shape[1]), dtype=np.float32)
+    bias = np.zeros(targets.shape[1], dtype=np.float32)
+    for _ in range(epochs):
+        probs = _softmax(base_logits + embeddings @ weight + bias)
+        grad = (probs - targets) / len(embeddings)
+        weight -= lr * (embeddings.T @ grad + l2 * weight)
+        bias -= lr * grad.sum(0)
+    return weight, bias
+
+
+def evaluate(head, embeddings, targets, categories):
+    scores = np.array(
+        [[row[c] for c in categories] for row in head.predict(embeddings, categories)]
+    )
+    agree = scores.argmax(1) == targets.argmax(1)
+    ranked = np.sort(scores, axis=1)[:, ::-1]
+    decisive = (ranked[:, 0] >= config.EMBEDDING_HEAD_CONFIDENCE_THRESHOLD) & (
+        ranked[:, 0] - ranked[:, 1] >= config.EMBEDDING_HEAD_MARGIN_THRESHOLD
+    )
+    return {
+        "agreement": float(agree.mean()),
+        "decisive_rate": float(decisive.mean()),
+        "decisive_agreement": float(agree[decisive].mean()) if decisive.any() else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("log", help="distillation JSONL (CLASSIFIER_DISTILL_LOG_PATH)")
+    parser.add_argument("--out", default=os.path.join(ROOT, "models", "embedding_head.npz"))
+    parser.add_argument("--temperature", type=float, default=20.0)
+    parser.add_argument("--seed-weight", type=float, default=1.0)
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--lr", type=float, default=0.5)
+    parser.add_argument("--l2", type=float, default=1e-3)
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--prototypes-only", action="store_true")
+    args = parser.parse_args()
+
+    categories = list(config.INCIDENT_CATEGORIES)
+    texts, targets = load_targets(args.log, categories)
+    if not texts:
+        sys.exit(f"No usable rows in {args.log}")
+
+    model = EmbeddingModel(config.EMBEDDING_MODEL)
+    embeddings = _l2_normalize(np.asarray(model.encode(texts), dtype=np.float32))
+    seeds = _l2_normalize(
+        np.asarray(
+            model.encode([CATEGORY_LABEL_MAP.get(c, c) for c in categories]),
+            dtype=np.float32,
+        )
+    )
+
+    order = np.random.default_rng(0).permutation(len(texts))
+    cut = int(len(texts) * (1 - args.holdout)) if len(texts) > 4 else len(texts)
+    train, held = order[:cut], order[cut:]
+
+    prototypes = fit_prototypes(embeddings[train], targets[train], seeds, args.seed_weight)
+    weight = bias = None
+    if not args.prototypes_only:
+        base_logits = args.temperature * embeddings[train] @ prototypes.T
+        weight, bias = fit_linear_head(
+            embeddings[train], targets[train], base_logits, args.epochs, args.lr, args.l2
+        )
+
+    head = EmbeddingHead(
+        categories,
+        prototypes,
+        weight=weight,
+        bias=bias,
+        temperature=args.temperature,
+        embedding_model=config.EMBEDDING_MODEL,
+    )
+    print(f"Rows: {len(texts)} (train {len(train)}, held-out {len(held)})")
+    print(f"Train:    {evaluate(head, embeddings[train], targets[train], categories)}")
+    if len(held):
+        print(f"Held-out: {evaluate(head, embeddings[held], targets[held], categories)}")
+
+    head.save(args.out)
+    print(f"Saved {args.out}; set EMBEDDING_HEAD_PATH to enable the tier")
+
+
+if __name__ == "__main__":
+    main()
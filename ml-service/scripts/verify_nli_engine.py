@@ -0,0 +1,78 @@
+"""
+Parity check: ZeroShotNLIEngine vs the transformers zero-shot pipeline.
+
+Runs every CLASSIFY_TESTS text from tests/test_accuracy.py through both the
+HF pipeline and the pre-tokenized engine (sharing one loaded model) and
+reports the largest per-label score difference, top-1 agreement, and timing.
+
+Usage:
+    python scripts/verify_nli_engine.py [--model facebook/bart-large-mnli] [--batch 16]
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from transformers import pipeline
+
+import config
+from models.classifier import CATEGORY_LABEL_MAP
+from models.nli_engine import ZeroShotNLIEngine
+
+
+def load_accuracy_texts():
+    spec = importlib.util.spec_from_file_location(
+        "accuracy_data", os.path.join(ROOT, "tests", "test_accuracy.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return [case["text"] for case in module.CLASSIFY_TESTS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default=config.CLASSIFIER_MODEL)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    texts = load_accuracy_texts()
+    labels = [CATEGORY_LABEL_MAP[c] for c in config.INCIDENT_CATEGORIES]
+    kwargs = {"candidate_labels": labels, "hypothesis_template": config.HYPOTHESIS_TEMPLATE}
+
+    pipe = pipeline("zero-shot-classification", model=args.model, device=-1)
+    engine = ZeroShotNLIEngine.from_pipeline(pipe)
+
+    started = time.perf_counter()
+    expected = [pipe(text, **kwargs) for text in texts]
+    pipe_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = []
+    for i in range(0, len(texts), args.batch):
+        actual.extend(engine(texts[i : i + args.batch], **kwargs))
+    engine_s = time.perf_counter() - started
+
+    worst = 0.0
+    agree = 0
+    for want, got in zip(expected, actual):
+        want_scores = dict(zip(want["labels"], want["scores"]))
+        got_scores = dict(zip(got["labels"], got["scores"]))
+        worst = max(worst, max(abs(want_scores[l] - got_scores[l]) for l in labels))
+        agree += want["labels"][0] == got["labels"][0]
+
+    print(f"texts={len(texts)} model={args.model}")
+    print(f"max |score diff| = {worst:.2e}   top-1 agreement = {agree}/{len(texts)}")
+    print(f"pipeline {pipe_s * 1000:.0f}ms   engine {engine_s * 1000:.0f}ms (batch={args.batch})")
+    if worst > args.tolerance:
+        print(f"FAIL: difference exceeds tolerance {args.tolerance}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Per-text embedding cache shared by /embed, /similarity and /analyze.
+
+Vectors are stored as packed float32 bytes under the "embedding" cache prefix,
+keyed by a model namespace plus the text digest. A candidate list is resolved
+with one MGET; only the misses are encoded, together, in a single batch.
+"""
+
+import logging
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_PREFIX = "embedding"
+
+# Encodes a batch of texts; returns one vector per text, in order.
+BatchEncoder = Callable[[List[str]], Awaitable[Sequence[Sequence[float]]]]
+
+
+def pack_vector(vector) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def unpack_vector(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.float32)
+
+
+class EmbeddingStore:
+    """
+    Resolve texts to embeddings through the cache, encoding only the misses.
+
+    Args:
+        cache: AsyncRedisCacheManager (needs get_many_raw / set_many_raw)
+        namespace: Identifies the embedding model, e.g. "<model>@<version>";
+            vectors from different models never share keys.
+    """
+
+    def __init__(self, cache, namespace: str):
+        self._cache = cache
+        self._namespace = namespace
+        self._encoded = 0
+        self._reused = 0
+
+    async def resolve(self, texts: List[str], encode: BatchEncoder) -> np.ndarray:
+        """Return a (len(texts), dim) float32 matrix aligned with texts."""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        unique = list(dict.fromkeys(texts))
+        vectors: Dict[str, np.ndarray] = {}
+        try:
+            cached = await self._cache.get_many_raw(
+                EMBEDDING_PREFIX, unique, model=self._namespace
+            )
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            cached = [None] * len(unique)
+        for text, data in zip(unique, cached):
+            if data:
+                vectors[text] = unpack_vector(data)
+
+        missing = [text for text in unique if text not in vectors]
+        if missing:
+            encoded = await encode(missing)
+            fresh = {
+                text: np.asarray(vector, dtype=np.float32)
+                for text, vector in zip(missing, encoded)
+            }
+            vectors.update(fresh)
+            try:
+                await self._cache.set_many_raw(
+                    EMBEDDING_PREFIX,
+                    {text: pack_vector(vector) for text, vector in fresh.items()},
+                    model=self._namespace,
+                )
+            except Exception as e:
+                logger.warning(f"Embedding cache write failed: {e}")
+
+        self._encoded += len(missing)
+        self._reused += len(texts) - len(missing)
+        return np.stack([vectors[text] for text in texts])
+
+    @property
+    def stats(self) -> Dict[str, object]:
+        return {
+            "namespace": self._namespace,
+            "encoded": self._encoded,
+            "reused": self._reused,
+        }
@@ -0,0 +1,406 @@
+"""
+In-process ANN index of recent incident embeddings for dedup candidate search.
+
+The backend upserts each incident once (id, embedding, timestamp, lat/lon)
+and then asks for the top-k neighbours of a new report by id, instead of
+shipping every nearby candidate's text to /similarity or /analyze to be
+re-embedded on each request.
+
+The index is IVF-flat in numpy: unit vectors are assigned to the nearest of
+`nlist` centroids (spherical k-means), and a query scores only the vectors in
+its `nprobe` closest lists, exactly (inner product = cosine similarity).
+Until there are enough vectors to train centroids, every search is a flat
+scan. Centroids are retrained once as many upserts as the index held at the
+last training have arrived, so the lists follow the live data as old entries
+age out. Training runs on a snapshot, in a background thread when
+`background_training` is set, and the new centroids are swapped in under the
+index lock when it finishes; searches meanwhile use the old ones.
+
+Entries more than the dedup time window in the past can no longer match a
+new report and are evicted on upsert; searches also filter by the time
+window and the dedup radius around the query, so eviction (a compaction of
+every row) only runs once the oldest entry is a tenth of the window past the
+cutoff, and an index over max_entries sheds a twentieth of its oldest
+entries at once.
+
+All methods are thread-safe.
+
+The index lives in the worker's memory and starts empty: with several
+workers each holds only the incidents upserted through it, which is why
+main.py refuses the /dedup index endpoints under a multi-worker prefork.
+"""
+
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_EARTH_RADIUS_METERS = 6_371_000.0
+HOUR = 3600.0
+
+# (incident_id, embedding, timestamp in epoch seconds, lat, lon)
+Item = Tuple[str, object, float, float, float]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def haversine_meters(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance from (lat, lon) to each (lats[i], lons[i])."""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = (
+        np.sin((lat2 - lat1) / 2.0) ** 2
+        + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    )
+    return 2.0 * _EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def spherical_kmeans(
+    vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0
+) -> np.ndarray:
+    """k unit centroids for unit `vectors` (k is capped at the vector count)."""
+    rng = np.random.default_rng(seed)
+    k = min(k, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        for cluster in range(k):
+            members = vectors[assign == cluster]
+            if len(members):
+                centroids[cluster] = members.sum(axis=0)
+            else:
+                # Re-seed an empty list on a random vector.
+                centroids[cluster] = vectors[rng.integers(len(vectors))]
+        centroids = _normalize(centroids)
+    return centroids
+
+
+_BUFFERS = ("_vector_buf", "_timestamp_buf", "_lat_buf", "_lon_buf", "_list_buf", "_seq_buf")
+
+
+class VectorIndex:
+    """
+    Args:
+        nlist: Number of inverted lists (k-means centroids).
+        nprobe: Lists scanned per query; nprobe >= nlist is an exact search.
+        window_hours: Dedup time window; older entries are evicted and
+            neighbours must be within this many hours of the query.
+        radius_meters: Default search radius around the query location.
+        max_entries: Hard cap; the oldest entries go first beyond it.
+        train_factor: Train centroids once there are nlist * train_factor vectors.
+        clock: Current time in epoch seconds, for eviction.
+        background_training: Retrain in a daemon thread instead of inside upsert.
+    """
+
+    def __init__(
+        self,
+        nlist: int = 64,
+        nprobe: int = 8,
+        window_hours: float = 4.0,
+        radius_meters: float = 1000.0,
+        max_entries: int = 100_000,
+        train_factor: int = 8,
+        clock: Callable[[], float] = time.time,
+        background_training: bool = False,
+    ):
+        self.nlist = max(1, nlist)
+        self.nprobe = max(1, nprobe)
+        self.window_seconds = window_hours * HOUR
+        self.radius_meters = radius_meters
+        self.max_entries = max(1, max_entries)
+        self._train_size = self.nlist * max(1, train_factor)
+        self._clock = clock
+        self._background_training = background_training
+        self._lock = threading.RLock()
+        self._train_lock = threading.Lock()
+
+        self._dim: Optional[int] = None
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        # Row buffers grow by doubling; only the first len(self) rows are live.
+        self._vector_buf = np.zeros((0, 0), dtype=np.float32)
+        self._timestamp_buf = np.zeros(0, dtype=np.float64)
+        self._lat_buf = np.zeros(0, dtype=np.float64)
+        self._lon_buf = np.zeros(0, dtype=np.float64)
+        self._list_buf = np.zeros(0, dtype=np.int32)
+        # Write sequence number per row: tells training which rows changed
+        # while it worked on its snapshot.
+        self._seq_buf = np.zeros(0, dtype=np.int64)
+        self._oldest = math.inf  # lower bound on the live timestamps
+        self._centroids: Optional[np.ndarray] = None
+        self._trained_size = 0
+        self._trained_upserts = 0
+
+        self._upserts = 0
+        self._evicted = 0
+        self._searches = 0
+        self._scanned = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, incident_id: str) -> bool:
+        return incident_id in self._rows
+
+    @property
+    def _vectors(self) -> np.ndarray:
+        return self._vector_buf[: len(self)]
+
+    @property
+    def _timestamps(self) -> np.ndarray:
+        return self._timestamp_buf[: len(self)]
+
+    @property
+    def _lats(self) -> np.ndarray:
+        return self._lat_buf[: len(self)]
+
+    @property
+    def _lons(self) -> np.ndarray:
+        return self._lon_buf[: len(self)]
+
+    @property
+    def _lists(self) -> np.ndarray:
+        return self._list_buf[: len(self)]
+
+    def _reserve_row(self) -> int:
+        row = len(self._ids)
+        if row == len(self._timestamp_buf):
+            capacity = max(64, 2 * row)
+            for name in _BUFFERS:
+                old = getattr(self, name)
+                grown = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+                grown[:row] = old[:row]
+                setattr(self, name, grown)
+        return row
+
+    # ── Writes ────────────────────────────────────────────────────────────────
+
+    def upsert(
+        self,
+        incident_id: str,
+        embedding,
+        timestamp: float,
+        lat: float,
+        lon: float,
+    ) -> None:
+        """Insert or replace one incident (timestamp in epoch seconds)."""
+        self.upsert_many([(incident_id, embedding, timestamp, lat, lon)])
+
+    def upsert_many(self, items: Iterable[Item]) -> None:
+        """
+        Insert or replace several incidents. Every embedding is checked
+        before anything is written: a ValueError leaves the index unchanged.
+        """
+        items = list(items)
+        vectors = [_normalize(np.asarray(item[1], dtype=np.float32).reshape(-1)) for item in items]
+        with self._lock:
+            dim = self._dim if self._dim is not None else (len(vectors[0]) if vectors else None)
+            for vector in vectors:
+                if len(vector) != dim:
+                    raise ValueError(f"Embedding has {len(vector)} dimensions, index has {dim}")
+            if self._dim is None and dim is not None:
+                self._dim = dim
+                self._vector_buf = np.zeros((0, dim), dtype=np.float32)
+
+            for (incident_id, _, timestamp, lat, lon), vector in zip(items, vectors):
+                row = self._rows.get(incident_id)
+                if row is None:
+                    row = self._reserve_row()
+                    self._rows[incident_id] = row
+                    self._ids.append(incident_id)
+                self._upserts += 1
+                self._vector_buf[row] = vector
+                self._timestamp_buf[row] = timestamp
+                self._lat_buf[row] = lat
+                self._lon_buf[row] = lon
+                self._list_buf[row] = self._nearest_list(vector)
+                self._seq_buf[row] = self._upserts
+                self._oldest = min(self._oldest, timestamp)
+
+            self._evict()
+            due = self._training_due()
+        if due:
+            if self._background_training:
+                threading.Thread(target=self.train, name="vector-index-train", daemon=True).start()
+            else:
+                self.train()
+
+    def remove(self, incident_id: str) -> bool:
+        with self._lock:
+            row = self._rows.get(incident_id)
+            if row is None:
+                return False
+            self._drop(np.array([row]))
+            return True
+
+    def evict(self) -> int:
+        """Drop entries older than the time window (and beyond max_entries)."""
+        with self._lock:
+            return self._evict(force=True)
+
+    def _evict(self, force: bool = False) -> int:
+        if not len(self):
+            return 0
+        cutoff = self._clock() - self.window_seconds
+        overflow = len(self) - self.max_entries
+        if not force and overflow <= 0 and self._oldest >= cutoff - 0.1 * self.window_seconds:
+            return 0
+        stale = np.flatnonzero(self._timestamps < cutoff)
+        if overflow > 0:
+            # Shed a margin below the cap so the next inserts do not compact again.
+            overflow = len(self) - len(stale) - (self.max_entries - self.max_entries // 20)
+        if overflow > 0:
+            keep = np.setdiff1d(np.arange(len(self)), stale)
+            oldest = keep[np.argsort(self._timestamps[keep])[:overflow]]
+            stale = np.concatenate([stale, oldest])
+        if len(stale):
+            self._drop(stale)
+        self._oldest = float(self._timestamps.min()) if len(self) else math.inf
+        return len(stale)
+
+    def _drop(self, rows: np.ndarray) -> None:
+        keep = np.ones(len(self), dtype=bool)
+        keep[rows] = False
+        kept = int(keep.sum())
+        for name in _BUFFERS:
+            buf = getattr(self, name)
+            buf[:kept] = buf[: len(self)][keep]
+        self._evicted += len(self) - kept
+        self._ids = [incident_id for incident_id, live in zip(self._ids, keep) if live]
+        self._rows = {incident_id: row for row, incident_id in enumerate(self._ids)}
+
+    # ── IVF lists ─────────────────────────────────────────────────────────────
+
+    def _nearest_list(self, vector: np.ndarray) -> int:
+        if self._centroids is None:
+            return 0
+        return int(np.argmax(self._centroids @ vector))
+
+    def _training_due(self) -> bool:
+        return len(self) >= self._train_size and (
+            self._upserts - self._trained_upserts >= self._trained_size
+        )
+
+    def train(self) -> bool:
+        """
+        Retrain the centroids if due; False if another training is running.
+        k-means runs on a snapshot without holding the index lock.
+        """
+        if not self._train_lock.acquire(blocking=False):
+            return False
+        try:
+            with self._lock:
+                if not self._training_due():
+                    return True
+                vectors = self._vectors.copy()
+                seqs = self._seq_buf[: len(self)].copy()
+                # Claim this round so upserts meanwhile do not start another.
+                self._trained_size = len(self)
+                self._trained_upserts = self._upserts
+
+            centroids = spherical_kmeans(vectors, self.nlist)
+            assigned = np.argmax(vectors @ centroids.T, axis=1).astype(np.int32)
+            order = np.argsort(seqs)
+            sorted_seqs = seqs[order]
+
+            with self._lock:
+                # Rows written since the snapshot are assigned here.
+                current = self._seq_buf[: len(self)]
+                position = np.minimum(np.searchsorted(sorted_seqs, current), len(seqs) - 1)
+                unchanged = sorted_seqs[position] == current
+                lists = np.empty(len(self), dtype=np.int32)
+                lists[unchanged] = assigned[order[position[unchanged]]]
+                changed = np.flatnonzero(~unchanged)
+                if len(changed):
+                    lists[changed] = np.argmax(self._vectors[changed] @ centroids.T, axis=1)
+                self._lists[:] = lists
+                self._centroids = centroids
+            return True
+        finally:
+            self._train_lock.release()
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def vector(self, incident_id: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._rows.get(incident_id)
+            return None if row is None else self._vectors[row].copy()
+
+    def search(
+        self,
+        embedding,
+        timestamp: float,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None,
+        k: int = 20,
+        radius_meters: Optional[float] = None,
+        exclude: Optional[str] = None,
+    ) -> List[Dict[str, object]]:
+        """
+        Top-k neighbours by cosine similarity among entries within the time
+        window of `timestamp` and, when a location is given, within
+        `radius_meters` (default: the index radius) of it.
+        """
+        query = _normalize(np.asarray(embedding, dtype=np.float32).reshape(-1))
+        with self._lock:
+            self._searches += 1
+            if not len(self) or k <= 0:
+                return []
+            if len(query) != self._dim:
+                raise ValueError(
+                    f"Embedding has {len(query)} dimensions, index has {self._dim}"
+                )
+
+            # Cheap filters first: the list and time masks; distances only for survivors.
+            mask = np.abs(self._timestamps - timestamp) <= self.window_seconds
+            if self._centroids is not None and self.nprobe < len(self._centroids):
+                probes = np.argsort(-(self._centroids @ query))[: self.nprobe]
+                mask &= np.isin(self._lists, probes)
+            if exclude is not None and exclude in self._rows:
+                mask[self._rows[exclude]] = False
+            rows = np.flatnonzero(mask)
+            distances = None
+            if lat is not None and lon is not None:
+                distances = haversine_meters(lat, lon, self._lats[rows], self._lons[rows])
+                radius = self.radius_meters if radius_meters is None else radius_meters
+                nearby = distances <= radius
+                rows, distances = rows[nearby], distances[nearby]
+
+            self._scanned += len(rows)
+            if not len(rows):
+                return []
+            scores = self._vectors[rows] @ query
+            top = np.argsort(-scores)[:k]
+            hours = np.abs(self._timestamps[rows[top]] - timestamp) / HOUR
+            return [
+                {
+                    "incident_id": self._ids[rows[i]],
+                    "score": round(float(scores[i]), 4),
+                    "distance_meters": (
+                        None if distances is None else round(float(distances[i]), 1)
+                    ),
+                    "hours_apart": round(float(apart), 2),
+                }
+                for i, apart in zip(top, hours)
+            ]
+
+    @property
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "entries": len(self),
+                "dimensions": self._dim,
+                "trained_lists": 0 if self._centroids is None else len(self._centroids),
+                "nprobe": self.nprobe,
+                "window_hours": self.window_seconds / HOUR,
+                "upserts": self._upserts,
+                "evicted": self._evicted,
+                "searches": self._searches,
+                "avg_scanned": round(self._scanned / self._searches, 1) if self._searches else 0.0,
+                "training": self._train_lock.locked(),
+            }
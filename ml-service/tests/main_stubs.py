@@ -0,0 +1,88 @@
+"""
+Import `main` without google-genai, torch or Redis: the heavy modules it
+imports are replaced by stubs unless another test module already loaded
+them. Endpoint tests call import_main() at module level.
+"""
+
+import importlib
+import importlib.util
+import os
+import sys
+import types
+
+
+_SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class DummyCache:
+    stats = {"backend": "test"}
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get(self, *args, **kwargs):
+        return None
+
+    def set(self, *args, **kwargs):
+        return None
+
+    def clear_prefix(self, *args, **kwargs):
+        return 0
+
+    def invalidate_on_model_update(self, *args, **kwargs):
+        return 0
+
+    def reconnect(self):
+        return False
+
+
+def stub_google() -> None:
+    """Stand in for google-genai when it is not installed."""
+    try:
+        has_google = importlib.util.find_spec("google") is not None
+        has_genai = importlib.util.find_spec("google.genai") is not None
+        if has_google and has_genai:
+            return
+    except Exception:
+        pass
+    google_module = sys.modules.get("google") or types.ModuleType("google")
+    if not hasattr(google_module, "__path__"):
+        google_module.__path__ = []
+    genai_module = types.ModuleType("google.genai")
+    genai_module.Client = object
+    genai_module.types = types.SimpleNamespace()
+    google_module.genai = genai_module
+    sys.modules["google"] = google_module
+    sys.modules["google.genai"] = genai_module
+
+
+def import_main():
+    stub_google()
+    for module_name, class_name in (
+        ("models.embeddings", "EmbeddingModel"),
+        ("models.classifier", "CategoryClassifier"),
+        ("models.toxicity", "ToxicityDetector"),
+        ("models.risk", "RiskScorer"),
+    ):
+        module = types.ModuleType(module_name)
+        setattr(module, class_name, object)
+        sys.modules.setdefault(module_name, module)
+
+    cache_module = types.ModuleType("cache_manager")
+    cache_module.RedisCacheManager = DummyCache
+    cache_module.AsyncRedisCacheManager = DummyCache
+    cache_module.InMemoryLRUCache = DummyCache
+    cache_module.MODEL_PREFIX_MAP = {}
+    sys.modules.setdefault("cache_manager", cache_module)
+    return importlib.import_module("main")
+
+
+def load_cache_manager():
+    """The real cache_manager, loaded from its file under a private name."""
+    spec = importlib.util.spec_from_file_location(
+        "_cache_manager_under_test",
+        os.path.join(_SERVICE_DIR, "cache_manager.py"),
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,57 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+from models import artifact_store
+from models.artifact_store import ArtifactStore, load_safetensors, write_manifest
+
+HAS_SAFETENSORS = all(
+    importlib.util.find_spec(name) is not None for name in ("torch", "safetensors")
+)
+
+
+@unittest.skipUnless(HAS_SAFETENSORS, "torch/safetensors are not installed")
+class LoadSafetensorsTests(unittest.TestCase):
+    def test_tensors_and_metadata_round_trip(self):
+        import torch
+        from safetensors.torch import save_file
+
+        weight = torch.arange(6, dtype=torch.float32).reshape(2, 3)
+        ids = torch.tensor([7, 8, 9], dtype=torch.int64)
+        half = torch.tensor([1.5, 2.0], dtype=torch.bfloat16)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, artifact_store.WEIGHTS)
+            save_file({"w": weight, "ids": ids, "h": half}, path, metadata={"aliases": "{}"})
+
+            tensors, metadata = load_safetensors(path)
+
+            self.assertTrue(torch.equal(tensors["w"], weight))
+            self.assertTrue(torch.equal(tensors["ids"], ids))
+            self.assertEqual(tensors["h"].dtype, torch.bfloat16)
+            self.assertEqual(metadata, {"aliases": "{}"})
+
+
+class ArtifactStoreTests(unittest.TestCase):
+    def test_manifest_must_match_the_configured_model(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = os.path.join(tmp, "classifier")
+            os.makedirs(directory)
+            write_manifest(directory, "org/model", "float32", {"model_class": "X"})
+            store = ArtifactStore(tmp)
+
+            self.assertEqual(store.manifest("classifier", "org/model")["model_class"], "X")
+            self.assertEqual(store.local_dir("classifier", "org/model"), directory)
+            self.assertIsNone(store.manifest("classifier", "org/other"))
+            self.assertIsNone(store.manifest("toxicity", "detoxify-original"))
+
+    def test_disabled_store_never_finds_artifacts(self):
+        store = ArtifactStore("")
+
+        self.assertIsNone(store.local_dir("embedding", "any"))
+        self.assertIsNone(store.load_hf_model("classifier", "any"))
+        self.assertEqual(store.stats, {"root": None, "loaded": {}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,349 @@
+import asyncio
+import importlib.util
+import os
+import time
+import unittest
+
+from redis.exceptions import RedisError
+
+# Other test modules replace `cache_manager` in sys.modules with a stub before
+# importing main, so load the real module straight from its file.
+_spec = importlib.util.spec_from_file_location(
+    "_cache_manager_under_test",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache_manager.py"),
+)
+cache_manager = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(cache_manager)
+
+
+class FakeAsyncRedis:
+    """Minimal stand-in for redis.asyncio.Redis with optional per-call latency."""
+
+    def __init__(self, delay: float = 0.0):
+        self.store = {}
+        self.ttls = {}
+        self.zsets = {}
+        self.delay = delay
+        self.fail = False
+        self.calls = 0
+
+    async def _io(self):
+        self.calls += 1
+        if self.fail:
+            raise RedisError("redis down")
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+    async def ping(self):
+        await self._io()
+        return True
+
+    async def get(self, key):
+        await self._io()
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        await self._io()
+        self.store[key] = value.encode() if isinstance(value, str) else value
+        self.ttls[key] = ttl
+
+    async def incr(self, key):
+        await self._io()
+        value = int(self.store.get(key, b"0")) + 1
+        self.store[key] = str(value).encode()
+        return value
+
+    async def delete(self, *keys):
+        await self._io()
+        return sum(1 for key in keys if self.store.pop(key, None) is not None)
+
+    unlink = delete
+
+    async def scan_iter(self, match=None, count=None):
+        await self._io()
+        prefix = (match or "*").rstrip("*")
+        for key in list(self.store):
+            if key.startswith(prefix):
+                yield key
+
+    async def mget(self, keys):
+        await self._io()
+        return [self.store.get(key) for key in keys]
+
+    async def zincrby(self, name, amount, member):
+        await self._io()
+        zset = self.zsets.setdefault(name, {})
+        zset[member] = zset.get(member, 0) + amount
+        return zset[member]
+
+    async def zrevrange(self, name, start, end):
+        await self._io()
+        ranked = sorted(self.zsets.get(name, {}).items(), key=lambda item: -item[1])
+        return [member.encode() for member, _ in ranked[start : end + 1]]
+
+    async def zremrangebyrank(self, name, start, end):
+        await self._io()
+        return 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def info(self):
+        await self._io()
+        return {"used_memory_human": "1M", "connected_clients": 1}
+
+    async def aclose(self, close_connection_pool=None):
+        return None
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._ops = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._ops.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        return [await getattr(self._redis, name)(*a, **kw) for name, a, kw in self._ops]
+
+
+async def _connected_cache(fake, **kwargs):
+    cache = cache_manager.AsyncRedisCacheManager(ttl_map={"classify": 60}, **kwargs)
+    cache._redis = fake
+    await cache.connect()
+    return cache
+
+
+class AsyncRedisCacheManagerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_round_trip_uses_prefix_ttl(self):
+        fake = FakeAsyncRedis()
+        cache = await _connected_cache(fake)
+
+        await cache.set("classify", "smoke in alley", {"predicted_category": "fire"}, pv="v1")
+        value = await cache.get("classify", "smoke in alley", pv="v1")
+
+        self.assertEqual(value, {"predicted_category": "fire"})
+        self.assertEqual(list(fake.ttls.values()), [60])
+        self.assertEqual(cache.stats["hits"], 1)
+        self.assertEqual(cache.stats["backend"], "redis-asyncio")
+
+    async def test_slow_redis_does_not_block_event_loop(self):
+        cache = await _connected_cache(FakeAsyncRedis(delay=0.2))
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        await asyncio.gather(cache.get("classify", "slow"), ticker())
+
+        self.assertEqual(ticks, 10)
+
+    async def test_redis_error_falls_back_and_retries_later(self):
+        fake = FakeAsyncRedis()
+        cache = await _connected_cache(fake, retry_interval=0.05)
+
+        fake.fail = True
+        await cache.set("classify", "text", {"value": 1})
+        self.assertFalse(cache.stats["redis_connected"])
+        self.assertEqual(await cache.get("classify", "text"), {"value": 1})
+
+        fake.fail = False
+        cache._retry_at = time.monotonic() - 1
+        await cache.set("classify", "text", {"value": 2})
+        self.assertTrue(cache.stats["redis_connected"])
+        self.assertEqual(await cache.get("classify", "text"), {"value": 2})
+
+    async def test_keys_are_namespaced_by_prefix_and_generation(self):
+        fake = FakeAsyncRedis()
+        cache = await _connected_cache(fake)
+
+        await cache.set("classify", "text", {"value": 1})
+
+        (key,) = fake.store
+        prefix, generation, digest = key.split(":")
+        self.assertEqual((prefix, generation), ("classify", "0"))
+        self.assertEqual(len(digest), 32)
+
+    async def test_invalidation_bumps_generation_in_constant_time(self):
+        fake = FakeAsyncRedis()
+        cache = await _connected_cache(fake)
+        await cache.set("classify", "text", {"value": 1})
+
+        await cache.invalidate_on_model_update("classifier")
+
+        self.assertIsNone(await cache.get("classify", "text"))
+        self.assertEqual(await cache.generation("classify"), 1)
+        self.assertEqual(fake.store["cachegen:classify"], b"1")
+        # The old entry is orphaned, not deleted; its TTL reclaims it.
+        self.assertEqual(len([k for k in fake.store if k.startswith("classify:")]), 1)
+
+    async def test_embedding_invalidation_also_bumps_similarity(self):
+        cache = await _connected_cache(FakeAsyncRedis())
+
+        await cache.invalidate_on_model_update("embedding")
+
+        self.assertEqual(await cache.generation("embedding"), 1)
+        self.assertEqual(await cache.generation("similarity"), 1)
+        self.assertEqual(await cache.generation("classify"), 0)
+
+    async def test_other_replicas_observe_bump_after_refresh(self):
+        fake = FakeAsyncRedis()
+        writer = await _connected_cache(fake, generation_refresh=0)
+        reader = await _connected_cache(fake, generation_refresh=0)
+        await writer.set("classify", "text", {"value": 1})
+        self.assertEqual(await reader.get("classify", "text"), {"value": 1})
+
+        await writer.clear_prefix("classify")
+
+        self.assertIsNone(await reader.get("classify", "text"))
+
+    async def test_sweep_removes_only_superseded_generations(self):
+        fake = FakeAsyncRedis()
+        cache = await _connected_cache(fake)
+        await cache.set("classify", "old", {"value": 1})
+        await cache.bump_generation("classify")
+        await cache.set("classify", "new", {"value": 2})
+
+        removed = await cache.sweep_stale_generations(["classify"])
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(await cache.get("classify", "new"), {"value": 2})
+        self.assertIn("cachegen:classify", fake.store)
+
+    async def test_sweep_keeps_newer_generations_and_unknown_keys(self):
+        fake = FakeAsyncRedis()
+        cache = await _connected_cache(fake)
+        await cache.bump_generation("classify")
+        # Written by a replica that bumped again after this one read "1".
+        fake.store["classify:2:" + "a" * 32] = b"{}"
+        fake.store["classify:0:" + "b" * 32] = b"{}"
+        fake.store["classify:legacy:" + "c" * 32] = b"{}"
+
+        removed = await cache.sweep_stale_generations(["classify"])
+
+        self.assertEqual(removed, 1)
+        self.assertIn("classify:2:" + "a" * 32, fake.store)
+        self.assertIn("classify:legacy:" + "c" * 32, fake.store)
+        self.assertNotIn("classify:0:" + "b" * 32, fake.store)
+
+    async def test_l1_serves_hot_keys_without_redis_round_trip(self):
+        fake = FakeAsyncRedis()
+        cache = await _connected_cache(
+            fake, l1_cache=cache_manager.InMemoryLRUCache(max_bytes=4096, ttl_seconds=30)
+        )
+        await cache.set("classify", "text", {"value": 1})
+        calls_after_set = fake.calls
+
+        self.assertEqual(await cache.get("classify", "text"), {"value": 1})
+        self.assertEqual(fake.calls, calls_after_set)
+        self.assertEqual(cache.stats["l1"]["hits"], 1)
+        self.assertEqual(cache.stats["l2"]["hits"], 0)
+
+    async def test_l1_is_populated_from_redis_hits(self):
+        fake = FakeAsyncRedis()
+        writer = await _connected_cache(fake)
+        await writer.set("classify", "text", {"value": 1})
+        reader = await _connected_cache(
+            fake, l1_cache=cache_manager.InMemoryLRUCache(max_bytes=4096, ttl_seconds=30)
+        )
+
+        await reader.get("classify", "text")
+        await reader.get("classify", "text")
+
+        self.assertEqual(reader.stats["l2"]["hits"], 1)
+        self.assertEqual(reader.stats["l1"]["hits"], 1)
+
+    async def test_l1_invalidates_with_generation(self):
+        fake = FakeAsyncRedis()
+        cache = await _connected_cache(
+            fake, l1_cache=cache_manager.InMemoryLRUCache(max_bytes=4096, ttl_seconds=30)
+        )
+        await cache.set("classify", "text", {"value": 1})
+
+        await cache.clear_prefix("classify")
+
+        self.assertIsNone(await cache.get("classify", "text"))
+
+    async def test_prefill_loads_hottest_current_generation_keys(self):
+        fake = FakeAsyncRedis()
+        writer = await _connected_cache(fake, hot_keys_tracked=10)
+        for text in ("hot", "warm", "cold"):
+            await writer.set("classify", text, {"text": text})
+        for _ in range(3):
+            await writer.get("classify", "hot")
+        await writer.get("classify", "warm")
+
+        l1 = cache_manager.InMemoryLRUCache(max_bytes=4096, ttl_seconds=30)
+        reader = await _connected_cache(fake, l1_cache=l1)
+        loaded = await reader.prefill_l1(limit=2)
+
+        self.assertEqual(loaded, 2)
+        self.assertEqual(l1.stats["size"], 2)
+        calls = fake.calls
+        self.assertEqual(await reader.get("classify", "hot"), {"text": "hot"})
+        self.assertEqual(fake.calls, calls)
+
+    async def test_raw_batch_uses_one_mget_and_one_pipeline(self):
+        fake = FakeAsyncRedis()
+        cache = await _connected_cache(fake)
+        await cache.set_many_raw("embedding", {"a": b"\x00\x01", "b": b"\x02"}, model="m")
+        calls = fake.calls
+
+        values = await cache.get_many_raw("embedding", ["a", "missing", "b"], model="m")
+
+        self.assertEqual(values, [b"\x00\x01", None, b"\x02"])
+        self.assertEqual(fake.calls, calls + 1)
+        self.assertEqual(cache.stats["misses"], 1)
+
+    async def test_raw_batch_falls_back_when_redis_is_down(self):
+        fake = FakeAsyncRedis()
+        cache = await _connected_cache(fake)
+        fake.fail = True
+
+        await cache.set_many_raw("embedding", {"a": b"\x00"}, model="m")
+
+        self.assertEqual(await cache.get_many_raw("embedding", ["a"], model="m"), [b"\x00"])
+
+    async def test_unconnected_cache_uses_fallback_only(self):
+        cache = cache_manager.AsyncRedisCacheManager()
+
+        await cache.set("toxicity", "text", {"is_toxic": False})
+
+        self.assertEqual(await cache.get("toxicity", "text"), {"is_toxic": False})
+        self.assertEqual(cache.stats["backend"], "in-memory (fallback)")
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class InMemoryLRUCacheByteBudgetTests(unittest.TestCase):
+    def test_evicts_least_recently_used_when_over_byte_budget(self):
+        l1 = cache_manager.InMemoryLRUCache(max_size=100, max_bytes=200)
+        l1.set_by_key("classify:0:a", "a", size_bytes=80)
+        l1.set_by_key("classify:0:b", "b", size_bytes=80)
+        l1.get_by_key("classify:0:a")
+
+        l1.set_by_key("classify:0:c", "c", size_bytes=80)
+
+        self.assertIsNone(l1.get_by_key("classify:0:b"))
+        self.assertEqual(l1.get_by_key("classify:0:a"), "a")
+        self.assertLessEqual(l1.stats["bytes"], 200)
+        self.assertEqual(l1.stats["evictions"], 1)
+
+    def test_rejects_values_larger_than_the_whole_budget(self):
+        l1 = cache_manager.InMemoryLRUCache(max_bytes=50)
+        l1.set_by_key("classify:0:a", "a", size_bytes=10)
+
+        l1.set_by_key("classify:0:big", "x", size_bytes=500)
+
+        self.assertIsNone(l1.get_by_key("classify:0:big"))
+        self.assertEqual(l1.get_by_key("classify:0:a"), "a")
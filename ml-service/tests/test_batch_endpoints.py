@@ -0,0 +1,311 @@
+import asyncio
+import importlib.util
+import json
+import sys
+import types
+import unittest
+import unittest.mock
+
+from pydantic import ValidationError
+
+# ── Stub heavy/optional deps so `import main` works without google-genai/torch ──
+try:
+    has_google = importlib.util.find_spec("google") is not None
+    has_genai = importlib.util.find_spec("google.genai") is not None
+    if not has_google or not has_genai:
+        raise ImportError
+except Exception:
+    google_module = sys.modules.get("google") or types.ModuleType("google")
+    if not hasattr(google_module, "__path__"):
+        google_module.__path__ = []
+    genai_module = types.ModuleType("google.genai")
+    genai_module.Client = object
+    genai_module.types = types.SimpleNamespace()
+    google_module.genai = genai_module
+    sys.modules["google"] = google_module
+    sys.modules["google.genai"] = genai_module
+
+for module_name, class_names in {
+    "models.embeddings": ("EmbeddingModel",),
+    "models.classifier": ("CategoryClassifier",),
+    "models.toxicity": ("ToxicityDetector",),
+    "models.risk": ("RiskScorer",),
+}.items():
+    module = types.ModuleType(module_name)
+    for class_name in class_names:
+        setattr(module, class_name, object)
+    sys.modules.setdefault(module_name, module)
+
+cache_module = types.ModuleType("cache_manager")
+
+
+class DummyCache:
+    stats = {"backend": "test"}
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get(self, *args, **kwargs):
+        return None
+
+    def set(self, *args, **kwargs):
+        return None
+
+    def clear_prefix(self, *args, **kwargs):
+        return 0
+
+    def invalidate_on_model_update(self, *args, **kwargs):
+        return 0
+
+    def reconnect(self):
+        return False
+
+
+cache_module.RedisCacheManager = DummyCache
+cache_module.AsyncRedisCacheManager = DummyCache
+cache_module.InMemoryLRUCache = DummyCache
+cache_module.MODEL_PREFIX_MAP = {}
+sys.modules.setdefault("cache_manager", cache_module)
+
+import main
+from providers.cached import CachedProvider
+
+
+class FakeBatchCache:
+    """Async cache with get_many/set; records how lookups were batched."""
+
+    def __init__(self, entries=None):
+        self.entries = dict(entries or {})
+        self.get_many_calls = []
+
+    def fingerprint(self, prefix, text, **kwargs):
+        return f"{prefix}:{text}:{sorted(kwargs.items())}"
+
+    async def get(self, prefix, text, **kwargs):
+        return self.entries.get((prefix, text))
+
+    async def get_many(self, prefix, texts, **kwargs):
+        self.get_many_calls.append((prefix, list(texts)))
+        return [self.entries.get((prefix, text)) for text in texts]
+
+    async def set(self, prefix, text, value, **kwargs):
+        self.entries[(prefix, text)] = value
+
+
+class FakeProvider:
+    def __init__(self, slow_texts=()):
+        self.slow_texts = set(slow_texts)
+        self.classified = []
+
+    def batching_stats(self):
+        return {}
+
+    async def classify(self, text, categories):
+        self.classified.append(text)
+        if text in self.slow_texts:
+            await asyncio.sleep(0.05)
+        if text == "unclassifiable":
+            return None
+        return {"predicted_category": "fire", "confidence": 0.9, "all_scores": {"fire": 0.9}}
+
+    async def detect_toxicity(self, text):
+        return {"is_toxic": False, "toxicity_score": 0.01, "is_severe": False, "details": {}}
+
+    async def compute_risk(self, **kwargs):
+        self.risk_inputs = kwargs
+        return {"risk_score": 0.2, "is_high_risk": False, "is_critical": False, "breakdown": {}}
+
+
+async def _read_ndjson(response):
+    lines = []
+    async for chunk in response.body_iterator:
+        lines.append(json.loads(chunk))
+    return lines
+
+
+class BatchEndpointTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.previous = (main.active_provider, main.cache)
+
+    def tearDown(self):
+        main.active_provider, main.cache = self.previous
+
+    async def test_classify_batch_serves_hits_first_and_computes_misses(self):
+        main.cache = FakeBatchCache(
+            {
+                ("classify", "cached text"): {
+                    "predicted_category": "theft",
+                    "confidence": 0.8,
+                    "all_scores": {"theft": 0.8},
+                }
+            }
+        )
+        provider = FakeProvider(slow_texts={"slow text"})
+        main.active_provider = CachedProvider(provider, main.cache)
+        request = main.ClassifyBatchRequest(
+            items=[{"text": "slow text"}, {"text": "cached text"}, {"text": "fast text"}]
+        )
+
+        lines = await _read_ndjson(await main.classify_batch(request))
+
+        self.assertEqual([line["index"] for line in lines], [1, 2, 0])
+        self.assertEqual(lines[0]["result"]["predicted_category"], "theft")
+        self.assertEqual(lines[2]["result"]["predicted_category"], "fire")
+        self.assertEqual(len(main.cache.get_many_calls), 1)
+        self.assertEqual(sorted(provider.classified), ["fast text", "slow text"])
+
+    async def test_item_failures_are_reported_per_line(self):
+        main.cache = FakeBatchCache()
+        main.active_provider = CachedProvider(FakeProvider(), main.cache)
+        request = main.ClassifyBatchRequest(
+            items=[{"text": "unclassifiable"}, {"text": "smoke"}]
+        )
+
+        lines = {line["index"]: line for line in await _read_ndjson(await main.classify_batch(request))}
+
+        self.assertEqual(lines[0]["error"], "Could not classify text")
+        self.assertIn("result", lines[1])
+
+    async def test_toxicity_and_risk_batches_stream_every_item(self):
+        main.cache = FakeBatchCache()
+        main.active_provider = CachedProvider(FakeProvider(), main.cache)
+
+        toxicity = await _read_ndjson(
+            await main.toxicity_batch(main.ToxicityBatchRequest(items=[{"text": "a"}, {"text": "b"}]))
+        )
+        risk = await _read_ndjson(
+            await main.risk_batch(main.RiskBatchRequest(items=[{"text": "a"}, {"text": "b"}]))
+        )
+
+        self.assertEqual(sorted(line["index"] for line in toxicity), [0, 1])
+        self.assertEqual(sorted(line["index"] for line in risk), [0, 1])
+        self.assertEqual(risk[0]["result"]["risk_score"], 0.2)
+
+    async def test_risk_batch_looks_up_each_input_group_once(self):
+        cached = {"risk_score": 0.7, "is_high_risk": True, "is_critical": False, "breakdown": {}}
+        main.cache = FakeBatchCache({("risk", "cached"): cached})
+        main.active_provider = CachedProvider(FakeProvider(), main.cache)
+        request = main.RiskBatchRequest(
+            items=[{"text": "cached"}, {"text": "new"}, {"text": "other", "severity": "high"}]
+        )
+
+        lines = await _read_ndjson(await main.risk_batch(request))
+
+        self.assertEqual((lines[0]["index"], lines[0]["result"]["risk_score"]), (0, 0.7))
+        self.assertEqual(sorted(line["index"] for line in lines[1:]), [1, 2])
+        self.assertEqual(
+            main.cache.get_many_calls, [("risk", ["cached", "new"]), ("risk", ["other"])]
+        )
+
+    async def test_analyze_batch_answers_fully_cached_items_from_batched_reads(self):
+        main.cache = FakeBatchCache(
+            {
+                ("classify", "seen"): {
+                    "predicted_category": "theft",
+                    "confidence": 0.8,
+                    "all_scores": {"theft": 0.8},
+                },
+                ("toxicity", "seen"): {
+                    "is_toxic": False,
+                    "toxicity_score": 0.01,
+                    "is_severe": False,
+                    "details": {},
+                },
+                ("risk", "seen"): {
+                    "risk_score": 0.4,
+                    "is_high_risk": False,
+                    "is_critical": False,
+                    "breakdown": {},
+                },
+            }
+        )
+        provider = FakeProvider()
+        main.active_provider = CachedProvider(provider, main.cache)
+        request = main.FullAnalysisBatchRequest(items=[{"text": "seen"}, {"text": "fresh"}])
+
+        with unittest.mock.patch.object(main.config, "ML_PROVIDER", "local"):
+            lines = await _read_ndjson(await main.full_analysis_batch(request))
+
+        self.assertEqual([line["index"] for line in lines], [0, 1])
+        self.assertEqual(lines[0]["result"]["risk"]["risk_score"], 0.4)
+        self.assertEqual(lines[0]["result"]["classification"]["predicted_category"], "theft")
+        self.assertEqual(provider.classified, ["fresh"])
+        self.assertEqual(
+            main.cache.get_many_calls[:3],
+            [("classify", ["seen", "fresh"]), ("toxicity", ["seen", "fresh"]), ("risk", ["seen"])],
+        )
+
+    async def test_analyze_runs_independent_stages_concurrently(self):
+        main.cache = FakeBatchCache()
+        provider = FakeProvider(slow_texts={"smoke from the roof"})
+        classify, detect_toxicity = provider.classify, provider.detect_toxicity
+        finished, overlapped = [], []
+
+        async def tracked_classify(text, categories):
+            result = await classify(text, categories)
+            finished.append("classify")
+            return result
+
+        async def slow_toxicity(text):
+            # Started while the (slow) classification is still running
+            overlapped.append(bool(provider.classified) and not finished)
+            await asyncio.sleep(0.05)
+            return await detect_toxicity(text)
+
+        provider.classify, provider.detect_toxicity = tracked_classify, slow_toxicity
+        main.active_provider = CachedProvider(provider, main.cache)
+        request = main.FullAnalysisRequest(text="smoke from the roof", severity="high")
+
+        with unittest.mock.patch.object(main.config, "ML_PROVIDER", "local"):
+            response = await main._run_full_analysis(request)
+
+        self.assertEqual(overlapped, [True])
+        self.assertEqual(response.classification.predicted_category, "fire")
+        self.assertEqual(response.risk.risk_score, 0.2)
+        self.assertEqual(provider.risk_inputs["category"], "fire")
+        self.assertEqual(provider.risk_inputs["toxicity_score"], 0.01)
+        self.assertIn(("risk", "smoke from the roof"), main.cache.entries)
+
+    async def test_analyze_runs_only_what_the_requested_components_need(self):
+        main.cache = FakeBatchCache()
+        provider = FakeProvider()
+        main.active_provider = CachedProvider(provider, main.cache)
+        request = main.FullAnalysisRequest(
+            text="smoke from the roof",
+            category="fire",
+            candidate_texts=["a fire on main street"],
+            components=["risk"],
+        )
+
+        with unittest.mock.patch.object(main.config, "ML_PROVIDER", "local"):
+            response = await main._run_full_analysis(request)
+
+        self.assertEqual(provider.classified, [])
+        self.assertEqual(provider.risk_inputs["category"], "fire")
+        self.assertEqual(provider.risk_inputs["toxicity_score"], 0.01)
+        self.assertEqual(response.risk.risk_score, 0.2)
+        self.assertIsNone(response.toxicity)
+        self.assertIsNone(response.similarity)
+
+    def test_gemini_subset_prompt_asks_only_for_requested_fields(self):
+        from providers.gemini import _analyze_system
+
+        prompt = _analyze_system({"toxicity", "summary"})
+
+        self.assertIn('"toxicity_score"', prompt)
+        self.assertIn('"summary"', prompt)
+        self.assertNotIn('"risk"', prompt)
+        self.assertNotIn("Risk score calibration", prompt)
+        self.assertLess(len(prompt), len(_analyze_system(main.ANALYZE_COMPONENTS)) / 2)
+
+    def test_batch_size_is_capped(self):
+        with self.assertRaises(ValidationError):
+            main.ToxicityBatchRequest(
+                items=[{"text": "x"}] * (main.config.BATCH_MAX_ITEMS + 1)
+            )
+        with self.assertRaises(ValidationError):
+            main.ToxicityBatchRequest(items=[])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import unittest
+
+from inference.batcher import MicroBatcher
+from providers.local import LocalProvider
+
+
+class RecordingRunner:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        if self.fail:
+            raise RuntimeError("forward pass failed")
+        return [item * 10 for item in items]
+
+
+class MicroBatcherTests(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_submissions_share_one_batch(self):
+        runner = RecordingRunner()
+        batcher = MicroBatcher(runner, max_batch_size=8, max_wait_ms=20)
+
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+        self.assertEqual(results, [0, 10, 20, 30, 40])
+        self.assertEqual(runner.batches, [[0, 1, 2, 3, 4]])
+        stats = batcher.stats
+        self.assertEqual((stats["batches"], stats["items"], stats["largest_batch"]), (1, 5, 5))
+        self.assertIsNotNone(stats["queue_wait_ms"]["p99"])
+        await batcher.close()
+
+    async def test_batches_are_capped_at_max_batch_size(self):
+        runner = RecordingRunner()
+        batcher = MicroBatcher(runner, max_batch_size=3, max_wait_ms=20)
+
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(7)))
+
+        self.assertEqual(results, [i * 10 for i in range(7)])
+        self.assertEqual([len(batch) for batch in runner.batches], [3, 3, 1])
+        await batcher.close()
+
+    async def test_failure_reaches_every_caller_in_the_batch(self):
+        batcher = MicroBatcher(RecordingRunner(fail=True), max_wait_ms=10)
+
+        results = await asyncio.gather(
+            batcher.submit(1), batcher.submit(2), return_exceptions=True
+        )
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(await MicroBatcher(RecordingRunner()).submit(3), 30)
+        await batcher.close()
+
+    async def test_lone_request_waits_at_most_max_wait(self):
+        batcher = MicroBatcher(RecordingRunner(), max_batch_size=64, max_wait_ms=5)
+        loop = asyncio.get_running_loop()
+
+        started = loop.time()
+        self.assertEqual(await batcher.submit(1), 10)
+
+        self.assertLess(loop.time() - started, 0.5)
+        await batcher.close()
+
+
+    async def test_close_fails_the_running_batch_and_the_queue(self):
+        release = threading.Event()
+
+        def blocking(items):
+            release.wait(5)
+            return items
+
+        batcher = MicroBatcher(blocking, max_batch_size=1, max_wait_ms=0, name="clf")
+        waiters = [asyncio.create_task(batcher.submit(i)) for i in range(3)]
+        while batcher.stats["queued"] != 2:
+            await asyncio.sleep(0.001)
+
+        await batcher.close()
+        release.set()
+        results = await asyncio.wait_for(
+            asyncio.gather(*waiters, return_exceptions=True), timeout=2
+        )
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(str(results[0]), "clf stopped")
+        self.assertEqual(batcher.stats["queued"], 0)
+        self.assertEqual(await batcher.submit(4), 4)
+        await batcher.close()
+
+class FakeBatchClassifier:
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+
+    def predict_top_batch(self, texts, categories):
+        self.calls.append((list(texts), list(categories)))
+        self.threads.add(threading.get_ident())
+        return [
+            {"category": categories[0], "confidence": 0.9, "all_scores": {categories[0]: 0.9}}
+            for _ in texts
+        ]
+
+
+class LocalProviderBatchingTests(unittest.IsolatedAsyncioTestCase):
+    async def test_classify_calls_are_batched_per_category_set(self):
+        classifier = FakeBatchClassifier()
+        provider = LocalProvider(classifier, None, None, None)
+
+        results = await asyncio.gather(
+            provider.classify("smoke", ["fire", "other"]),
+            provider.classify("flames", ["fire", "other"]),
+            provider.classify("loud music", ["noise_complaint"]),
+        )
+
+        self.assertEqual(
+            [r["predicted_category"] for r in results], ["fire", "fire", "noise_complaint"]
+        )
+        self.assertEqual(
+            sorted(classifier.calls),
+            [(["loud music"], ["noise_complaint"]), (["smoke", "flames"], ["fire", "other"])],
+        )
+        self.assertNotIn(threading.get_ident(), classifier.threads)
+        self.assertIn("classify", provider.batching_stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
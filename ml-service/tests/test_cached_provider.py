@@ -0,0 +1,151 @@
+import unittest
+import unittest.mock
+from contextlib import asynccontextmanager
+
+import config
+from main_stubs import import_main, load_cache_manager
+from providers.cached import CachedProvider
+
+main = import_main()
+cache_manager = load_cache_manager()
+
+CATEGORIES = ["fire", "theft"]
+
+
+class MemoryCache:
+    def __init__(self):
+        self.entries = {}
+
+    @staticmethod
+    def _key(prefix, text, kwargs):
+        return (prefix, text, tuple(sorted(kwargs.items())))
+
+    async def get(self, prefix, text, **kwargs):
+        return self.entries.get(self._key(prefix, text, kwargs))
+
+    async def get_many(self, prefix, texts, **kwargs):
+        return [self.entries.get(self._key(prefix, text, kwargs)) for text in texts]
+
+    async def set(self, prefix, text, value, **kwargs):
+        self.entries[self._key(prefix, text, kwargs)] = value
+
+
+class CountingProvider:
+    single_call_analysis = False
+
+    def __init__(self):
+        self.calls = []
+
+    async def classify(self, text, categories):
+        self.calls.append("classify")
+        return {"predicted_category": "fire", "confidence": 0.9, "all_scores": {"fire": 0.9}}
+
+    async def detect_toxicity(self, text):
+        self.calls.append("toxicity")
+        return {"is_toxic": False, "toxicity_score": 0.02, "is_severe": False, "details": {}}
+
+    async def compute_risk(self, **kwargs):
+        self.calls.append("risk")
+        return {"risk_score": 0.4, "is_high_risk": False, "is_critical": False, "breakdown": {}}
+
+    async def scored_similarity(self, query_text, candidate_texts):
+        self.calls.append("similarity")
+        # The first call runs while the re-ranker is unloaded.
+        return [0.5] * len(candidate_texts), self.calls.count("similarity") > 1
+
+    async def full_analyze(self, **kwargs):
+        self.calls.append("full_analyze")
+        return {"classification": None, "summary": "Kitchen fire"}
+
+
+async def analyze(provider, text="smoke from the roof"):
+    return await provider.full_analyze(
+        text=text, category=None, severity="high", duplicate_count=0, categories=CATEGORIES
+    )
+
+
+class CachedProviderTests(unittest.IsolatedAsyncioTestCase):
+    async def test_analysis_reuses_components_from_single_purpose_calls(self):
+        inner = CountingProvider()
+        provider = CachedProvider(inner, MemoryCache(), provider="local")
+
+        await provider.classify("smoke from the roof", CATEGORIES)
+        result = await analyze(provider)
+        self.assertEqual(sorted(inner.calls), ["classify", "risk", "toxicity"])
+        self.assertEqual(result["risk"]["risk_score"], 0.4)
+
+        await analyze(provider)
+        self.assertEqual(len(inner.calls), 3)
+        self.assertEqual(
+            await provider.cached_toxicity(["smoke from the roof", "unseen"]),
+            [result["toxicity"], None],
+        )
+
+    async def test_prompt_and_model_versions_are_part_of_the_key(self):
+        inner = CountingProvider()
+        provider = CachedProvider(inner, MemoryCache(), provider="local")
+        classifier = dict(config.MODEL_VERSION_MAP["classifier"], version="retrained")
+
+        await provider.classify("smoke", CATEGORIES)
+        with unittest.mock.patch.object(config, "PROMPT_VERSION_CLASSIFY", "classify-v2"):
+            await provider.classify("smoke", CATEGORIES)
+        with unittest.mock.patch.dict(config.MODEL_VERSION_MAP, {"classifier": classifier}):
+            await provider.classify("smoke", CATEGORIES)
+        await provider.classify("smoke", CATEGORIES)
+
+        self.assertEqual(inner.calls, ["classify"] * 3)
+
+    async def test_single_call_analysis_is_cached_whole(self):
+        inner = CountingProvider()
+        inner.single_call_analysis = True
+        provider = CachedProvider(inner, MemoryCache(), provider="gemini")
+
+        first = await analyze(provider)
+        second = await analyze(provider)
+
+        self.assertEqual(inner.calls, ["full_analyze"])
+        self.assertEqual(second, first)
+
+    async def test_similarity_without_reranking_is_not_cached(self):
+        inner = CountingProvider()
+        provider = CachedProvider(inner, MemoryCache(), provider="local")
+
+        for _ in range(3):
+            self.assertEqual(await provider.batch_similarity("smoke", ["fire"]), [0.5])
+
+        self.assertEqual(inner.calls, ["similarity", "similarity"])
+
+    async def test_embedding_invalidation_misses_the_similarity_cache(self):
+        inner = CountingProvider()
+        cache = cache_manager.AsyncRedisCacheManager()
+        provider = CachedProvider(inner, cache, provider="local")
+        for _ in range(3):
+            await provider.batch_similarity("smoke", ["fire"])
+        self.assertEqual(inner.calls, ["similarity", "similarity"])
+
+        with unittest.mock.patch.multiple(
+            main, cache=cache, MODEL_PREFIX_MAP=cache_manager.MODEL_PREFIX_MAP
+        ):
+            await main.invalidate_cache("embedding")
+        await provider.batch_similarity("smoke", ["fire"])
+
+        self.assertEqual(inner.calls, ["similarity"] * 3)
+
+    async def test_only_misses_reserve_their_model(self):
+        reserved = []
+
+        @asynccontextmanager
+        async def reserve(*models):
+            reserved.append(models)
+            yield
+
+        provider = CachedProvider(CountingProvider(), MemoryCache(), reserve, provider="local")
+
+        for _ in range(3):
+            await provider.detect_toxicity("shouting outside")
+
+        self.assertEqual(reserved, [("toxicity",)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import importlib.util
+import os
+import threading
+import unittest
+from unittest import mock
+
+from main_stubs import import_main
+from models.cascade_calibration import CascadeCalibrator
+
+main = import_main()
+
+HAS_MODEL_DEPS = all(
+    importlib.util.find_spec(name) is not None for name in ("torch", "transformers")
+)
+
+
+def _fill(calibrator, top, margin, taken, agreed, count, weight=1.0):
+    for _ in range(count):
+        calibrator.record(top, margin, taken, agreed, weight)
+
+
+class CascadeCalibratorTests(unittest.TestCase):
+    def test_stats_report_fast_path_rate_and_audited_agreement(self):
+        calibrator = CascadeCalibrator(window=100)
+        _fill(calibrator, 0.9, 0.5, True, None, 6)
+        _fill(calibrator, 0.9, 0.5, True, True, 2, weight=50.0)
+        _fill(calibrator, 0.5, 0.05, False, False, 2)
+
+        stats = calibrator.stats
+
+        self.assertEqual((stats["fast_runs"], stats["fast_path_taken"]), (10, 8))
+        self.assertEqual(stats["fast_path_rate"], 0.8)
+        self.assertEqual(stats["window"]["agreement"], 1.0)
+        self.assertEqual(stats["window"]["agreement_support"], 2)
+
+    def test_suggests_looser_gates_when_agreement_holds_below_them(self):
+        calibrator = CascadeCalibrator(min_support=10)
+        _fill(calibrator, 0.9, 0.5, True, True, 20)
+        _fill(calibrator, 0.65, 0.2, False, True, 20)
+        _fill(calibrator, 0.4, 0.01, False, False, 20)
+
+        suggestion = calibrator.suggest(target_agreement=0.95)
+
+        self.assertLessEqual(suggestion["confidence_threshold"], 0.65)
+        self.assertGreater(suggestion["confidence_threshold"], 0.4)
+        self.assertAlmostEqual(suggestion["fast_path_rate"], 2 / 3, places=3)
+        self.assertEqual(suggestion["agreement"], 1.0)
+
+    def test_no_suggestion_without_enough_support(self):
+        calibrator = CascadeCalibrator(min_support=50)
+        _fill(calibrator, 0.9, 0.5, True, True, 10)
+
+        self.assertIsNone(calibrator.suggest(0.9))
+        self.assertIsNone(CascadeCalibrator().suggest(0.9))
+
+    def test_due_fires_once_per_interval(self):
+        calibrator = CascadeCalibrator()
+        _fill(calibrator, 0.9, 0.5, True, None, 3)
+
+        self.assertTrue(calibrator.due(3))
+        self.assertFalse(calibrator.due(3))
+
+
+
+def _load_classifier_module():
+    # Other test modules replace `models.classifier` with a stub; load the real file.
+    spec = importlib.util.spec_from_file_location(
+        "_classifier_calibration_under_test",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "classifier.py"),
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@unittest.skipUnless(HAS_MODEL_DEPS, "torch/transformers are not installed")
+class ClassifierCalibrationStatusTests(unittest.TestCase):
+    def test_status_serves_the_last_suggestion_without_searching(self):
+        module = _load_classifier_module()
+        classifier = object.__new__(module.CategoryClassifier)
+        classifier._calibrator = CascadeCalibrator(min_support=10)
+        _fill(classifier._calibrator, 0.9, 0.5, True, True, 40)
+
+        with mock.patch.object(
+            classifier._calibrator, "suggest", wraps=classifier._calibrator.suggest
+        ) as suggest:
+            self.assertIsNone(classifier.calibration_status()["suggestion"])
+            suggestion = classifier.recalibrate()
+            for _ in range(3):
+                status = classifier.calibration_status()
+
+        self.assertEqual(suggest.call_count, 1)
+        self.assertEqual(status["suggestion"], suggestion)
+        self.assertIsNotNone(status["suggested_at"])
+
+
+class FakeCalibratedClassifier:
+    cascade_thresholds = {"confidence": 0.8, "margin": 0.1}
+
+    def __init__(self):
+        self.threads = []
+
+    def recalibrate(self, apply=False):
+        self.threads.append(threading.current_thread())
+        return {"confidence": 0.75}
+
+    def calibration_status(self):
+        return {"samples": 10}
+
+
+class CalibrateEndpointTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.previous = main.classifier_model
+
+    def tearDown(self):
+        main.classifier_model = self.previous
+
+    async def test_recalibration_runs_off_the_event_loop(self):
+        main.classifier_model = FakeCalibratedClassifier()
+
+        result = await main.calibrate_classifier(apply=True)
+
+        self.assertTrue(result["applied"])
+        self.assertIsNot(main.classifier_model.threads[0], threading.current_thread())
+
+    async def test_process_pool_classifier_is_refused(self):
+        main.classifier_model = main.ProcessModelProxy(None, "classifier", object)
+
+        with self.assertRaises(main.HTTPException) as raised:
+            await main.calibrate_classifier(apply=True)
+        self.assertEqual(raised.exception.status_code, 409)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import importlib.util
+import os
+import unittest
+
+HAS_MODEL_DEPS = all(
+    importlib.util.find_spec(name) is not None for name in ("torch", "transformers")
+)
+
+if HAS_MODEL_DEPS:
+    # Other test modules replace `models.classifier` with a stub; load the real file.
+    _spec = importlib.util.spec_from_file_location(
+        "_classifier_under_test",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "classifier.py"),
+    )
+    classifier_module = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(classifier_module)
+
+CATEGORIES = [
+    "theft", "assault", "vandalism", "suspicious_activity", "traffic_incident",
+    "noise_complaint", "fire", "medical_emergency", "hazard", "other",
+]
+
+
+class RecordingZeroShot:
+    def __init__(self, ranking):
+        self.ranking = ranking
+        self.calls = []
+
+    def __call__(self, texts, candidate_labels, **kwargs):
+        self.calls.append(list(candidate_labels))
+        ordered = [label for label in self.ranking if label in candidate_labels]
+        ordered += [label for label in candidate_labels if label not in ordered]
+        scores = [0.3, 0.25, 0.2] + [0.25 / max(1, len(ordered) - 3)] * (len(ordered) - 3)
+        return [{"labels": ordered, "scores": scores[: len(ordered)]} for _ in texts]
+
+
+@unittest.skipUnless(HAS_MODEL_DEPS, "torch/transformers are not installed")
+class HypothesisPruningTests(unittest.TestCase):
+    def setUp(self):
+        self.module = classifier_module
+        self.label = self.module.CATEGORY_LABEL_MAP
+        self.classifier = object.__new__(self.module.CategoryClassifier)
+        self.classifier._pruned_pairs = 0
+
+    def test_keeps_fast_top_k_hint_matches_and_other(self):
+        fast = {cat: 0.01 for cat in CATEGORIES}
+        fast.update({"theft": 0.4, "vandalism": 0.3, "suspicious_activity": 0.2})
+
+        subset = self.classifier._prune_candidates(
+            "smoke and flames from the garage", CATEGORIES, fast
+        )
+
+        self.assertTrue({"theft", "vandalism", "suspicious_activity", "fire", "other"} <= set(subset))
+        self.assertLess(len(subset), len(CATEGORIES))
+
+    def test_no_fast_scores_means_no_pruning(self):
+        self.assertEqual(self.classifier._prune_candidates("fire", CATEGORIES, None), CATEGORIES)
+
+    def test_escalated_texts_score_only_the_pruned_labels(self):
+        fast = RecordingZeroShot([self.label["theft"], self.label["vandalism"]])
+        slow = RecordingZeroShot([self.label["theft"]])
+        self.classifier._use_cascade = True
+        self.classifier._fast_classifier = fast
+        self.classifier._classifier = slow
+        config = self.module.config
+        previous = config.CLASSIFIER_PRUNING_ENABLED
+        config.CLASSIFIER_PRUNING_ENABLED = True
+        try:
+            (scores,) = self.classifier.predict_batch(["my bike is gone"], CATEGORIES)
+        finally:
+            config.CLASSIFIER_PRUNING_ENABLED = previous
+
+        self.assertEqual(len(fast.calls[0]), len(CATEGORIES))
+        self.assertLess(len(slow.calls[0]), len(CATEGORIES))
+        self.assertEqual(set(scores), set(CATEGORIES))
+        self.assertGreater(self.classifier._pruned_pairs, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import importlib.util
+import os
+import threading
+import unittest
+
+HAS_MODEL_DEPS = all(
+    importlib.util.find_spec(name) is not None for name in ("torch", "transformers")
+)
+
+if HAS_MODEL_DEPS:
+    # Other test modules replace `models.classifier` with a stub; load the real file.
+    _spec = importlib.util.spec_from_file_location(
+        "_classifier_under_test",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "classifier.py"),
+    )
+    classifier_module = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(classifier_module)
+
+CATEGORIES = ["theft", "fire", "other"]
+
+
+class FixedZeroShot:
+    def __init__(self, scores, gate=None):
+        self.scores = scores
+        self.gate = gate
+        self.calls = 0
+        self.threads = set()
+
+    def __call__(self, texts, candidate_labels, **kwargs):
+        self.calls += 1
+        self.threads.add(threading.get_ident())
+        if self.gate is not None:
+            self.gate.wait(5)
+        return [
+            {"labels": list(candidate_labels), "scores": self.scores[: len(candidate_labels)]}
+            for _ in texts
+        ]
+
+
+@unittest.skipUnless(HAS_MODEL_DEPS, "torch/transformers are not installed")
+class SpeculativeCascadeTests(unittest.TestCase):
+    def setUp(self):
+        self.module = classifier_module
+        self.config = self.module.config
+        self.previous = (self.config.CLASSIFIER_SPECULATIVE_ENABLED, self.config.CASCADE_AUDIT_RATE)
+        self.config.CLASSIFIER_SPECULATIVE_ENABLED = True
+        self.config.CASCADE_AUDIT_RATE = 0.0
+        self.classifier = object.__new__(self.module.CategoryClassifier)
+        self.classifier._use_cascade = True
+        for name in ("_speculative_runs", "_speculative_paid_off", "_speculative_discarded"):
+            setattr(self.classifier, name, 0)
+
+    def tearDown(self):
+        self.config.CLASSIFIER_SPECULATIVE_ENABLED, self.config.CASCADE_AUDIT_RATE = self.previous
+
+    def test_uncertain_fast_result_uses_the_speculative_accurate_run(self):
+        self.classifier._fast_classifier = FixedZeroShot([0.4, 0.35, 0.25])
+        self.classifier._classifier = FixedZeroShot([0.1, 0.8, 0.1])
+
+        (scores,) = self.classifier.predict_batch(["something odd"], CATEGORIES)
+
+        self.assertEqual(max(scores, key=scores.get), "fire")
+        self.assertNotIn(threading.get_ident(), self.classifier._classifier.threads)
+        stats = self.classifier._speculation_stats()
+        self.assertEqual((stats["runs"], stats["paid_off"]), (1, 1))
+
+    def test_decisive_fast_result_discards_the_accurate_run(self):
+        gate = threading.Event()
+        self.classifier._fast_classifier = FixedZeroShot([0.95, 0.03, 0.02])
+        self.classifier._classifier = FixedZeroShot([0.1, 0.8, 0.1], gate=gate)
+
+        (scores,) = self.classifier.predict_batch(["bike stolen"], CATEGORIES)
+        gate.set()
+
+        self.assertEqual(max(scores, key=scores.get), "theft")
+        self.assertEqual(self.classifier._speculation_stats()["discarded"], 1)
+
+    def test_large_batches_fall_back_to_the_sequential_cascade(self):
+        self.classifier._fast_classifier = FixedZeroShot([0.95, 0.03, 0.02])
+        self.classifier._classifier = FixedZeroShot([0.1, 0.8, 0.1])
+        texts = ["bike stolen"] * (self.config.CLASSIFIER_SPECULATIVE_MAX_TEXTS + 1)
+
+        self.classifier.predict_batch(texts, CATEGORIES)
+
+        self.assertEqual(self.classifier._classifier.calls, 0)
+        self.assertEqual(self.classifier._speculation_stats()["runs"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
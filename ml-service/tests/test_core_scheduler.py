@@ -0,0 +1,150 @@
+import asyncio
+import sys
+import threading
+import types
+import unittest
+from unittest import mock
+
+from inference.core_scheduler import CoreScheduler, apportion, parse_split
+from models.cpu_backends import ort_session_kwargs, set_ort_threads
+from providers.local import LocalProvider
+
+
+class ApportionTests(unittest.TestCase):
+    def test_shares_follow_weights_and_use_every_core(self):
+        counts = apportion(8, {"classifier": 4, "embedding": 2, "toxicity": 2})
+
+        self.assertEqual(counts, {"classifier": 4, "embedding": 2, "toxicity": 2})
+
+    def test_every_model_gets_a_core(self):
+        counts = apportion(4, {"classifier": 100, "embedding": 1, "toxicity": 1})
+
+        self.assertEqual(counts, {"classifier": 2, "embedding": 1, "toxicity": 1})
+        self.assertEqual(sum(counts.values()), 4)
+
+    def test_fewer_cores_than_models(self):
+        self.assertEqual(apportion(2, {"a": 1, "b": 1, "c": 1}), {"a": 1, "b": 1, "c": 1})
+
+    def test_parse_split(self):
+        self.assertIsNone(parse_split("auto"))
+        self.assertEqual(
+            parse_split("classifier:4, embedding:2"), {"classifier": 4.0, "embedding": 2.0}
+        )
+
+
+class CoreSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_each_model_runs_on_its_own_thread(self):
+        scheduler = CoreScheduler(("classifier", "toxicity"), list(range(4)))
+        try:
+            first = await scheduler.run("classifier", threading.current_thread)
+            second = await scheduler.run("toxicity", threading.current_thread)
+
+            self.assertTrue(first.name.startswith("cores-classifier"))
+            self.assertTrue(second.name.startswith("cores-toxicity"))
+            self.assertEqual(scheduler.stats["layout"]["classifier"]["calls"], 1)
+        finally:
+            scheduler.shutdown()
+
+    async def test_side_work_runs_alongside_the_model_call(self):
+        scheduler = CoreScheduler(("classifier", "toxicity"), list(range(4)))
+
+        def call():
+            side = scheduler.submit_side("classifier", threading.current_thread)
+            return threading.current_thread(), side.result(timeout=5)
+
+        try:
+            main, side = await scheduler.run("classifier", call)
+
+            self.assertNotEqual(main, side)
+            self.assertTrue(side.name.startswith("cores-classifier-side"))
+            self.assertIsNone(scheduler.submit_side("risk", threading.current_thread))
+            self.assertEqual(scheduler.stats["layout"]["classifier"]["side_calls"], 1)
+        finally:
+            scheduler.shutdown()
+
+    async def test_auto_split_follows_measured_service_time(self):
+        scheduler = CoreScheduler(("classifier", "embedding", "toxicity"), list(range(8)))
+        try:
+            # Equal start gives 3/3/2 threads, so these timings are 1200/300/200 core-ms.
+            counts = scheduler.rebalance(
+                {"classifier": 400.0, "embedding": 100.0, "toxicity": 100.0}
+            )
+
+            self.assertEqual(counts, {"classifier": 4, "embedding": 2, "toxicity": 2})
+            self.assertEqual(scheduler.stats["layout"]["classifier"]["threads"], 4)
+            self.assertEqual(scheduler.stats["rebalances"], 1)
+        finally:
+            scheduler.shutdown()
+
+    async def test_configured_split_is_not_rebalanced(self):
+        split = {"classifier": 1, "toxicity": 1}
+        scheduler = CoreScheduler(("classifier", "toxicity"), list(range(4)), split=split)
+        try:
+            self.assertIsNone(scheduler.rebalance({"classifier": 900.0, "toxicity": 1.0}))
+            self.assertEqual(scheduler.stats["layout"]["classifier"]["threads"], 2)
+        finally:
+            scheduler.shutdown()
+
+    async def test_threads_outside_the_scheduler_keep_their_thread_count(self):
+        # torch.set_num_threads is process-wide: model it that way.
+        torch = types.SimpleNamespace(threads=8)
+        torch.get_num_threads = lambda: torch.threads
+        torch.set_num_threads = lambda n: setattr(torch, "threads", n)
+        split = {"classifier": 6, "embedding": 1, "toxicity": 1}
+        with mock.patch.dict(sys.modules, {"torch": torch}):
+            scheduler = CoreScheduler(
+                ("classifier", "embedding", "toxicity"), list(range(8)), split=split
+            )
+            try:
+                for model in split:
+                    await scheduler.run(model, lambda: None)
+
+                self.assertEqual(await asyncio.to_thread(torch.get_num_threads), 8)
+            finally:
+                scheduler.shutdown()
+
+    async def test_onnx_sessions_get_their_partition_threads(self):
+        onnxruntime = types.SimpleNamespace(SessionOptions=types.SimpleNamespace)
+        scheduler = CoreScheduler(
+            ("classifier", "toxicity"), list(range(8)), split={"classifier": 3, "toxicity": 1}
+        )
+        try:
+            set_ort_threads(scheduler.threads)
+            with mock.patch.dict(sys.modules, {"onnxruntime": onnxruntime}):
+                options = ort_session_kwargs("classifier")["session_options"]
+
+            self.assertEqual(options.intra_op_num_threads, 6)
+            self.assertEqual(ort_session_kwargs("risk"), {})
+        finally:
+            set_ort_threads({})
+            scheduler.shutdown()
+
+
+class FakeBatchClassifier:
+    def __init__(self):
+        self.threads = set()
+
+    def predict_top_batch(self, texts, categories):
+        self.threads.add(threading.current_thread().name)
+        return [
+            {"category": categories[0], "confidence": 0.9, "all_scores": {categories[0]: 0.9}}
+            for _ in texts
+        ]
+
+
+class LocalProviderPartitionTests(unittest.IsolatedAsyncioTestCase):
+    async def test_batched_classify_runs_on_the_classifier_partition(self):
+        scheduler = CoreScheduler(("classifier", "embedding", "toxicity"), list(range(3)))
+        classifier = FakeBatchClassifier()
+        provider = LocalProvider(classifier, None, None, None, core_scheduler=scheduler)
+        try:
+            await provider.classify("smoke", ["fire", "other"])
+
+            self.assertEqual(len(classifier.threads), 1)
+            self.assertTrue(classifier.threads.pop().startswith("cores-classifier"))
+        finally:
+            scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from models import cpu_backends
+
+
+class FakeORTModel:
+    exports = 0
+    loads = []
+
+    def __init__(self, source):
+        self.source = source
+
+    @classmethod
+    def from_pretrained(cls, path, export=False, **kwargs):
+        if export:
+            cls.exports += 1
+        else:
+            cls.loads.append((path, kwargs))
+        return cls(path)
+
+    def save_pretrained(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "model.onnx"), "wb") as handle:
+            handle.write(b"onnx")
+
+    def __call__(self, **inputs):
+        return type("Output", (), {"logits": sorted(inputs)})()
+
+
+class CPUBackendTests(unittest.TestCase):
+    def test_int8_backends_fall_back_off_cpu(self):
+        self.assertEqual(cpu_backends.resolve_backend("onnx-int8", "cpu", "m"), "onnx-int8")
+        self.assertEqual(cpu_backends.resolve_backend("onnx-int8", "cuda", "m"), "onnx")
+        self.assertEqual(cpu_backends.resolve_backend("torch-int8", "cuda", "m"), "torch")
+        self.assertEqual(cpu_backends.resolve_backend("tensorrt", "cpu", "m"), "torch")
+
+    def test_onnx_export_is_cached_on_disk(self):
+        FakeORTModel.exports, FakeORTModel.loads = 0, []
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(
+            cpu_backends.config, "ONNX_CACHE_DIR", tmp, create=True
+        ):
+            for _ in range(2):
+                cpu_backends.load_ort_model(
+                    FakeORTModel, "org/model", quantize=False, provider="CPUExecutionProvider"
+                )
+
+            expected_dir = os.path.join(tmp, "org--model", "onnx")
+            self.assertEqual(FakeORTModel.exports, 1)
+            self.assertEqual(
+                FakeORTModel.loads,
+                [(expected_dir, {"provider": "CPUExecutionProvider"})] * 2,
+            )
+
+    def test_logits_adapter_returns_a_tuple_like_torch_models(self):
+        adapter = cpu_backends.ORTLogitsAdapter(FakeORTModel("x"))
+
+        self.assertIs(adapter.eval(), adapter)
+        self.assertEqual(adapter(input_ids=1, attention_mask=1), (["attention_mask", "input_ids"],))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from models.embedding_head import EmbeddingHead
+from providers.local import LocalProvider
+
+
+def _head(**kwargs):
+    return EmbeddingHead(
+        ["fire", "theft", "other"],
+        prototypes=np.eye(3, 4, dtype=np.float32),
+        embedding_model="mini",
+        **kwargs,
+    )
+
+
+class EmbeddingHeadTests(unittest.TestCase):
+    def test_prototype_scores_favour_the_nearest_category(self):
+        scores = _head().predict(np.array([[1.0, 0.1, 0.0, 0.0]]), ["fire", "theft", "other"])[0]
+
+        self.assertEqual(max(scores, key=scores.get), "fire")
+        self.assertGreater(scores["fire"], 0.99)
+        self.assertAlmostEqual(sum(scores.values()), 1.0, places=5)
+
+    def test_requested_subset_is_renormalised(self):
+        scores = _head().predict(np.array([[0.0, 0.0, 1.0, 0.0]]), ["fire", "theft"])[0]
+
+        self.assertEqual(set(scores), {"fire", "theft"})
+        self.assertAlmostEqual(scores["fire"] + scores["theft"], 1.0, places=5)
+
+    def test_linear_head_shifts_the_logits(self):
+        weight = np.zeros((4, 3), dtype=np.float32)
+        weight[3, 1] = 50.0
+        scores = _head(weight=weight).predict(
+            np.array([[0.5, 0.0, 0.0, 0.5]]), ["fire", "theft", "other"]
+        )[0]
+
+        self.assertEqual(max(scores, key=scores.get), "theft")
+
+    def test_round_trip_and_encoder_mismatch(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "head.npz")
+            _head(weight=np.ones((4, 3)), temperature=7.0).save(path)
+
+            loaded = EmbeddingHead.load_if_configured(path, "mini")
+            self.assertEqual(loaded.categories, ["fire", "theft", "other"])
+            self.assertEqual(loaded.temperature, 7.0)
+            self.assertEqual(loaded.weight.shape, (4, 3))
+            self.assertIsNone(EmbeddingHead.load_if_configured(path, "other-encoder"))
+            self.assertIsNone(EmbeddingHead.load_if_configured(os.path.join(tmp, "x.npz"), "mini"))
+
+        self.assertFalse(_head().covers(["fire", "hazard"]))
+
+
+class FakeEmbedding:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+class FakeHeadClassifier:
+    uses_embeddings = True
+
+    def __init__(self):
+        self.embeddings = []
+
+    def predict_top_batch(self, texts, categories, embeddings=None):
+        self.embeddings.append(embeddings)
+        return [
+            {"category": categories[0], "confidence": 0.9, "all_scores": {categories[0]: 0.9}}
+            for _ in texts
+        ]
+
+
+class LocalProviderEmbeddingHeadTests(unittest.IsolatedAsyncioTestCase):
+    async def test_classify_passes_report_embeddings_to_the_classifier(self):
+        classifier = FakeHeadClassifier()
+        embedding = FakeEmbedding()
+        provider = LocalProvider(classifier, embedding, None, None)
+
+        await asyncio.gather(
+            provider.classify("smoke", ["fire", "other"]),
+            provider.classify("flames", ["fire", "other"]),
+        )
+
+        (matrix,) = classifier.embeddings
+        self.assertEqual(matrix.shape, (2, 4))
+        self.assertEqual(sorted(sum(embedding.calls, [])), ["flames", "smoke"])
+
+
+if __name__ == "__main__":
+    unittest.main()
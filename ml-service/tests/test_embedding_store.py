@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+
+from services.embedding_store import EmbeddingStore, pack_vector, unpack_vector
+
+
+class FakeRawCache:
+    """Records batched lookups/writes the way AsyncRedisCacheManager exposes them."""
+
+    def __init__(self):
+        self.store = {}
+        self.lookups = 0
+        self.writes = 0
+
+    async def get_many_raw(self, prefix, texts, **kwargs):
+        self.lookups += 1
+        return [self.store.get((prefix, kwargs["model"], text)) for text in texts]
+
+    async def set_many_raw(self, prefix, items, **kwargs):
+        self.writes += 1
+        for text, data in items.items():
+            self.store[(prefix, kwargs["model"], text)] = data
+
+
+class RecordingEncoder:
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(text)), 1.0, 0.5] for text in texts]
+
+
+class EmbeddingStoreTests(unittest.IsolatedAsyncioTestCase):
+    async def test_only_misses_are_encoded_in_one_batch(self):
+        cache = FakeRawCache()
+        store = EmbeddingStore(cache, namespace="mini@1")
+        encoder = RecordingEncoder()
+        await store.resolve(["fire", "smoke"], encoder)
+
+        vectors = await store.resolve(["fire", "flood", "smoke", "theft"], encoder)
+
+        self.assertEqual(encoder.batches, [["fire", "smoke"], ["flood", "theft"]])
+        self.assertEqual(vectors.shape, (4, 3))
+        self.assertEqual(vectors.dtype, np.float32)
+        self.assertEqual(vectors[1][0], len("flood"))
+        self.assertEqual(cache.lookups, 2)
+        self.assertEqual(store.stats["reused"], 2)
+
+    async def test_duplicate_texts_are_encoded_once(self):
+        store = EmbeddingStore(FakeRawCache(), namespace="mini@1")
+        encoder = RecordingEncoder()
+
+        vectors = await store.resolve(["same", "same", "other"], encoder)
+
+        self.assertEqual(encoder.batches, [["same", "other"]])
+        np.testing.assert_array_equal(vectors[0], vectors[1])
+
+    async def test_namespaces_do_not_share_vectors(self):
+        cache = FakeRawCache()
+        encoder = RecordingEncoder()
+        await EmbeddingStore(cache, namespace="mini@1").resolve(["fire"], encoder)
+
+        await EmbeddingStore(cache, namespace="mini@2").resolve(["fire"], encoder)
+
+        self.assertEqual(len(encoder.batches), 2)
+
+    async def test_vectors_are_stored_as_packed_float32(self):
+        cache = FakeRawCache()
+        await EmbeddingStore(cache, namespace="mini@1").resolve(["fire"], RecordingEncoder())
+
+        (data,) = cache.store.values()
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(len(data), 3 * 4)
+        np.testing.assert_array_equal(unpack_vector(data), [4.0, 1.0, 0.5])
+        self.assertEqual(pack_vector([4.0, 1.0, 0.5]), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
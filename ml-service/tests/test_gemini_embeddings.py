@@ -0,0 +1,44 @@
+import threading
+import types
+import unittest
+from unittest import mock
+
+from main_stubs import stub_google
+
+stub_google()
+
+from providers import gemini
+from providers.gemini import GeminiProvider
+
+
+class RecordingModels:
+    def __init__(self):
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def embed_content(self, model, contents):
+        with self._lock:
+            self.requests.append(list(contents))
+        return types.SimpleNamespace(
+            embeddings=[types.SimpleNamespace(values=[float(len(text))]) for text in contents]
+        )
+
+
+class GeminiEmbedBatchTests(unittest.IsolatedAsyncioTestCase):
+    async def test_large_batches_are_split_within_the_request_limit(self):
+        provider = GeminiProvider.__new__(GeminiProvider)
+        provider._client = types.SimpleNamespace(models=RecordingModels())
+        provider._embedding_store = None
+        texts = ["x" * (i % 7 + 1) for i in range(250)]
+
+        with mock.patch.object(gemini.config, "GEMINI_EMBEDDING_MAX_BATCH", 100):
+            vectors = await provider.embed_many(texts)
+
+        self.assertEqual(
+            sorted(len(chunk) for chunk in provider._client.models.requests), [50, 100, 100]
+        )
+        self.assertEqual(vectors, [[float(len(text))] for text in texts])
+
+
+if __name__ == "__main__":
+    unittest.main()
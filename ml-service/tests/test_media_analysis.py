@@ -60,7 +60,9 @@ class DummyCache:
 
 
 cache_module.RedisCacheManager = DummyCache
+cache_module.AsyncRedisCacheManager = DummyCache
 cache_module.InMemoryLRUCache = DummyCache
+cache_module.MODEL_PREFIX_MAP = {}
 sys.modules["cache_manager"] = cache_module
 
 import main
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import unittest
+
+from inference.model_manager import LazyModel, ModelManager
+
+
+class FakeModel:
+    loads = 0
+
+    def __init__(self):
+        type(self).loads += 1
+
+    def predict(self, text):
+        return text.upper()
+
+    @property
+    def ready(self):
+        return True
+
+
+class FakeOwner:
+    """Model with one evictable sub-model, like EmbeddingModel's cross-encoder."""
+
+    def __init__(self, name, last_used):
+        self.name = name
+        self.loaded = True
+        self.wanted = False
+        self.last_used = last_used
+
+    def component_usage(self):
+        return {self.name: {"loaded": self.loaded, "last_used": self.last_used, "wanted": self.wanted}}
+
+    def unload_component(self, name):
+        self.loaded = False
+
+    def reload_component(self, name):
+        self.loaded = True
+        self.wanted = False
+
+
+class ModelManagerTests(unittest.TestCase):
+    def test_eager_models_load_concurrently(self):
+        manager = ModelManager()
+        barrier = threading.Barrier(2, timeout=5)
+
+        def loader(value):
+            def load():
+                barrier.wait()  # deadlocks (BrokenBarrierError) if loads were sequential
+                return value
+
+            return load
+
+        manager.register("a", loader("A"))
+        manager.register("b", loader("B"))
+        asyncio.run(manager.load_eager(parallel=True))
+
+        self.assertEqual((manager.instance("a"), manager.instance("b")), ("A", "B"))
+        self.assertEqual(manager.stats["models"]["a"]["state"], "loaded")
+
+    def test_lazy_model_loads_on_first_call_not_on_lookup(self):
+        FakeModel.loads = 0
+        manager = ModelManager()
+        proxy = manager.register("fake", FakeModel, FakeModel, lazy=True)
+        asyncio.run(manager.load_eager())
+
+        self.assertIsInstance(proxy, LazyModel)
+        self.assertTrue(hasattr(proxy, "predict"))
+        self.assertFalse(proxy.is_loaded())
+        self.assertEqual(manager.stats["models"]["fake"]["state"], "pending")
+
+        self.assertEqual(proxy.predict("x"), "X")
+        self.assertTrue(proxy.ready)
+        self.assertEqual(FakeModel.loads, 1)
+        self.assertIsNotNone(manager.stats["models"]["fake"]["load_ms"])
+
+    def test_failed_load_is_reported(self):
+        manager = ModelManager()
+
+        def broken():
+            raise RuntimeError("no weights")
+
+        manager.register("broken", broken)
+        with self.assertRaises(RuntimeError):
+            asyncio.run(manager.load_eager())
+        self.assertEqual(manager.stats["models"]["broken"]["state"], "failed")
+        self.assertEqual(manager.stats["models"]["broken"]["error"], "no weights")
+
+    def test_over_budget_evicts_least_recently_used_idle_component(self):
+        rss = [1200.0]
+        manager = ModelManager(
+            memory_budget_mb=1000, evictable=["old", "recent"], idle_seconds=0,
+            rss_reader=lambda: rss[0],
+        )
+        old, recent = FakeOwner("old", last_used=1.0), FakeOwner("recent", last_used=2.0)
+        manager.register("m1", lambda: old)
+        manager.register("m2", lambda: recent)
+        asyncio.run(manager.load_eager())
+
+        def unload(name, owner=old):
+            owner.loaded = False
+            rss[0] = 900.0
+
+        old.unload_component = unload
+        self.assertEqual(manager.enforce_budget(), ["evicted:old"])
+        self.assertFalse(old.loaded)
+        self.assertTrue(recent.loaded)
+
+        # Wanted again, but reloading would exceed the budget: stays out.
+        old.wanted = True
+        rss[0] = 950.0
+        self.assertEqual(manager.enforce_budget(), [])
+        rss[0] = 500.0
+        self.assertEqual(manager.enforce_budget(), ["reloaded:old"])
+        self.assertTrue(old.loaded)
+        self.assertEqual(manager.stats["components"]["old"]["evictions"], 1)
+
+    def test_budget_disabled_by_default(self):
+        manager = ModelManager(rss_reader=lambda: 10_000.0)
+        manager.register("m", lambda: FakeOwner("x", 0.0))
+        asyncio.run(manager.load_eager())
+
+        self.assertEqual(manager.enforce_budget(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
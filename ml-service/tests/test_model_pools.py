@@ -0,0 +1,51 @@
+import asyncio
+import unittest
+
+from inference.model_pools import ModelPools
+
+
+class ModelPoolsTests(unittest.IsolatedAsyncioTestCase):
+    async def test_saturated_pool_does_not_block_other_models(self):
+        pools = ModelPools({"classifier": 1, "risk": 1})
+        release = asyncio.Event()
+
+        async def slow_classification():
+            async with pools.reserve("classifier"):
+                await release.wait()
+
+        flood = [asyncio.create_task(slow_classification()) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        async with pools.reserve("risk"):
+            stats = pools.stats
+        self.assertEqual(stats["classifier"]["active"], 1)
+        self.assertEqual(stats["classifier"]["queue_depth"], 2)
+        self.assertEqual(stats["risk"]["admitted"], 1)
+
+        release.set()
+        await asyncio.gather(*flood)
+        self.assertEqual(pools.stats["classifier"]["queue_depth"], 0)
+        self.assertEqual(pools.stats["classifier"]["peak_queue_depth"], 2)
+        self.assertIsNotNone(pools.stats["classifier"]["wait_ms"]["p99"])
+
+    async def test_multi_model_reservation_releases_on_error(self):
+        pools = ModelPools({"classifier": 1, "toxicity": 1})
+
+        with self.assertRaises(RuntimeError):
+            async with pools.reserve("toxicity", "classifier"):
+                raise RuntimeError("inference failed")
+
+        self.assertEqual(pools.stats["classifier"]["active"], 0)
+        self.assertEqual(pools.stats["toxicity"]["active"], 0)
+        async with pools.reserve("classifier", "toxicity"):
+            pass
+
+    async def test_unconfigured_models_get_the_default_limit(self):
+        pools = ModelPools({}, default_limit=3)
+
+        async with pools.reserve("embedding"):
+            self.assertEqual(pools.stats["embedding"]["limit"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import importlib.util
+import threading
+import unittest
+
+HAS_TORCH = importlib.util.find_spec("torch") is not None
+
+if HAS_TORCH:
+    import numpy as np
+    import torch
+
+    from models.nli_engine import InferenceCancelled, ZeroShotNLIEngine
+
+
+class WordTokenizer:
+    """Tiny whitespace tokenizer exposing the slow-tokenizer hooks the engine uses."""
+
+    model_max_length = 16
+    model_input_names = ["input_ids", "attention_mask"]
+    pad_token_id = 0
+    padding_side = "right"
+
+    def __init__(self):
+        self.vocab = {}
+        self.calls = 0
+
+    def __call__(self, texts, add_special_tokens=False):
+        self.calls += 1
+        return {
+            "input_ids": [
+                [self.vocab.setdefault(word, len(self.vocab) + 3) for word in text.split()]
+                for text in texts
+            ]
+        }
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 3 if pair else 2
+
+    def build_inputs_with_special_tokens(self, first, second):
+        return [1] + first + [2] + second + [2]
+
+
+class BagOfWordsNLI:
+    """Deterministic stand-in: logits depend on the non-padding tokens only."""
+
+    class config:
+        label2id = {"contradiction": 0, "neutral": 1, "entailment": 2}
+
+    def __init__(self):
+        self.batch_shapes = []
+
+    def __call__(self, input_ids, attention_mask):
+        self.batch_shapes.append(tuple(input_ids.shape))
+        masked = (input_ids * attention_mask).float()
+        total = masked.sum(-1)
+        logits = torch.stack([total % 7, total % 3, (total * 13) % 11], dim=-1) / 3.0
+        return type("Output", (), {"logits": logits})()
+
+
+def reference_scores(model, tokenizer, text, labels, template):
+    """The HF pipeline's math, one unpadded pair at a time."""
+    premise = tokenizer([text])["input_ids"][0]
+    logits = []
+    for label in labels:
+        hypothesis = tokenizer([template.format(label)])["input_ids"][0]
+        budget = tokenizer.model_max_length - 3 - len(hypothesis)
+        ids = tokenizer.build_inputs_with_special_tokens(premise[:budget], hypothesis)
+        out = model(torch.tensor([ids]), torch.ones(1, len(ids), dtype=torch.long))
+        logits.append(out.logits[0].numpy())
+    entail = np.array(logits)[:, 2]
+    probs = np.exp(entail) / np.exp(entail).sum()
+    return dict(zip(labels, probs.tolist()))
+
+
+@unittest.skipUnless(HAS_TORCH, "torch is not installed")
+class ZeroShotNLIEngineTests(unittest.TestCase):
+    LABELS = ["fire", "theft", "loud noise"]
+    TEMPLATE = "This incident involves {}."
+
+    def setUp(self):
+        self.tokenizer = WordTokenizer()
+        self.model = BagOfWordsNLI()
+        self.engine = ZeroShotNLIEngine(self.model, self.tokenizer)
+
+    def test_scores_match_unpadded_pipeline_math(self):
+        texts = ["smoke pouring out of the garage", "bike stolen", "a b c d e f g h i j k"]
+
+        results = self.engine(texts, candidate_labels=self.LABELS, hypothesis_template=self.TEMPLATE)
+
+        for text, result in zip(texts, results):
+            expected = reference_scores(BagOfWordsNLI(), self.tokenizer, text, self.LABELS, self.TEMPLATE)
+            got = dict(zip(result["labels"], result["scores"]))
+            for label in self.LABELS:
+                self.assertAlmostEqual(got[label], expected[label], places=6)
+            self.assertEqual(result["scores"], sorted(result["scores"], reverse=True))
+
+    def test_all_pairs_run_in_one_padded_forward_pass(self):
+        self.engine(["short", "a much longer report text"], candidate_labels=self.LABELS)
+
+        self.assertEqual(len(self.model.batch_shapes), 1)
+        self.assertEqual(self.model.batch_shapes[0][0], 2 * len(self.LABELS))
+
+    def test_hypotheses_are_tokenized_once_per_label_set(self):
+        self.engine("first", candidate_labels=self.LABELS)
+        calls = self.tokenizer.calls
+
+        self.engine("second", candidate_labels=self.LABELS)
+
+        self.assertEqual(self.tokenizer.calls, calls + 1)  # the premise only
+
+    def test_hypothesis_cache_is_safe_across_threads(self):
+        engine = ZeroShotNLIEngine(self.model, self.tokenizer, hypothesis_cache_size=4)
+        label_sets = [[f"label{i}", f"other{i}"] for i in range(12)]
+        errors = []
+
+        def worker(offset):
+            try:
+                for i in range(200):
+                    labels = label_sets[(offset + i) % len(label_sets)]
+                    self.assertEqual(len(engine.hypothesis_ids(labels, "This is {}.")), 2)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(engine._hypotheses), 4)
+
+    def test_single_string_returns_a_dict_like_the_pipeline(self):
+        result = self.engine("smoke", candidate_labels=self.LABELS)
+
+        self.assertEqual(result["sequence"], "smoke")
+        self.assertAlmostEqual(sum(result["scores"]), 1.0, places=6)
+
+    def test_set_cancel_event_stops_before_the_forward_pass(self):
+        cancel = threading.Event()
+        cancel.set()
+
+        with self.assertRaises(InferenceCancelled):
+            self.engine("smoke", candidate_labels=self.LABELS, cancel_event=cancel)
+        self.assertEqual(self.model.batch_shapes, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+import config
+
+from inference.worker_stats import (
+    aggregate_worker_stats,
+    collect_worker_stats,
+    publish_worker_stats,
+)
+from prefork import RestartPolicy, config_error, cpu_slices
+
+
+class CpuSliceTests(unittest.TestCase):
+    def test_equal_share_per_worker(self):
+        self.assertEqual(cpu_slices(2, 0, list(range(8))), [[0, 1, 2, 3], [4, 5, 6, 7]])
+
+    def test_oversubscription_wraps_around(self):
+        self.assertEqual(cpu_slices(3, 2, [0, 1, 2, 3]), [[0, 1], [2, 3], [0, 1]])
+
+    def test_no_cpu_information(self):
+        self.assertEqual(cpu_slices(2, 0, []), [[], []])
+
+
+class ConfigErrorTests(unittest.TestCase):
+    def test_cpu_without_process_pool_can_fork(self):
+        with unittest.mock.patch.multiple(
+            config,
+            DEVICE="cpu",
+            CLASSIFIER_DEVICE="cpu",
+            EMBEDDING_DEVICE="cpu",
+            TOXICITY_DEVICE="cpu",
+            CROSS_ENCODER_DEVICE="cpu",
+            INFERENCE_PROCESS_WORKERS=0,
+        ):
+            self.assertIsNone(config_error())
+
+    def test_cuda_is_refused(self):
+        with unittest.mock.patch.multiple(config, DEVICE="cuda", CLASSIFIER_DEVICE="cuda"):
+            self.assertIn("CPU", config_error())
+
+    def test_process_pool_is_refused(self):
+        with unittest.mock.patch.multiple(
+            config,
+            DEVICE="cpu",
+            CLASSIFIER_DEVICE="cpu",
+            EMBEDDING_DEVICE="cpu",
+            TOXICITY_DEVICE="cpu",
+            CROSS_ENCODER_DEVICE="cpu",
+            INFERENCE_PROCESS_WORKERS=2,
+        ):
+            self.assertIn("INFERENCE_PROCESS_WORKERS", config_error())
+
+
+class RestartPolicyTests(unittest.TestCase):
+    def test_rapid_failures_back_off_then_give_up(self):
+        policy = RestartPolicy(1.0, 4.0, max_rapid=4, rapid_seconds=60)
+
+        delays = [policy.delay(0, uptime=2.0) for _ in range(5)]
+
+        self.assertEqual(delays, [1.0, 2.0, 4.0, 4.0, None])
+
+    def test_a_long_run_resets_the_count(self):
+        policy = RestartPolicy(1.0, 30.0, max_rapid=2, rapid_seconds=60)
+        policy.delay(0, uptime=1.0)
+        policy.delay(0, uptime=1.0)
+
+        self.assertEqual(policy.delay(0, uptime=600.0), 0.0)
+        self.assertEqual(policy.delay(0, uptime=1.0), 1.0)
+        self.assertEqual(policy.delay(1, uptime=1.0), 1.0)
+
+
+class WorkerStatsTests(unittest.TestCase):
+    def test_snapshots_of_dead_workers_are_dropped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            publish_worker_stats(tmp, {"worker": 0, "pid": os.getpid()})
+            dead = os.path.join(tmp, "worker-999999999.json")
+            with open(dead, "w") as handle:
+                json.dump({"worker": 1}, handle)
+
+            snapshots = collect_worker_stats(tmp)
+
+            self.assertEqual([s["worker"] for s in snapshots], [0])
+            self.assertFalse(os.path.exists(dead))
+
+    def test_cache_counters_are_summed_across_workers(self):
+        snapshots = [
+            {
+                "worker": 0,
+                "provider_ready": True,
+                "warmup": {"state": "done"},
+                "cache": {"hits": 3, "misses": 1, "l1": {"hits": 2, "misses": 2}},
+            },
+            {
+                "worker": 1,
+                "provider_ready": False,
+                "warmup": {"state": "running"},
+                "cache": {"hits": 1, "misses": 3, "l1": {"hits": 0, "misses": 4}},
+            },
+        ]
+
+        view = aggregate_worker_stats(snapshots)
+
+        self.assertEqual((view["count"], view["ready"]), (2, 1))
+        self.assertEqual(view["cache"]["hits"], 4)
+        self.assertEqual(view["cache"]["hit_rate"], "50.0%")
+        self.assertEqual(view["cache"]["l1"], {"hits": 2, "misses": 6, "hit_rate": "25.0%"})
+        self.assertEqual(view["per_worker"][1]["warmup"], "running")
+        self.assertEqual(view["per_worker"][0]["cache"]["hit_rate"], "75.0%")
+
+    def test_missing_directory_means_no_workers(self):
+        self.assertEqual(collect_worker_stats("/nonexistent/prefork-stats"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
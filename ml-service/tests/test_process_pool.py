@@ -0,0 +1,136 @@
+import os
+import signal
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from inference.process_pool import (
+    InferenceProcessPool,
+    ProcessModelProxy,
+    WorkerDiedError,
+    pack,
+    unpack,
+)
+
+
+class FakeEmbedder:
+    dimension = 4
+
+    def encode(self, texts):
+        return np.arange(len(texts) * self.dimension, dtype=np.float32).reshape(len(texts), -1)
+
+    def fail(self):
+        raise ValueError("bad input")
+
+    def slow(self, seconds):
+        time.sleep(seconds)
+
+
+def load_fake_models():
+    return {"embedding": FakeEmbedder()}
+
+
+def exit_while_loading():
+    os._exit(3)
+
+
+class SharedMemoryTransportTests(unittest.TestCase):
+    def test_large_arrays_round_trip_through_shared_memory(self):
+        counters = {}
+        vectors = np.random.rand(64, 384).astype(np.float32)
+        packed = pack({"vectors": vectors, "label": "x", "small": np.ones(2)}, 1024, counters)
+
+        self.assertNotIsInstance(packed["vectors"], np.ndarray)
+        self.assertIsInstance(packed["small"], np.ndarray)
+        self.assertEqual(counters["shm_transfers"], 1)
+        self.assertEqual(counters["shm_bytes"], vectors.nbytes)
+
+        restored = unpack(packed)
+        np.testing.assert_array_equal(restored["vectors"], vectors)
+        self.assertEqual(restored["label"], "x")
+
+    def test_nested_sequences_keep_their_type(self):
+        packed = pack(([np.zeros(512, dtype=np.float32)], "t"), 1024)
+        restored = unpack(packed)
+
+        self.assertIsInstance(restored, tuple)
+        self.assertIsInstance(restored[0], list)
+        self.assertEqual(restored[0][0].shape, (512,))
+
+
+class InferenceProcessPoolTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = InferenceProcessPool(
+            workers=1, threads_per_worker=1, timeout_seconds=30, shm_min_bytes=64,
+            loader=load_fake_models,
+        )
+        cls.pool.start(timeout=60)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_proxy_calls_run_in_the_worker(self):
+        proxy = ProcessModelProxy(self.pool, "embedding", FakeEmbedder, cached_attrs=("dimension",))
+
+        vectors = proxy.encode(["a", "b", "c", "d", "e"])
+
+        np.testing.assert_array_equal(vectors, FakeEmbedder().encode(["a"] * 5))
+        self.assertEqual(proxy.dimension, 4)
+        self.assertEqual(proxy.dimension, 4)
+        self.assertGreaterEqual(self.pool.stats["calls"], 2)
+        self.assertEqual(self.pool.stats["in_flight"], 0)
+
+    def test_worker_exceptions_reach_the_caller(self):
+        proxy = ProcessModelProxy(self.pool, "embedding", FakeEmbedder)
+
+        with self.assertRaises(ValueError):
+            proxy.fail()
+
+
+class WorkerDeathTests(unittest.TestCase):
+    def test_dead_worker_fails_its_calls_and_is_respawned(self):
+        pool = InferenceProcessPool(
+            workers=1, threads_per_worker=1, timeout_seconds=30, loader=load_fake_models
+        )
+        pool.start(timeout=60)
+        try:
+            proxy = ProcessModelProxy(pool, "embedding", FakeEmbedder)
+            errors = []
+
+            def call():
+                try:
+                    proxy.slow(20)
+                except Exception as e:
+                    errors.append(e)
+
+            caller = threading.Thread(target=call)
+            caller.start()
+            while pool.stats["in_flight"] == 0:
+                time.sleep(0.01)
+            started = time.monotonic()
+            os.kill(pool.stats["workers"][0]["pid"], signal.SIGKILL)
+            caller.join(timeout=10)
+
+            self.assertLess(time.monotonic() - started, 10)
+            self.assertIsInstance(errors[0], WorkerDiedError)
+            self.assertEqual(proxy.encode(["a"]).shape, (1, 4))
+            self.assertEqual(pool.stats["worker_deaths"], 1)
+            self.assertEqual(pool.stats["respawns"], 1)
+        finally:
+            pool.close()
+
+    def test_start_fails_when_a_worker_dies_while_loading(self):
+        pool = InferenceProcessPool(workers=1, threads_per_worker=1, loader=exit_while_loading)
+        started = time.monotonic()
+
+        with self.assertRaises(RuntimeError):
+            pool.start()
+        self.assertLess(time.monotonic() - started, 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+
+from inference.singleflight import SingleFlight
+
+
+class SingleFlightTests(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_identical_calls_share_one_execution(self):
+        flight = SingleFlight()
+        runs = 0
+
+        async def compute():
+            nonlocal runs
+            runs += 1
+            await asyncio.sleep(0.02)
+            return {"predicted_category": "fire"}
+
+        results = await asyncio.gather(
+            *(flight.do("classify:abc", compute, group="classify") for _ in range(5))
+        )
+
+        self.assertEqual(runs, 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        stats = flight.stats
+        self.assertEqual(stats["collapsed_total"], 4)
+        self.assertEqual(stats["groups"]["classify"], {"executions": 1, "collapsed": 4})
+        self.assertEqual(stats["in_flight"], 0)
+
+    async def test_distinct_keys_run_independently(self):
+        flight = SingleFlight()
+
+        async def compute(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(
+            flight.do("a", lambda: compute(1)),
+            flight.do("b", lambda: compute(2)),
+        )
+
+        self.assertEqual(results, [1, 2])
+        self.assertEqual(flight.stats["collapsed_total"], 0)
+
+    async def test_cancelled_waiter_does_not_cancel_shared_computation(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flight.do("k", compute))
+        second = asyncio.create_task(flight.do("k", compute))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        self.assertEqual(await second, "done")
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+
+    async def test_exception_reaches_every_waiter_and_key_is_released(self):
+        flight = SingleFlight()
+        runs = 0
+
+        async def failing():
+            nonlocal runs
+            runs += 1
+            await asyncio.sleep(0.01)
+            raise ValueError("model exploded")
+
+        results = await asyncio.gather(
+            flight.do("k", failing), flight.do("k", failing), return_exceptions=True
+        )
+
+        self.assertEqual(runs, 1)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+        async def succeeding():
+            return "recovered"
+
+        self.assertEqual(await flight.do("k", succeeding), "recovered")
+
+    async def test_sequential_calls_are_not_coalesced(self):
+        flight = SingleFlight()
+        runs = 0
+
+        async def compute():
+            nonlocal runs
+            runs += 1
+            return runs
+
+        self.assertEqual(await flight.do("k", compute), 1)
+        self.assertEqual(await flight.do("k", compute), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
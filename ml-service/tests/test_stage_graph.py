@@ -0,0 +1,77 @@
+import asyncio
+import unittest
+
+from inference.stage_graph import Stage, run_stages
+
+
+def after(delay, value):
+    async def run(_done):
+        await asyncio.sleep(delay)
+        return value
+
+    return run
+
+
+class StageGraphTests(unittest.IsolatedAsyncioTestCase):
+    async def test_independent_stages_overlap(self):
+        stages = await run_stages(
+            [
+                Stage("classification", after(0.05, "fire")),
+                Stage("toxicity", after(0.05, 0.1)),
+                Stage("similarity", after(0.05, [])),
+            ]
+        )
+
+        starts = [start for start, _ in stages.timings.values()]
+        self.assertLess(max(starts), 20.0)
+        self.assertLess(stages.elapsed_ms, 140.0)
+        self.assertEqual(stages.values["classification"], "fire")
+
+    async def test_dependents_start_after_and_receive_their_inputs(self):
+        seen = {}
+
+        async def risk(done):
+            seen.update(done)
+            return "high"
+
+        stages = await run_stages(
+            [
+                Stage("risk", risk, requires=("classification", "toxicity")),
+                Stage("classification", after(0.02, "fire")),
+                Stage("toxicity", after(0.01, 0.7)),
+            ]
+        )
+
+        self.assertEqual(seen, {"classification": "fire", "toxicity": 0.7})
+        self.assertGreaterEqual(stages.timings["risk"][0], stages.timings["classification"][1])
+        self.assertEqual(stages.values["risk"], "high")
+
+    async def test_a_failed_stage_yields_none_to_its_dependents(self):
+        async def broken(_done):
+            raise RuntimeError("model unavailable")
+
+        stages = await run_stages(
+            [
+                Stage("classification", broken),
+                Stage("risk", lambda done: after(0, done)(done), requires=("classification",)),
+            ]
+        )
+
+        self.assertIsNone(stages.values["classification"])
+        self.assertIsInstance(stages.errors["classification"], RuntimeError)
+        self.assertEqual(stages.values["risk"], {"classification": None})
+
+    async def test_invalid_graphs_are_rejected(self):
+        with self.assertRaises(ValueError):
+            await run_stages([Stage("risk", after(0, 1), requires=("missing",))])
+        with self.assertRaises(ValueError):
+            await run_stages(
+                [
+                    Stage("a", after(0, 1), requires=("b",)),
+                    Stage("b", after(0, 1), requires=("a",)),
+                ]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,20 @@
+import unittest
+
+from inference.stats import RollingWindow
+
+
+class RollingWindowTests(unittest.TestCase):
+    def test_summary_covers_recent_samples_and_count_covers_all(self):
+        window = RollingWindow(size=4)
+        for value in (100.0, 1.0, 2.0, 3.0, 4.0):
+            window.add(value)
+
+        self.assertEqual(window.summary(), {"p50": 2.0, "p99": 3.0, "mean": 2.5})
+        self.assertEqual(window.count, 5)
+
+    def test_empty_window(self):
+        self.assertEqual(RollingWindow().summary(), {"p50": None, "p99": None, "mean": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
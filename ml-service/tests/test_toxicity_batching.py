@@ -0,0 +1,96 @@
+import importlib.util
+import os
+import sys
+import types
+import unittest
+
+if importlib.util.find_spec("detoxify") is None:
+    detoxify_module = types.ModuleType("detoxify")
+    detoxify_module.Detoxify = object
+    sys.modules["detoxify"] = detoxify_module
+
+# Other test modules replace `models.toxicity` with a stub; load the real file.
+_spec = importlib.util.spec_from_file_location(
+    "_toxicity_under_test",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "toxicity.py"),
+)
+toxicity = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(toxicity)
+
+LABELS = ("toxicity", "severe_toxicity", "obscene", "threat", "insult", "identity_attack")
+
+
+class FakeDetoxify:
+    """Detoxify's list API: one list of scores per label, aligned with the input."""
+
+    def __init__(self, scores=None):
+        self.calls = []
+        self._scores = scores or {}
+
+    def predict(self, texts):
+        self.calls.append(list(texts))
+        return {
+            label: [self._scores.get(text, {}).get(label, 0.01) for text in texts]
+            for label in LABELS
+        }
+
+
+def _detector(model):
+    detector = object.__new__(toxicity.ToxicityDetector)
+    detector._model = model
+    return detector
+
+
+class ToxicityBatchTests(unittest.TestCase):
+    def test_batch_is_length_sorted_into_padding_chunks(self):
+        model = FakeDetoxify()
+        texts = ["x" * n for n in (40, 5, 30, 10, 20)]
+        original_chunk = toxicity.config.TOXICITY_PADDING_CHUNK
+        toxicity.config.TOXICITY_PADDING_CHUNK = 2
+        try:
+            results = _detector(model).batch_analyze(texts)
+        finally:
+            toxicity.config.TOXICITY_PADDING_CHUNK = original_chunk
+
+        self.assertEqual([[len(t) for t in call] for call in model.calls], [[5, 10], [20, 30], [40]])
+        self.assertEqual(len(results), 5)
+        self.assertEqual(set(results[0]), set(LABELS))
+
+    def test_scores_return_to_input_order(self):
+        model = FakeDetoxify({"you absolute idiot": {"toxicity": 0.9, "insult": 0.8}})
+
+        verdicts = _detector(model).is_toxic_batch(
+            ["a long and calm report about a parked car", "you absolute idiot"], 0.5
+        )
+
+        self.assertFalse(verdicts[0]["is_toxic"])
+        self.assertTrue(verdicts[1]["is_toxic"])
+        self.assertAlmostEqual(verdicts[1]["toxicity_score"], 0.9)
+        self.assertEqual(len(model.calls), 1)
+
+    def test_empty_texts_skip_the_model(self):
+        model = FakeDetoxify()
+
+        verdicts = _detector(model).is_toxic_batch(["", "ok"], 0.5)
+
+        self.assertEqual(model.calls, [["ok"]])
+        self.assertEqual(verdicts[0]["toxicity_score"], 0.0)
+
+    def test_contextual_backstop_applies_per_text_in_batch(self):
+        model = FakeDetoxify(
+            {
+                "those people are vermin": {"toxicity": 0.25},
+                "vermin in the basement": {"toxicity": 0.25},
+            }
+        )
+
+        hate, pests = _detector(model).is_toxic_batch(
+            ["those people are vermin", "vermin in the basement"], 0.5
+        )
+
+        self.assertTrue(hate["is_severe"])
+        self.assertFalse(pests["is_severe"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import time
+import unittest
+import unittest.mock
+from datetime import datetime, timezone
+
+import numpy as np
+
+from main_stubs import import_main
+from services.vector_index import VectorIndex, haversine_meters
+
+main = import_main()
+
+NOW = 1_760_000_000.0
+HOUR = 3600.0
+
+
+def clustered(count, dim=32, clusters=16, seed=0):
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim))
+    return centres[rng.integers(clusters, size=count)] + 0.3 * rng.normal(size=(count, dim))
+
+
+class VectorIndexTests(unittest.TestCase):
+    def test_neighbours_are_limited_to_the_time_window_and_radius(self):
+        index = VectorIndex(window_hours=4, radius_meters=1000, clock=lambda: NOW)
+        vector = [1.0, 0.0, 0.0]
+        index.upsert("query", vector, NOW, 40.7128, -74.0060)
+        index.upsert("same-block", [0.9, 0.1, 0.0], NOW - HOUR, 40.7130, -74.0062)
+        index.upsert("across-town", vector, NOW, 40.7800, -73.9700)
+        index.upsert("future", vector, NOW + 5 * HOUR, 40.7128, -74.0060)
+
+        neighbours = index.search(
+            index.vector("query"), NOW, 40.7128, -74.0060, k=5, exclude="query"
+        )
+
+        self.assertEqual([n["incident_id"] for n in neighbours], ["same-block"])
+        self.assertEqual(neighbours[0]["hours_apart"], 1.0)
+        self.assertLess(neighbours[0]["distance_meters"], 50)
+
+    def test_entries_older_than_the_window_are_evicted(self):
+        index = VectorIndex(window_hours=4, clock=lambda: NOW)
+        index.upsert("old", [1.0, 0.0], NOW - 6 * HOUR, 0.0, 0.0)
+        index.upsert("recent", [1.0, 0.0], NOW - HOUR, 0.0, 0.0)
+        index.upsert("new", [0.0, 1.0], NOW, 0.0, 0.0)
+
+        self.assertNotIn("old", index)
+        self.assertIn("recent", index)
+        self.assertEqual(index.stats["evicted"], 1)
+        self.assertTrue(index.remove("recent"))
+        self.assertEqual(len(index), 1)
+
+    def test_ivf_search_matches_exact_search_on_clustered_data(self):
+        vectors = clustered(2000)
+        ivf = VectorIndex(nlist=16, nprobe=4, train_factor=4, clock=lambda: NOW)
+        exact = VectorIndex(nlist=16, nprobe=16, train_factor=4, clock=lambda: NOW)
+        for i, vector in enumerate(vectors):
+            ivf.upsert(str(i), vector, NOW, 0.0, 0.0)
+            exact.upsert(str(i), vector, NOW, 0.0, 0.0)
+        self.assertEqual(ivf.stats["trained_lists"], 16)
+
+        queries = vectors[:50] + 0.1 * np.random.default_rng(1).normal(size=(50, 32))
+        recall = np.mean(
+            [
+                len(
+                    {n["incident_id"] for n in ivf.search(q, NOW, k=10)}
+                    & {n["incident_id"] for n in exact.search(q, NOW, k=10)}
+                )
+                / 10
+                for q in queries
+            ]
+        )
+        self.assertGreater(recall, 0.9)
+        self.assertLess(ivf.stats["avg_scanned"], exact.stats["avg_scanned"] / 2)
+
+    def test_dimension_mismatch_is_rejected(self):
+        index = VectorIndex(clock=lambda: NOW)
+        index.upsert("a", [1.0, 0.0, 0.0], NOW, 0.0, 0.0)
+
+        with self.assertRaises(ValueError):
+            index.upsert("b", [1.0, 0.0], NOW, 0.0, 0.0)
+        with self.assertRaises(ValueError):
+            index.search([1.0, 0.0], NOW)
+
+    def test_a_bad_item_leaves_the_batch_unwritten(self):
+        index = VectorIndex(clock=lambda: NOW)
+        index.upsert("a", [1.0, 0.0, 0.0], NOW, 0.0, 0.0)
+
+        with self.assertRaises(ValueError):
+            index.upsert_many(
+                [
+                    ("b", [0.0, 1.0, 0.0], NOW, 0.0, 0.0),
+                    ("c", [1.0, 0.0], NOW, 0.0, 0.0),
+                ]
+            )
+        self.assertNotIn("b", index)
+        self.assertEqual(index.stats["upserts"], 1)
+
+    def test_background_training_swaps_centroids_in(self):
+        vectors = clustered(600)
+        index = VectorIndex(
+            nlist=8, nprobe=2, train_factor=4, clock=lambda: NOW, background_training=True
+        )
+        index.upsert_many((str(i), v, NOW, 0.0, 0.0) for i, v in enumerate(vectors))
+
+        deadline = time.monotonic() + 10
+        while index.stats["trained_lists"] == 0 or index.stats["training"]:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        index.upsert("late", vectors[0], NOW, 0.0, 0.0)
+
+        neighbours = index.search(vectors[0], NOW, k=2)
+        self.assertEqual({n["incident_id"] for n in neighbours}, {"0", "late"})
+
+    def test_haversine_distance(self):
+        # One degree of latitude is about 111 km.
+        distance = haversine_meters(0.0, 0.0, np.array([1.0]), np.array([0.0]))[0]
+        self.assertAlmostEqual(distance / 1000.0, 111.2, delta=0.5)
+
+
+class FakeEmbeddingProvider:
+    def __init__(self):
+        self.batches = []
+
+    async def embed_many(self, texts):
+        self.batches.append(list(texts))
+        return [[1.0, float(i), 0.0] for i in range(len(texts))]
+
+
+class DedupIndexEndpointTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.previous = (main.active_provider, main.dedup_index)
+        main.dedup_index = main.VectorIndex()
+
+    def tearDown(self):
+        main.active_provider, main.dedup_index = self.previous
+
+    async def test_texts_in_a_bulk_upsert_are_embedded_in_one_call(self):
+        provider = main.active_provider = FakeEmbeddingProvider()
+        at = {"timestamp": datetime.now(timezone.utc), "lat": 40.7, "lon": -74.0}
+        request = main.DedupIndexRequest(
+            items=[
+                {"incident_id": "a", "text": "smoke on 5th", **at},
+                {"incident_id": "b", "embedding": [0.0, 0.0, 1.0], **at},
+                {"incident_id": "c", "text": "fire on 5th", **at},
+            ]
+        )
+
+        response = await main.dedup_index_upsert(request)
+
+        self.assertEqual(response.entries, 3)
+        self.assertEqual(provider.batches, [["smoke on 5th", "fire on 5th"]])
+        self.assertEqual(main.dedup_index.vector("b").tolist(), [0.0, 0.0, 1.0])
+
+    async def test_multi_worker_prefork_is_refused(self):
+        request = main.DedupSearchRequest(
+            embedding=[1.0, 0.0], timestamp=datetime.now(timezone.utc)
+        )
+        with unittest.mock.patch.object(main, "PREFORK_WORKER", "0"):
+            with unittest.mock.patch.object(main.config, "PREFORK_WORKERS", 2):
+                with self.assertRaises(main.HTTPException) as raised:
+                    await main.dedup_search(request)
+        self.assertEqual(raised.exception.status_code, 409)
+
+
+if __name__ == "__main__":
+    unittest.main()
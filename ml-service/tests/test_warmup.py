@@ -0,0 +1,134 @@
+import json
+import unittest
+from unittest import mock
+
+from inference.model_manager import ModelManager
+from main_stubs import import_main
+from providers import local
+from providers.local import LocalProvider, warmup_text
+
+main = import_main()
+
+
+class WarmableModel:
+    def __init__(self, fail=False, failures=0):
+        self.batches = []
+        self.fail = fail
+        self.failures = failures
+
+    def warmup(self, texts, categories=None):
+        if self.fail:
+            raise RuntimeError("kernel error")
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("transient error")
+        self.batches.append((len(texts), len(texts[0].split()), categories))
+
+    def is_toxic_batch(self, texts, threshold):
+        return [{"is_toxic": False} for _ in texts]
+
+
+class ProviderWarmupTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(
+            local.config,
+            MODEL_WARMUP_ENABLED=True,
+            MODEL_WARMUP_LENGTHS=[4, 32],
+            MODEL_WARMUP_BATCH_SIZES=[1, 3],
+            MODEL_WARMUP_ATTEMPTS=3,
+            MODEL_WARMUP_RETRY_BACKOFF_SECONDS=0.0,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_not_ready_until_every_length_and_batch_size_ran(self):
+        embedding, classifier, toxicity = WarmableModel(), WarmableModel(), WarmableModel()
+        provider = LocalProvider(classifier, embedding, toxicity, object())
+
+        self.assertFalse(await provider.is_ready())
+        await provider.warmup()
+
+        self.assertTrue(await provider.is_ready())
+        self.assertEqual(
+            [(size, words) for size, words, _ in toxicity.batches],
+            [(1, 4), (3, 4), (1, 32), (3, 32)],
+        )
+        self.assertEqual(classifier.batches[0][2], local.config.INCIDENT_CATEGORIES)
+        stats = provider.warmup_stats()
+        self.assertEqual(stats["state"], "done")
+        self.assertEqual(set(stats["ms"]), {"embedding", "classifier", "toxicity"})
+
+    async def test_failed_warmup_keeps_provider_not_ready(self):
+        provider = LocalProvider(WarmableModel(fail=True), WarmableModel(), WarmableModel(), object())
+
+        await provider.warmup()
+
+        self.assertFalse(await provider.is_ready())
+        stats = provider.warmup_stats()
+        self.assertEqual((stats["state"], stats["attempts"]), ("failed", 3))
+        self.assertEqual(stats["error"], "kernel error")
+
+    async def test_transient_warmup_failure_is_retried(self):
+        provider = LocalProvider(WarmableModel(failures=1), WarmableModel(), WarmableModel(), object())
+
+        await provider.warmup()
+
+        self.assertTrue(await provider.is_ready())
+        stats = provider.warmup_stats()
+        self.assertEqual((stats["state"], stats["attempts"], stats["error"]), ("done", 2, None))
+
+    async def test_lazy_models_are_not_loaded_to_be_warmed(self):
+        manager = ModelManager()
+        loader = mock.Mock(return_value=WarmableModel())
+        lazy_toxicity = manager.register("toxicity", loader, WarmableModel, lazy=True)
+        provider = LocalProvider(WarmableModel(), WarmableModel(), lazy_toxicity, object())
+
+        await provider.warmup()
+
+        loader.assert_not_called()
+        self.assertNotIn("toxicity", provider.warmup_stats()["ms"])
+
+    def test_warmup_text_has_the_requested_length(self):
+        self.assertEqual(len(warmup_text(50).split()), 50)
+        self.assertNotEqual(warmup_text(5, 0), warmup_text(5, 1))
+
+
+class FakeWarmupProvider:
+    def __init__(self, state):
+        self.state = state
+
+    async def is_ready(self):
+        return self.state == "done"
+
+    def warmup_stats(self):
+        return {"state": self.state, "ms": {}, "attempts": 3, "error": "kernel error"}
+
+    def batching_stats(self):
+        return {}
+
+
+class HealthEndpointTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.previous = main.active_provider
+
+    def tearDown(self):
+        main.active_provider = self.previous
+
+    async def test_failed_warmup_answers_503_unhealthy(self):
+        main.active_provider = FakeWarmupProvider("failed")
+
+        response = await main.health_check()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(json.loads(response.body)["status"], "unhealthy")
+
+    async def test_running_warmup_is_degraded_not_unhealthy(self):
+        main.active_provider = FakeWarmupProvider("running")
+
+        response = await main.health_check()
+
+        self.assertEqual(response["status"], "degraded")
+
+
+if __name__ == "__main__":
+    unittest.main()